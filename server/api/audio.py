@@ -10,11 +10,9 @@ import asyncio
 import base64
 import json
 import logging
-import io
 import os
 import random
 import time
-import wave
 from typing import Optional
 import numpy as np
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
@@ -23,7 +21,10 @@ from core.intent_parser import IntentParser
 from core.conversation_state import ConversationMode
 from core.vad_wakeword import VADWakeWordDetector
 from core.story_recorder import StoryRecordingSession
+from core.async_db import get_async_db
 from core.auth import verify_device_api_key, verify_websocket_key
+from core import audio_dsp, device_state
+from core.squawk import RenderedClip
 from config import settings
 
 router = APIRouter()
@@ -36,6 +37,20 @@ OWW_CHUNK_SAMPLES = 1280
 OWW_CHUNK_BYTES = OWW_CHUNK_SAMPLES * 2  # int16 = 2 bytes
 
 
+def _mic_wav(pcm: bytes) -> bytes:
+    """Wrap raw device mic PCM in a WAV header for transcription/storage."""
+    return audio_dsp.wrap_wav(bytes(pcm), rate=settings.SAMPLE_RATE, channels=settings.CHANNELS)
+
+
+def _record_event(app, device_id: str, tenant_id: int, event_type: str, **fields):
+    """Queue a device_events row for the admin dashboard (batched write)."""
+    telemetry = getattr(app.state, "telemetry", None)
+    if telemetry:
+        telemetry.record(device_id, tenant_id, event_type, **fields)
+    elif getattr(app.state, "db", None):
+        get_async_db(app).defer("log_device_event", device_id, tenant_id, event_type, **fields)
+
+
 class AudioSession:
     def __init__(self, device_id: str):
         self.device_id = device_id
@@ -54,13 +69,7 @@ class AudioSession:
 
     def get_wav_bytes(self, audio_data: bytearray = None) -> bytes:
         data = audio_data if audio_data else self.audio_buffer
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(settings.CHANNELS)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(settings.SAMPLE_RATE)
-            wav_file.writeframes(data)
-        return wav_buffer.getvalue()
+        return _mic_wav(data)
 
 
 # ─── Continuous Stream Handler ───────────────────────────────────────────────
@@ -74,6 +83,7 @@ async def continuous_stream(websocket: WebSocket):
 
     app = websocket.app
     db = app.state.db
+    adb = get_async_db(app)  # DB calls run off the event loop
     transcriber = app.state.transcriber
     tts = app.state.tts
     # Per-device wake word detector (model has internal state that gets corrupted
@@ -82,7 +92,7 @@ async def continuous_stream(websocket: WebSocket):
     from core.wakeword import WakeWordDetector
     _shared_detector = app.state.wake_word_detector
     if not hasattr(app.state, '_device_detectors'):
-        app.state._device_detectors = {}
+        app.state._device_detectors = device_state.DeviceStateStore("audio.device_detectors")
     # device_id not known yet — will be set after connect message. Use shared for now,
     # swap to per-device after we know the device_id.
     detector = _shared_detector
@@ -135,12 +145,13 @@ async def continuous_stream(websocket: WebSocket):
 
     # Mutable container so _log_event captures current tenant_id and DB device_id
     _evt_ctx = {"tenant_id": 1, "db_device_id": device_id}
+    connected_id = None  # device pinned in device_state while this socket is open
 
     def _log_event(evt_type, intent=None, success=1, detail=None):
         """Log a device event for admin dashboard (never crashes pipeline)."""
         try:
-            db.log_device_event(_evt_ctx["db_device_id"], _evt_ctx["tenant_id"],
-                                evt_type, intent=intent, success=success, detail=detail)
+            _record_event(app, _evt_ctx["db_device_id"], _evt_ctx["tenant_id"],
+                          evt_type, intent=intent, success=success, detail=detail)
         except Exception:
             pass
 
@@ -168,7 +179,7 @@ async def continuous_stream(websocket: WebSocket):
                     fw_version = msg_data.get("fw_version")
                     fw_variant = msg_data.get("fw_variant")
                     # Authenticate device
-                    device_info = verify_device_api_key(msg_data.get("api_key", ""), db)
+                    device_info = await adb.write(verify_device_api_key, msg_data.get("api_key", ""), db)
                     if device_info:
                         # Guard: reject unclaimed devices with claim codes
                         if device_info.get("claim_code") and not device_info.get("claimed_at"):
@@ -190,15 +201,12 @@ async def continuous_stream(websocket: WebSocket):
                         # Save firmware info using the DB device_id
                         db_device_id = device_info.get("device_id") or device_id
                         if fw_version:
-                            db.update_device_firmware_info(db_device_id, fw_version, fw_variant)
+                            await adb.update_device_firmware_info(db_device_id, fw_version, fw_variant)
                             logger.info(f"Device {device_id} firmware: v{fw_version} ({fw_variant})")
                         logger.info(f"Continuous stream device: {device_id} (tenant={device_info['tenant_id']})")
 
                         # Mark device as seen (for admin dashboard online status)
-                        try:
-                            db.update_device_last_seen(db_device_id)
-                        except Exception:
-                            pass
+                        adb.defer("update_device_last_seen", db_device_id)
 
                         # Swap to per-device wake word detector (cached, reused on reconnect)
                         if _shared_detector.ready and _shared_detector.model_path:
@@ -214,7 +222,7 @@ async def continuous_stream(websocket: WebSocket):
 
                         # Load voice volume + default speaker from user profile
                         try:
-                            user_profile = db.get_or_create_user(tenant_id=tenant_id)
+                            user_profile = await adb.get_or_create_user(tenant_id=tenant_id)
                             conv_state.voice_volume = user_profile.get("voice_volume") or 100
                             # Default speaker to owner name so stories aren't "Unknown"
                             if not conv_state.speaker_name:
@@ -248,10 +256,13 @@ async def continuous_stream(websocket: WebSocket):
                     # Register for medication reminders
                     if med_scheduler:
                         med_scheduler.register_websocket(device_id, websocket, tenant_id)
+                    if connected_id is None:
+                        device_state.mark_connected(device_id)
+                        connected_id = device_id
 
                     # Load family names into intent parser for person detection
                     try:
-                        family_members = db.get_family_members(tenant_id=tenant_id)
+                        family_members = await adb.get_family_members(tenant_id=tenant_id)
                         family_names = set()
                         relation_to_name = {}
                         for m in family_members:
@@ -292,7 +303,7 @@ async def continuous_stream(websocket: WebSocket):
                           "squawk_volume": 30, "rms_threshold": None,
                           "message_nag_enabled": 1}
                     try:
-                        ds = db.get_device_settings(device_id, tenant_id)
+                        ds = await adb.get_device_settings(device_id, tenant_id)
                     except Exception:
                         pass
 
@@ -337,16 +348,16 @@ async def continuous_stream(websocket: WebSocket):
 
                         # Register nostalgia callback for chatter slots (20% chance)
                         _ns_tid = tenant_id
-                        _ns_db = db
+                        _ns_db = adb
                         _ns_tts = tts
                         _ns_ws = websocket
                         _ns_smgr = squawk_mgr
                         _ns_dev = device_id
                         _ns_cmd = cmd
                         async def _nostalgia_chatter():
-                            snippet = _ns_db.get_next_nostalgia_snippet(_ns_tid)
+                            snippet = await _ns_db.get_next_nostalgia_snippet(_ns_tid)
                             if snippet:
-                                _ns_db.mark_nostalgia_used(snippet["id"])
+                                await _ns_db.mark_nostalgia_used(snippet["id"])
                                 logger.info(f"Nostalgia snippet → {_ns_dev}: {snippet['text'][:60]}...")
                                 await _send_tts(_ns_ws, _ns_tts, snippet["text"],
                                                 squawk_mgr=_ns_smgr, device_id=_ns_dev)
@@ -358,24 +369,17 @@ async def continuous_stream(websocket: WebSocket):
                         squawk_mgr.register_nostalgia_callback(device_id, _nostalgia_chatter)
 
                         # Register prayer recording scheduler
-                        _pr_db = db
+                        _pr_db = adb
                         _pr_tts = tts
                         _pr_ws = websocket
                         _pr_smgr = squawk_mgr
                         _pr_dev = device_id
                         _pr_tid = tenant_id
                         _pr_cmd = cmd
-                        _pr_last_check = [0]  # mutable for closure
 
                         async def _check_scheduled_prayers():
-                            """Check if any prayer recordings should play right now."""
-                            import time as _time
-                            now = _time.time()
-                            # Only check once per minute
-                            if now - _pr_last_check[0] < 60:
-                                return False
-                            _pr_last_check[0] = now
-
+                            """Check if any prayer recordings should play right now.
+                            The squawk scheduler calls this once per minute."""
                             from datetime import datetime
                             from core.medications import _get_local_now
                             local_now = _get_local_now()
@@ -384,7 +388,7 @@ async def continuous_stream(websocket: WebSocket):
                             # Python weekday: Mon=0, Sun=6. Our schedule: Sun=0, Sat=6
                             day_of_week = (day_of_week + 1) % 7
 
-                            prayers = _pr_db.get_scheduled_prayers(_pr_tid, day_of_week)
+                            prayers = await _pr_db.get_scheduled_prayers(_pr_tid, day_of_week)
                             for prayer in prayers:
                                 sched_time = prayer.get("schedule_time", "")
                                 if not sched_time:
@@ -411,8 +415,8 @@ async def continuous_stream(websocket: WebSocket):
                                         # Send the recorded WAV
                                         with open(filepath, "rb") as f:
                                             wav_data = f.read()
-                                        await _pr_smgr._send_wav(_pr_dev, wav_data)
-                                        _pr_db.update_prayer_recording_played(prayer["id"])
+                                        await _pr_smgr._send_wav(_pr_ws, _pr_dev, wav_data)
+                                        await _pr_db.update_prayer_recording_played(prayer["id"])
                                         # Set last_response so "repeat" works
                                         if _pr_cmd:
                                             _pr_cmd._last_response[_pr_dev] = intro
@@ -422,7 +426,7 @@ async def continuous_stream(websocket: WebSocket):
                         squawk_mgr.register_prayer_callback(device_id, _check_scheduled_prayers)
 
                         # Register message nag callback
-                        _msg_db = db
+                        _msg_db = adb
                         _msg_tid = tenant_id
                         _msg_ws = websocket
                         _msg_tts = tts
@@ -430,7 +434,7 @@ async def continuous_stream(websocket: WebSocket):
                         _msg_dev = device_id
                         _msg_cmd = cmd
                         async def _has_messages():
-                            msgs = _msg_db.get_messages_for(tenant_id=_msg_tid, device_id=_msg_dev)
+                            msgs = await _msg_db.get_messages_for(tenant_id=_msg_tid, device_id=_msg_dev)
                             # Only nag for unread messages
                             return any(not m.get("read") for m in msgs)
                         async def _tts_message(text):
@@ -447,10 +451,7 @@ async def continuous_stream(websocket: WebSocket):
                     await websocket.send_json({"event": "pong"})
                     # Update last_seen on ping (~every 30s) for admin dashboard
                     if db_device_id:
-                        try:
-                            db.update_device_last_seen(db_device_id)
-                        except Exception:
-                            pass
+                        adb.defer("update_device_last_seen", db_device_id)
                     continue
 
                 if event == "story_button":
@@ -492,8 +493,7 @@ async def continuous_stream(websocket: WebSocket):
                         duration = result.get("duration_seconds", 0)
 
                         if transcript or wav_filename:
-                            db = app.state.db
-                            story_id = db.save_story(
+                            story_id = await adb.save_story(
                                 transcript=transcript or "(no speech detected)",
                                 audio_s3_key=wav_filename,
                                 speaker_name=conv_state.speaker_name,
@@ -505,7 +505,7 @@ async def continuous_stream(websocket: WebSocket):
                             # Auto-tag story with people, places, years
                             if transcript:
                                 try:
-                                    db.auto_tag_story(story_id, transcript, tenant_id=conv_state.tenant_id)
+                                    await adb.auto_tag_story(story_id, transcript, tenant_id=conv_state.tenant_id)
                                 except Exception:
                                     pass
 
@@ -519,7 +519,7 @@ async def continuous_stream(websocket: WebSocket):
                                     )
                                     mem_bucket = metadata.get("bucket", "ordinary_world")
                                     mem_phase = metadata.get("life_phase", "unknown")
-                                    db.save_memory(
+                                    await adb.save_memory(
                                         story_id=story_id,
                                         speaker=metadata.get("speaker"),
                                         bucket=mem_bucket,
@@ -534,7 +534,7 @@ async def continuous_stream(websocket: WebSocket):
                                     )
                                     # Flag matching chapters as needing refresh
                                     try:
-                                        db.flag_chapters_for_refresh(
+                                        await adb.flag_chapters_for_refresh(
                                             mem_bucket, mem_phase,
                                             tenant_id=conv_state.tenant_id,
                                         )
@@ -597,8 +597,7 @@ async def continuous_stream(websocket: WebSocket):
                     duration = result.get("duration_seconds", 0)
 
                     if transcript or wav_filename:
-                        db_ref = app.state.db
-                        db_ref.save_story(
+                        await adb.save_story(
                             transcript=transcript or "(no speech detected)",
                             audio_s3_key=wav_filename,
                             speaker_name=conv_state.speaker_name,
@@ -740,14 +739,8 @@ async def continuous_stream(websocket: WebSocket):
                                 and reason == "silence"
                                 and not still_there_prompted):
                             # Quick transcribe to check if user actually spoke
-                            check_wav = io.BytesIO()
-                            with wave.open(check_wav, 'wb') as wf:
-                                wf.setnchannels(settings.CHANNELS)
-                                wf.setsampwidth(2)
-                                wf.setframerate(settings.SAMPLE_RATE)
-                                wf.writeframes(command_audio)
                             check_text = await asyncio.to_thread(
-                                transcriber.transcribe, check_wav.getvalue()
+                                transcriber.transcribe, _mic_wav(command_audio)
                             )
 
                             if not check_text or not check_text.strip():
@@ -813,6 +806,8 @@ async def continuous_stream(websocket: WebSocket):
             med_scheduler.unregister_websocket(device_id)
         if squawk_mgr:
             squawk_mgr.unregister_device(device_id)
+        if connected_id:
+            device_state.mark_disconnected(connected_id)
 
 
 async def _process_command(
@@ -833,11 +828,11 @@ async def _process_command(
     # Load pronunciation guide for this tenant
     _pronunciations = []
     try:
-        _db = getattr(websocket.app.state, "db", None)
+        _db = get_async_db(websocket.app)
         if _db:
             _conv = cmd._get_state(device_id) if hasattr(cmd, '_get_state') else None
             _tid = _conv.tenant_id if _conv else 1
-            _pronunciations = _db.get_pronunciations(_tid)
+            _pronunciations = await _db.get_pronunciations(_tid)
     except Exception:
         pass
 
@@ -855,18 +850,12 @@ async def _process_command(
     if len(command_audio) > _min_save_bytes:
         try:
             import uuid as _uuid
-            wav_buf = io.BytesIO()
-            with wave.open(wav_buf, 'wb') as wf:
-                wf.setnchannels(settings.CHANNELS)
-                wf.setsampwidth(2)
-                wf.setframerate(settings.SAMPLE_RATE)
-                wf.writeframes(command_audio)
             recordings_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "recordings")
             os.makedirs(recordings_dir, exist_ok=True)
             _saved_wav_filename = f"story_{device_id}_{_uuid.uuid4().hex[:8]}.wav"
             filepath = os.path.join(recordings_dir, _saved_wav_filename)
             with open(filepath, "wb") as f:
-                f.write(wav_buf.getvalue())
+                f.write(_mic_wav(command_audio))
             duration_sec = len(command_audio) / (settings.SAMPLE_RATE * 2)
             logger.info(f"Story audio saved: {_saved_wav_filename} ({duration_sec:.1f}s)")
         except Exception as e:
@@ -893,13 +882,7 @@ async def _process_command(
 
             parts = []
             for i, chunk in enumerate(chunks):
-                wav_buffer = io.BytesIO()
-                with wave.open(wav_buffer, 'wb') as wf:
-                    wf.setnchannels(settings.CHANNELS)
-                    wf.setsampwidth(2)
-                    wf.setframerate(settings.SAMPLE_RATE)
-                    wf.writeframes(chunk)
-                wav_bytes = wav_buffer.getvalue()
+                wav_bytes = _mic_wav(chunk)
                 try:
                     part = await asyncio.wait_for(
                         asyncio.to_thread(transcriber.transcribe, wav_bytes),
@@ -916,13 +899,7 @@ async def _process_command(
             logger.info(f"Chunked STT: {len(chunks)} chunks, {len(transcription)} chars total")
         else:
             # Single-shot transcription for short recordings
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wf:
-                wf.setnchannels(settings.CHANNELS)
-                wf.setsampwidth(2)
-                wf.setframerate(settings.SAMPLE_RATE)
-                wf.writeframes(command_audio)
-            wav_bytes = wav_buffer.getvalue()
+            wav_bytes = _mic_wav(command_audio)
 
             try:
                 transcription = await asyncio.wait_for(
@@ -939,16 +916,16 @@ async def _process_command(
         # If we have saved audio, preserve it as a story regardless of mode
         if _saved_wav_filename:
             try:
-                _db = getattr(websocket.app.state, "db", None)
+                _db = get_async_db(websocket.app)
                 _tid = conv_state_check.tenant_id if conv_state_check else 1
                 _q = getattr(conv_state_check, "current_question", None)
                 _speaker = None
                 try:
-                    _usr = _db.get_or_create_user(tenant_id=_tid) if _db else {}
+                    _usr = await _db.get_or_create_user(tenant_id=_tid) if _db else {}
                     _speaker = _usr.get("name") or None
                 except Exception:
                     pass
-                story_id = _db.save_story(
+                story_id = await _db.save_story(
                     transcript="(Transcription pending — long recording)",
                     audio_s3_key=_saved_wav_filename,
                     speaker_name=_speaker,
@@ -1047,12 +1024,10 @@ async def _process_command(
 
     # Log command event for admin dashboard
     try:
-        _db = getattr(websocket.app.state, "db", None)
-        if _db:
-            _conv = cmd._get_state(device_id) if hasattr(cmd, '_get_state') else None
-            _tid = _conv.tenant_id if _conv else 1
-            _db.log_device_event(db_device_id or device_id, _tid, "command",
-                                 intent=intent_result.get("intent"))
+        _conv = cmd._get_state(device_id) if hasattr(cmd, '_get_state') else None
+        _tid = _conv.tenant_id if _conv else 1
+        _record_event(websocket.app, db_device_id or device_id, _tid, "command",
+                      intent=intent_result.get("intent"))
     except Exception:
         pass
 
@@ -1063,11 +1038,11 @@ async def _process_command(
         # Build location override from user settings
         _weather_loc = None
         try:
-            _db = getattr(websocket.app.state, "db", None)
+            _db = get_async_db(websocket.app)
             if _db:
                 _conv = cmd._get_state(device_id) if hasattr(cmd, '_get_state') else None
                 _tid = _conv.tenant_id if _conv else 1
-                _wu = _db.get_or_create_user(tenant_id=_tid)
+                _wu = await _db.get_or_create_user(tenant_id=_tid)
                 if _wu and _wu.get("location_lat") and _wu.get("location_lon"):
                     _weather_loc = (_wu["location_lat"], _wu["location_lon"],
                                     _wu.get("location_city") or "your area")
@@ -1107,11 +1082,11 @@ async def _process_command(
     # Get owner's familiar name for personalized buffers
     _owner_name = None
     try:
-        _db = getattr(websocket.app.state, "db", None)
+        _db = get_async_db(websocket.app)
         if _db:
             _conv = cmd._get_state(device_id) if hasattr(cmd, '_get_state') else None
             _tid = _conv.tenant_id if _conv else 1
-            _usr = _db.get_or_create_user(tenant_id=_tid)
+            _usr = await _db.get_or_create_user(tenant_id=_tid)
             _owner_name = _usr.get("familiar_name") or _usr.get("name") or None
     except Exception:
         pass
@@ -1235,22 +1210,16 @@ async def _process_command(
                     wav_data = f.read()
                 # Scale volume to match blessing volume setting
                 try:
-                    _db = getattr(websocket.app.state, "db", None)
+                    _db = get_async_db(websocket.app)
                     _cmd = getattr(websocket.app.state, "cmd", None)
                     _cs = _cmd._get_state(device_id) if _cmd else None
                     _tid = _cs.tenant_id if _cs else 1
-                    _usr = _db.get_or_create_user(tenant_id=_tid) if _db else {}
+                    _usr = await _db.get_or_create_user(tenant_id=_tid) if _db else {}
                     _vol = _usr.get("blessing_volume", 80)
                     if _vol is None:
                         _vol = 80
                     if _vol < 100:
-                            import numpy as _np
-                            # Skip WAV header (44 bytes) if present
-                            hdr = 44 if wav_data[:4] == b'RIFF' else 0
-                            samples = _np.frombuffer(wav_data[hdr:], dtype=_np.int16).astype(_np.float32)
-                            samples = samples * (_vol / 100.0)
-                            samples = _np.clip(samples, -32768, 32767).astype(_np.int16)
-                            wav_data = wav_data[:hdr] + samples.tobytes()
+                        wav_data = audio_dsp.scale_wav(wav_data, _vol / 100.0)
                 except Exception:
                     pass
                 ws = squawk_mgr._active_devices.get(device_id, websocket)
@@ -1272,16 +1241,16 @@ async def _process_command(
             and transcription
             and len(transcription) > 100):
         try:
-            _db = getattr(websocket.app.state, "db", None)
+            _db = get_async_db(websocket.app)
             _conv = cmd._get_state(device_id) if hasattr(cmd, '_get_state') else None
             _tid = _conv.tenant_id if _conv else 1
             _speaker = None
             try:
-                _usr = _db.get_or_create_user(tenant_id=_tid) if _db else {}
+                _usr = await _db.get_or_create_user(tenant_id=_tid) if _db else {}
                 _speaker = _usr.get("name") or None
             except Exception:
                 pass
-            _db.save_story(
+            await _db.save_story(
                 transcript=transcription,
                 audio_s3_key=_saved_wav_filename,
                 speaker_name=_speaker,
@@ -1328,12 +1297,8 @@ async def _send_tts(websocket: WebSocket, tts, text: str, squawk_mgr=None,
                 conv_state = cmd._get_state(device_id)
                 vol = getattr(conv_state, "voice_volume", 100)
                 if vol < 100:
-                    import numpy as np
-                    factor = vol / 100.0
-                    samples = np.frombuffer(tts_audio, dtype=np.int16).astype(np.float32)
-                    samples = samples * factor
-                    samples = np.clip(samples, -32768, 32767).astype(np.int16)
-                    tts_audio = samples.tobytes()
+                    # Scale samples only — the WAV header must pass through intact
+                    tts_audio = audio_dsp.scale_wav(tts_audio, vol / 100.0)
         except Exception:
             pass  # If anything fails, send at full volume
 
@@ -1343,31 +1308,13 @@ async def _send_tts(websocket: WebSocket, tts, text: str, squawk_mgr=None,
         # Acquire send lock if available (prevents concurrent writes with squawk)
         lock = squawk_mgr.get_send_lock(device_id) if squawk_mgr and device_id else None
 
-        async def _do_send():
-            # Smaller chunks + longer delays for large audio to avoid
-            # overwhelming ESP32's WebSocket receive buffer / TCP stack.
-            # ESP32 buffers all chunks before playback, so we need to
-            # pace the sends to avoid TCP buffer overflow → freeze.
-            total_len = len(tts_audio)
-            if total_len > 128000:  # ~4s of audio — large response
-                chunk_size = 4000
-                chunk_delay = 0.08
-            elif total_len > 64000:  # ~2s of audio — medium response
-                chunk_size = 6000
-                chunk_delay = 0.06
-            else:
-                chunk_size = 8000
-                chunk_delay = 0.05
+        # Same framing and pacing as squawks and reminders (squawk._chunk_plan)
+        clip = RenderedClip(tts_audio, squawk=False)
 
-            for i in range(0, total_len, chunk_size):
-                chunk = tts_audio[i:i + chunk_size]
-                chunk_b64 = base64.b64encode(chunk).decode()
-                await websocket.send_json({
-                    "event": "audio_chunk",
-                    "audio": chunk_b64,
-                    "final": (i + chunk_size >= total_len),
-                })
-                await asyncio.sleep(chunk_delay)
+        async def _do_send():
+            for frame in clip.frames:
+                await websocket.send_text(frame)
+                await asyncio.sleep(clip.chunk_delay)
 
         if lock:
             async with lock:
@@ -1381,10 +1328,8 @@ async def _send_tts(websocket: WebSocket, tts, text: str, squawk_mgr=None,
         logger.error(f"TTS error: {e}")
         traceback.print_exc()
         try:
-            _db = getattr(websocket.app.state, "db", None)
-            if _db:
-                _db.log_device_event(device_id or "unknown", 1, "error",
-                                     detail=f"TTS: {str(e)[:400]}")
+            _record_event(websocket.app, device_id or "unknown", 1, "error",
+                          detail=f"TTS: {str(e)[:400]}")
         except Exception:
             pass
         return 0.0
@@ -1404,6 +1349,7 @@ async def audio_stream(websocket: WebSocket):
     tts = app.state.tts
     cmd = app.state.cmd
     med_scheduler_ev = getattr(app.state, "med_scheduler", None)
+    connected_id = None  # device pinned in device_state while this socket is open
 
     try:
         while True:
@@ -1449,6 +1395,9 @@ async def audio_stream(websocket: WebSocket):
                 # Register for medication reminders
                 if med_scheduler_ev:
                     med_scheduler_ev.register_websocket(device_id, websocket, tenant_id_ev)
+                if connected_id is None:
+                    device_state.mark_connected(device_id)
+                    connected_id = device_id
 
                 await websocket.send_json({"event": "connected", "message": "Ready"})
 
@@ -1577,3 +1526,5 @@ async def audio_stream(websocket: WebSocket):
     finally:
         if med_scheduler_ev:
             med_scheduler_ev.unregister_websocket(device_id)
+        if connected_id:
+            device_state.mark_disconnected(connected_id)
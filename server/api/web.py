@@ -18,6 +18,7 @@ from fastapi.templating import Jinja2Templates
 from core.web_auth import get_web_session, require_login, require_owner, require_admin, hash_password, verify_password
 from core.auth import generate_api_key
 from core import memory_capture
+from core.database import keyset_page
 from core.medications import format_time_12hr, _get_local_now
 from core.subscription import check_feature, get_subscription
 from config import settings
@@ -144,15 +145,7 @@ async def login_submit(request: Request, email: str = Form(...),
     # Auto-upgrade legacy SHA-256 hash to bcrypt on successful login
     from core.web_auth import needs_rehash
     if needs_rehash(account["password_hash"]):
-        new_hash = hash_password(password)
-        conn = db._get_connection()
-        try:
-            conn.execute("UPDATE accounts SET password_hash = ? WHERE id = ?",
-                         (new_hash, account["id"]))
-            conn.commit()
-        finally:
-            if not db._conn:
-                conn.close()
+        db.update_account_password(account["id"], hash_password(password))
 
     # Create session
     session_id = db.create_web_session(
@@ -299,15 +292,7 @@ async def reset_password_submit(request: Request,
             "error": "Password must be at least 6 characters.", "session": None,
         })
 
-    new_hash = hash_password(password)
-    conn = db._get_connection()
-    try:
-        conn.execute("UPDATE accounts SET password_hash = ? WHERE id = ?",
-                     (new_hash, account["id"]))
-        conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
+    db.update_account_password(account["id"], hash_password(password))
 
     return RedirectResponse("/web/login?reset=1", status_code=303)
 
@@ -322,8 +307,7 @@ async def forgot_code_page(request: Request):
 
     if household:
         # Find tenant by name (case-insensitive)
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             import sqlite3 as _sq
             conn.row_factory = _sq.Row
             tenant = conn.execute(
@@ -335,9 +319,6 @@ async def forgot_code_page(request: Request):
                     (tenant["id"],)
                 ).fetchall()
                 questions = [{"question": r["question"]} for r in rows]
-        finally:
-            if not db._conn:
-                conn.close()
 
     error = None
     if household and not questions:
@@ -355,8 +336,7 @@ async def forgot_code_submit(request: Request):
     db = request.app.state.db
     household = form.get("household", "").strip()
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3 as _sq
         conn.row_factory = _sq.Row
         tenant = conn.execute(
@@ -407,9 +387,6 @@ async def forgot_code_submit(request: Request):
             "household": household, "recovered_code": tenant["family_code"],
             "session": None,
         })
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 # ── Legal Pages ──
@@ -553,14 +530,10 @@ async def register_submit(request: Request, name: str = Form(...),
     if not db.has_accounts():
         tenant_id = 1
         # Update the default tenant name
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.execute("UPDATE tenants SET name = ?, updated_at = CURRENT_TIMESTAMP WHERE id = 1",
                          (household_name,))
             conn.commit()
-        finally:
-            if not db._conn:
-                conn.close()
     else:
         tenant_id = db.create_tenant(household_name)
         # Start 30-day free trial for new tenants
@@ -770,8 +743,7 @@ def _add_friend_to_tree(db, owner_tid: int, friend_name: str, friend_email: str
     import sqlite3 as _sq
     name = friend_name.strip()
     email = (friend_email or "").strip().lower() or None
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = _sq.Row
         # 1) Match by email first — most reliable. Upgrade the name to the
         #    canonical signup name (so "Erik M." becomes "Erik Meyer").
@@ -804,9 +776,6 @@ def _add_friend_to_tree(db, owner_tid: int, friend_name: str, friend_email: str
             VALUES (?, ?, 'friend', 'friend', 0, ?, 'Polly Connect', ?)
         """, (name, name.lower(), owner_tid, email))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _auto_add_inviter_to_tree(db, new_tid: int, invitation: dict):
@@ -816,16 +785,12 @@ def _auto_add_inviter_to_tree(db, new_tid: int, invitation: dict):
     if not inviter_name:
         return
     # Resolve the inviter's email so the add can dedupe/link by it.
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         row = conn.execute(
             "SELECT email FROM accounts WHERE tenant_id = ? AND role = 'owner' LIMIT 1",
             (invitation.get("tenant_id"),)).fetchone()
         inviter_email = row["email"] if row else None
-    finally:
-        if not db._conn:
-            conn.close()
     _add_friend_to_tree(db, new_tid, inviter_name, inviter_email)
 
 
@@ -891,8 +856,7 @@ async def welcome_save(request: Request):
         if coords:
             location_lat, location_lon = coords
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         final_name = name or user.get("name")
         conn.execute("""
             UPDATE user_profiles SET name = ?, familiar_name = ?,
@@ -909,9 +873,8 @@ async def welcome_save(request: Request):
             conn.execute("UPDATE accounts SET name = ? WHERE id = ?",
                          (familiar_name or final_name, session["account_id"]))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
+    if final_name and session.get("account_id"):
+        db.invalidate_web_sessions(account_id=session["account_id"])
 
     # Claim device if code provided
     claim_code = form.get("claim_code", "").strip()
@@ -982,14 +945,11 @@ async def family_login_submit(request: Request, name: str = Form(...),
         invitation = db.get_invitation_by_id(int(invite_id))
         if invitation and invitation["tenant_id"] == tenant["id"]:
             # Link session to invitation
-            conn = db._get_connection()
-            try:
+            with db.connection() as conn:
                 conn.execute("UPDATE web_sessions SET invitation_id = ? WHERE id = ?",
                             (int(invite_id), session_id))
                 conn.commit()
-            finally:
-                if not db._conn:
-                    conn.close()
+            db.invalidate_web_sessions(session_id)
             db.update_invitation_status(int(invite_id), "visited")
 
     # New family sessions go to onboarding
@@ -1316,8 +1276,7 @@ async def family_legacy_page(request: Request):
     owner_name = user.get("familiar_name") or user.get("name") or "the owner"
 
     # Stats
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3 as _sq
         conn.row_factory = _sq.Row
         story_count = conn.execute("SELECT COUNT(*) FROM stories WHERE tenant_id = ?", (tid,)).fetchone()[0]
@@ -1331,9 +1290,6 @@ async def family_legacy_page(request: Request):
             my_story_count = conn.execute(
                 "SELECT COUNT(*) FROM stories WHERE tenant_id = ? AND LOWER(speaker_name) = ?",
                 (tid, my_name.lower())).fetchone()[0]
-    finally:
-        if not db._conn:
-            conn.close()
 
     return templates.TemplateResponse("family_legacy.html", {
         "request": request, "session": session,
@@ -1679,29 +1635,21 @@ async def memory_photo_index_upload(request: Request,
         description = f"Error: {e}"
 
     # Save photo index record
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "INSERT INTO photo_indexes (tenant_id, filename, location, description, item_count) VALUES (?, ?, ?, ?, ?)",
             (tid, filename, location.strip(), description[:2000], len(indexed_items))
         )
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Re-fetch indexed photos for display
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3 as _sq
         conn.row_factory = _sq.Row
         indexed_photos = [dict(r) for r in conn.execute(
             "SELECT * FROM photo_indexes WHERE tenant_id = ? ORDER BY created_at DESC",
             (tid,)
         ).fetchall()]
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Redirect to stored items page showing how many were saved
     return RedirectResponse(f"/web/memory/items?saved={len(indexed_items)}", status_code=303)
@@ -1715,8 +1663,7 @@ async def memory_photo_index_delete(request: Request, photo_id: int):
         return redirect
     db = request.app.state.db
     tid = session["tenant_id"]
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         # Get filename to delete from disk
         row = conn.execute(
             "SELECT filename FROM photo_indexes WHERE id = ? AND tenant_id = ?",
@@ -1728,12 +1675,24 @@ async def memory_photo_index_delete(request: Request, photo_id: int):
                 os.remove(filepath)
             conn.execute("DELETE FROM photo_indexes WHERE id = ? AND tenant_id = ?", (photo_id, tid))
             conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse("/web/memory/photo-index", status_code=303)
 
 
+STORIES_PER_PAGE = 5
+PHOTOS_PER_PAGE = 48
+WALL_PER_PAGE = 30
+CHATTER_POSTS_PER_PAGE = 30
+FEED_MAX_LIMIT = 100
+
+
+def _feed_limit(request: Request, default: int) -> int:
+    """?limit= for the JSON feed endpoints, clamped to 1..FEED_MAX_LIMIT."""
+    try:
+        return max(1, min(int(request.query_params.get("limit", default)), FEED_MAX_LIMIT))
+    except ValueError:
+        return default
+
+
 @router.get("/stories", response_class=HTMLResponse)
 async def stories_list(request: Request):
     session = await get_web_session(request)
@@ -1743,40 +1702,63 @@ async def stories_list(request: Request):
 
     db = request.app.state.db
     tid = session["tenant_id"]
-    page = int(request.query_params.get("page", "1"))
-    per_page = 5
-    offset = (page - 1) * per_page
+    cursor = request.query_params.get("cursor") or None
     verified_filter = session.get("role") == "family"
 
     import sqlite3 as _sq
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = _sq.Row
         where = "WHERE tenant_id = ?"
         params = [tid]
         if verified_filter:
             where += " AND verified = 1"
         total = conn.execute(f"SELECT COUNT(*) FROM stories {where}", params).fetchone()[0]
-        stories = [dict(r) for r in conn.execute(
-            f"SELECT * FROM stories {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
-            params + [per_page, offset]
-        ).fetchall()]
-    finally:
-        if not db._conn:
-            conn.close()
-
-    total_pages = max(1, (total + per_page - 1) // per_page)
+        stories, next_cursor = keyset_page(
+            conn, f"SELECT * FROM stories {where}", params, cursor, STORIES_PER_PAGE)
 
     return templates.TemplateResponse("stories.html", {
         "request": request,
         "session": session,
         "stories": stories,
-        "page": page,
-        "total_pages": total_pages,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
         "total": total,
     })
 
 
+@router.get("/api/stories")
+async def stories_feed_api(request: Request):
+    """JSON keyset page of stories for infinite scroll: ?cursor=&limit=."""
+    session = await get_web_session(request)
+    if not session:
+        return JSONResponse({"error": "Not logged in"}, status_code=401)
+    db = request.app.state.db
+    stories, next_cursor = db.get_stories_page(
+        cursor=request.query_params.get("cursor"),
+        limit=_feed_limit(request, 20),
+        tenant_id=session["tenant_id"],
+        verified_only=session.get("role") == "family",
+    )
+    return JSONResponse({"items": stories, "next_cursor": next_cursor})
+
+
+@router.get("/api/memories")
+async def memories_feed_api(request: Request):
+    """JSON keyset page of extracted memories for infinite scroll (owners)."""
+    session = await get_web_session(request)
+    if not session:
+        return JSONResponse({"error": "Not logged in"}, status_code=401)
+    if session.get("role") == "family":
+        return JSONResponse({"error": "Not authorized"}, status_code=403)
+    db = request.app.state.db
+    memories, next_cursor = db.get_memories_page(
+        cursor=request.query_params.get("cursor"),
+        limit=_feed_limit(request, 20),
+        tenant_id=session["tenant_id"],
+    )
+    return JSONResponse({"items": memories, "next_cursor": next_cursor})
+
+
 @router.get("/stories/{story_id}/edit", response_class=HTMLResponse)
 async def story_edit(request: Request, story_id: int):
     session = await get_web_session(request)
@@ -1785,8 +1767,7 @@ async def story_edit(request: Request, story_id: int):
         return redirect
 
     db = request.app.state.db
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         story = conn.execute(
             "SELECT * FROM stories WHERE id = ? AND tenant_id = ?",
@@ -1800,9 +1781,6 @@ async def story_edit(request: Request, story_id: int):
                 "SELECT estimated_year FROM memories WHERE story_id = ? LIMIT 1",
                 (story_id,)).fetchone()
             est_year = row[0] if row and row[0] else None
-    finally:
-        if not db._conn:
-            conn.close()
 
     if not story:
         return RedirectResponse("/web/stories")
@@ -1833,8 +1811,7 @@ async def story_edit_save(request: Request, story_id: int):
     private = 1 if form.get("private") else 0
 
     db = request.app.state.db
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         if question_text is not None:
             conn.execute("""
                 UPDATE stories SET transcript = ?, corrected_transcript = ?, speaker_name = ?, question_text = ?,
@@ -1858,9 +1835,6 @@ async def story_edit_save(request: Request, story_id: int):
         except (TypeError, ValueError):
             pass
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return RedirectResponse(f"/web/stories/{story_id}/edit", status_code=303)
 
@@ -1874,8 +1848,7 @@ async def story_toggle_verify(request: Request, story_id: int):
 
     db = request.app.state.db
     tid = session["tenant_id"]
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         current = conn.execute(
             "SELECT verified FROM stories WHERE id = ? AND tenant_id = ?",
             (story_id, tid)
@@ -1887,9 +1860,6 @@ async def story_toggle_verify(request: Request, story_id: int):
             "UPDATE stories SET verified = ?, verified_at = datetime('now') WHERE id = ? AND tenant_id = ?",
             (new_val, story_id, tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return JSONResponse({"ok": True, "verified": bool(new_val)})
 
@@ -1905,8 +1875,7 @@ async def story_toggle_qr(request: Request, story_id: int):
 
     db = request.app.state.db
     tid = session["tenant_id"]
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         current = conn.execute(
             "SELECT qr_in_book FROM stories WHERE id = ? AND tenant_id = ?",
             (story_id, tid)
@@ -1918,9 +1887,6 @@ async def story_toggle_qr(request: Request, story_id: int):
             "UPDATE stories SET qr_in_book = ? WHERE id = ? AND tenant_id = ?",
             (new_val, story_id, tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return JSONResponse({"ok": True, "qr_in_book": bool(new_val)})
 
@@ -1939,15 +1905,11 @@ async def story_inline_save(request: Request, story_id: int):
 
     db = request.app.state.db
     tid = session["tenant_id"]
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE stories SET transcript = ?, corrected_transcript = ? WHERE id = ? AND tenant_id = ?",
             (transcript, transcript, story_id, tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return JSONResponse({"ok": True})
 
@@ -2081,16 +2043,12 @@ async def story_qr_code(request: Request, story_id: int):
         return redirect
 
     db = request.app.state.db
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         story = conn.execute(
             "SELECT audio_s3_key FROM stories WHERE id = ? AND tenant_id = ?",
             (story_id, session["tenant_id"])
         ).fetchone()
-    finally:
-        if not db._conn:
-            conn.close()
 
     if not story or not story["audio_s3_key"]:
         from fastapi.responses import Response
@@ -2124,8 +2082,7 @@ async def story_delete(request: Request, story_id: int):
         return redirect
 
     db = request.app.state.db
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         story = conn.execute(
             "SELECT audio_s3_key FROM stories WHERE id = ? AND tenant_id = ?",
@@ -2137,9 +2094,6 @@ async def story_delete(request: Request, story_id: int):
         conn.execute("DELETE FROM stories WHERE id = ? AND tenant_id = ?",
                      (story_id, session["tenant_id"]))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     if story and story["audio_s3_key"]:
         import os
@@ -2162,8 +2116,7 @@ async def story_to_nostalgia(request: Request, story_id: int):
     tid = session["tenant_id"]
 
     # Get the story
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         story = conn.execute(
             "SELECT corrected_transcript, transcript, speaker_name, source FROM stories WHERE id = ? AND tenant_id = ?",
@@ -2172,9 +2125,6 @@ async def story_to_nostalgia(request: Request, story_id: int):
         if not story:
             return RedirectResponse("/web/stories", status_code=303)
         story = dict(story)
-    finally:
-        if not db._conn:
-            conn.close()
 
     text = (story.get("corrected_transcript") or story.get("transcript") or "").strip()
     if not text:
@@ -2321,6 +2271,13 @@ async def medications_page(request: Request):
     })
 
 
+def _reindex_medication(request: Request, med_id: int):
+    """Keep the scheduler's minute-of-week index in step with the table."""
+    scheduler = getattr(request.app.state, "med_scheduler", None)
+    if scheduler:
+        scheduler.refresh_medication(med_id)
+
+
 @router.post("/medications/add")
 async def medication_add(request: Request, name: str = Form(...),
                          dosage: str = Form(""), times: str = Form(...),
@@ -2338,8 +2295,9 @@ async def medication_add(request: Request, name: str = Form(...),
     user = db.get_or_create_user(tenant_id=tid)
     # Parse comma-separated times (supports "8am", "2:30 PM", "14:00")
     time_list = [parse_time_input(t) for t in times.split(",") if t.strip()]
-    db.add_medication(user["id"], name, dosage, json.dumps(time_list),
-                      tenant_id=tid, device_id=device_id or None)
+    med_id = db.add_medication(user["id"], name, dosage, json.dumps(time_list),
+                               tenant_id=tid, device_id=device_id or None)
+    _reindex_medication(request, med_id)
     return RedirectResponse("/web/medications", status_code=303)
 
 
@@ -2360,6 +2318,12 @@ async def medications_calendar(request: Request):
     now = _get_local_now()
     tz_name = settings.TIMEZONE
 
+    # 30-day reminder counts per medication, from the daily rollup. Taken /
+    # missed stay hidden until something records them (no confirmation path yet).
+    reminded = {}
+    for r in db.get_medication_rollups(tid, (now - timedelta(days=29)).strftime("%Y-%m-%d")):
+        reminded[r["medication_id"]] = reminded.get(r["medication_id"], 0) + r["reminded"]
+
     day_map = {"mon": "MO", "tue": "TU", "wed": "WE", "thu": "TH",
                "fri": "FR", "sat": "SA", "sun": "SU"}
 
@@ -2381,6 +2345,8 @@ async def medications_calendar(request: Request):
             byday = "MO,TU,WE,TH,FR,SA,SU"
 
         dosage_str = f" ({med.get('dosage', '')})" if med.get("dosage") else ""
+        count = reminded.get(med["id"])
+        adherence_str = f"\\nLast 30 days: {count} reminders sent" if count else ""
 
         for med_time in times:
             try:
@@ -2404,7 +2370,7 @@ async def medications_calendar(request: Request):
                 f"DTEND;TZID={tz_name}:{dtend}",
                 f"RRULE:FREQ=WEEKLY;BYDAY={byday}",
                 f"SUMMARY:Take {med['name']}{dosage_str}",
-                f"DESCRIPTION:Polly reminder: Take {med['name']}{dosage_str} at {time_display}",
+                f"DESCRIPTION:Polly reminder: Take {med['name']}{dosage_str} at {time_display}{adherence_str}",
                 "BEGIN:VALARM",
                 "TRIGGER:-PT5M",
                 "ACTION:DISPLAY",
@@ -2478,6 +2444,7 @@ async def medication_edit_save(request: Request, med_id: int,
         json.dumps(time_list), json.dumps(day_list),
         tenant_id=tid,
     )
+    _reindex_medication(request, med_id)
     return RedirectResponse("/web/medications", status_code=303)
 
 
@@ -2490,6 +2457,7 @@ async def medication_delete(request: Request, med_id: int):
 
     db = request.app.state.db
     db.delete_medication(med_id, tenant_id=session["tenant_id"])
+    _reindex_medication(request, med_id)
     return RedirectResponse("/web/medications", status_code=303)
 
 
@@ -2510,6 +2478,11 @@ async def medications_upcoming(request: Request):
     current_minutes = now.hour * 60 + now.minute
     current_day = now.strftime("%a").lower()
 
+    # 7-day reminder count from the daily rollup. Taken / missed are left out
+    # until a confirmation path records them; reporting 0 taken would read
+    # as non-compliance.
+    week = db.get_medication_rollups(tid, (now - timedelta(days=6)).strftime("%Y-%m-%d"))
+
     result = []
     for med in medications:
         times = json.loads(med["times"]) if isinstance(med["times"], str) else med["times"]
@@ -2549,7 +2522,8 @@ async def medications_upcoming(request: Request):
     badge_order = {"overdue": 0, "soon": 1, "scheduled": 2, "inactive": 3}
     result.sort(key=lambda x: (badge_order.get(x["badge"], 9), x["time_24"]))
 
-    return JSONResponse({"medications": result, "current_time": now.strftime("%I:%M %p")})
+    return JSONResponse({"medications": result, "current_time": now.strftime("%I:%M %p"),
+                         "reminders_7d": sum(r["reminded"] for r in week)})
 
 
 @router.get("/memory", response_class=HTMLResponse)
@@ -2833,8 +2807,7 @@ async def messages_save_to_stories(request: Request, message_id: int):
         return redirect
     db = request.app.state.db
     tid = session["tenant_id"]
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3 as _sq
         conn.row_factory = _sq.Row
         msg = conn.execute(
@@ -2856,9 +2829,6 @@ async def messages_save_to_stories(request: Request, message_id: int):
             source="voice_message",
             tenant_id=tid,
         )
-    finally:
-        if not db._conn:
-            conn.close()
 
     return RedirectResponse("/web/messages?saved_story=1", status_code=303)
 
@@ -2929,22 +2899,17 @@ async def settings_page(request: Request):
             snooze_status = "quiet_hours"
         elif not in_quiet and user.get("squawk_quiet_override"):
             # Quiet hours ended naturally — clear the override
-            conn = db._get_connection()
-            try:
+            with db.connection() as conn:
                 conn.execute(
                     "UPDATE user_profiles SET squawk_quiet_override = 0 WHERE tenant_id = ?",
                     (session["tenant_id"],)
                 )
                 conn.commit()
-            finally:
-                if not db._conn:
-                    conn.close()
 
     pronunciations = db.get_pronunciations(session["tenant_id"])
 
     # Load security questions
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3 as _sq
         conn.row_factory = _sq.Row
         sq_rows = conn.execute(
@@ -2952,9 +2917,6 @@ async def settings_page(request: Request):
             (session["tenant_id"],)
         ).fetchall()
         security_questions = [dict(r) for r in sq_rows]
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Load devices with per-device settings for settings UI
     tenant_devices = db.get_devices_by_tenant(session["tenant_id"])
@@ -3092,8 +3054,7 @@ async def settings_save(request: Request):
         except ValueError:
             pass
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("""
             UPDATE user_profiles SET name = ?, familiar_name = ?,
             bible_topic_preference = ?, music_genre_preference = ?,
@@ -3113,9 +3074,6 @@ async def settings_save(request: Request):
               hometown.strip() or None, birth_year_int,
               user["id"]))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Per-device sound settings override
     target_device = form.get("device_id", "").strip()
@@ -3238,20 +3196,15 @@ async def squawk_snooze(request: Request, duration: int = Form(30),
         db.update_device_settings(device_id, squawk_snoozed_until=snoozed_until,
                                   squawk_quiet_override=0)
         # Clear tenant-level snooze so per-device takes priority
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.execute("UPDATE user_profiles SET squawk_snoozed_until = NULL WHERE tenant_id = ?", (tenant_id,))
             conn.commit()
-        finally:
-            if not db._conn:
-                conn.close()
         if squawk_mgr:
             squawk_mgr.snooze(device_id, duration)
         return RedirectResponse(f"/web/settings?snoozed={device_id}", status_code=303)
     else:
         # Tenant-wide snooze (all devices) — update tenant AND all device overrides
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.execute(
                 "UPDATE user_profiles SET squawk_snoozed_until = ?, squawk_quiet_override = 0 WHERE tenant_id = ?",
                 (snoozed_until, tenant_id)
@@ -3261,9 +3214,6 @@ async def squawk_snooze(request: Request, duration: int = Form(30),
                 (snoozed_until, tenant_id)
             )
             conn.commit()
-        finally:
-            if not db._conn:
-                conn.close()
         if squawk_mgr:
             for dev_id in list(squawk_mgr._active_devices.keys()):
                 squawk_mgr.snooze(dev_id, duration)
@@ -3296,8 +3246,7 @@ async def squawk_unsnooze(request: Request, device_id: str = Form("")):
         return RedirectResponse(f"/web/settings?woke={device_id}", status_code=303)
     else:
         # Tenant-wide unsnooze — clear tenant AND all device overrides
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.execute(
                 "UPDATE user_profiles SET squawk_snoozed_until = NULL, squawk_quiet_override = 1 WHERE tenant_id = ?",
                 (tenant_id,)
@@ -3307,9 +3256,6 @@ async def squawk_unsnooze(request: Request, device_id: str = Form("")):
                 (tenant_id,)
             )
             conn.commit()
-        finally:
-            if not db._conn:
-                conn.close()
         if squawk_mgr:
             for dev_id in list(squawk_mgr._active_devices.keys()):
                 squawk_mgr.unsnooze(dev_id)
@@ -3394,8 +3340,7 @@ async def transcriptions_page(request: Request):
     per_page = 5
     offset = (page - 1) * per_page
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         if filter_val == "verified":
             where = "WHERE verified = 1 AND tenant_id = ?"
@@ -3408,9 +3353,6 @@ async def transcriptions_page(request: Request):
             f"SELECT * FROM stories {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
             (tid, per_page, offset)
         ).fetchall()]
-    finally:
-        if not db._conn:
-            conn.close()
 
     total_pages = max(1, (total + per_page - 1) // per_page)
 
@@ -3446,16 +3388,12 @@ async def transcription_verify(request: Request, story_id: int,
             return RedirectResponse("/web/transcriptions", status_code=303)
 
     # Update speaker name if changed
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE stories SET speaker_name = ? WHERE id = ? AND tenant_id = ?",
             (speaker_name or None, story_id, tid)
         )
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Mark verified
     db.verify_story(story_id, verified_by, corrected_transcript or None,
@@ -3487,14 +3425,10 @@ async def transcription_delete(request: Request, story_id: int):
 
     db = request.app.state.db
     tid = session["tenant_id"]
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("DELETE FROM stories WHERE id = ? AND tenant_id = ?", (story_id, tid))
         conn.execute("DELETE FROM memories WHERE story_id = ? AND tenant_id = ?", (story_id, tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return RedirectResponse("/web/transcriptions", status_code=303)
 
@@ -3514,31 +3448,38 @@ async def photos_page(request: Request):
 
     db = request.app.state.db
     tid = session["tenant_id"]
-    photos = db.get_photos(limit=100, tenant_id=tid)
+    cursor = request.query_params.get("cursor") or None
+    photos, next_cursor = db.get_photos_page(cursor=cursor, limit=PHOTOS_PER_PAGE, tenant_id=tid)
     stories = db.get_stories(limit=200, tenant_id=tid, verified_only=False)
 
-    # Parse tags JSON and attach all stories for each photo
-    conn = db._get_connection()
-    import sqlite3 as _sqlite3
-    conn.row_factory = _sqlite3.Row
+    # Parse tags JSON and attach all stories for each photo on this page
+    by_photo = {}
+    if photos:
+        import sqlite3 as _sqlite3
+        marks = ",".join("?" * len(photos))
+        with db.connection() as conn:
+            conn.row_factory = _sqlite3.Row
+            for row in conn.execute(
+                "SELECT id, photo_id, COALESCE(corrected_transcript, transcript) as transcript, "
+                f"speaker_name, audio_s3_key FROM stories WHERE tenant_id = ? AND photo_id IN ({marks}) "
+                "ORDER BY id",
+                [tid] + [p["id"] for p in photos]
+            ).fetchall():
+                by_photo.setdefault(row["photo_id"], []).append(dict(row))
     for photo in photos:
         try:
             photo["tag_list"] = json.loads(photo.get("tags") or "[]")
         except (json.JSONDecodeError, TypeError):
             photo["tag_list"] = []
-        # Get all stories linked to this photo
-        photo_stories = conn.execute(
-            "SELECT id, COALESCE(corrected_transcript, transcript) as transcript, speaker_name, audio_s3_key "
-            "FROM stories WHERE photo_id = ? AND tenant_id = ? ORDER BY id",
-            (photo["id"], tid)
-        ).fetchall()
-        photo["stories"] = [dict(s) for s in photo_stories]
+        photo["stories"] = by_photo.get(photo["id"], [])
 
     return templates.TemplateResponse("photos.html", {
         "request": request,
         "session": session,
         "photos": photos,
         "stories": stories,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
     })
 
 
@@ -3636,8 +3577,7 @@ async def photo_toggle_book(request: Request, photo_id: int):
         return RedirectResponse("/web/photos", status_code=303)
 
     import sqlite3 as _sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = _sqlite3.Row
         # Toggle on photos table
         new_val = 0 if photo.get("in_book", 1) else 1
@@ -3674,9 +3614,6 @@ async def photo_toggle_book(request: Request, photo_id: int):
                             VALUES (?, ?, 'ordinary_world', 'unknown', ?, ?, 'verified', ?)
                         """, (story_id, speaker, transcript[:200], transcript, tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # If toggled on and memory_extractor is available, try to enrich the memory
     if new_val == 1 and photo.get("story_id"):
@@ -3693,8 +3630,7 @@ async def photo_toggle_book(request: Request, photo_id: int):
                         speaker=story.get("speaker_name") or None,
                     )
                     # Update the memory with enriched data
-                    conn2 = db._get_connection()
-                    try:
+                    with db.connection() as conn2:
                         conn2.execute("""
                             UPDATE memories SET bucket = ?, life_phase = ?,
                             text_summary = ?, verification_status = 'verified'
@@ -3702,9 +3638,6 @@ async def photo_toggle_book(request: Request, photo_id: int):
                         """, (mem_data["bucket"], mem_data["life_phase"],
                               mem_data["text_summary"], photo["story_id"], tid))
                         conn2.commit()
-                    finally:
-                        if not db._conn:
-                            conn2.close()
         except Exception:
             pass  # Memory was still created with defaults above
 
@@ -4392,7 +4325,8 @@ async def shared_wall_page(request: Request, connected_tenant_id: int):
     if not connected:
         return RedirectResponse("/web/family-tree", status_code=303)
 
-    items = db.get_wall_items(tid, connected_tenant_id, limit=50)
+    cursor = request.query_params.get("cursor") or None
+    items, next_cursor = db.get_wall_page(tid, connected_tenant_id, cursor=cursor, limit=WALL_PER_PAGE)
     my_photos = db.get_photos(limit=100, tenant_id=tid, include_wall_only=True) if session.get("role") != "family" else []
 
     # Load reactions and comments for all wall items
@@ -4422,9 +4356,34 @@ async def shared_wall_page(request: Request, connected_tenant_id: int):
         "my_tenant_id": tid,
         "reactions": reactions,
         "comments": comments,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
     })
 
 
+@router.get("/api/wall/{connected_tenant_id}")
+async def shared_wall_feed_api(request: Request, connected_tenant_id: int):
+    """JSON keyset page of a shared wall for infinite scroll: ?cursor=&limit=."""
+    session = await get_web_session(request)
+    if not session:
+        return JSONResponse({"error": "Not logged in"}, status_code=401)
+    db = request.app.state.db
+    tid = session["tenant_id"]
+    if not any(c["connected_tenant_id"] == connected_tenant_id
+               for c in db.get_connected_families(tid)):
+        return JSONResponse({"error": "Not connected"}, status_code=403)
+    items, next_cursor = db.get_wall_page(
+        tid, connected_tenant_id, cursor=request.query_params.get("cursor"),
+        limit=_feed_limit(request, WALL_PER_PAGE))
+    item_ids = [i["id"] for i in items]
+    reactions = db.get_wall_reactions(item_ids) if item_ids else {}
+    comments = db.get_wall_comments(item_ids) if item_ids else {}
+    for item in items:
+        item["reactions"] = reactions.get(item["id"], [])
+        item["comments"] = comments.get(item["id"], [])
+    return JSONResponse({"items": items, "next_cursor": next_cursor})
+
+
 @router.post("/wall/{connected_tenant_id}/polly")
 async def wall_polly(request: Request, connected_tenant_id: int):
     """Polly chimes into a shared Wall conversation and captures the meaningful
@@ -4458,12 +4417,8 @@ async def wall_polly(request: Request, connected_tenant_id: int):
         return JSONResponse({"error": "Nothing to talk about yet — add a caption or comment!"}, status_code=400)
 
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         by = _birth_year_for(conn, tid)
-    finally:
-        if not db._conn:
-            conn.close()
 
     result = await asyncio.to_thread(
         memory_capture.polly_interjection, thread_text, None, by)
@@ -4533,8 +4488,7 @@ async def wall_delete_item(request: Request, item_id: int):
     tid = session["tenant_id"]
 
     # Get the item to find out which wall to redirect back to
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         item = conn.execute("SELECT * FROM shared_wall_items WHERE id = ?", (item_id,)).fetchone()
         if item:
@@ -4542,9 +4496,6 @@ async def wall_delete_item(request: Request, item_id: int):
             other_tid = item["to_tenant_id"] if item["from_tenant_id"] == tid else item["from_tenant_id"]
         else:
             other_tid = None
-    finally:
-        if not db._conn:
-            conn.close()
 
     db.delete_wall_item(item_id, tid)
 
@@ -4724,15 +4675,11 @@ async def wall_save_photo_to_library(request: Request):
 
     # Get the wall item's sharing note
     if wall_item_id:
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.row_factory = __import__("sqlite3").Row
             wall_item = conn.execute("SELECT caption FROM shared_wall_items WHERE id = ?", (wall_item_id,)).fetchone()
             if wall_item and wall_item["caption"]:
                 parts.append(wall_item["caption"])
-        finally:
-            if not db._conn:
-                conn.close()
 
         # Get all comments on this wall item (the conversation)
         wall_comments = db.get_wall_comments([wall_item_id])
@@ -4760,17 +4707,23 @@ async def wall_save_photo_to_library(request: Request):
 
 @router.get("/api/photos/list")
 async def photos_list_api(request: Request):
-    """Lightweight JSON endpoint returning tenant's photos for share picker."""
+    """Lightweight JSON endpoint returning tenant's photos for share picker.
+    Keyset paged with ?cursor=&limit=; the body stays a plain list for
+    existing callers, and the next page's cursor is in X-Next-Cursor."""
     session = await get_web_session(request)
     if not session:
         return JSONResponse({"error": "Not logged in"}, status_code=401)
     db = request.app.state.db
-    photos = db.get_photos(limit=100, tenant_id=session["tenant_id"])
+    photos, next_cursor = db.get_photos_page(
+        cursor=request.query_params.get("cursor"),
+        limit=_feed_limit(request, FEED_MAX_LIMIT),
+        tenant_id=session["tenant_id"],
+    )
     return JSONResponse([{
         "id": p["id"],
         "filename": p["filename"],
         "caption": p.get("caption") or "",
-    } for p in photos])
+    } for p in photos], headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 
 # ── Chatter (group-based community feed) ──
@@ -4803,22 +4756,20 @@ def _time_ago(created_at_str):
         return ""
 
 
-def _load_posts(conn, group_id, tid):
-    """Load posts for a group with reactions and comments."""
+def _load_posts(conn, group_id, tid, cursor=None, limit=CHATTER_POSTS_PER_PAGE):
+    """Load one keyset page of a group's posts with reactions and comments.
+    Returns (posts, next_cursor)."""
     import re
     from markupsafe import escape
-    rows = conn.execute("""
+    rows, next_cursor = keyset_page(conn, """
         SELECT ap.*, t.name as household_name
         FROM aviary_posts ap
         JOIN tenants t ON ap.tenant_id = t.id
         WHERE ap.group_id = ?
-        ORDER BY ap.created_at DESC
-        LIMIT 100
-    """, (group_id,)).fetchall()
+    """, (group_id,), cursor, limit, alias="ap")
 
     posts = []
-    for row in rows:
-        post = dict(row)
+    for post in rows:
         post["time_ago"] = _time_ago(post["created_at"])
         raw = str(escape(post.get("content") or ""))
         post["content_html"] = re.sub(
@@ -4842,7 +4793,7 @@ def _load_posts(conn, group_id, tid):
         ).fetchall()
         post["comments"] = [dict(c) for c in comments]
         posts.append(post)
-    return posts
+    return posts, next_cursor
 
 
 def _birth_year_for(conn, tid):
@@ -4914,8 +4865,7 @@ async def chatter_polly(request: Request, group_id: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         member = conn.execute(
             "SELECT 1 FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
@@ -4941,9 +4891,6 @@ async def chatter_polly(request: Request, group_id: int):
         names = [m["nm"] for m in members if m["nm"]]
 
         by = _birth_year_for(conn, tid)
-    finally:
-        if not db._conn:
-            conn.close()
 
     result = await asyncio.to_thread(
         memory_capture.polly_interjection, thread_text, names, by, group_theme)
@@ -4952,17 +4899,13 @@ async def chatter_polly(request: Request, group_id: int):
     questions = result.get("questions") or []
 
     # Polly chimes into the feed like a member of the conversation
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         cur = conn.execute(
             "INSERT INTO aviary_posts (tenant_id, author_name, content_type, "
             "content, group_id) VALUES (?, 'Polly 🦜', 'text', ?, ?)",
             (tid, interjection, group_id))
         polly_post_id = cur.lastrowid
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # NOTE: nothing is saved to the legacy book here. Pressing Polly only makes
     # her chime into the conversation. Adding a conversation to the book is now
@@ -5018,8 +4961,7 @@ async def chatter_narrate(request: Request, group_id: int):
     tid = session["tenant_id"]
     unlimited = _narrate_unlimited(db, tid)
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         member = conn.execute(
             "SELECT 1 FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
@@ -5035,9 +4977,6 @@ async def chatter_narrate(request: Request, group_id: int):
         grp = conn.execute("SELECT name FROM chatter_groups WHERE id = ?",
                            (group_id,)).fetchone()
         theme = grp["name"] if grp else None
-    finally:
-        if not db._conn:
-            conn.close()
 
     owner_name = session.get("name")
     result = await asyncio.to_thread(
@@ -5052,17 +4991,13 @@ async def chatter_narrate(request: Request, group_id: int):
     # Count this preview against the free allowance (only for free users).
     remaining = None
     if not unlimited:
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             used = _narrate_count(conn, tid)
             conn.execute("DELETE FROM chatter_narrate_usage WHERE tenant_id = ?", (tid,))
             conn.execute("INSERT INTO chatter_narrate_usage (tenant_id, count) VALUES (?, ?)",
                          (tid, used + 1))
             conn.commit()
             remaining = max(0, FREE_NARRATE_LIMIT - (used + 1))
-        finally:
-            if not db._conn:
-                conn.close()
 
     return JSONResponse({
         "ok": True,
@@ -5100,8 +5035,7 @@ async def chatter_narrate_save(request: Request, group_id: int):
 
     unlimited = _narrate_unlimited(db, tid)
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         member = conn.execute(
             "SELECT 1 FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
@@ -5115,9 +5049,6 @@ async def chatter_narrate_save(request: Request, group_id: int):
                 (tid,)).fetchone()[0]
             if saved >= FREE_NARRATE_SAVES:
                 return JSONResponse({"ok": False, "upgrade": True, "error": _UPGRADE_MSG})
-    finally:
-        if not db._conn:
-            conn.close()
 
     verifier = session.get("name") or "Me"
     # capture() creates the story + book memory; then mark that story verified
@@ -5133,8 +5064,7 @@ async def chatter_narrate_save(request: Request, group_id: int):
     if not mem_id:
         return JSONResponse({"error": "Could not save — try again."}, status_code=500)
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE stories SET verified = 1, verified_by = ?, "
             "verified_at = CURRENT_TIMESTAMP, corrected_transcript = ?, "
@@ -5146,9 +5076,6 @@ async def chatter_narrate_save(request: Request, group_id: int):
                 "UPDATE memories SET estimated_year = ?, year_confidence = 'user' WHERE id = ?",
                 (year, mem_id))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return JSONResponse({"ok": True})
 
@@ -5230,8 +5157,7 @@ async def chatter_groups_list(request: Request):
     tid = session["tenant_id"]
     import sqlite3
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
 
         # Get groups I'm a member of
@@ -5285,9 +5211,6 @@ async def chatter_groups_list(request: Request):
         """, (tid,)).fetchall()
         connections = [dict(c) for c in connections]
 
-    finally:
-        if not db._conn:
-            conn.close()
 
     return templates.TemplateResponse("chatter.html", {
         "request": request,
@@ -5313,8 +5236,7 @@ async def chatter_create_group(request: Request):
     tid = session["tenant_id"]
     import sqlite3
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         # Create group
         conn.execute(
@@ -5333,9 +5255,6 @@ async def chatter_create_group(request: Request):
                     "INSERT OR IGNORE INTO chatter_group_members (group_id, tenant_id, role) VALUES (?, ?, 'member')",
                     (group_id, int(mtid)))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return RedirectResponse(f"/web/chatter/{group_id}", status_code=303)
 
@@ -5350,8 +5269,7 @@ async def chatter_people(request: Request):
     tid = session["tenant_id"]
     group_id = request.query_params.get("group_id")
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         people = []
         seen = set()
@@ -5390,9 +5308,6 @@ async def chatter_people(request: Request):
 
         people.sort(key=lambda p: p["name"].lower())
         return JSONResponse({"people": people})
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 @router.get("/chatter/{group_id}", response_class=HTMLResponse)
@@ -5406,8 +5321,7 @@ async def chatter_group_feed(request: Request, group_id: int):
     tid = session["tenant_id"]
     import sqlite3
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
 
         # Verify membership
@@ -5423,7 +5337,8 @@ async def chatter_group_feed(request: Request, group_id: int):
             return RedirectResponse("/web/chatter", status_code=303)
         group = dict(group)
 
-        posts = _load_posts(conn, group_id, tid)
+        cursor = request.query_params.get("cursor") or None
+        posts, next_cursor = _load_posts(conn, group_id, tid, cursor=cursor)
 
         # Get group members for display
         members = conn.execute("""
@@ -5455,9 +5370,6 @@ async def chatter_group_feed(request: Request, group_id: int):
             (group_id, tid))
         conn.commit()
 
-    finally:
-        if not db._conn:
-            conn.close()
 
     is_admin = member["role"] == "admin"
 
@@ -5469,9 +5381,33 @@ async def chatter_group_feed(request: Request, group_id: int):
         "members": members,
         "invitable": invitable,
         "is_admin": is_admin,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
     })
 
 
+@router.get("/api/chatter/{group_id}/posts")
+async def chatter_group_feed_api(request: Request, group_id: int):
+    """JSON keyset page of a chatter group's posts for infinite scroll."""
+    session = await get_web_session(request)
+    if not session:
+        return JSONResponse({"error": "Not logged in"}, status_code=401)
+    db = request.app.state.db
+    tid = session["tenant_id"]
+    import sqlite3
+    with db.connection() as conn:
+        conn.row_factory = sqlite3.Row
+        if not conn.execute(
+            "SELECT 1 FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
+            (group_id, tid)
+        ).fetchone():
+            return JSONResponse({"error": "Not a member"}, status_code=403)
+        posts, next_cursor = _load_posts(
+            conn, group_id, tid, cursor=request.query_params.get("cursor"),
+            limit=_feed_limit(request, CHATTER_POSTS_PER_PAGE))
+    return JSONResponse({"items": posts, "next_cursor": next_cursor})
+
+
 @router.post("/chatter/{group_id}/post")
 async def chatter_group_post(request: Request, group_id: int):
     """Create a post in a chatter group."""
@@ -5485,17 +5421,13 @@ async def chatter_group_post(request: Request, group_id: int):
     import sqlite3
 
     # Verify membership
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         member = conn.execute(
             "SELECT 1 FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
             (group_id, tid)
         ).fetchone()
         if not member:
             return RedirectResponse("/web/chatter", status_code=303)
-    finally:
-        if not db._conn:
-            conn.close()
 
     form = await request.form()
     content = (form.get("content") or "").strip()
@@ -5561,17 +5493,13 @@ async def chatter_group_post(request: Request, group_id: int):
     elif audio_filename:
         content_type = "voice"
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         cur = conn.execute("""
             INSERT INTO aviary_posts (tenant_id, author_name, content_type, content, photo_filename, audio_filename, group_id)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (tid, author, content_type, content or None, photo_filename, audio_filename, group_id))
         post_id = cur.lastrowid
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Book is opt-in: chatter posts are NOT auto-captured into the legacy book.
     # Add to the book deliberately via per-post "Save to Stories" or the
@@ -5689,16 +5617,12 @@ async def chatter_email_off(request: Request):
     token = request.query_params.get("t", "").strip()
     ok = False
     if token:
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.execute("CREATE TABLE IF NOT EXISTS chatter_notify "
                          "(tenant_id INTEGER PRIMARY KEY, posts_email INTEGER DEFAULT 1, optout_token TEXT)")
             cur = conn.execute("UPDATE chatter_notify SET posts_email = 0 WHERE optout_token = ?", (token,))
             conn.commit()
             ok = cur.rowcount > 0
-        finally:
-            if not db._conn:
-                conn.close()
     if ok:
         head, msg = "You're all set", (
             "You won't get emails when someone posts in Chatter anymore. "
@@ -5723,15 +5647,11 @@ async def chatter_email_on(request: Request):
     db = request.app.state.db
     token = request.query_params.get("t", "").strip()
     if token:
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.execute("CREATE TABLE IF NOT EXISTS chatter_notify "
                          "(tenant_id INTEGER PRIMARY KEY, posts_email INTEGER DEFAULT 1, optout_token TEXT)")
             conn.execute("UPDATE chatter_notify SET posts_email = 1 WHERE optout_token = ?", (token,))
             conn.commit()
-        finally:
-            if not db._conn:
-                conn.close()
     html = """<!doctype html><html><head><meta name="viewport" content="width=device-width,initial-scale=1"><title>Polly Connect</title></head>
     <body style="font-family:sans-serif;max-width:480px;margin:60px auto;padding:0 20px;text-align:center;color:#333;">
     <div style="font-size:42px;">&#x1F99C;</div><h2 style="color:#ea580c;">You're back on</h2>
@@ -5748,8 +5668,7 @@ def _join_pending_groups(db, tid: int, email: str):
     if not tid or not email:
         return
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         conn.execute("CREATE TABLE IF NOT EXISTS pending_group_members "
                      "(group_id INTEGER, email TEXT, group_name TEXT, inviter_name TEXT)")
@@ -5764,9 +5683,6 @@ def _join_pending_groups(db, tid: int, email: str):
         if rows:
             conn.execute("DELETE FROM pending_group_members WHERE LOWER(email) = ?", (em,))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 @router.post("/chatter/{group_id}/invite")
@@ -5785,8 +5701,7 @@ async def chatter_group_invite(request: Request, group_id: int):
     tid = session["tenant_id"]
     import sqlite3, threading
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         member = conn.execute(
             "SELECT 1 FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
@@ -5803,9 +5718,6 @@ async def chatter_group_invite(request: Request, group_id: int):
                 (group_id, int(invitee_tid)))
             conn.commit()
             return RedirectResponse(f"/web/chatter/{group_id}", status_code=303)
-    finally:
-        if not db._conn:
-            conn.close()
 
     # B) Invite by email into this named group.
     if invite_email and "@" in invite_email:
@@ -5818,15 +5730,11 @@ async def chatter_group_invite(request: Request, group_id: int):
             res = db.send_friend_request_by_tenant(tid, existing["tenant_id"])
             if res:
                 db.accept_friend_request(tid, existing["tenant_id"])
-            conn2 = db._get_connection()
-            try:
+            with db.connection() as conn2:
                 conn2.execute(
                     "INSERT OR IGNORE INTO chatter_group_members (group_id, tenant_id, role) VALUES (?, ?, 'member')",
                     (group_id, existing["tenant_id"]))
                 conn2.commit()
-            finally:
-                if not db._conn:
-                    conn2.close()
             return RedirectResponse(f"/web/chatter/{group_id}?invite_sent={invite_name}", status_code=303)
         # New person → invitation + pending group membership + group-named email.
         tenant = db.get_tenant(tid)
@@ -5835,17 +5743,13 @@ async def chatter_group_invite(request: Request, group_id: int):
             tenant_id=tid, family_member_id=None, inviter_name=owner_name,
             invitee_name=invite_name, invitee_email=invite_email,
             voice_filename=None, family_code=family_code)
-        conn3 = db._get_connection()
-        try:
+        with db.connection() as conn3:
             conn3.execute("CREATE TABLE IF NOT EXISTS pending_group_members "
                           "(group_id INTEGER, email TEXT, group_name TEXT, inviter_name TEXT)")
             conn3.execute(
                 "INSERT INTO pending_group_members (group_id, email, group_name, inviter_name) VALUES (?, ?, ?, ?)",
                 (group_id, invite_email, group_name, owner_name))
             conn3.commit()
-        finally:
-            if not db._conn:
-                conn3.close()
         from core.notify import send_chatter_invitation
         threading.Thread(
             target=send_chatter_invitation,
@@ -5867,8 +5771,7 @@ async def chatter_group_leave(request: Request, group_id: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "DELETE FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
             (group_id, tid))
@@ -5881,9 +5784,6 @@ async def chatter_group_leave(request: Request, group_id: int):
             conn.execute("DELETE FROM aviary_posts WHERE group_id = ?", (group_id,))
             conn.execute("DELETE FROM chatter_groups WHERE id = ?", (group_id,))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse("/web/chatter", status_code=303)
 
 
@@ -5898,8 +5798,7 @@ async def chatter_group_delete(request: Request, group_id: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         member = conn.execute(
             "SELECT role FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
@@ -5921,9 +5820,6 @@ async def chatter_group_delete(request: Request, group_id: int):
                 pass
         conn.execute("DELETE FROM chatter_groups WHERE id = ?", (group_id,))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse("/web/chatter", status_code=303)
 
 
@@ -5942,8 +5838,7 @@ async def chatter_group_remove_member(request: Request, group_id: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         # Verify I'm admin
         me = conn.execute(
             "SELECT role FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
@@ -5955,9 +5850,6 @@ async def chatter_group_remove_member(request: Request, group_id: int):
             "DELETE FROM chatter_group_members WHERE group_id = ? AND tenant_id = ?",
             (group_id, int(remove_tid)))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse(f"/web/chatter/{group_id}", status_code=303)
 
 
@@ -5969,8 +5861,7 @@ async def chatter_delete_post(request: Request, post_id: int):
         return RedirectResponse("/web/login", status_code=302)
     db = request.app.state.db
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         post = conn.execute("SELECT group_id FROM aviary_posts WHERE id = ? AND tenant_id = ?",
                             (post_id, session["tenant_id"])).fetchone()
         group_id = post[0] if post else None
@@ -5979,9 +5870,6 @@ async def chatter_delete_post(request: Request, post_id: int):
         conn.execute("DELETE FROM aviary_reactions WHERE post_id = ?", (post_id,))
         conn.execute("DELETE FROM aviary_comments WHERE post_id = ?", (post_id,))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     if group_id:
         return RedirectResponse(f"/web/chatter/{group_id}", status_code=303)
     return RedirectResponse("/web/chatter", status_code=303)
@@ -5999,8 +5887,7 @@ async def chatter_react(request: Request, post_id: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         existing = conn.execute(
             "SELECT id, reaction FROM aviary_reactions WHERE post_id = ? AND tenant_id = ?",
             (post_id, tid)
@@ -6016,9 +5903,6 @@ async def chatter_react(request: Request, post_id: int):
             (post_id, tid, session.get("name", ""), reaction))
         conn.commit()
         return JSONResponse({"ok": True, "action": "added", "old": old_reaction})
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 @router.post("/chatter/{post_id}/comment")
@@ -6034,15 +5918,11 @@ async def chatter_comment(request: Request, post_id: int):
     tid = session["tenant_id"]
     author = session.get("name", "Someone")
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "INSERT INTO aviary_comments (post_id, tenant_id, author_name, comment) VALUES (?, ?, ?, ?)",
             (post_id, tid, author, comment_text))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return JSONResponse({"ok": True, "name": author, "comment": comment_text})
 
 
@@ -6055,8 +5935,7 @@ async def chatter_save_to_stories(request: Request, post_id: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         post = conn.execute("SELECT * FROM aviary_posts WHERE id = ?", (post_id,)).fetchone()
         if not post:
@@ -6084,9 +5963,6 @@ async def chatter_save_to_stories(request: Request, post_id: int):
 
         conn.commit()
         return JSONResponse({"ok": True})
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 @router.post("/settings/security-questions")
@@ -6112,8 +5988,7 @@ async def security_questions_save(request: Request):
     if len(questions) < 2:
         return RedirectResponse("/web/settings", status_code=303)
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         # Replace existing questions
         conn.execute("DELETE FROM security_questions WHERE tenant_id = ?", (tid,))
         for q, ah in questions:
@@ -6122,9 +5997,6 @@ async def security_questions_save(request: Request):
                 (tid, q, ah)
             )
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return RedirectResponse("/web/settings", status_code=303)
 
@@ -6288,8 +6160,7 @@ async def family_tree_page(request: Request):
             # Check that THEY have shared their tree with us
             # Their row: tenant_id=view_tid, connected_tenant_id=tid
             import sqlite3 as _sq2
-            conn_check = db._get_connection()
-            try:
+            with db.connection() as conn_check:
                 conn_check.row_factory = _sq2.Row
                 their_row = conn_check.execute(
                     "SELECT share_tree FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
@@ -6299,9 +6170,6 @@ async def family_tree_page(request: Request):
                     viewing_connected = True
                 else:
                     view_tid = None
-            finally:
-                if not db._conn:
-                    conn_check.close()
         else:
             view_tid = None  # Not connected, fall back to own tree
 
@@ -6309,16 +6177,12 @@ async def family_tree_page(request: Request):
     members = db.get_family_members(tenant_id=target_tid)
 
     # Get owner name from setup
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = __import__("sqlite3").Row
         profile = conn.execute(
             "SELECT * FROM user_profiles WHERE tenant_id = ? LIMIT 1", (target_tid,)
         ).fetchone()
         owner_name = profile["name"] if profile and profile["name"] else "The Owner"
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Build tree structure: group by generation
     tree = {}
@@ -6348,8 +6212,7 @@ async def family_tree_page(request: Request):
         if first:
             connected_names.add(first)
             # Check for unread messages we sent TO them (on their board from us)
-            conn = db._get_connection()
-            try:
+            with db.connection() as conn:
                 import sqlite3 as _sq
                 conn.row_factory = _sq.Row
                 my_tenant = db.get_tenant(tid)
@@ -6363,9 +6226,6 @@ async def family_tree_page(request: Request):
                     "SELECT COUNT(*) FROM family_messages WHERE tenant_id = ? AND from_name = ? AND read = 0 AND expires_at > datetime('now')",
                     (tid, cf["connected_tenant_name"])
                 ).fetchone()[0]
-            finally:
-                if not db._conn:
-                    conn.close()
 
             connected_name_map[first] = {
                 "tenant_id": cf["connected_tenant_id"],
@@ -6568,8 +6428,7 @@ async def family_tree_add(request: Request,
         if any(cf["connected_tenant_id"] == ttid for cf in connected):
             # Verify they've shared their tree with us
             import sqlite3 as _sq
-            conn_chk = db._get_connection()
-            try:
+            with db.connection() as conn_chk:
                 their_share = conn_chk.execute(
                     "SELECT share_tree FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
                     (ttid, tid)
@@ -6577,9 +6436,6 @@ async def family_tree_add(request: Request,
                 if their_share and their_share[0]:
                     actual_tid = ttid
                     redirect_suffix = f"?view={ttid}"
-            finally:
-                if not db._conn:
-                    conn_chk.close()
 
     generation = RELATION_GENERATION.get(relation_to_owner, 0)
     parent_id = int(parent_member_id) if parent_member_id else None
@@ -6653,17 +6509,13 @@ async def family_tree_edit(request: Request, member_id: int,
             return RedirectResponse("/web/family-tree", status_code=303)
         # Verify they've shared their tree
         import sqlite3 as _sq
-        conn_chk = db._get_connection()
-        try:
+        with db.connection() as conn_chk:
             their_share = conn_chk.execute(
                 "SELECT share_tree FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
                 (member_tid, tid)
             ).fetchone()
             if not their_share or not their_share[0]:
                 return RedirectResponse("/web/family-tree", status_code=303)
-        finally:
-            if not db._conn:
-                conn_chk.close()
         if member.get("added_by") != session.get("name"):
             return RedirectResponse(f"/web/family-tree?view={member_tid}", status_code=303)
         redirect_suffix = f"?view={member_tid}"
@@ -6726,17 +6578,13 @@ async def family_tree_delete(request: Request, member_id: int):
             return RedirectResponse("/web/family-tree", status_code=303)
         # Verify they've shared their tree
         import sqlite3 as _sq
-        conn_chk = db._get_connection()
-        try:
+        with db.connection() as conn_chk:
             their_share = conn_chk.execute(
                 "SELECT share_tree FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
                 (member_tid, tid)
             ).fetchone()
             if not their_share or not their_share[0]:
                 return RedirectResponse("/web/family-tree", status_code=303)
-        finally:
-            if not db._conn:
-                conn_chk.close()
         if member.get("added_by") != session.get("name"):
             return RedirectResponse(f"/web/family-tree?view={member_tid}", status_code=303)
         redirect_suffix = f"?view={member_tid}"
@@ -6767,15 +6615,11 @@ async def family_tree_request_access(request: Request, target_tid: int):
         return RedirectResponse("/web/family-tree", status_code=303)
     # Set tree_requested=1 on THEIR row (tenant_id=target_tid, connected_tenant_id=us)
     import sqlite3 as _sq
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE connected_families SET tree_requested = 1 WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
             (target_tid, tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse("/web/family-tree?tree_requested=1", status_code=303)
 
 
@@ -6789,16 +6633,12 @@ async def family_tree_grant_access(request: Request, requester_tid: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3 as _sq
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         # Set share_tree=1 and clear the request flag on MY row
         conn.execute(
             "UPDATE connected_families SET share_tree = 1, tree_requested = 0 WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
             (tid, requester_tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse("/web/family-tree", status_code=303)
 
 
@@ -6812,15 +6652,11 @@ async def family_tree_decline_access(request: Request, requester_tid: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3 as _sq
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE connected_families SET tree_requested = 0 WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
             (tid, requester_tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse("/web/family-tree", status_code=303)
 
 
@@ -6834,8 +6670,7 @@ async def family_tree_toggle_share(request: Request, target_tid: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3 as _sq
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         current = conn.execute(
             "SELECT share_tree FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
             (tid, target_tid)
@@ -6846,9 +6681,6 @@ async def family_tree_toggle_share(request: Request, target_tid: int):
                 "UPDATE connected_families SET share_tree = ?, tree_requested = 0 WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
                 (new_val, tid, target_tid))
             conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
     return RedirectResponse("/web/family-tree", status_code=303)
 
 
@@ -6905,13 +6737,9 @@ async def invite_member_send(request: Request, member_id: int,
         family_code = db.generate_family_code(tid)
 
     # Update member email
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("UPDATE family_members SET email = ? WHERE id = ?", (email, member_id))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Check for voice message (uploaded via AJAX before send)
     voice_filename = request.query_params.get("voice_file", "")
@@ -6981,8 +6809,7 @@ async def connected_devices_info(request: Request, target_tid: int):
         return JSONResponse({"count": 0, "devices": []})
     db = request.app.state.db
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.row_factory = sqlite3.Row
         devices = conn.execute(
             "SELECT device_id, name FROM devices WHERE tenant_id = ? AND claimed_at IS NOT NULL",
@@ -6992,9 +6819,6 @@ async def connected_devices_info(request: Request, target_tid: int):
             "count": len(devices),
             "devices": [{"device_id": d["device_id"], "name": d["name"]} for d in devices],
         })
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 @router.get("/api/family-tree/{member_id}/photos")
@@ -7149,16 +6973,12 @@ async def nostalgia_profile_save(request: Request):
     tid = session["tenant_id"]
     user = db.get_or_create_user(tenant_id=tid)
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE user_profiles SET nostalgia_profile = ? WHERE id = ?",
             (json.dumps(profile), user["id"])
         )
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return RedirectResponse("/web/nostalgia", status_code=303)
 
@@ -7499,15 +7319,11 @@ async def device_add(request: Request, device_name: str = Form(""),
         claim_code = db.generate_claim_code(device_id)
         # If pre-assigned, mark as claimed so it works immediately after provisioning
         if pre_tenant:
-            conn = db._get_connection()
-            try:
+            with db.connection() as conn:
                 conn.execute(
                     "UPDATE devices SET claimed_at = CURRENT_TIMESTAMP WHERE device_id = ?",
                     (device_id,))
                 conn.commit()
-            finally:
-                if not db._conn:
-                    conn.close()
     else:
         db.register_device(device_id, tid, name=name, api_key=api_key)
         claim_code = None
@@ -7814,8 +7630,7 @@ async def book_memory_toggle(request: Request, memory_id: int):
     db = request.app.state.db
     tid = session["tenant_id"]
     import sqlite3
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         row = conn.execute(
             "SELECT COALESCE(include_in_book, 1) FROM memories WHERE id = ? AND tenant_id = ?",
             (memory_id, tid)).fetchone()
@@ -7827,9 +7642,6 @@ async def book_memory_toggle(request: Request, memory_id: int):
             (new_val, memory_id, tid))
         conn.commit()
         return JSONResponse({"ok": True, "include_in_book": new_val})
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 @router.get("/book/chapters/{chapter_num}", response_class=HTMLResponse)
@@ -8123,8 +7935,7 @@ async def book_chapter_save(request: Request, chapter_num: int,
     tid = session["tenant_id"]
 
     # Update existing draft content
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3
         conn.row_factory = sqlite3.Row
         existing = conn.execute(
@@ -8143,9 +7954,6 @@ async def book_chapter_save(request: Request, chapter_num: int,
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (chapter_num, f"Chapter {chapter_num}", "", "", "[]", content, tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     return RedirectResponse(
         f"/web/book/chapters/{chapter_num}?msg=Changes saved.",
@@ -8218,14 +8026,10 @@ async def book_export_pdf(request: Request):
     if not existing_config.get("author_name"):
         existing_config["author_name"] = speaker_name
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("UPDATE user_profiles SET book_page_count = ?, book_cover_config = ? WHERE tenant_id = ?",
                      (page_count, json.dumps(existing_config), tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     safe_name = speaker_name.replace(" ", "_").lower() if speaker_name else "legacy"
     filename = f"polly_book_{safe_name}.pdf"
@@ -8368,14 +8172,10 @@ async def cover_download(request: Request):
         "title_offset": title_offset, "photo_offset": photo_offset,
         "author_offset": author_offset, "blurb_offset": blurb_offset,
     }
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("UPDATE user_profiles SET book_cover_config = ? WHERE tenant_id = ?",
                      (json.dumps(config), tid))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     from core.book_cover import generate_cover_pdf
     try:
@@ -8807,8 +8607,7 @@ async def photo_listen_page(request: Request, photo_id: int):
 
     # Scope story query to the photo's tenant
     photo_tenant = photo.get("tenant_id")
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3
         conn.row_factory = sqlite3.Row
         stories = conn.execute(
@@ -8820,9 +8619,6 @@ async def photo_listen_page(request: Request, photo_id: int):
             (photo_id, photo_tenant)
         ).fetchall()
         stories = [dict(s) for s in stories]
-    finally:
-        if not db._conn:
-            conn.close()
 
     caption = photo.get("caption") or "Family Photo"
     caption_safe = caption.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
@@ -9181,15 +8977,11 @@ async def admin_provision_submit(request: Request,
     from core.subscription import start_trial
     if tier == "legacy":
         # Set legacy tier directly
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             conn.execute(
                 "UPDATE tenants SET subscription_tier = 'legacy', subscription_status = 'active' WHERE id = ?",
                 (tenant_id,))
             conn.commit()
-        finally:
-            if not db._conn:
-                conn.close()
     else:
         start_trial(db, tenant_id, days=30)
 
@@ -9218,8 +9010,7 @@ async def admin_provision_submit(request: Request,
             location_lat, location_lon = coords
 
     # Update profile with all details + mark setup complete
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("""
             UPDATE user_profiles SET name = ?, familiar_name = ?,
             hometown = ?, birth_year = ?,
@@ -9231,9 +9022,6 @@ async def admin_provision_submit(request: Request,
               location_city.strip() or None, location_lat, location_lon,
               user["id"]))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # 6. Create device + pre-assign to tenant
     device_id = f"polly-{uuid.uuid4().hex[:8]}"
@@ -9243,26 +9031,18 @@ async def admin_provision_submit(request: Request,
     claim_code = db.generate_claim_code(device_id)
 
     # Use claim code as the family code too (one code for everything)
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE tenants SET family_code = ?, family_code_created_at = CURRENT_TIMESTAMP WHERE id = ?",
             (claim_code, tenant_id))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     # Mark as claimed
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE devices SET claimed_at = CURRENT_TIMESTAMP WHERE device_id = ?",
             (device_id,))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
     result = {
         "owner_name": owner_name.strip(),
@@ -9342,6 +9122,61 @@ async def admin_dashboard(request: Request):
     })
 
 
+@router.get("/admin/api/intent-latency")
+async def admin_intent_latency(request: Request):
+    """ADMIN JSON: per-intent dispatch latency histograms since startup."""
+    session = await get_web_session(request)
+    if not session or not session.get("is_admin"):
+        return JSONResponse({"error": "Not authorized"}, status_code=403)
+    cmd = getattr(request.app.state, "cmd", None)
+    return JSONResponse({"intents": cmd.intent_latency_report() if cmd else {}})
+
+
+@router.get("/admin/api/reminder-delivery")
+async def admin_reminder_delivery(request: Request):
+    """ADMIN JSON: per-device medication reminder delivery latency."""
+    session = await get_web_session(request)
+    if not session or not session.get("is_admin"):
+        return JSONResponse({"error": "Not authorized"}, status_code=403)
+    scheduler = getattr(request.app.state, "med_scheduler", None)
+    return JSONResponse({
+        "devices": scheduler.delivery_report() if scheduler else {},
+        "audio_cache": scheduler.audio_cache.stats() if scheduler else {},
+    })
+
+
+@router.get("/admin/api/telemetry")
+async def admin_telemetry(request: Request):
+    """ADMIN JSON: device event buffer, heartbeat tracker, DB writer queue,
+    web session cache, DB maintenance runs and backups."""
+    session = await get_web_session(request)
+    if not session or not session.get("is_admin"):
+        return JSONResponse({"error": "Not authorized"}, status_code=403)
+    telemetry = getattr(request.app.state, "telemetry", None)
+    heartbeats = getattr(request.app.state, "heartbeats", None)
+    async_db = getattr(request.app.state, "async_db", None)
+    maintenance = getattr(request.app.state, "maintenance", None)
+    backups = getattr(request.app.state, "backups", None)
+    return JSONResponse({
+        "telemetry": telemetry.stats() if telemetry else {},
+        "heartbeats": heartbeats.stats() if heartbeats else {},
+        "db_writer": async_db.stats() if async_db else {},
+        "session_cache": request.app.state.db.sessions.stats(),
+        "maintenance": maintenance.stats() if maintenance else {},
+        "backups": backups.stats() if backups else {},
+    })
+
+
+@router.get("/admin/api/device-state")
+async def admin_device_state(request: Request):
+    """ADMIN JSON: size of the bounded per-device in-memory stores."""
+    session = await get_web_session(request)
+    if not session or not session.get("is_admin"):
+        return JSONResponse({"error": "Not authorized"}, status_code=403)
+    from core.device_state import memory_report
+    return JSONResponse({"stores": memory_report()})
+
+
 @router.post("/admin/tenant/{target_tid}/subscription")
 async def admin_set_subscription(request: Request, target_tid: int, tier: str = Form(...)):
     """ADMIN: change a tenant's subscription tier."""
@@ -0,0 +1,29 @@
+"""
+One-shot backfill: build the medication_daily compliance rollup from the
+raw medication_logs history (new writes keep it current from then on).
+
+Run from /opt/polly-connect/server with:
+    sudo python3 backfill_medication_rollups.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import PollyDB
+
+
+def main():
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "polly.db")
+    db_path = os.path.normpath(db_path)
+    print(f"DB: {db_path}")
+
+    db = PollyDB(db_path=db_path)
+    started = time.monotonic()
+    rows = db.rebuild_medication_rollups()
+    print(f"Wrote {rows} medication_daily row(s) in {time.monotonic() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
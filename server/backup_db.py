@@ -0,0 +1,86 @@
+"""
+Take, list, verify and restore online backups of the Polly database
+(what core/backup.py does daily inside the server). Taking a backup is
+safe while the server runs; restoring over the live database is not, so
+stop the server first.
+
+Run from /opt/polly-connect/server with:
+    sudo python3 backup_db.py                        # list snapshots
+    sudo python3 backup_db.py --backup
+    sudo python3 backup_db.py --verify               # newest; or --verify FILE
+    sudo python3 backup_db.py --restore FILE --to ../polly.db --force
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import settings
+from core.backup import (default_backup_dir, list_backups, restore_backup,
+                         rotate_backups, snapshot_time, take_backup, verify_backup)
+from core.database import SCHEMA_VERSION
+
+
+def print_verify(snapshot: str) -> bool:
+    result = verify_backup(snapshot)
+    print(f"{os.path.basename(snapshot)}: integrity {result['integrity']}, "
+          f"schema v{result['schema_version']} (code is v{SCHEMA_VERSION}), "
+          f"{result['tables']} tables, {result['bytes']} bytes restored")
+    return result["ok"]
+
+
+def main(argv=None):
+    default_db = os.path.normpath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "polly.db"))
+    ap = argparse.ArgumentParser(description="Polly DB online backups")
+    ap.add_argument("--db", default=default_db, help="database file")
+    ap.add_argument("--dir", default=settings.BACKUP_DIR,
+                    help="backup directory (default backups/ next to the database)")
+    ap.add_argument("--backup", action="store_true", help="take a snapshot now, then rotate")
+    ap.add_argument("--verify", nargs="?", const="latest", metavar="FILE",
+                    help="restore a snapshot to a temp file and check it")
+    ap.add_argument("--restore", metavar="FILE", help="snapshot to restore (verified first)")
+    ap.add_argument("--to", help="restore destination (default --db)")
+    ap.add_argument("--force", action="store_true", help="overwrite an existing destination")
+    args = ap.parse_args(argv)
+    backup_dir = args.dir or default_backup_dir(args.db)
+
+    if args.backup:
+        result = take_backup(args.db, backup_dir)
+        removed = rotate_backups(backup_dir, settings.BACKUP_KEEP_DAILY,
+                                 settings.BACKUP_KEEP_WEEKLY)
+        print(f"Wrote {result['path']}: {result['pages']} pages, {result['bytes']} bytes "
+              f"in {result['seconds']}s; rotated out {len(removed)}.")
+
+    if args.verify:
+        snapshots = list_backups(backup_dir)
+        target = args.verify
+        if target == "latest":
+            if not snapshots:
+                print(f"No snapshots in {backup_dir}")
+                return 1
+            target = snapshots[-1]
+        return 0 if print_verify(target) else 1
+
+    if args.restore:
+        dest = args.to or args.db
+        if os.path.exists(dest) and not args.force:
+            print(f"{dest} exists; stop the server and pass --force to overwrite.")
+            return 1
+        if not print_verify(args.restore):
+            print("Snapshot failed verification; not restored.")
+            return 1
+        restore_backup(args.restore, dest)
+        print(f"Restored {args.restore} to {dest}")
+        return 0
+
+    print(f"Snapshots in {backup_dir}:")
+    for path in list_backups(backup_dir):
+        print(f"  {os.path.basename(path)}  {snapshot_time(path):%Y-%m-%d %H:%M} UTC  "
+              f"{os.path.getsize(path)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -59,5 +59,24 @@ class Settings:
     # Data directory
     DATA_DIR: str = os.getenv("POLLY_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"))
 
+    # Converted 16kHz PCM cache for static/sounds (empty = no disk cache)
+    SOUND_CACHE_DIR: str = os.getenv("POLLY_SOUND_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".sound_cache"))
+
+    # Database maintenance (core/maintenance.py): retention and archival
+    MAINTENANCE_INTERVAL_S: int = int(os.getenv("POLLY_MAINTENANCE_INTERVAL", "3600"))
+    # device_events older than this many calendar months (current month
+    # included) move to the archive DB; empty path = <db>-archive.db
+    EVENTS_LIVE_MONTHS: int = int(os.getenv("POLLY_EVENTS_LIVE_MONTHS", "2"))
+    EVENTS_ARCHIVE_PATH: str = os.getenv("POLLY_EVENTS_ARCHIVE_PATH", "")
+    MESSAGE_RETENTION_DAYS: int = int(os.getenv("POLLY_MESSAGE_RETENTION_DAYS", "30"))
+    NARRATIVE_LOG_RETENTION_DAYS: int = int(os.getenv("POLLY_NARRATIVE_LOG_RETENTION_DAYS", "90"))
+
+    # Online backups (core/backup.py); interval 0 = off, empty dir = backups/
+    # next to the database
+    BACKUP_INTERVAL_S: int = int(os.getenv("POLLY_BACKUP_INTERVAL", "86400"))
+    BACKUP_DIR: str = os.getenv("POLLY_BACKUP_DIR", "")
+    BACKUP_KEEP_DAILY: int = int(os.getenv("POLLY_BACKUP_KEEP_DAILY", "7"))
+    BACKUP_KEEP_WEEKLY: int = int(os.getenv("POLLY_BACKUP_KEEP_WEEKLY", "4"))
+
 
 settings = Settings()
@@ -12,14 +12,12 @@ No collision with response TTS is possible.
 
 import asyncio
 import base64
-import io
 import logging
-import os
 import random
-import struct
-import wave
 from typing import Optional, List
 
+from core.sound_bank import SoundBank
+
 logger = logging.getLogger(__name__)
 
 # Short squawk files to use as acknowledgment chirps (under 1 second)
@@ -37,60 +35,21 @@ class AckCache:
     def ready(self) -> bool:
         return self._ready and len(self._clips) > 0
 
-    def warm_up(self, sounds_dir: str):
-        """Load and convert squawk files to 16kHz mono WAV. Call at startup."""
+    def warm_up(self, sounds_dir: str, bank: SoundBank = None):
+        """Load squawk files as 16kHz mono WAV from the shared sound bank. Call at startup."""
+        bank = bank or SoundBank(sounds_dir)
         for filename in ACK_SQUAWK_FILES:
-            path = os.path.join(sounds_dir, filename)
-            if not os.path.exists(path):
-                logger.warning(f"Ack squawk not found: {path}")
-                continue
-            try:
-                clip = self._load_and_convert(path)
-                if clip and len(clip) > 100:
-                    dur = len(clip) / 32000.0
-                    self._clips.append(clip)
-                    logger.debug(f"Cached ack squawk: {filename} ({dur:.2f}s)")
-            except Exception as e:
-                logger.warning(f"Failed to cache ack squawk {filename}: {e}")
+            clip = bank.wav(filename)
+            if clip and len(clip) > 100:
+                dur = len(clip) / 32000.0
+                self._clips.append(clip)
+                logger.debug(f"Cached ack squawk: {filename} ({dur:.2f}s)")
+            else:
+                logger.warning(f"Ack squawk unavailable: {filename}")
 
         self._ready = len(self._clips) > 0
         logger.info(f"Ack cache ready: {len(self._clips)} squawk clips cached")
 
-    def _load_and_convert(self, path: str) -> Optional[bytes]:
-        """Load a WAV file and convert to 16kHz mono WAV bytes."""
-        with wave.open(path, 'rb') as wav_in:
-            n_channels = wav_in.getnchannels()
-            sample_width = wav_in.getsampwidth()
-            framerate = wav_in.getframerate()
-            frames = wav_in.readframes(wav_in.getnframes())
-
-        if sample_width != 2:
-            logger.warning(f"Unsupported sample width {sample_width} in {path}")
-            return None
-
-        # Decode to int16 samples
-        n_samples = len(frames) // 2
-        samples = list(struct.unpack(f'<{n_samples}h', frames))
-
-        # Stereo → mono (take left channel)
-        if n_channels == 2:
-            samples = samples[::2]
-
-        # Downsample to 16kHz if needed
-        if framerate > 16000:
-            ratio = max(1, round(framerate / 16000))
-            samples = samples[::ratio]
-
-        # Wrap in 16kHz mono WAV
-        output = io.BytesIO()
-        with wave.open(output, 'wb') as wav_out:
-            wav_out.setnchannels(1)
-            wav_out.setsampwidth(2)
-            wav_out.setframerate(16000)
-            wav_out.writeframes(struct.pack(f'<{len(samples)}h', *samples))
-
-        return output.getvalue()
-
     def get_random_clip(self) -> Optional[bytes]:
         """Return a random cached audio clip (WAV bytes)."""
         if not self._clips:
@@ -0,0 +1,123 @@
+"""
+Async facade over PollyDB.
+
+PollyDB is synchronous; calling it straight from an async handler stalls the
+event loop, and with it every device's audio stream, for as long as the
+query (or commit, or WAL checkpoint) takes. AsyncPollyDB runs the same
+methods off the loop:
+
+    adb = get_async_db(app)
+    user = await adb.get_or_create_user(tenant_id=tid)
+    adb.defer("log_device_event", device_id, tid, "connect")   # fire-and-forget
+
+Reads (get_*/find_*/list_*/search*/...) run on a small thread pool against
+pooled connections. Everything else goes through a single writer thread, so
+writes are serialized in submission order and never contend for SQLite's
+write lock.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+READ_PREFIXES = ("get_", "find_", "list_", "search", "count_", "is_", "has_")
+# Named like reads but may insert
+WRITING_READS = {"get_or_create_user"}
+
+DEFAULT_READERS = 4
+
+
+def is_read_method(name: str) -> bool:
+    return name.startswith(READ_PREFIXES) and name not in WRITING_READS
+
+
+class AsyncPollyDB:
+    """`await adb.<method>(...)` for any PollyDB method."""
+
+    def __init__(self, db, readers: int = DEFAULT_READERS):
+        self.db = db
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        # A :memory: database is one shared connection: keep it on one thread
+        if db._conn is not None:
+            self._readers = self._writer
+        else:
+            self._readers = ThreadPoolExecutor(max_workers=readers,
+                                               thread_name_prefix="db-reader")
+        self._lock = threading.Lock()
+        self.pending_writes = 0
+        self.deferred_failures = 0
+        self.closed = False
+
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+        if not callable(method):
+            return method
+        run = self.read if is_read_method(name) else self.write
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await run(method, *args, **kwargs)
+
+        return call
+
+    async def read(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on a reader thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, functools.partial(fn, *args, **kwargs))
+
+    async def write(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the writer thread, after earlier writes."""
+        return await asyncio.wrap_future(self._submit_write(fn, *args, **kwargs))
+
+    def defer(self, name: str, *args, **kwargs) -> Future:
+        """Queue a write without waiting for it (telemetry, last_seen).
+        Failures are logged, never raised to the caller."""
+        future = self._submit_write(getattr(self.db, name), *args, **kwargs)
+        future.add_done_callback(functools.partial(self._log_deferred, name))
+        return future
+
+    def _submit_write(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            self.pending_writes += 1
+        future = self._writer.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._write_done)
+        return future
+
+    def _write_done(self, future):
+        with self._lock:
+            self.pending_writes -= 1
+
+    def _log_deferred(self, name, future):
+        if not future.cancelled() and future.exception() is not None:
+            with self._lock:
+                self.deferred_failures += 1
+            logger.warning(f"Deferred DB write {name} failed: {future.exception()}")
+
+    def stats(self) -> dict:
+        return {"pending_writes": self.pending_writes,
+                "deferred_failures": self.deferred_failures}
+
+    def close(self):
+        """Finish queued writes and stop the worker threads."""
+        self.closed = True
+        self._writer.shutdown(wait=True)
+        if self._readers is not self._writer:
+            self._readers.shutdown(wait=True)
+
+
+def get_async_db(app) -> Optional[AsyncPollyDB]:
+    """The app's AsyncPollyDB, created on first use if the lifespan hasn't.
+    None when the app has no database."""
+    db = getattr(app.state, "db", None)
+    if db is None:
+        return None
+    adb = getattr(app.state, "async_db", None)
+    if adb is None or adb.db is not db or adb.closed:
+        adb = AsyncPollyDB(db)
+        app.state.async_db = adb
+    return adb
@@ -0,0 +1,212 @@
+"""
+Shared audio DSP for Polly Connect.
+
+Every format conversion between source audio (sound files, TTS engines,
+device recordings) and the ESP32 wire format — 16kHz mono 16-bit PCM in a
+WAV container — goes through these NumPy helpers:
+
+  unwrap_wav / wrap_wav     WAV container <-> samples
+  downmix                   N channels -> mono (channel average)
+  resample                  polyphase (Kaiser-windowed sinc) rate conversion
+  apply_gain / saturate     volume scaling with int16 clipping
+  normalize_loudness        RMS loudness target with a peak ceiling, applied
+                            to squawk and reminder clips
+
+Samples are float32 on the int16 scale (-32768..32767) between steps, so
+chained operations don't re-quantize.
+"""
+
+import io
+import wave
+from functools import lru_cache
+from math import gcd
+from typing import Tuple, Union
+
+import numpy as np
+
+TARGET_RATE = 16000
+
+# Common loudness for rendered clips, so squawks and TTS play at the same
+# level whatever their source files were mastered at
+LOUDNESS_TARGET_DBFS = -20.0
+
+# Resampler quality: zero crossings of the sinc on each side, and Kaiser beta
+RESAMPLE_HALF_WIDTH = 16
+RESAMPLE_KAISER_BETA = 8.6
+
+# Outputs computed per block, bounding the (block x taps) working matrix
+_RESAMPLE_BLOCK = 16384
+
+
+# ── WAV container ────────────────────────────────────────────────────
+
+def decode_pcm(raw: bytes, sampwidth: int) -> np.ndarray:
+    """Interleaved little-endian PCM of any common width -> float32 on int16 scale."""
+    if sampwidth == 1:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) * 256
+    if sampwidth == 2:
+        return np.frombuffer(raw, dtype='<i2').astype(np.float32)
+    if sampwidth == 3:
+        b = np.frombuffer(raw[:len(raw) - len(raw) % 3], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        # Sign-extend 24 -> 32 bits, then keep the top 16
+        return ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 16).astype(np.float32)
+    if sampwidth == 4:
+        return np.frombuffer(raw, dtype='<i4').astype(np.float32) / 65536
+    raise ValueError(f"Unsupported sample width: {sampwidth}")
+
+
+def unwrap_wav(wav_bytes: bytes) -> Tuple[np.ndarray, int]:
+    """WAV bytes -> (float32 samples shaped (frames, channels), sample rate)."""
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
+        channels = w.getnchannels()
+        sampwidth = w.getsampwidth()
+        rate = w.getframerate()
+        raw = w.readframes(w.getnframes())
+    samples = decode_pcm(raw, sampwidth)
+    samples = samples[:len(samples) - len(samples) % channels]
+    return samples.reshape(-1, channels), rate
+
+
+def wav_frames(wav_bytes: bytes) -> bytes:
+    """Raw PCM frames of a WAV, untouched."""
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
+        return w.readframes(w.getnframes())
+
+
+def wrap_wav(pcm: Union[bytes, bytearray, np.ndarray], rate: int = TARGET_RATE,
+             channels: int = 1) -> bytes:
+    """16-bit PCM (raw bytes or int16 samples) -> WAV bytes."""
+    if isinstance(pcm, np.ndarray):
+        pcm = np.ascontiguousarray(pcm, dtype='<i2').tobytes()
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm)
+    return out.getvalue()
+
+
+# ── Channels, gain, loudness ─────────────────────────────────────────
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """(frames, channels) -> mono by averaging channels; 1-D input passes through."""
+    if samples.ndim == 1:
+        return samples
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+def apply_gain(samples: np.ndarray, gain: float) -> np.ndarray:
+    """Scale samples (float32 result; call saturate() to get int16)."""
+    if gain == 1.0:
+        return samples.astype(np.float32, copy=False)
+    return samples.astype(np.float32, copy=False) * np.float32(gain)
+
+
+def saturate(samples: np.ndarray) -> np.ndarray:
+    """Round and clip to int16 — the last step before the wire."""
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+
+
+def rms_dbfs(samples: np.ndarray) -> float:
+    """RMS level in dB relative to int16 full scale (-inf for silence)."""
+    if not len(samples):
+        return float('-inf')
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    return 20 * np.log10(rms / 32768.0) if rms > 0 else float('-inf')
+
+
+def normalize_loudness(samples: np.ndarray, target_dbfs: float = LOUDNESS_TARGET_DBFS,
+                       peak_dbfs: float = -1.0) -> np.ndarray:
+    """Gain toward an RMS target, capped so peaks stay under peak_dbfs."""
+    level = rms_dbfs(samples)
+    if level == float('-inf'):
+        return samples.astype(np.float32, copy=False)
+    gain = 10 ** ((target_dbfs - level) / 20)
+    peak = float(np.max(np.abs(samples)))
+    ceiling = 32768.0 * 10 ** (peak_dbfs / 20)
+    if peak * gain > ceiling:
+        gain = ceiling / peak
+    return apply_gain(samples, gain)
+
+
+# ── Resampling ───────────────────────────────────────────────────────
+
+@lru_cache(maxsize=16)
+def _polyphase_bank(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass split into `up` phases: shape (up, taps)."""
+    factor = max(up, down)
+    half = RESAMPLE_HALF_WIDTH * factor
+    t = np.arange(-half, half + 1, dtype=np.float64)
+    h = np.sinc(t / factor) * np.kaiser(len(t), RESAMPLE_KAISER_BETA)
+    h *= up / h.sum()  # unity DC gain after zero-stuffing by `up`
+    taps = -(-len(h) // up)
+    h = np.concatenate([h, np.zeros(taps * up - len(h))])
+    return h.reshape(taps, up).T.astype(np.float32).copy()  # bank[p, k] = h[p + k*up]
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = TARGET_RATE) -> np.ndarray:
+    """Polyphase rational resampling of mono float samples (zero-phase delay).
+
+    Output n reads the filter phase (n*down + delay) % up. That phase repeats
+    every `up` outputs while the input position advances by `down`, so each
+    phase is one strided (rows x taps) window view times a tap vector — no
+    zero-stuffing and no gathered copies of the input.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if src_rate == dst_rate or not len(samples):
+        return samples
+    g = gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    bank = _polyphase_bank(up, down)[:, ::-1]  # reversed taps: window . bank[p]
+    taps = bank.shape[1]
+    delay = RESAMPLE_HALF_WIDTH * max(up, down)  # filter centre, upsampled domain
+
+    n_out = -(-len(samples) * up // down)
+    padded = np.concatenate([np.zeros(taps, np.float32), samples,
+                             np.zeros(2 * taps + 1, np.float32)])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, taps)
+    out = np.empty(n_out, dtype=np.float32)
+    for r in range(min(up, n_out)):
+        m = r * down + delay
+        rows = len(range(r, n_out, up))
+        # y[n] = sum_k bank[p, k] * x[m//up - k]  ==  padded[m//up + 1 : m//up + 1 + taps] . reversed
+        start = m // up + 1
+        out[r::up] = windows[start:start + rows * down:down] @ bank[m % up]
+    return out
+
+
+# ── Pipelines ────────────────────────────────────────────────────────
+
+def to_16k_mono(wav_bytes: bytes, volume: float = 1.0) -> np.ndarray:
+    """Any WAV -> 16kHz mono int16 samples at the given volume."""
+    samples, rate = unwrap_wav(wav_bytes)
+    mono = resample(downmix(samples), rate, TARGET_RATE)
+    return saturate(apply_gain(mono, volume))
+
+
+def to_16k_mono_wav(wav_bytes: bytes, volume: float = 1.0) -> bytes:
+    """Any WAV -> 16kHz mono 16-bit WAV bytes at the given volume."""
+    return wrap_wav(to_16k_mono(wav_bytes, volume))
+
+
+def scale_wav(wav_bytes: bytes, gain: float) -> bytes:
+    """Volume-scale a 16-bit WAV without touching its format or header."""
+    if gain == 1.0:
+        return wav_bytes
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
+        channels, rate = w.getnchannels(), w.getframerate()
+    samples, _ = unwrap_wav(wav_bytes)
+    return wrap_wav(saturate(apply_gain(samples.reshape(-1), gain)), rate, channels)
+
+
+def scale_pcm(pcm: np.ndarray, gain: float) -> np.ndarray:
+    """Volume-scale int16 samples with saturation."""
+    return pcm if gain == 1.0 else saturate(apply_gain(pcm, gain))
+
+
+def normalize_pcm(pcm: np.ndarray, target_dbfs: float = LOUDNESS_TARGET_DBFS) -> np.ndarray:
+    """Loudness-normalize int16 samples (peak-capped, saturated)."""
+    return saturate(normalize_loudness(pcm, target_dbfs))
@@ -5,13 +5,11 @@ Outputs 16kHz mono PCM wrapped in WAV header.
 Free tier: 5M chars/month.
 """
 
-import io
 import logging
 import os
-import struct
-import wave
 from typing import Optional
 
+from core import audio_dsp
 from core.tts_base import TTSBackend
 
 logger = logging.getLogger(__name__)
@@ -72,14 +70,7 @@ class AWSPollyTTS(TTSBackend):
                 return None
 
             # Wrap raw PCM in WAV header (16kHz, 16-bit, mono)
-            output = io.BytesIO()
-            with wave.open(output, "wb") as wav_out:
-                wav_out.setnchannels(1)
-                wav_out.setsampwidth(2)
-                wav_out.setframerate(16000)
-                wav_out.writeframes(pcm_data)
-
-            return output.getvalue()
+            return audio_dsp.wrap_wav(pcm_data, rate=16000)
 
         except Exception as e:
             logger.error(f"Amazon Polly TTS error: {e}")
@@ -0,0 +1,235 @@
+"""
+Online backups of the Polly database.
+
+Copying polly.db while the server runs is unsafe (the WAL holds the newest
+commits) and VACUUM INTO reads the whole file in one go. take_backup()
+uses the SQLite backup API instead, BACKUP_STEP_PAGES pages per step with
+a short sleep between steps, from one read transaction: in WAL mode that
+is a consistent snapshot which never blocks writers and is not restarted
+by them (checkpoints just can't pass it until the copy is done).
+
+Snapshots are gzipped to <backup_dir>/<db stem>-YYYYMMDD-HHMMSS.db.gz and
+rotated: the newest snapshot of each of the last `keep_daily` days and of
+each of the last `keep_weekly` ISO weeks are kept. verify_backup()
+restores one to a temp file and runs PRAGMA integrity_check; see
+backup_db.py for the command line.
+
+DbBackup runs take_backup() every BACKUP_INTERVAL_S on a plain worker
+thread, not the DB writer, so queued writes never wait behind it.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKUP_STEP_PAGES = 256
+BACKUP_STEP_PAUSE_SECONDS = 0.02
+FIRST_RUN_DELAY_SECONDS = 600
+COPY_CHUNK_BYTES = 1 << 20
+SNAPSHOT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+
+_SNAPSHOT_RE = re.compile(r"-(\d{8}-\d{6})\.db\.gz$")
+
+
+def snapshot_time(path: str) -> Optional[datetime]:
+    """UTC time encoded in a snapshot file name, None for other files."""
+    match = _SNAPSHOT_RE.search(os.path.basename(path))
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), SNAPSHOT_TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def default_backup_dir(db_path: str) -> str:
+    """backups/ next to the database file."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "backups")
+
+
+def list_backups(backup_dir: str) -> List[str]:
+    """Snapshot paths in backup_dir, oldest first."""
+    if not os.path.isdir(backup_dir):
+        return []
+    found = [os.path.join(backup_dir, name) for name in os.listdir(backup_dir)]
+    return sorted((p for p in found if snapshot_time(p)), key=snapshot_time)
+
+
+def take_backup(db_path: str, backup_dir: str, pages: int = BACKUP_STEP_PAGES,
+                pause: float = BACKUP_STEP_PAUSE_SECONDS,
+                now: datetime = None) -> Dict:
+    """Snapshot db_path into backup_dir as a .db.gz. Returns {path, pages,
+    steps, bytes, seconds}."""
+    started = time.monotonic()
+    now = now or datetime.now(timezone.utc)
+    os.makedirs(backup_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    final = os.path.join(backup_dir, f"{stem}-{now.strftime(SNAPSHOT_TIME_FORMAT)}.db.gz")
+    raw = final[:-len(".gz")] + ".partial"
+    steps = 0
+
+    def progress(status, remaining, total):
+        nonlocal steps
+        steps += 1
+        if remaining:
+            time.sleep(pause)
+
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(raw)
+    try:
+        # Pin one snapshot for the whole copy
+        src.execute("BEGIN")
+        src.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        src.backup(dst, pages=pages, progress=progress)
+        src.rollback()
+        page_count = dst.execute("PRAGMA page_count").fetchone()[0]
+        dst.close()
+        with open(raw, "rb") as fin, gzip.open(final + ".tmp", "wb", compresslevel=6) as fout:
+            shutil.copyfileobj(fin, fout, COPY_CHUNK_BYTES)
+        os.replace(final + ".tmp", final)
+    finally:
+        src.close()
+        dst.close()
+        for leftover in (raw, final + ".tmp"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return {
+        "path": final,
+        "pages": page_count,
+        "steps": steps,
+        "bytes": os.path.getsize(final),
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+
+def rotate_backups(backup_dir: str, keep_daily: int = 7, keep_weekly: int = 4) -> List[str]:
+    """Delete snapshots outside the retention window. Returns removed paths."""
+    keep = set()
+    days, weeks = {}, {}
+    for path in reversed(list_backups(backup_dir)):  # newest first
+        taken = snapshot_time(path)
+        day, week = taken.date(), taken.isocalendar()[:2]
+        if day not in days and len(days) < keep_daily:
+            days[day] = path
+            keep.add(path)
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks[week] = path
+            keep.add(path)
+    removed = [p for p in list_backups(backup_dir) if p not in keep]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def restore_backup(snapshot: str, dest: str):
+    """Decompress a snapshot to dest (which must not be open anywhere)."""
+    tmp = dest + ".restoring"
+    with gzip.open(snapshot, "rb") as fin, open(tmp, "wb") as fout:
+        shutil.copyfileobj(fin, fout, COPY_CHUNK_BYTES)
+    # A stale WAL next to dest would be replayed over the restored file
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(dest + suffix):
+            os.remove(dest + suffix)
+    os.replace(tmp, dest)
+
+
+def verify_backup(snapshot: str) -> Dict:
+    """Restore a snapshot to a temp file and check it. Returns {ok,
+    integrity, schema_version, tables, bytes}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "restore.db")
+        try:
+            restore_backup(snapshot, path)
+        except (OSError, EOFError) as e:
+            return {"ok": False, "integrity": f"unreadable: {e}",
+                    "schema_version": None, "tables": 0, "bytes": 0}
+        conn = sqlite3.connect(path)
+        try:
+            integrity = "; ".join(r[0] for r in conn.execute("PRAGMA integrity_check"))
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            tables = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            integrity, version, tables = str(e), None, 0
+        finally:
+            conn.close()
+        return {
+            "ok": integrity == "ok" and tables > 0,
+            "integrity": integrity,
+            "schema_version": version,
+            "tables": tables,
+            "bytes": os.path.getsize(path),
+        }
+
+
+class DbBackup:
+    def __init__(self, db_path: str, backup_dir: str, interval: float = 86400,
+                 keep_daily: int = 7, keep_weekly: int = 4,
+                 pages: int = BACKUP_STEP_PAGES, pause: float = BACKUP_STEP_PAUSE_SECONDS):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval = interval
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        self.pages = pages
+        self.pause = pause
+        self._task = None
+        self.runs = 0
+        self.failures = 0
+        self.last_backup: Dict = {}
+
+    def _run(self) -> Dict:
+        result = take_backup(self.db_path, self.backup_dir, self.pages, self.pause)
+        result["rotated"] = len(rotate_backups(self.backup_dir, self.keep_daily, self.keep_weekly))
+        return result
+
+    async def run_once(self) -> Dict:
+        result = await asyncio.get_running_loop().run_in_executor(None, self._run)
+        self.runs += 1
+        self.last_backup = result
+        logger.info(f"DB backup {result['path']}: {result['bytes']} bytes in "
+                    f"{result['seconds']}s ({result['steps']} steps)")
+        return result
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _seconds_until_due(self) -> float:
+        backups = list_backups(self.backup_dir)
+        if not backups:
+            return 0
+        age = (datetime.now(timezone.utc) - snapshot_time(backups[-1])).total_seconds()
+        return max(self.interval - age, 0)
+
+    async def _loop(self):
+        # Not during startup, and a restart shouldn't cost an extra full copy
+        await asyncio.sleep(max(self._seconds_until_due(), FIRST_RUN_DELAY_SECONDS))
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"DB backup error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "backup_dir": self.backup_dir,
+            "snapshots": len(list_backups(self.backup_dir)),
+            "last_backup": self.last_backup,
+        }
@@ -44,8 +44,7 @@ class BibleVerseService:
             else:
                 verses = data
 
-            conn = self.db._get_connection()
-            try:
+            with self.db.connection() as conn:
                 for v in verses:
                     conn.execute("""
                         INSERT INTO bible_verses (reference, text, reflection, topic, day_of_year)
@@ -55,9 +54,6 @@ class BibleVerseService:
                 conn.commit()
                 self._verses_loaded = True
                 logger.info(f"Loaded {len(verses)} bible verses")
-            finally:
-                if not self.db._conn:
-                    conn.close()
         except Exception as e:
             logger.error(f"Error loading bible verses: {e}")
 
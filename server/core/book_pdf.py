@@ -873,8 +873,7 @@ class LegacyBookPDF:
 
         # Also get ALL stories for this tenant that have audio
         # (some stories may not be in any chapter yet)
-        conn = self.db._get_connection()
-        try:
+        with self.db.connection() as conn:
             import sqlite3
             conn.row_factory = sqlite3.Row
             all_stories = conn.execute(
@@ -883,9 +882,6 @@ class LegacyBookPDF:
                 "FROM stories s WHERE s.tenant_id = ? AND s.audio_s3_key IS NOT NULL",
                 (self.tenant_id,)
             ).fetchall()
-        finally:
-            if not self.db._conn:
-                conn.close()
 
         for s in all_stories:
             s = dict(s)
@@ -897,15 +893,11 @@ class LegacyBookPDF:
 
             # Get speaker from memory
             mem = None
-            conn = self.db._get_connection()
-            try:
+            with self.db.connection() as conn:
                 mem = conn.execute(
                     "SELECT speaker FROM memories WHERE story_id = ? LIMIT 1",
                     (s["id"],)
                 ).fetchone()
-            finally:
-                if not self.db._conn:
-                    conn.close()
 
             speaker = mem[0] if mem else ""
 
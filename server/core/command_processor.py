@@ -4,16 +4,31 @@ Handles all intents with access to all services.
 Tracks last_response per device for "repeat" functionality.
 """
 
+import asyncio
 import logging
+import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from core.conversation_state import ConversationMode, ConversationState
+from core.device_state import DeviceStateStore
+from core.metrics import LatencyHistogram
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# intent -> (method name, blocking), filled in by @intent_handler below
+_INTENT_HANDLERS: Dict[str, Tuple[str, bool]] = {}
+
+
+def intent_handler(intent: str, blocking: bool = False):
+    """Register a CommandProcessor method as the handler for an intent."""
+    def register(func):
+        _INTENT_HANDLERS[intent] = (func.__name__, blocking)
+        return func
+    return register
+
 
 class CommandProcessor:
     """
@@ -38,675 +53,820 @@ class CommandProcessor:
         self.narrative_arc = narrative_arc
         self.engagement = engagement
         self.followup_gen = followup_gen
-        self._last_response = {}
-        self._last_missing_item = {}  # device_id -> item name (for "found it")
-        self._conversation_states = {}  # device_id -> ConversationState
+        # Per-device maps are bounded: idle, disconnected devices are evicted
+        self._last_response = DeviceStateStore("cmd.last_response")
+        self._last_missing_item = DeviceStateStore("cmd.last_missing_item")  # device_id -> item name (for "found it")
+        self._conversation_states = DeviceStateStore("cmd.conversation_states")  # device_id -> ConversationState
+        # intent -> (handler, blocking); O(1) dispatch instead of an if/elif chain
+        self._handlers = {
+            intent: (getattr(self, name), blocking)
+            for intent, (name, blocking) in _INTENT_HANDLERS.items()
+        }
+        self._intent_latency: Dict[str, LatencyHistogram] = {}
 
     def _get_state(self, device_id: str) -> ConversationState:
         if device_id not in self._conversation_states:
             self._conversation_states[device_id] = ConversationState()
         return self._conversation_states[device_id]
 
+    def register_intent(self, intent: str, handler, blocking: bool = False):
+        """Add or replace the handler for an intent.
+
+        handler(intent_result, raw_text, device_id, state) may be async, or a
+        plain function; blocking=True runs a plain function on a worker thread
+        so DB/network calls don't stall every device's audio loop.
+        """
+        self._handlers[intent] = (handler, blocking)
+
     async def process(self, intent_result: dict, raw_text: str,
                       device_id: str = "unknown") -> str:
         """Process a parsed intent and return response text."""
         intent = intent_result.get("intent", "unknown")
 
-        # ── Memory storage ──
-
         # Get tenant context from conversation state
         state = self._get_state(device_id)
+
+        entry = self._handlers.get(intent)
+        if entry is None:
+            return "I didn't understand that. You can ask me to find things, tell a joke, or ask you a question."
+
+        handler, blocking = entry
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                return await handler(intent_result, raw_text, device_id, state)
+            if blocking:
+                return await asyncio.to_thread(handler, intent_result, raw_text, device_id, state)
+            return handler(intent_result, raw_text, device_id, state)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            hist = self._intent_latency.get(intent)
+            if hist is None:
+                hist = self._intent_latency[intent] = LatencyHistogram()
+            hist.observe(elapsed_ms)
+
+    def intent_latency_report(self) -> Dict[str, dict]:
+        """Per-intent latency summary, slowest total time first."""
+        report = {intent: hist.snapshot() for intent, hist in self._intent_latency.items()}
+        return dict(sorted(report.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+    def snapshot_state(self) -> Dict:
+        """Per-device conversation state, JSON-safe, for restart snapshots."""
+        return {
+            "conversations": {d: st.to_dict() for d, st in self._conversation_states.items()},
+            "last_response": dict(self._last_response.items()),
+            "last_missing_item": dict(self._last_missing_item.items()),
+        }
+
+    def restore_state(self, snapshot: Dict):
+        """Load a snapshot_state() payload; live entries win over restored ones."""
+        for device_id, data in snapshot.get("conversations", {}).items():
+            if device_id not in self._conversation_states:
+                self._conversation_states[device_id] = ConversationState.from_dict(data)
+        for device_id, resp in snapshot.get("last_response", {}).items():
+            self._last_response.setdefault(device_id, resp)
+        for device_id, item in snapshot.get("last_missing_item", {}).items():
+            self._last_missing_item.setdefault(device_id, item)
+
+    # ── Intent handlers ──
+    # Registered by @intent_handler; each takes (intent_result, raw_text,
+    # device_id, state). blocking=True handlers run off the event loop.
+
+    # ── Memory storage ──
+
+    @intent_handler("store", blocking=True)
+    def _intent_store(self, intent_result: dict, raw_text: str,
+                      device_id: str, state: ConversationState) -> str:
+        from core.subscription import check_feature
         tid = state.tenant_id
+        if not check_feature(self.db, tid, "add_item"):
+            return "Your plan limit has been reached for stored items. Visit the Polly website to upgrade."
+        item = intent_result.get("item")
+        location = intent_result.get("location")
+        context = intent_result.get("context")
+        prep = intent_result.get("prep", "on")
+        if item and location:
+            self.db.store_item(item, location, context, raw_text, tenant_id=tid, prep=prep)
+            verb = "are" if item.endswith("s") and not item.endswith("ss") else "is"
+            resp = f"Got it. The {item} {verb} {prep} the {location}."
+            self._last_response[device_id] = resp
+            return resp
+        return "I didn't understand what to store."
 
-        if intent == "store":
-            from core.subscription import check_feature
-            if not check_feature(self.db, tid, "add_item"):
-                return "Your plan limit has been reached for stored items. Visit the Polly website to upgrade."
-            item = intent_result.get("item")
-            location = intent_result.get("location")
-            context = intent_result.get("context")
-            prep = intent_result.get("prep", "on")
-            if item and location:
-                self.db.store_item(item, location, context, raw_text, tenant_id=tid, prep=prep)
-                verb = "are" if item.endswith("s") and not item.endswith("ss") else "is"
-                resp = f"Got it. The {item} {verb} {prep} the {location}."
-                self._last_response[device_id] = resp
-                return resp
-            return "I didn't understand what to store."
-
-        elif intent == "retrieve_item":
-            import random
-            item = intent_result.get("item")
-            mom = intent_result.get("mom_mode", False)
-            if item:
-                results = self.db.find_item(item, tenant_id=tid)
-                if results:
-                    if len(results) == 1:
-                        r = results[0]
-                        prep = r.get("prep") or "on"
-                        loc = r["location"]
-                        # Skip prep if location already starts with a preposition
-                        loc_lower = loc.lower()
-                        has_prep = loc_lower.startswith(("by ", "in ", "on ", "at ", "near ", "under ", "behind ", "next to ", "inside "))
-                        if has_prep:
-                            loc_phrase = loc.lower()  # "by the bathroom"
-                        else:
-                            loc_phrase = f"{prep} the {loc}"  # "on the shelf"
-                        if mom:
-                            phrases = [
-                                f"Have you looked {loc_phrase}?",
-                                f"Did you try {loc_phrase}?",
-                                f"I think it's {loc_phrase}, sweetie.",
-                                f"Check {loc_phrase}, honey.",
-                                f"It should be {loc_phrase}. Did you really look?",
-                                f"Last I heard, it was {loc_phrase}.",
-                                f"Did you check {loc_phrase}? Really check?",
-                            ]
-                            resp = random.choice(phrases)
-                        else:
-                            verb = "are" if r['item'].endswith("s") and not r['item'].endswith("ss") else "is"
-                            if r.get("context"):
-                                resp = f"The {r['item']} {verb} {loc_phrase}, {r['context']}."
-                            else:
-                                resp = f"The {r['item']} {verb} {loc_phrase}."
+    @intent_handler("retrieve_item", blocking=True)
+    def _intent_retrieve_item(self, intent_result: dict, raw_text: str,
+                              device_id: str, state: ConversationState) -> str:
+        import random
+        tid = state.tenant_id
+        item = intent_result.get("item")
+        mom = intent_result.get("mom_mode", False)
+        if item:
+            results = self.db.find_item(item, tenant_id=tid)
+            if results:
+                if len(results) == 1:
+                    r = results[0]
+                    prep = r.get("prep") or "on"
+                    loc = r["location"]
+                    # Skip prep if location already starts with a preposition
+                    loc_lower = loc.lower()
+                    has_prep = loc_lower.startswith(("by ", "in ", "on ", "at ", "near ", "under ", "behind ", "next to ", "inside "))
+                    if has_prep:
+                        loc_phrase = loc.lower()  # "by the bathroom"
+                    else:
+                        loc_phrase = f"{prep} the {loc}"  # "on the shelf"
+                    if mom:
+                        phrases = [
+                            f"Have you looked {loc_phrase}?",
+                            f"Did you try {loc_phrase}?",
+                            f"I think it's {loc_phrase}, sweetie.",
+                            f"Check {loc_phrase}, honey.",
+                            f"It should be {loc_phrase}. Did you really look?",
+                            f"Last I heard, it was {loc_phrase}.",
+                            f"Did you check {loc_phrase}? Really check?",
+                        ]
+                        resp = random.choice(phrases)
                     else:
-                        locations = [f"{r.get('prep', 'on')} the {r['location']}" for r in results]
-                        if len(locations) == 2:
-                            resp = f"Did you check {locations[0]} or {locations[1]}?"
+                        verb = "are" if r['item'].endswith("s") and not r['item'].endswith("ss") else "is"
+                        if r.get("context"):
+                            resp = f"The {r['item']} {verb} {loc_phrase}, {r['context']}."
                         else:
-                            resp = f"Did you check {', '.join(locations[:-1])}, or {locations[-1]}?"
-                    self._last_response[device_id] = resp
-                    return resp
-                # Not found — track it for "found it"
-                self._last_missing_item[device_id] = item
-                if mom:
-                    phrases = [
-                        f"Hmm, I don't remember where you put the {item}. When you find it, let me know!",
-                        f"I'm not sure where the {item} is. Did you put it away properly?",
-                        f"The {item}? I don't know, sweetie. Where did you last have it?",
-                    ]
-                    resp = random.choice(phrases)
+                            resp = f"The {r['item']} {verb} {loc_phrase}."
                 else:
-                    resp = f"I don't know where the {item} is."
+                    locations = [f"{r.get('prep', 'on')} the {r['location']}" for r in results]
+                    if len(locations) == 2:
+                        resp = f"Did you check {locations[0]} or {locations[1]}?"
+                    else:
+                        resp = f"Did you check {', '.join(locations[:-1])}, or {locations[-1]}?"
                 self._last_response[device_id] = resp
                 return resp
-            return "What are you looking for?"
-
-        elif intent == "found_it":
-            import random
-            last_item = self._last_missing_item.pop(device_id, None)
-            phrases = [
-                "See? It was right where I said!",
-                "Good! Now put it back when you're done.",
-                "Told you! Moms always know.",
-                "Great! Was it in the last place you looked?",
-            ]
-            resp = random.choice(phrases)
-            if last_item:
-                resp += f" Where was the {last_item}?"
+            # Not found — track it for "found it"
+            self._last_missing_item[device_id] = item
+            if mom:
+                phrases = [
+                    f"Hmm, I don't remember where you put the {item}. When you find it, let me know!",
+                    f"I'm not sure where the {item} is. Did you put it away properly?",
+                    f"The {item}? I don't know, sweetie. Where did you last have it?",
+                ]
+                resp = random.choice(phrases)
+            else:
+                resp = f"I don't know where the {item} is."
             self._last_response[device_id] = resp
             return resp
+        return "What are you looking for?"
 
-        elif intent == "play_blessing":
-            import random, os
-            speaker_filter = intent_result.get("speaker")
-            category_filter = intent_result.get("category")
-
-            # Check for recorded blessings first
-            recordings = self.db.get_prayer_recordings(tid)
-
-            if recordings:
-                # Filter by speaker if specified
-                if speaker_filter:
-                    speaker_lower = speaker_filter.lower()
-                    filtered = [r for r in recordings if speaker_lower in (r.get("speaker_name") or "").lower()]
-                    if filtered:
-                        recordings = filtered
-
-                # Filter by category if specified
-                if category_filter:
-                    filtered = [r for r in recordings if r.get("category") == category_filter]
-                    if filtered:
-                        recordings = filtered
-
-                # Pick one
-                rec = random.choice(recordings)
-                audio_file = rec.get("audio_filename")
-                if audio_file:
-                    speaker = rec.get("speaker_name", "")
-                    category = rec.get("category", "blessing")
-                    self.db.update_prayer_recording_played(rec["id"])
-                    intro = f"{speaker}'s {category} blessing." if speaker else f"A {category} blessing."
-                    self._last_response[device_id] = intro
-                    return f"__PLAY_PRAYER__{audio_file}__INTRO__{intro}"
-
-            # No recordings found — fall back to AI-generated blessing
-            if self.prayer:
-                theme = category_filter or "gratitude"
-                resp = self.prayer.get_prayer(
-                    theme, tenant_id=state.tenant_id, pray_for=speaker_filter)
-                self._last_response[device_id] = resp
-                return resp
-            return "Let us bow our heads. Lord, bless this moment and all who are gathered. Fill our hearts with gratitude and peace. Amen."
-
-        elif intent == "retrieve_location":
-            location = intent_result.get("location")
-            if location:
-                results = self.db.find_by_location(location, tenant_id=tid)
-                if results:
-                    items = [r["item"] for r in results]
-                    if len(items) == 1:
-                        resp = f"On the {location}, you have your {items[0]}."
-                    else:
-                        listed = ", ".join(items[:-1]) + f", and {items[-1]}"
-                        resp = f"On the {location}, you have {len(items)} things: {listed}."
-                    self._last_response[device_id] = resp
-                    return resp
-                return f"I don't have anything stored for {location}."
-            return "Which location?"
-
-        elif intent == "delete":
-            item = intent_result.get("item")
-            if item:
-                if self.db.delete_item(item, tenant_id=tid):
-                    return f"Forgot about the {item}."
-                return f"I don't have {item} stored."
-            return "What should I forget?"
-
-        elif intent == "list_all":
-            items = self.db.list_all(tenant_id=tid)
-            resp = f"You have {len(items)} items stored."
+    @intent_handler("found_it")
+    def _intent_found_it(self, intent_result: dict, raw_text: str,
+                         device_id: str, state: ConversationState) -> str:
+        import random
+        last_item = self._last_missing_item.pop(device_id, None)
+        phrases = [
+            "See? It was right where I said!",
+            "Good! Now put it back when you're done.",
+            "Told you! Moms always know.",
+            "Great! Was it in the last place you looked?",
+        ]
+        resp = random.choice(phrases)
+        if last_item:
+            resp += f" Where was the {last_item}?"
+        self._last_response[device_id] = resp
+        return resp
+
+    @intent_handler("play_blessing", blocking=True)
+    def _intent_play_blessing(self, intent_result: dict, raw_text: str,
+                              device_id: str, state: ConversationState) -> str:
+        import random, os
+        tid = state.tenant_id
+        speaker_filter = intent_result.get("speaker")
+        category_filter = intent_result.get("category")
+
+        # Check for recorded blessings first
+        recordings = self.db.get_prayer_recordings(tid)
+
+        if recordings:
+            # Filter by speaker if specified
+            if speaker_filter:
+                speaker_lower = speaker_filter.lower()
+                filtered = [r for r in recordings if speaker_lower in (r.get("speaker_name") or "").lower()]
+                if filtered:
+                    recordings = filtered
+
+            # Filter by category if specified
+            if category_filter:
+                filtered = [r for r in recordings if r.get("category") == category_filter]
+                if filtered:
+                    recordings = filtered
+
+            # Pick one
+            rec = random.choice(recordings)
+            audio_file = rec.get("audio_filename")
+            if audio_file:
+                speaker = rec.get("speaker_name", "")
+                category = rec.get("category", "blessing")
+                self.db.update_prayer_recording_played(rec["id"])
+                intro = f"{speaker}'s {category} blessing." if speaker else f"A {category} blessing."
+                self._last_response[device_id] = intro
+                return f"__PLAY_PRAYER__{audio_file}__INTRO__{intro}"
+
+        # No recordings found — fall back to AI-generated blessing
+        if self.prayer:
+            theme = category_filter or "gratitude"
+            resp = self.prayer.get_prayer(
+                theme, tenant_id=state.tenant_id, pray_for=speaker_filter)
             self._last_response[device_id] = resp
             return resp
+        return "Let us bow our heads. Lord, bless this moment and all who are gathered. Fill our hearts with gratitude and peace. Amen."
 
-        # ── Message board ──
+    @intent_handler("retrieve_location", blocking=True)
+    def _intent_retrieve_location(self, intent_result: dict, raw_text: str,
+                                  device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        location = intent_result.get("location")
+        if location:
+            results = self.db.find_by_location(location, tenant_id=tid)
+            if results:
+                items = [r["item"] for r in results]
+                if len(items) == 1:
+                    resp = f"On the {location}, you have your {items[0]}."
+                else:
+                    listed = ", ".join(items[:-1]) + f", and {items[-1]}"
+                    resp = f"On the {location}, you have {len(items)} things: {listed}."
+                self._last_response[device_id] = resp
+                return resp
+            return f"I don't have anything stored for {location}."
+        return "Which location?"
 
-        elif intent == "send_polly_message":
-            # Two-step: "send a message to Matt's Polly" → confirm name → ask for message → send
-            person = intent_result.get("person", "")
-            if person:
-                person_lower = person.lower().strip()
-                connected = self.db.get_connected_families(tid)
+    @intent_handler("delete", blocking=True)
+    def _intent_delete(self, intent_result: dict, raw_text: str,
+                       device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        item = intent_result.get("item")
+        if item:
+            if self.db.delete_item(item, tenant_id=tid):
+                return f"Forgot about the {item}."
+            return f"I don't have {item} stored."
+        return "What should I forget?"
+
+    @intent_handler("list_all", blocking=True)
+    def _intent_list_all(self, intent_result: dict, raw_text: str,
+                         device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        items = self.db.list_all(tenant_id=tid)
+        resp = f"You have {len(items)} items stored."
+        self._last_response[device_id] = resp
+        return resp
+
+    # ── Message board ──
+
+    @intent_handler("send_polly_message", blocking=True)
+    def _intent_send_polly_message(self, intent_result: dict, raw_text: str,
+                                   device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        # Two-step: "send a message to Matt's Polly" → confirm name → ask for message → send
+        person = intent_result.get("person", "")
+        if person:
+            person_lower = person.lower().strip()
+            connected = self.db.get_connected_families(tid)
+
+            # Build list of ALL matching connected friends
+            matches = []
+            for cf in connected:
+                cf_user = self.db.get_or_create_user(tenant_id=cf["connected_tenant_id"])
+                cf_name = (cf_user.get("name") or "").strip()
+                cf_lower = cf_name.lower()
+                cf_first = cf_lower.split()[0] if cf_lower else ""
+                person_first = person_lower.split()[0] if person_lower else ""
+
+                # Exact full name match
+                if person_lower == cf_lower:
+                    matches = [{"cf": cf, "full_name": cf_name}]
+                    break
+                # First name match
+                if person_first and cf_first and person_first == cf_first:
+                    matches.append({"cf": cf, "full_name": cf_name})
+
+            if len(matches) == 1:
+                m = matches[0]
+                state.pending_polly_target = {
+                    "tenant_id": m["cf"]["connected_tenant_id"],
+                    "name": m["cf"]["connected_tenant_name"],
+                    "person": m["full_name"],
+                }
+                state.mode = ConversationMode.AWAITING_POLLY_MESSAGE
+                resp = f"What would you like to say to {m['full_name']}?"
+                self._last_response[device_id] = resp
+                return resp
+            elif len(matches) > 1:
+                names = ", ".join(m["full_name"] for m in matches[:-1]) + f", or {matches[-1]['full_name']}"
+                resp = f"Which {person.split()[0].title()} — {names}?"
+                self._last_response[device_id] = resp
+                # Store all matches so we can resolve on next response
+                state.pending_polly_target = {"matches": matches}
+                state.mode = ConversationMode.AWAITING_POLLY_MESSAGE
+                return resp
+            return f"I don't see {person} as a connected Polly friend. You can connect them on the family tree."
+        return "Who would you like to send a message to?"
 
-                # Build list of ALL matching connected friends
-                matches = []
+    @intent_handler("leave_message", blocking=True)
+    def _intent_leave_message(self, intent_result: dict, raw_text: str,
+                              device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        person = intent_result.get("person", "")
+        message = intent_result.get("message", "")
+        if person and message:
+            # Transform pronouns so message reads naturally to the recipient
+            # "tell Glen he is awesome" → "you are awesome"
+            # "tell my wife I love her" → "I love you"
+            import re as _re
+            msg = message
+            # he/she → you (subject)
+            msg = _re.sub(r'\bhe is\b', 'you are', msg, flags=_re.IGNORECASE)
+            msg = _re.sub(r'\bshe is\b', 'you are', msg, flags=_re.IGNORECASE)
+            msg = _re.sub(r'\bhe\b', 'you', msg, flags=_re.IGNORECASE)
+            msg = _re.sub(r'\bshe\b', 'you', msg, flags=_re.IGNORECASE)
+            # him/her → you (object) — careful not to replace "her" in "here"
+            msg = _re.sub(r'\bhim\b', 'you', msg, flags=_re.IGNORECASE)
+            msg = _re.sub(r'\bher\b(?!\w)', 'you', msg, flags=_re.IGNORECASE)
+            # his/her → your (possessive)
+            msg = _re.sub(r'\bhis\b', 'your', msg, flags=_re.IGNORECASE)
+            message = msg
+            speaker = state.speaker_name or self.db.get_owner_name(tenant_id=tid) or "someone"
+            person_lower = person.lower().strip()
+            has_last_name = len(person_lower.split()) >= 2
+
+            # Cross-tenant ONLY on full name (first + last) match
+            if has_last_name:
+                connected = self.db.get_connected_families(tid)
                 for cf in connected:
                     cf_user = self.db.get_or_create_user(tenant_id=cf["connected_tenant_id"])
                     cf_name = (cf_user.get("name") or "").strip()
-                    cf_lower = cf_name.lower()
-                    cf_first = cf_lower.split()[0] if cf_lower else ""
-                    person_first = person_lower.split()[0] if person_lower else ""
-
-                    # Exact full name match
-                    if person_lower == cf_lower:
-                        matches = [{"cf": cf, "full_name": cf_name}]
-                        break
-                    # First name match
-                    if person_first and cf_first and person_first == cf_first:
-                        matches.append({"cf": cf, "full_name": cf_name})
+                    if person_lower == cf_name.lower():
+                        # Exact full name match → send cross-tenant
+                        my_tenant = self.db.get_tenant(tid)
+                        from_label = my_tenant["name"] if my_tenant else speaker
+                        self.db.save_message(from_name=from_label, message=message,
+                                            tenant_id=cf["connected_tenant_id"])
+                        resp = f"Sent to {cf_name}'s Polly: {message}."
+                        self._last_response[device_id] = resp
+                        return resp
+
+            # First name only OR no cross-tenant match → local family board
+            self.db.save_message(from_name=speaker, to_name=person, message=message, tenant_id=tid)
+            resp = f"Got it. I'll let {person} know: {message}."
+            self._last_response[device_id] = resp
+            return resp
+        return "I didn't catch the message. Try saying: tell dad I'm going to the store."
 
-                if len(matches) == 1:
-                    m = matches[0]
-                    state.pending_polly_target = {
-                        "tenant_id": m["cf"]["connected_tenant_id"],
-                        "name": m["cf"]["connected_tenant_name"],
-                        "person": m["full_name"],
-                    }
-                    state.mode = ConversationMode.AWAITING_POLLY_MESSAGE
-                    resp = f"What would you like to say to {m['full_name']}?"
-                    self._last_response[device_id] = resp
-                    return resp
-                elif len(matches) > 1:
-                    names = ", ".join(m["full_name"] for m in matches[:-1]) + f", or {matches[-1]['full_name']}"
-                    resp = f"Which {person.split()[0].title()} — {names}?"
-                    self._last_response[device_id] = resp
-                    # Store all matches so we can resolve on next response
-                    state.pending_polly_target = {"matches": matches}
-                    state.mode = ConversationMode.AWAITING_POLLY_MESSAGE
-                    return resp
-                return f"I don't see {person} as a connected Polly friend. You can connect them on the family tree."
-            return "Who would you like to send a message to?"
-
-        elif intent == "leave_message":
-            person = intent_result.get("person", "")
-            message = intent_result.get("message", "")
-            if person and message:
-                # Transform pronouns so message reads naturally to the recipient
-                # "tell Glen he is awesome" → "you are awesome"
-                # "tell my wife I love her" → "I love you"
-                import re as _re
-                msg = message
-                # he/she → you (subject)
-                msg = _re.sub(r'\bhe is\b', 'you are', msg, flags=_re.IGNORECASE)
-                msg = _re.sub(r'\bshe is\b', 'you are', msg, flags=_re.IGNORECASE)
-                msg = _re.sub(r'\bhe\b', 'you', msg, flags=_re.IGNORECASE)
-                msg = _re.sub(r'\bshe\b', 'you', msg, flags=_re.IGNORECASE)
-                # him/her → you (object) — careful not to replace "her" in "here"
-                msg = _re.sub(r'\bhim\b', 'you', msg, flags=_re.IGNORECASE)
-                msg = _re.sub(r'\bher\b(?!\w)', 'you', msg, flags=_re.IGNORECASE)
-                # his/her → your (possessive)
-                msg = _re.sub(r'\bhis\b', 'your', msg, flags=_re.IGNORECASE)
-                message = msg
-                speaker = state.speaker_name or self.db.get_owner_name(tenant_id=tid) or "someone"
-                person_lower = person.lower().strip()
-                has_last_name = len(person_lower.split()) >= 2
-
-                # Cross-tenant ONLY on full name (first + last) match
-                if has_last_name:
-                    connected = self.db.get_connected_families(tid)
-                    for cf in connected:
-                        cf_user = self.db.get_or_create_user(tenant_id=cf["connected_tenant_id"])
-                        cf_name = (cf_user.get("name") or "").strip()
-                        if person_lower == cf_name.lower():
-                            # Exact full name match → send cross-tenant
-                            my_tenant = self.db.get_tenant(tid)
-                            from_label = my_tenant["name"] if my_tenant else speaker
-                            self.db.save_message(from_name=from_label, message=message,
-                                                tenant_id=cf["connected_tenant_id"])
-                            resp = f"Sent to {cf_name}'s Polly: {message}."
-                            self._last_response[device_id] = resp
-                            return resp
-
-                # First name only OR no cross-tenant match → local family board
-                self.db.save_message(from_name=speaker, to_name=person, message=message, tenant_id=tid)
-                resp = f"Got it. I'll let {person} know: {message}."
+    @intent_handler("where_is_person", blocking=True)
+    def _intent_where_is_person(self, intent_result: dict, raw_text: str,
+                                device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        person = intent_result.get("person", "")
+        if person:
+            status = self.db.get_person_status(person, tenant_id=tid)
+            if status:
+                created = datetime.strptime(status["created_at"], "%Y-%m-%d %H:%M:%S")
+                now = datetime.utcnow()
+                diff = now - created
+                minutes = int(diff.total_seconds() / 60)
+                if minutes < 2:
+                    ago = "just a moment ago"
+                elif minutes < 60:
+                    ago = f"about {minutes} minutes ago"
+                else:
+                    hours = minutes // 60
+                    ago = f"about {hours} hour{'s' if hours > 1 else ''} ago"
+                name = status['from_name'].title()
+                msg = self._natural_status(status['message'])
+                resp = f"Last I heard, {name} is {msg}. That was {ago}."
                 self._last_response[device_id] = resp
                 return resp
-            return "I didn't catch the message. Try saying: tell dad I'm going to the store."
-
-        elif intent == "where_is_person":
-            person = intent_result.get("person", "")
-            if person:
-                status = self.db.get_person_status(person, tenant_id=tid)
-                if status:
-                    created = datetime.strptime(status["created_at"], "%Y-%m-%d %H:%M:%S")
-                    now = datetime.utcnow()
-                    diff = now - created
-                    minutes = int(diff.total_seconds() / 60)
-                    if minutes < 2:
-                        ago = "just a moment ago"
-                    elif minutes < 60:
-                        ago = f"about {minutes} minutes ago"
-                    else:
-                        hours = minutes // 60
-                        ago = f"about {hours} hour{'s' if hours > 1 else ''} ago"
-                    name = status['from_name'].title()
-                    msg = self._natural_status(status['message'])
-                    resp = f"Last I heard, {name} is {msg}. That was {ago}."
-                    self._last_response[device_id] = resp
-                    return resp
-                return f"I don't have any updates on {person} right now."
-            return "Who are you looking for?"
-
-        elif intent == "status_update":
-            person = intent_result.get("person")
-            status_text = intent_result.get("status", "")
-            if person:
-                # Someone is reporting another person's status
+            return f"I don't have any updates on {person} right now."
+        return "Who are you looking for?"
+
+    @intent_handler("status_update", blocking=True)
+    def _intent_status_update(self, intent_result: dict, raw_text: str,
+                              device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        person = intent_result.get("person")
+        status_text = intent_result.get("status", "")
+        if person:
+            # Someone is reporting another person's status
+            self.db.save_message(
+                from_name=person, message=status_text, tenant_id=tid
+            )
+            name = person.title()
+            msg = self._natural_status(status_text)
+            resp = f"Got it. {name} is {msg}. I'll post that to the board."
+            self._last_response[device_id] = resp
+            return resp
+        else:
+            # Speaker is updating their own status — need their name
+            speaker = state.speaker_name
+            if speaker:
                 self.db.save_message(
-                    from_name=person, message=status_text, tenant_id=tid
+                    from_name=speaker, message=status_text, tenant_id=tid
                 )
-                name = person.title()
                 msg = self._natural_status(status_text)
-                resp = f"Got it. {name} is {msg}. I'll post that to the board."
+                resp = f"Got it, {speaker}. I'll post to the board that you're {msg}."
                 self._last_response[device_id] = resp
                 return resp
-            else:
-                # Speaker is updating their own status — need their name
-                speaker = state.speaker_name
-                if speaker:
-                    self.db.save_message(
-                        from_name=speaker, message=status_text, tenant_id=tid
-                    )
-                    msg = self._natural_status(status_text)
-                    resp = f"Got it, {speaker}. I'll post to the board that you're {msg}."
-                    self._last_response[device_id] = resp
-                    return resp
-                # Don't know who's speaking — ask
-                state.pending_status = status_text
-                state.mode = ConversationMode.AWAITING_NAME
-                return "Sure, I can post that to the message board. Who is this?"
-
-        elif intent == "check_messages":
-            messages = self.db.get_messages_for(tenant_id=tid, device_id=device_id)
-            if messages:
-                # Mark all as read
-                msg_ids = [m["id"] for m in messages]
-                conn = self.db._get_connection()
-                try:
-                    placeholders = ",".join("?" * len(msg_ids))
-                    conn.execute(f"UPDATE family_messages SET read = 1 WHERE id IN ({placeholders})", msg_ids)
-                    conn.commit()
-                finally:
-                    if not self.db._conn:
-                        conn.close()
-
-                # Check if the first message is a voice message — play the audio
-                first_voice = None
-                for m in messages:
-                    if m.get("audio_filename"):
-                        first_voice = m
-                        break
+            # Don't know who's speaking — ask
+            state.pending_status = status_text
+            state.mode = ConversationMode.AWAITING_NAME
+            return "Sure, I can post that to the message board. Who is this?"
+
+    @intent_handler("check_messages", blocking=True)
+    def _intent_check_messages(self, intent_result: dict, raw_text: str,
+                               device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        messages = self.db.get_messages_for(tenant_id=tid, device_id=device_id)
+        if messages:
+            # Mark all as read
+            msg_ids = [m["id"] for m in messages]
+            with self.db.connection() as conn:
+                placeholders = ",".join("?" * len(msg_ids))
+                conn.execute(f"UPDATE family_messages SET read = 1 WHERE id IN ({placeholders})", msg_ids)
+                conn.commit()
+
+            # Check if the first message is a voice message — play the audio
+            first_voice = None
+            for m in messages:
+                if m.get("audio_filename"):
+                    first_voice = m
+                    break
+
+            if first_voice:
+                name = first_voice['from_name'].title() if first_voice['from_name'] else "Someone"
+                intro = f"Voice message from {name}."
+                self._last_response[device_id] = intro
+                return f"__PLAY_PRAYER__{first_voice['audio_filename']}__INTRO__{intro}"
+
+            # Text messages
+            parts = []
+            for m in messages[:5]:
+                name = m['from_name'].title() if m['from_name'] and m['from_name'] != 'someone' else None
+                if m["to_name"]:
+                    if name:
+                        parts.append(f"{name} says to {m['to_name'].title()}: {m['message']}")
+                    else:
+                        parts.append(f"Message for {m['to_name'].title()}: {m['message']}")
+                else:
+                    if name:
+                        msg = self._natural_status(m['message'])
+                        parts.append(f"{name} is {msg}")
+                    else:
+                        parts.append(m['message'])
+            resp = f"You have {len(messages)} message{'s' if len(messages) > 1 else ''} on the board. " + ". ".join(parts) + "."
+            self._last_response[device_id] = resp
+            return resp
+        return "The message board is clear. No messages right now."
 
-                if first_voice:
-                    name = first_voice['from_name'].title() if first_voice['from_name'] else "Someone"
-                    intro = f"Voice message from {name}."
-                    self._last_response[device_id] = intro
-                    return f"__PLAY_PRAYER__{first_voice['audio_filename']}__INTRO__{intro}"
+    @intent_handler("clear_messages", blocking=True)
+    def _intent_clear_messages(self, intent_result: dict, raw_text: str,
+                               device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        messages = self.db.get_messages_for(tenant_id=tid, device_id=device_id)
+        if messages:
+            with self.db.connection() as conn:
+                msg_ids = [m["id"] for m in messages]
+                placeholders = ",".join("?" * len(msg_ids))
+                conn.execute(
+                    f"DELETE FROM family_messages WHERE id IN ({placeholders})",
+                    msg_ids
+                )
+                conn.commit()
+            return f"Done. I cleared {len(messages)} message{'s' if len(messages) > 1 else ''} from the board."
+        return "The board is already clear."
 
-                # Text messages
-                parts = []
-                for m in messages[:5]:
-                    name = m['from_name'].title() if m['from_name'] and m['from_name'] != 'someone' else None
-                    if m["to_name"]:
-                        if name:
-                            parts.append(f"{name} says to {m['to_name'].title()}: {m['message']}")
-                        else:
-                            parts.append(f"Message for {m['to_name'].title()}: {m['message']}")
-                    else:
-                        if name:
-                            msg = self._natural_status(m['message'])
-                            parts.append(f"{name} is {msg}")
-                        else:
-                            parts.append(m['message'])
-                resp = f"You have {len(messages)} message{'s' if len(messages) > 1 else ''} on the board. " + ". ".join(parts) + "."
-                self._last_response[device_id] = resp
-                return resp
-            return "The message board is clear. No messages right now."
-
-        elif intent == "clear_messages":
-            messages = self.db.get_messages_for(tenant_id=tid, device_id=device_id)
-            if messages:
-                conn = self.db._get_connection()
-                try:
-                    msg_ids = [m["id"] for m in messages]
-                    placeholders = ",".join("?" * len(msg_ids))
-                    conn.execute(
-                        f"DELETE FROM family_messages WHERE id IN ({placeholders})",
-                        msg_ids
-                    )
-                    conn.commit()
-                finally:
-                    if not self.db._conn:
-                        conn.close()
-                return f"Done. I cleared {len(messages)} message{'s' if len(messages) > 1 else ''} from the board."
-            return "The board is already clear."
-
-        elif intent == "person_home":
-            person = intent_result.get("person", "")
-            if person:
-                self.db.clear_person_messages(person, tenant_id=tid)
-                name = person.title()
-                resp = f"Welcome back, {name}! I've cleared their messages from the board."
-                self._last_response[device_id] = resp
-                return resp
-            return "Who's home?"
+    @intent_handler("person_home", blocking=True)
+    def _intent_person_home(self, intent_result: dict, raw_text: str,
+                            device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        person = intent_result.get("person", "")
+        if person:
+            self.db.clear_person_messages(person, tenant_id=tid)
+            name = person.title()
+            resp = f"Welcome back, {name}! I've cleared their messages from the board."
+            self._last_response[device_id] = resp
+            return resp
+        return "Who's home?"
 
-        # ── Jokes & questions ──
+    # ── Jokes & questions ──
 
-        elif intent == "tell_joke":
-            # In kid mode, only serve kid jokes (check per-device first)
-            _ds = self.db.get_device_settings(device_id, tid) if device_id else {}
-            _kid = _ds.get("kid_mode") if _ds else self.db.get_or_create_user(tenant_id=tid).get("kid_mode")
-            if _kid:
-                joke = self.data.get_kid_joke()
-            else:
-                joke = self.data.get_joke()
-            if joke:
-                resp = f"<speak>{joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
-                self._last_response[device_id] = f"{joke['setup']} ... {joke['punchline']}"
-                return resp
-            return "I'm fresh out of jokes right now!"
-
-        elif intent == "tell_naughty_joke":
-            # Check kid mode (per-device first)
-            _ds = self.db.get_device_settings(device_id, tid) if device_id else {}
-            _kid = _ds.get("kid_mode") if _ds else self.db.get_or_create_user(tenant_id=tid).get("kid_mode")
-            if _kid:
-                joke = self.data.get_kid_joke()
-                if joke:
-                    resp = f"<speak>How about a kid joke instead? {joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
-                    self._last_response[device_id] = f"{joke['setup']} ... {joke['punchline']}"
-                    return resp
-                return "Kid mode is on! No naughty jokes, but I'm out of kid jokes too!"
-            joke = self.data.get_naughty_joke()
-            if joke:
-                resp = f"<speak>{joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
-                self._last_response[device_id] = f"{joke['setup']} ... {joke['punchline']}"
-                return resp
-            return "I am fresh out of naughty jokes right now!"
+    @intent_handler("tell_joke", blocking=True)
+    def _intent_tell_joke(self, intent_result: dict, raw_text: str,
+                          device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        # In kid mode, only serve kid jokes (check per-device first)
+        _ds = self.db.get_device_settings(device_id, tid) if device_id else {}
+        _kid = _ds.get("kid_mode") if _ds else self.db.get_or_create_user(tenant_id=tid).get("kid_mode")
+        if _kid:
+            joke = self.data.get_kid_joke()
+        else:
+            joke = self.data.get_joke()
+        if joke:
+            resp = f"<speak>{joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
+            self._last_response[device_id] = f"{joke['setup']} ... {joke['punchline']}"
+            return resp
+        return "I'm fresh out of jokes right now!"
 
-        elif intent == "tell_kid_joke":
+    @intent_handler("tell_naughty_joke", blocking=True)
+    def _intent_tell_naughty_joke(self, intent_result: dict, raw_text: str,
+                                  device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        # Check kid mode (per-device first)
+        _ds = self.db.get_device_settings(device_id, tid) if device_id else {}
+        _kid = _ds.get("kid_mode") if _ds else self.db.get_or_create_user(tenant_id=tid).get("kid_mode")
+        if _kid:
             joke = self.data.get_kid_joke()
             if joke:
-                resp = f"<speak>{joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
+                resp = f"<speak>How about a kid joke instead? {joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
                 self._last_response[device_id] = f"{joke['setup']} ... {joke['punchline']}"
                 return resp
-            return "I don't have any kid jokes right now!"
+            return "Kid mode is on! No naughty jokes, but I'm out of kid jokes too!"
+        joke = self.data.get_naughty_joke()
+        if joke:
+            resp = f"<speak>{joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
+            self._last_response[device_id] = f"{joke['setup']} ... {joke['punchline']}"
+            return resp
+        return "I am fresh out of naughty jokes right now!"
+
+    @intent_handler("tell_kid_joke")
+    def _intent_tell_kid_joke(self, intent_result: dict, raw_text: str,
+                              device_id: str, state: ConversationState) -> str:
+        joke = self.data.get_kid_joke()
+        if joke:
+            resp = f"<speak>{joke['setup']}<break time=\"2s\"/>{joke['punchline']}</speak>"
+            self._last_response[device_id] = f"{joke['setup']} ... {joke['punchline']}"
+            return resp
+        return "I don't have any kid jokes right now!"
 
-        elif intent == "ask_question":
-            owner_age = self._get_owner_age(tid)
-            question = self.data.get_question(owner_age=owner_age)
-            if question:
-                resp = question["question"]
-                self._last_response[device_id] = resp
-                # Enter conversational mode so user can answer without wake word
-                state = self._get_state(device_id)
+    @intent_handler("ask_question", blocking=True)
+    def _intent_ask_question(self, intent_result: dict, raw_text: str,
+                             device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        owner_age = self._get_owner_age(tid)
+        question = self.data.get_question(owner_age=owner_age)
+        if question:
+            resp = question["question"]
+            self._last_response[device_id] = resp
+            # Enter conversational mode so user can answer without wake word
+            state.mode = ConversationMode.STORY_PROMPT
+            state.current_question = resp
+            state.story_parts = []
+            state.followup_count = 0
+            return resp
+        return "I don't have any questions ready right now."
+
+    # ── Navigation ──
+
+    @intent_handler("repeat")
+    def _intent_repeat(self, intent_result: dict, raw_text: str,
+                       device_id: str, state: ConversationState) -> str:
+        last = self._last_response.get(device_id)
+        if last:
+            prefix = self.data.get_response("repeat_acknowledgment") or "Sure, here it is again."
+            # If we have a pending question, restore story mode so user can answer
+            if state.current_question:
                 state.mode = ConversationMode.STORY_PROMPT
-                state.current_question = resp
                 state.story_parts = []
                 state.followup_count = 0
-                return resp
-            return "I don't have any questions ready right now."
-
-        # ── Navigation ──
-
-        elif intent == "repeat":
-            last = self._last_response.get(device_id)
-            if last:
-                prefix = self.data.get_response("repeat_acknowledgment") or "Sure, here it is again."
-                # If we have a pending question, restore story mode so user can answer
-                state = self._get_state(device_id)
-                if state.current_question:
-                    state.mode = ConversationMode.STORY_PROMPT
-                    state.story_parts = []
-                    state.followup_count = 0
-                return f"{prefix} {last}"
-            return "I don't have anything to repeat."
-
-        elif intent == "slower":
-            return self.data.get_response("slower_acknowledgment") or "I'll slow down for you."
-
-        elif intent == "skip":
-            return self.data.get_response("skip_acknowledgment") or "No problem, let's move on."
-
-        elif intent == "stop":
-            return self.data.get_response("goodbye") or "Okay, take care."
-
-        elif intent == "tell_time":
-            now = datetime.now(ZoneInfo("America/Chicago"))
-            hour = now.strftime("%I").lstrip("0")
-            minute = now.strftime("%M")
-            ampm = "AY M" if now.strftime("%p") == "AM" else "P M"
-            if minute == "00":
-                resp = f"It's {hour} o'clock {ampm}."
-            else:
-                resp = f"It's {hour} {minute} {ampm}."
-            self._last_response[device_id] = resp
-            return resp
-
-        elif intent == "tell_date":
-            now = datetime.now(ZoneInfo("America/Chicago"))
-            resp = f"Today is {now.strftime('%A, %B')} {now.day}, {now.year}."
+            return f"{prefix} {last}"
+        return "I don't have anything to repeat."
+
+    @intent_handler("slower")
+    def _intent_slower(self, intent_result: dict, raw_text: str,
+                       device_id: str, state: ConversationState) -> str:
+        return self.data.get_response("slower_acknowledgment") or "I'll slow down for you."
+
+    @intent_handler("skip")
+    def _intent_skip(self, intent_result: dict, raw_text: str,
+                     device_id: str, state: ConversationState) -> str:
+        return self.data.get_response("skip_acknowledgment") or "No problem, let's move on."
+
+    @intent_handler("stop")
+    def _intent_stop(self, intent_result: dict, raw_text: str,
+                     device_id: str, state: ConversationState) -> str:
+        return self.data.get_response("goodbye") or "Okay, take care."
+
+    @intent_handler("tell_time")
+    def _intent_tell_time(self, intent_result: dict, raw_text: str,
+                          device_id: str, state: ConversationState) -> str:
+        now = datetime.now(ZoneInfo("America/Chicago"))
+        hour = now.strftime("%I").lstrip("0")
+        minute = now.strftime("%M")
+        ampm = "AY M" if now.strftime("%p") == "AM" else "P M"
+        if minute == "00":
+            resp = f"It's {hour} o'clock {ampm}."
+        else:
+            resp = f"It's {hour} {minute} {ampm}."
+        self._last_response[device_id] = resp
+        return resp
+
+    @intent_handler("tell_date")
+    def _intent_tell_date(self, intent_result: dict, raw_text: str,
+                          device_id: str, state: ConversationState) -> str:
+        now = datetime.now(ZoneInfo("America/Chicago"))
+        resp = f"Today is {now.strftime('%A, %B')} {now.day}, {now.year}."
+        self._last_response[device_id] = resp
+        return resp
+
+    @intent_handler("thank_you")
+    def _intent_thank_you(self, intent_result: dict, raw_text: str,
+                          device_id: str, state: ConversationState) -> str:
+        import random
+        responses = [
+            "You're welcome!",
+            "Happy to help!",
+            "Anytime!",
+            "Of course! That's what I'm here for.",
+            "You're very welcome!",
+            "My pleasure!",
+        ]
+        resp = random.choice(responses)
+        self._last_response[device_id] = resp
+        return resp
+
+    @intent_handler("who_is", blocking=True)
+    def _intent_who_is(self, intent_result: dict, raw_text: str,
+                       device_id: str, state: ConversationState) -> str:
+        name = intent_result.get("name", "")
+        return self._handle_who_is(name, device_id)
+
+    @intent_handler("greeting")
+    def _intent_greeting(self, intent_result: dict, raw_text: str,
+                         device_id: str, state: ConversationState) -> str:
+        resp = self.data.get_response("greeting") or "Hello! How are you today?"
+        self._last_response[device_id] = resp
+        return resp
+
+    @intent_handler("goodbye")
+    def _intent_goodbye(self, intent_result: dict, raw_text: str,
+                        device_id: str, state: ConversationState) -> str:
+        return self.data.get_response("goodbye") or "Goodbye, take care."
+
+    # ── Bible verses ──
+
+    @intent_handler("bible_verse", blocking=True)
+    def _intent_bible_verse(self, intent_result: dict, raw_text: str,
+                            device_id: str, state: ConversationState) -> str:
+        if self.bible:
+            topic = intent_result.get("topic")
+            resp = self.bible.get_verse(topic)
             self._last_response[device_id] = resp
             return resp
-
-        elif intent == "thank_you":
-            import random
-            responses = [
-                "You're welcome!",
-                "Happy to help!",
-                "Anytime!",
-                "Of course! That's what I'm here for.",
-                "You're very welcome!",
-                "My pleasure!",
-            ]
-            resp = random.choice(responses)
+        return "Bible verses are coming soon. Stay tuned!"
+
+    # ── Prayer ──
+
+    @intent_handler("prayer", blocking=True)
+    def _intent_prayer(self, intent_result: dict, raw_text: str,
+                       device_id: str, state: ConversationState) -> str:
+        theme = intent_result.get("theme")
+        pray_for = intent_result.get("pray_for")
+
+        # Check if user wants a recorded prayer (grace, bedtime, etc.)
+        text_lower = raw_text.lower()
+        play_recorded = any(p in text_lower for p in [
+            "play grace", "say grace", "play the grace",
+            "play bedtime prayer", "bedtime prayer", "bedtime blessing",
+            "play morning", "morning blessing", "morning prayer",
+            "play the prayer", "play a blessing", "play the blessing",
+            "family grace", "family blessing", "family prayer",
+            "play grandpa", "play grandma", "play papa", "play nana",
+        ])
+
+        if play_recorded:
+            # Try to find a matching recorded prayer
+            category = None
+            if "grace" in text_lower:
+                category = "grace"
+            elif "bedtime" in text_lower:
+                category = "bedtime"
+            elif "morning" in text_lower:
+                category = "morning"
+            elif "holiday" in text_lower:
+                category = "holiday"
+            elif "blessing" in text_lower:
+                category = "blessing"
+
+        # AI-generated prayer (recorded blessings only play via "play_blessing" intent)
+        if self.prayer:
+            resp = self.prayer.get_prayer(
+                theme, tenant_id=state.tenant_id, pray_for=pray_for)
             self._last_response[device_id] = resp
             return resp
+        return "Let us bow our heads. Dear Lord, be with us today. Give us strength, give us peace, and remind us that we are loved. Amen."
 
-        elif intent == "who_is":
-            name = intent_result.get("name", "")
-            return await self._handle_who_is(name, device_id)
+    # ── Nostalgia ──
 
-        elif intent == "greeting":
-            resp = self.data.get_response("greeting") or "Hello! How are you today?"
+    @intent_handler("nostalgia", blocking=True)
+    def _intent_nostalgia(self, intent_result: dict, raw_text: str,
+                          device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        snippet = self.db.get_next_nostalgia_snippet(tid)
+        if snippet:
+            self.db.mark_nostalgia_used(snippet["id"])
+            resp = snippet["text"]
             self._last_response[device_id] = resp
             return resp
+        return "I don't have any nostalgia stories set up yet. Ask your family to add your hometown and birth year in the settings page, and I'll have some wonderful memories to share!"
 
-        elif intent == "goodbye":
-            return self.data.get_response("goodbye") or "Goodbye, take care."
-
-        # ── Bible verses ──
+    # ── Medications ──
 
-        elif intent == "bible_verse":
-            if self.bible:
-                topic = intent_result.get("topic")
-                resp = self.bible.get_verse(topic)
-                self._last_response[device_id] = resp
-                return resp
-            return "Bible verses are coming soon. Stay tuned!"
-
-        # ── Prayer ──
-
-        elif intent == "prayer":
-            state = self._get_state(device_id)
-            theme = intent_result.get("theme")
-            pray_for = intent_result.get("pray_for")
-
-            # Check if user wants a recorded prayer (grace, bedtime, etc.)
-            text_lower = raw_text.lower()
-            play_recorded = any(p in text_lower for p in [
-                "play grace", "say grace", "play the grace",
-                "play bedtime prayer", "bedtime prayer", "bedtime blessing",
-                "play morning", "morning blessing", "morning prayer",
-                "play the prayer", "play a blessing", "play the blessing",
-                "family grace", "family blessing", "family prayer",
-                "play grandpa", "play grandma", "play papa", "play nana",
-            ])
-
-            if play_recorded:
-                # Try to find a matching recorded prayer
-                category = None
-                if "grace" in text_lower:
-                    category = "grace"
-                elif "bedtime" in text_lower:
-                    category = "bedtime"
-                elif "morning" in text_lower:
-                    category = "morning"
-                elif "holiday" in text_lower:
-                    category = "holiday"
-                elif "blessing" in text_lower:
-                    category = "blessing"
-
-            # AI-generated prayer (recorded blessings only play via "play_blessing" intent)
-            if self.prayer:
-                resp = self.prayer.get_prayer(
-                    theme, tenant_id=state.tenant_id, pray_for=pray_for)
-                self._last_response[device_id] = resp
-                return resp
-            return "Let us bow our heads. Dear Lord, be with us today. Give us strength, give us peace, and remind us that we are loved. Amen."
-
-        # ── Nostalgia ──
-
-        elif intent == "nostalgia":
-            snippet = self.db.get_next_nostalgia_snippet(tid)
-            if snippet:
-                self.db.mark_nostalgia_used(snippet["id"])
-                resp = snippet["text"]
-                self._last_response[device_id] = resp
-                return resp
-            return "I don't have any nostalgia stories set up yet. Ask your family to add your hometown and birth year in the settings page, and I'll have some wonderful memories to share!"
-
-        # ── Medications ──
-
-        elif intent == "medication":
-            if self.meds:
-                parsed = self.meds.parse_medication_command(raw_text)
-                if parsed:
-                    if parsed["action"] == "add":
-                        import json
-                        user = self.db.get_or_create_user(tenant_id=tid)
-                        self.db.add_medication(
-                            user["id"], parsed["name"], "",
-                            json.dumps(parsed["times"]), tenant_id=tid
-                        )
-                        times_str = " and ".join(parsed["times"])
-                        return f"Got it. I'll remind you to take {parsed['name']} at {times_str}."
-                    elif parsed["action"] == "list":
-                        meds = self.db.get_medications(tenant_id=tid)
-                        if meds:
-                            names = [m["name"] for m in meds]
-                            return f"Your medications: {', '.join(names)}."
-                        return "You don't have any medication reminders set up yet."
-                    elif parsed["action"] == "confirm_taken":
-                        return "Great, I've noted that you took your medication."
-            return "Medication reminders are coming soon."
-
-        # ── Weather ──
-
-        elif intent == "weather":
-            if self.weather:
-                client_ip = state.client_ip
-                # Check for user-configured location
-                location_override = None
-                user = self.db.get_or_create_user(tenant_id=state.tenant_id)
-                if user and user.get("location_lat") and user.get("location_lon"):
-                    location_override = (
-                        user["location_lat"],
-                        user["location_lon"],
-                        user.get("location_city") or "your area",
+    @intent_handler("medication", blocking=True)
+    def _intent_medication(self, intent_result: dict, raw_text: str,
+                           device_id: str, state: ConversationState) -> str:
+        tid = state.tenant_id
+        if self.meds:
+            parsed = self.meds.parse_medication_command(raw_text)
+            if parsed:
+                if parsed["action"] == "add":
+                    import json
+                    user = self.db.get_or_create_user(tenant_id=tid)
+                    med_id = self.db.add_medication(
+                        user["id"], parsed["name"], "",
+                        json.dumps(parsed["times"]), tenant_id=tid
                     )
-                resp = self.weather.get_weather(
-                    client_ip=client_ip,
-                    location_override=location_override,
+                    self.meds.refresh_medication(med_id)
+                    times_str = " and ".join(parsed["times"])
+                    return f"Got it. I'll remind you to take {parsed['name']} at {times_str}."
+                elif parsed["action"] == "list":
+                    meds = self.db.get_medications(tenant_id=tid)
+                    if meds:
+                        names = [m["name"] for m in meds]
+                        return f"Your medications: {', '.join(names)}."
+                    return "You don't have any medication reminders set up yet."
+                elif parsed["action"] == "confirm_taken":
+                    return "Great, I've noted that you took your medication."
+        return "Medication reminders are coming soon."
+
+    # ── Weather ──
+
+    @intent_handler("weather", blocking=True)
+    def _intent_weather(self, intent_result: dict, raw_text: str,
+                        device_id: str, state: ConversationState) -> str:
+        if self.weather:
+            client_ip = state.client_ip
+            # Check for user-configured location
+            location_override = None
+            user = self.db.get_or_create_user(tenant_id=state.tenant_id)
+            if user and user.get("location_lat") and user.get("location_lon"):
+                location_override = (
+                    user["location_lat"],
+                    user["location_lon"],
+                    user.get("location_city") or "your area",
                 )
-                self._last_response[device_id] = resp
-                return resp
-            return "Weather forecasts are coming soon."
-
-        # ── Help & fallback ──
+            resp = self.weather.get_weather(
+                client_ip=client_ip,
+                location_override=location_override,
+            )
+            self._last_response[device_id] = resp
+            return resp
+        return "Weather forecasts are coming soon."
 
-        elif intent == "help":
-            resp = self.data.get_response("confused_help")
-            if resp:
-                self._last_response[device_id] = resp
-                return resp
-            return ("I can remember where things are, tell jokes, and ask you questions "
-                    "about your life. Just say 'tell me a joke' or 'where are my keys'.")
+    # ── Help & fallback ──
 
-        # ── Family storytelling ──
+    @intent_handler("help")
+    def _intent_help(self, intent_result: dict, raw_text: str,
+                     device_id: str, state: ConversationState) -> str:
+        resp = self.data.get_response("confused_help")
+        if resp:
+            self._last_response[device_id] = resp
+            return resp
+        return ("I can remember where things are, tell jokes, and ask you questions "
+                "about your life. Just say 'tell me a joke' or 'where are my keys'.")
 
-        elif intent == "introduce_self":
-            return await self._handle_introduce(intent_result, device_id)
+    # ── Family storytelling ──
 
-        elif intent == "tell_story":
-            return await self._handle_tell_story(device_id)
+    @intent_handler("introduce_self", blocking=True)
+    def _intent_introduce_self(self, intent_result: dict, raw_text: str,
+                               device_id: str, state: ConversationState) -> str:
+        return self._handle_introduce(intent_result, device_id)
 
-        elif intent == "hear_stories":
-            return await self._handle_hear_stories(intent_result, device_id)
+    @intent_handler("tell_story")
+    async def _intent_tell_story(self, intent_result: dict, raw_text: str,
+                                 device_id: str, state: ConversationState) -> str:
+        return await self._handle_tell_story(device_id)
 
-        elif intent == "family_question":
-            return await self._handle_family_question(device_id)
+    @intent_handler("hear_stories", blocking=True)
+    def _intent_hear_stories(self, intent_result: dict, raw_text: str,
+                             device_id: str, state: ConversationState) -> str:
+        return self._handle_hear_stories(intent_result, device_id)
 
-        elif intent == "story_progress":
-            return await self._handle_story_progress(device_id)
+    @intent_handler("family_question")
+    async def _intent_family_question(self, intent_result: dict, raw_text: str,
+                                      device_id: str, state: ConversationState) -> str:
+        return await self._handle_family_question(device_id)
 
-        return "I didn't understand that. You can ask me to find things, tell a joke, or ask you a question."
+    @intent_handler("story_progress", blocking=True)
+    def _intent_story_progress(self, intent_result: dict, raw_text: str,
+                               device_id: str, state: ConversationState) -> str:
+        return self._handle_story_progress(device_id)
 
     # ── Family storytelling handlers ──
 
-    async def _handle_introduce(self, intent_result: dict, device_id: str) -> str:
+    def _handle_introduce(self, intent_result: dict, device_id: str) -> str:
         name = intent_result.get("name")
         relationship = intent_result.get("relationship")
         if not name:
@@ -740,7 +900,7 @@ class CommandProcessor:
             return f"Go ahead, {name}. I'm listening."
         return "Go ahead, I'm listening."
 
-    async def _handle_hear_stories(self, intent_result: dict, device_id: str = "unknown") -> str:
+    def _handle_hear_stories(self, intent_result: dict, device_id: str = "unknown") -> str:
         state = self._get_state(device_id)
         tid = state.tenant_id
         query = intent_result.get("query")
@@ -811,10 +971,7 @@ class CommandProcessor:
         # Build narrative from stories using OpenAI
         if self.followup_gen and self.followup_gen.available:
             try:
-                import asyncio
-                narrative, used_ids = await asyncio.to_thread(
-                    self._generate_story_narrative, stories, query, tid
-                )
+                narrative, used_ids = self._generate_story_narrative(stories, query, tid)
                 if narrative:
                     # Log which stories were used
                     if used_ids:
@@ -1025,7 +1182,7 @@ NARRATIVE:"""
         state.followup_count = 0
         return question_text
 
-    async def _handle_story_progress(self, device_id: str) -> str:
+    def _handle_story_progress(self, device_id: str) -> str:
         state = self._get_state(device_id)
         speaker = state.speaker_name
 
@@ -1072,22 +1229,18 @@ NARRATIVE:"""
         "brother in law": ["brother-in-law"], "sister in law": ["sister-in-law"],
     }
 
-    async def _handle_who_is(self, name: str, device_id: str) -> str:
+    def _handle_who_is(self, name: str, device_id: str) -> str:
         """Look up a person in the family tree by name or relationship."""
         state = self._get_state(device_id)
         tid = state.tenant_id
 
         # Search family_members table for matching name
-        conn = self.db._get_connection()
-        try:
+        with self.db.connection() as conn:
             conn.row_factory = __import__('sqlite3').Row
             rows = conn.execute(
                 "SELECT name, relation_to_owner FROM family_members WHERE LOWER(name) LIKE ? AND (tenant_id = ? OR tenant_id IS NULL)",
                 (f"%{name.lower()}%", tid)
             ).fetchall()
-        finally:
-            if not self.db._conn:
-                conn.close()
 
         if rows:
             member = rows[0]
@@ -1104,17 +1257,13 @@ NARRATIVE:"""
             # Also try the raw relationship value (e.g., "mother", "father")
             alias_relations = [name_lower]
 
-        conn = self.db._get_connection()
-        try:
+        with self.db.connection() as conn:
             conn.row_factory = __import__('sqlite3').Row
             placeholders = ",".join("?" for _ in alias_relations)
             rows = conn.execute(
                 f"SELECT name, relation_to_owner FROM family_members WHERE LOWER(relation_to_owner) IN ({placeholders}) AND (tenant_id = ? OR tenant_id IS NULL)",
                 (*alias_relations, tid)
             ).fetchall()
-        finally:
-            if not self.db._conn:
-                conn.close()
 
         if rows:
             if len(rows) == 1:
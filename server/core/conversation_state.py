@@ -103,6 +103,36 @@ class ConversationState:
                 return  # Keep conversational state — user may still be answering
         self.reset()
 
+    # Fields carried across a server restart (see core/state_snapshot.py)
+    _SNAPSHOT_FIELDS = (
+        "speaker_name", "current_question", "story_parts", "followup_count",
+        "max_followups", "current_bucket", "current_life_phase",
+        "critical_thinking_step", "pending_status", "pending_polly_target",
+        "tenant_id", "user_id", "client_ip", "voice_volume",
+    )
+
+    def to_dict(self) -> Dict:
+        """JSON-safe snapshot. mode_set_at is monotonic, so store it as wall time."""
+        data = {f: getattr(self, f) for f in self._SNAPSHOT_FIELDS}
+        data["mode"] = self._mode.value
+        data["mode_set_wall"] = time.time() - (time.monotonic() - self.mode_set_at)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ConversationState":
+        state = cls()
+        for f in cls._SNAPSHOT_FIELDS:
+            if f in data:
+                setattr(state, f, data[f])
+        try:
+            state._mode = ConversationMode(data.get("mode", ConversationMode.COMMAND.value))
+        except ValueError:
+            state._mode = ConversationMode.COMMAND
+        wall = data.get("mode_set_wall")
+        if wall is not None:
+            state.mode_set_at = time.monotonic() - max(0.0, time.time() - wall)
+        return state
+
     @property
     def silence_timeout(self) -> float:
         return SILENCE_TIMEOUTS.get(self.mode, 1.5)
@@ -8,10 +8,13 @@ import time
 
 logger = logging.getLogger(__name__)
 
-# Secret key for CSRF tokens — persistent across restarts
+# Secret key for CSRF tokens — persistent across restarts.
+# POLLY_CSRF_SECRET overrides the file (tests use a fixed one).
 import os
 _csrf_secret_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".csrf_secret")
-if os.path.exists(_csrf_secret_file):
+if os.getenv("POLLY_CSRF_SECRET"):
+    _csrf_secret = os.environ["POLLY_CSRF_SECRET"]
+elif os.path.exists(_csrf_secret_file):
     with open(_csrf_secret_file, "r") as f:
         _csrf_secret = f.read().strip()
 else:
@@ -2,32 +2,526 @@
 Database module for Polly Connect
 """
 
+import base64
 import hashlib
 import json
+import logging
 import sqlite3
 import re
 import secrets
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+# medication_logs statuses counted in the medication_daily rollup
+ROLLUP_STATUSES = ("reminded", "taken", "missed")
+
+
+def _local_day(when: datetime = None) -> str:
+    """Local (settings.TIMEZONE) calendar day for a UTC time, default now."""
+    from config import settings
+    tz = ZoneInfo(settings.TIMEZONE)
+    when = when or datetime.now(timezone.utc)
+    return when.astimezone(tz).strftime("%Y-%m-%d")
+
+
+def _parse_utc(value) -> Optional[datetime]:
+    """SQLite CURRENT_TIMESTAMP text ('YYYY-MM-DD HH:MM:SS', UTC) -> aware datetime."""
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value)).replace(tzinfo=timezone.utc)
+
+
+# Composite indexes for the tenant-scoped hot paths (name, table, columns).
+# Created by schema v2, after v1 has added tenant_id to older tables;
+# tests/test_query_plans.py fails if a hot query still scans.
+TENANT_INDEXES = (
+    ("idx_items_tenant_item", "items", "tenant_id, item_normalized"),
+    ("idx_items_tenant_updated", "items", "tenant_id, updated_at"),
+    ("idx_stories_tenant_created", "stories", "tenant_id, created_at"),
+    ("idx_stories_tenant_photo", "stories", "tenant_id, photo_id"),
+    ("idx_memories_tenant_created", "memories", "tenant_id, created_at"),
+    ("idx_memories_tenant_story", "memories", "tenant_id, story_id"),
+    ("idx_memories_tenant_source", "memories", "tenant_id, source, source_ref"),
+    ("idx_photos_tenant_created", "photos", "tenant_id, created_at"),
+    ("idx_medications_tenant_active", "medications", "tenant_id, active"),
+    ("idx_medication_logs_med_time", "medication_logs", "medication_id, created_at"),
+    ("idx_family_tenant_seen", "family_members", "tenant_id, last_seen"),
+    ("idx_story_tags_tenant_value", "story_tags", "tenant_id, tag_type, tag_value"),
+    ("idx_devices_tenant", "devices", "tenant_id, registered_at"),
+)
+
+# (created_at) indexes for the keyset-paged feeds not covered above
+FEED_INDEXES = (
+    ("idx_shared_wall_pair_created", "shared_wall_items", "from_tenant_id, to_tenant_id, created_at"),
+    ("idx_aviary_group_created", "aviary_posts", "group_id, created_at"),
+)
+
+# FTS5 indexes: fts table -> (content table, indexed columns). External-
+# content tables, kept in sync by triggers, ranked with bm25().
+FTS_TABLES = {
+    "items_fts": ("items", ("item", "location", "context")),
+    "stories_fts": ("stories", ("transcript", "corrected_transcript", "speaker_name")),
+    "memories_fts": ("memories", ("text_summary", "text")),
+}
+
+# Filler words dropped from full-text queries ("tell me about the farm")
+_FTS_STOPWORDS = {"the", "a", "an", "my", "our", "that", "this", "about", "of",
+                  "and", "to", "in", "on", "at", "is", "was", "me", "any"}
+
+
+def _fts_match(text: str, column: str = None) -> Optional[str]:
+    """Free text -> FTS5 MATCH expression: every word as a prefix term, ANDed.
+    Returns None when nothing searchable is left."""
+    words = [w for w in re.findall(r"\w+", (text or "").lower())
+             if w not in _FTS_STOPWORDS and (len(w) > 1 or w.isdigit())]
+    if not words:
+        return None
+    expr = " AND ".join(f'"{w}"*' for w in words)
+    return f"{column} : ({expr})" if column else expr
+
+
+# ── Keyset pagination ──
+# Feeds are paged on (created_at, id), newest first, with an opaque cursor
+# naming the last row served, so page N costs the same as page 1 (OFFSET
+# re-reads every skipped row). Each feed has a (.., created_at) index.
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    raw = f"{created_at}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    """(created_at, id) from a cursor; None for a missing or mangled one
+    (which just means "start from the newest")."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return created_at, int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(conn, query: str, params, cursor: Optional[str], limit: int,
+                alias: str = "") -> Tuple[List[Dict], Optional[str]]:
+    """One page of `query` (a SELECT ending in a WHERE clause) newest first.
+    conn must use sqlite3.Row. Returns (rows, cursor for the next page or
+    None on the last page)."""
+    col = f"{alias}." if alias else ""
+    params = list(params)
+    after = decode_cursor(cursor)
+    if after:
+        query += f" AND ({col}created_at, {col}id) < (?, ?)"
+        params += after
+    query += f" ORDER BY {col}created_at DESC, {col}id DESC LIMIT ?"
+    rows = [dict(r) for r in conn.execute(query, params + [limit + 1]).fetchall()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+
+# Numbered schema steps, recorded in PRAGMA user_version: (version,
+# description, PollyDB method). Append only, and never edit a step once it
+# has shipped: databases at or past its version will not run it again.
+MIGRATIONS = (
+    (1, "base schema and column migrations", "_migrate_base_schema"),
+    (2, "tenant-scoped composite indexes", "_migrate_tenant_indexes"),
+    (3, "FTS5 search tables", "_migrate_fts"),
+    (4, "feed pagination indexes", "_migrate_feed_indexes"),
+    (5, "admin dashboard rollups", "_migrate_admin_rollups"),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+# PollyDB used to open (and close) a fresh sqlite3 connection per method call.
+# ConnectionPool keeps a few long-lived connections per database file, each
+# configured once with the pragmas below. Prefer `with db.connection() as
+# conn:`; legacy `_get_connection() ... close()` call sites get a
+# PooledConnection whose close() returns the connection to the pool.
+
+# Applied once per connection. WAL readers don't block the writer, so
+# synchronous=NORMAL is durable across app crashes (only an OS crash can
+# lose the last commits). Negative cache_size is KiB. auto_vacuum only
+# takes effect on a new file (or the next VACUUM), so it goes first: it lets
+# the maintenance loop hand freed pages back to the OS.
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA temp_store=MEMORY",
+)
+
+DEFAULT_MAX_IDLE = 8
+BUSY_TIMEOUT_SECONDS = 10.0
+
+
+class ConnectionPool:
+    """Bounded LIFO pool of configured connections to one SQLite file.
+
+    Connections are created on demand (never blocks); at most `max_idle` are
+    kept for reuse. A connection is used by one thread at a time, so
+    check_same_thread is off to let the executor threads share them.
+    """
+
+    def __init__(self, db_path: str, max_idle: int = DEFAULT_MAX_IDLE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS,
+                               check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        self.created += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            self.in_use += 1
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self.in_use -= 1
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection: uncommitted work is rolled back (as close()
+        would have discarded it) and per-call state is reset."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error as e:
+            logger.warning(f"Dropping broken pooled connection: {e}")
+            self._discard(conn)
+            return
+        with self._lock:
+            self.in_use -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            self.in_use -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"idle": len(self._idle), "in_use": self.in_use,
+                    "created": self.created, "reused": self.reused}
+
+
+class PooledConnection:
+    """sqlite3.Connection stand-in for legacy call sites: close() hands the
+    connection back to the pool instead of closing the file."""
+
+    __slots__ = ("_pool", "_raw")
+
+    def __init__(self, pool: ConnectionPool, raw: sqlite3.Connection):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_raw", raw)
+
+    def __getattr__(self, name):
+        raw = self._raw
+        if raw is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(raw, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._raw, name, value)  # row_factory, isolation_level, ...
+
+    def __enter__(self):
+        return self._raw.__enter__()
+
+    def __exit__(self, *exc):
+        return self._raw.__exit__(*exc)
+
+    def close(self):
+        raw = self._raw
+        if raw is not None:
+            object.__setattr__(self, "_raw", None)
+            self._pool.release(raw)
+
+    def __del__(self):
+        # Call sites that never closed their connection leaked a file handle
+        # before; now the connection just goes back to the pool
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+SESSION_CACHE_TTL_SECONDS = 60.0
+SESSION_CACHE_MAX_ENTRIES = 2048
+
+
+class SessionCache:
+    """get_web_session() rows kept in memory, LRU-bounded and TTL-limited.
+
+    Every portal page and every private static file resolves the session
+    cookie; this saves the web_sessions/accounts join on each of them.
+    PollyDB drops entries whenever it changes a session or its account, so
+    the TTL only bounds staleness from writes made behind its back.
+    """
+
+    def __init__(self, ttl: float = SESSION_CACHE_TTL_SECONDS,
+                 max_entries: int = SESSION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()  # used from the reader threads
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry and entry[0] > now and not _session_expired(entry[1]):
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return dict(entry[1])
+            if entry:
+                del self._entries[session_id]
+            self.misses += 1
+            return None
+
+    def put(self, session_id: str, session: Dict):
+        with self._lock:
+            self._entries[session_id] = (time.monotonic() + self.ttl, dict(session))
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def discard_where(self, **match):
+        """Drop every entry whose row matches all of match, e.g. account_id=3."""
+        with self._lock:
+            for session_id in [sid for sid, (_, row) in self._entries.items()
+                               if all(row.get(k) == v for k, v in match.items())]:
+                del self._entries[session_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def _session_expired(session: Dict) -> bool:
+    try:
+        return datetime.fromisoformat(session["expires_at"]) <= datetime.utcnow()
+    except (KeyError, TypeError, ValueError):
+        return True
 
 
 class PollyDB:
-    def __init__(self, db_path: str = "polly.db"):
+    def __init__(self, db_path: str = "polly.db", migrate: bool = True):
         self.db_path = db_path
         self._conn = None
+        self._pool = None
+        self._fts = False
+        self.heartbeats = None  # HeartbeatTracker, attached by main
+        self.sessions = SessionCache()
         if db_path == ":memory:":
             self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            self._pool = ConnectionPool(db_path)
+        if migrate:
+            self.apply_migrations()
+        self._fts = self._has_fts()
+
+    # ── Schema versions ──
+
+    def schema_version(self) -> int:
+        with self.connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def pending_migrations(self) -> List[tuple]:
+        """(version, description) of every migration not yet applied."""
+        current = self.schema_version()
+        return [(v, desc) for v, desc, _ in MIGRATIONS if v > current]
+
+    def apply_migrations(self) -> List[int]:
+        """Bring the schema up to SCHEMA_VERSION. A current database costs one
+        PRAGMA read. Each step is idempotent, so a crash (or a second process
+        starting at the same time) just repeats it."""
+        current = self.schema_version()
+        if current > SCHEMA_VERSION:
+            logger.warning(f"{self.db_path} is at schema v{current}, newer than "
+                           f"this code (v{SCHEMA_VERSION})")
+        applied = []
+        for version, description, method in MIGRATIONS:
+            if version <= current:
+                continue
+            started = time.monotonic()
+            getattr(self, method)()
+            with self.connection() as conn:
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.commit()
+            applied.append(version)
+            logger.info(f"Schema v{version} ({description}) applied in "
+                        f"{(time.monotonic() - started) * 1000:.0f}ms")
+        return applied
+
+    def _has_fts(self) -> bool:
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='items_fts'"
+            ).fetchone() is not None
+
+    def _migrate_base_schema(self):
         self._init_db()
         self._run_migrations()
 
+    def _migrate_tenant_indexes(self):
+        with self.connection() as conn:
+            for name, table, columns in TENANT_INDEXES:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+            conn.commit()
+
+    def _migrate_fts(self):
+        with self.connection() as conn:
+            self._init_fts(conn)
+            conn.commit()
+
+    def _migrate_feed_indexes(self):
+        with self.connection() as conn:
+            for name, table, columns in FEED_INDEXES:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+            conn.commit()
+
+    def _migrate_admin_rollups(self):
+        with self.connection() as conn:
+            # device_events counted per UTC hour / device / type, as the
+            # telemetry writer inserts them
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS device_event_hourly (
+                    hour TEXT NOT NULL,
+                    device_id TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (hour, device_id, event_type)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS intent_daily (
+                    day TEXT NOT NULL,
+                    intent TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, intent)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS device_activity (
+                    device_id TEXT PRIMARY KEY,
+                    last_command_at TEXT
+                )
+            """)
+            # Stories are inserted from many places, so their per-tenant
+            # count is kept by triggers (tenant 0 = no tenant)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS story_counts (
+                    tenant_key INTEGER PRIMARY KEY,
+                    total INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS story_counts_ai AFTER INSERT ON stories BEGIN
+                    INSERT INTO story_counts (tenant_key, total)
+                    VALUES (COALESCE(new.tenant_id, 0), 1)
+                    ON CONFLICT(tenant_key) DO UPDATE SET total = total + 1;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS story_counts_ad AFTER DELETE ON stories BEGIN
+                    UPDATE story_counts SET total = total - 1
+                    WHERE tenant_key = COALESCE(old.tenant_id, 0);
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS story_counts_au AFTER UPDATE OF tenant_id ON stories
+                WHEN COALESCE(old.tenant_id, 0) != COALESCE(new.tenant_id, 0) BEGIN
+                    UPDATE story_counts SET total = total - 1
+                    WHERE tenant_key = COALESCE(old.tenant_id, 0);
+                    INSERT INTO story_counts (tenant_key, total)
+                    VALUES (COALESCE(new.tenant_id, 0), 1)
+                    ON CONFLICT(tenant_key) DO UPDATE SET total = total + 1;
+                END
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_stories_created ON stories(created_at)")
+            conn.commit()
+        self.rebuild_admin_rollups()
+
+    @contextmanager
+    def connection(self):
+        """A pooled connection for the duration of the block. Uncommitted
+        work is rolled back when it is returned."""
+        if self._conn:
+            yield self._conn
+            return
+        conn = self._pool.acquire()
+        try:
+            yield conn
+        finally:
+            self._pool.release(conn)
+
     def _get_connection(self):
+        """Legacy accessor: callers must close() it, which returns it to the pool.
+        Prefer `with db.connection() as conn`."""
         if self._conn:
             return self._conn
-        return sqlite3.connect(self.db_path)
+        return PooledConnection(self._pool, self._pool.acquire())
+
+    def close(self):
+        """Close every idle pooled connection (shutdown)."""
+        if self._pool:
+            self._pool.close_all()
+
+    def pool_stats(self) -> Dict:
+        return self._pool.stats() if self._pool else {}
 
     def _init_db(self):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Enable WAL mode for better concurrent access
             conn.execute("PRAGMA journal_mode=WAL")
 
@@ -134,6 +628,23 @@ class PollyDB:
                 )
             """)
 
+            # ── Medication compliance rollup: one row per medication per local day ──
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS medication_daily (
+                    medication_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    tenant_id INTEGER,
+                    reminded INTEGER DEFAULT 0,
+                    taken INTEGER DEFAULT 0,
+                    missed INTEGER DEFAULT 0,
+                    PRIMARY KEY (medication_id, day)
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_medication_daily_tenant_day
+                ON medication_daily(tenant_id, day)
+            """)
+
             # ── Bible verses ──
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS bible_verses (
@@ -526,15 +1037,20 @@ class PollyDB:
             conn.execute("CREATE INDEX IF NOT EXISTS idx_device_events_device_time ON device_events(device_id, created_at)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_device_events_type_time ON device_events(event_type, created_at)")
 
+            # ── Runtime state snapshots (restored after restarts) ──
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS runtime_state (
+                    name TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def _run_migrations(self):
         """Add columns to existing tables (safe to run repeatedly)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Get existing columns for user_profiles
             cols = {row[1] for row in conn.execute("PRAGMA table_info(user_profiles)").fetchall()}
             migrations = {
@@ -908,9 +1424,53 @@ class PollyDB:
             """)
 
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
+
+    def _init_fts(self, conn):
+        """Create the FTS5 search tables and their sync triggers. A new table
+        is populated from its content table. Without FTS5 support, search
+        falls back to LIKE."""
+        existing = {r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        for fts, (table, columns) in FTS_TABLES.items():
+            cols = ", ".join(columns)
+            old_vals = ", ".join(f"old.{c}" for c in columns)
+            new_vals = ", ".join(f"new.{c}" for c in columns)
+            try:
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                        {cols}, content='{table}', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                    )
+                """)
+            except sqlite3.OperationalError:
+                return  # no FTS5 in this SQLite build
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals});
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals});
+                END
+            """)
+            if fts not in existing:
+                conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def rebuild_search_index(self):
+        """Re-derive every FTS table from its content table (maintenance)."""
+        if not self._fts:
+            return
+        with self.connection() as conn:
+            for fts in FTS_TABLES:
+                conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            conn.commit()
 
     @staticmethod
     def _normalize(text: str) -> str:
@@ -924,45 +1484,32 @@ class PollyDB:
     # ── Tenant management ──
 
     def create_tenant(self, name: str) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 "INSERT INTO tenants (name) VALUES (?)", (name,)
             )
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_tenant(self, tenant_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM tenants WHERE id = ?", (tenant_id,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_all_tenants(self) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             results = conn.execute("SELECT * FROM tenants ORDER BY name").fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_tenant(self, tenant_id: int) -> Dict[str, int]:
         """ADMIN: permanently delete a tenant and all of its data. Sweeps every
         table that has a tenant_id column, then removes the tenant row itself.
         Returns {table: rows_deleted}."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             tables = [r[0] for r in conn.execute(
                 "SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
             deleted = {}
@@ -977,53 +1524,38 @@ class PollyDB:
             cur = conn.execute("DELETE FROM tenants WHERE id = ?", (tenant_id,))
             deleted["tenants"] = cur.rowcount
             conn.commit()
-            return deleted
-        finally:
-            if not self._conn:
-                conn.close()
+        self.sessions.discard_where(tenant_id=tenant_id)
+        return deleted
 
     def set_tenant_subscription(self, tenant_id: int, tier: str, status: str = "active"):
         """ADMIN: set a tenant's subscription tier + status (trial|basic|legacy)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE tenants SET subscription_tier = ?, subscription_status = ? WHERE id = ?",
                 (tier, status, tenant_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def is_book_purchased(self, tenant_id: int) -> bool:
         """True if this tenant bought the one-time Legacy Book unlock."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             row = conn.execute(
                 "SELECT book_purchased FROM tenants WHERE id = ?", (tenant_id,)
             ).fetchone()
             return bool(row and row[0])
-        finally:
-            if not self._conn:
-                conn.close()
 
     def set_book_purchased(self, tenant_id: int, purchased: bool = True):
         """Mark the one-time Legacy Book unlock for a tenant."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("UPDATE tenants SET book_purchased = ? WHERE id = ?",
                          (1 if purchased else 0, tenant_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Connected families (cross-tenant) ──
 
     def send_friend_request(self, tenant_id: int, target_family_code: str) -> Optional[Dict]:
         """Connect to another family by code. Sender is instantly connected.
         Target gets a pending request they must accept."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             target = conn.execute(
                 "SELECT * FROM tenants WHERE family_code = ?", (target_family_code,)
@@ -1059,15 +1591,11 @@ class PollyDB:
                 (target_tid, tenant_id, my_name))
             conn.commit()
             return {"connected_tenant_id": target_tid, "connected_tenant_name": target_name}
-        finally:
-            if not self._conn:
-                conn.close()
 
     def send_friend_request_by_tenant(self, tenant_id: int, target_tenant_id: int) -> Optional[Dict]:
         """Connect to another family by tenant ID (email-based discovery).
         Same as send_friend_request but skips code lookup."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if target_tenant_id == tenant_id:
                 return None
@@ -1098,14 +1626,10 @@ class PollyDB:
                 (target_tenant_id, tenant_id, my_name))
             conn.commit()
             return {"connected_tenant_id": target_tenant_id, "connected_tenant_name": target_name}
-        finally:
-            if not self._conn:
-                conn.close()
 
     def accept_friend_request(self, tenant_id: int, requester_tenant_id: int) -> bool:
         """Accept a pending friend request. Updates to accepted and adds sender to accepter's family tree."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             # Find the pending request
             pending = conn.execute(
@@ -1146,14 +1670,10 @@ class PollyDB:
 
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     def decline_friend_request(self, tenant_id: int, requester_tenant_id: int):
         """Decline a friend request. Removes both directions."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Remove both directions
             conn.execute(
                 "DELETE FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ?",
@@ -1162,14 +1682,10 @@ class PollyDB:
                 "DELETE FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ?",
                 (requester_tenant_id, tenant_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def disconnect_family(self, tenant_id: int, connected_tenant_id: int):
         """Remove a family connection (both directions)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "DELETE FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ?",
                 (tenant_id, connected_tenant_id))
@@ -1177,45 +1693,33 @@ class PollyDB:
                 "DELETE FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ?",
                 (connected_tenant_id, tenant_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_connected_families(self, tenant_id: int) -> List[Dict]:
         """Get accepted connections for this tenant."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             results = conn.execute(
                 "SELECT * FROM connected_families WHERE tenant_id = ? AND status = 'accepted' ORDER BY connected_tenant_name",
                 (tenant_id,)
             ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_pending_friend_requests(self, tenant_id: int) -> List[Dict]:
         """Get pending friend requests sent TO this tenant."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             results = conn.execute(
                 "SELECT * FROM connected_families WHERE tenant_id = ? AND status = 'pending' ORDER BY created_at DESC",
                 (tenant_id,)
             ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Shared Wall ──
 
     def share_to_wall(self, from_tenant_id: int, to_tenant_id: int,
                       content_type: str, content_id: int, caption: str = None) -> Optional[int]:
         """Share a photo/story/message to the wall between two connected families."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Verify connection exists
             conn.row_factory = sqlite3.Row
             exists = conn.execute(
@@ -1236,27 +1740,27 @@ class PollyDB:
                 (from_tenant_id, to_tenant_id, content_type, content_id, caption))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_wall_items(self, tenant_a: int, tenant_b: int, limit: int = 50) -> List[Dict]:
         """Get all shared wall items between two tenants (both directions), newest first."""
-        conn = self._get_connection()
-        try:
+        return self.get_wall_page(tenant_a, tenant_b, limit=limit)[0]
+
+    def get_wall_page(self, tenant_a: int, tenant_b: int, cursor: str = None,
+                      limit: int = 30) -> Tuple[List[Dict], Optional[str]]:
+        """One keyset page of the shared wall, newest first, with each item's
+        photo/story/message attached. Returns (items, next_cursor)."""
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
-            rows = conn.execute("""
+            rows, next_cursor = keyset_page(conn, """
                 SELECT w.*, t.name as from_tenant_name
                 FROM shared_wall_items w
                 LEFT JOIN tenants t ON t.id = w.from_tenant_id
-                WHERE (w.from_tenant_id = ? AND w.to_tenant_id = ?)
-                   OR (w.from_tenant_id = ? AND w.to_tenant_id = ?)
-                ORDER BY w.created_at DESC LIMIT ?
-            """, (tenant_a, tenant_b, tenant_b, tenant_a, limit)).fetchall()
+                WHERE ((w.from_tenant_id = ? AND w.to_tenant_id = ?)
+                   OR (w.from_tenant_id = ? AND w.to_tenant_id = ?))
+            """, (tenant_a, tenant_b, tenant_b, tenant_a), cursor, limit, alias="w")
 
             items = []
-            for r in rows:
-                item = dict(r)
+            for item in rows:
                 ctype = item["content_type"]
                 cid = item["content_id"]
                 if ctype == "photo" and cid:
@@ -1282,15 +1786,11 @@ class PollyDB:
                     else:
                         continue
                 items.append(item)
-            return items
-        finally:
-            if not self._conn:
-                conn.close()
+            return items, next_cursor
 
     def react_to_wall_item(self, wall_item_id: int, tenant_id: int, reaction: str) -> bool:
         """Toggle a reaction on a wall item. Same reaction again = remove it."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             existing = conn.execute(
                 "SELECT reaction FROM wall_reactions WHERE wall_item_id = ? AND tenant_id = ?",
                 (wall_item_id, tenant_id)
@@ -1306,16 +1806,12 @@ class PollyDB:
                     (wall_item_id, tenant_id, reaction))
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_wall_reactions(self, wall_item_ids: list) -> dict:
         """Get reactions for a list of wall item IDs. Returns {item_id: [{tenant_id, reaction}]}."""
         if not wall_item_ids:
             return {}
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             placeholders = ",".join("?" * len(wall_item_ids))
             rows = conn.execute(
@@ -1329,30 +1825,22 @@ class PollyDB:
                     result[wid] = []
                 result[wid].append({"tenant_id": r["tenant_id"], "reaction": r["reaction"]})
             return result
-        finally:
-            if not self._conn:
-                conn.close()
 
     def add_wall_comment(self, wall_item_id: int, tenant_id: int,
                          tenant_name: str, comment: str = None,
                          audio_filename: str = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 "INSERT INTO wall_comments (wall_item_id, tenant_id, tenant_name, comment, audio_filename) VALUES (?, ?, ?, ?, ?)",
                 (wall_item_id, tenant_id, tenant_name, comment, audio_filename))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_wall_comments(self, wall_item_ids: list) -> dict:
         """Returns {item_id: [comment_dicts]} for all given wall item IDs."""
         if not wall_item_ids:
             return {}
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             placeholders = ",".join("?" * len(wall_item_ids))
             rows = conn.execute(
@@ -1367,14 +1855,10 @@ class PollyDB:
                     result[wid] = []
                 result[wid].append(d)
             return result
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_wall_new_count(self, from_tenant_id: int, to_tenant_id: int) -> int:
         """Count wall items shared TO this tenant since their last wall visit."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Get last visit timestamp
             row = conn.execute(
                 "SELECT last_wall_visit FROM connected_families WHERE tenant_id = ? AND connected_tenant_id = ? AND status = 'accepted'",
@@ -1386,20 +1870,13 @@ class PollyDB:
                 (from_tenant_id, to_tenant_id, last_visit)
             ).fetchone()[0]
             return count
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_wall_item(self, item_id: int, tenant_id: int) -> bool:
         """Delete a wall item (only the sharer can remove it)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("DELETE FROM shared_wall_items WHERE id = ? AND from_tenant_id = ?", (item_id, tenant_id))
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Family Invitations ──
 
@@ -1407,8 +1884,7 @@ class PollyDB:
                                 inviter_name: str, invitee_name: str,
                                 invitee_email: str, voice_filename: str = None,
                                 family_code: str = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO family_invitations
                 (tenant_id, family_member_id, inviter_name, invitee_name, invitee_email,
@@ -1418,51 +1894,35 @@ class PollyDB:
                   invitee_email, voice_filename, family_code))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_invitation_by_id(self, invitation_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM family_invitations WHERE id = ?", (invitation_id,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_invitations_for_tenant(self, tenant_id: int) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             results = conn.execute(
                 "SELECT * FROM family_invitations WHERE tenant_id = ? ORDER BY sent_at DESC",
                 (tenant_id,)
             ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_invitation_by_email_and_tenant(self, email: str, tenant_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM family_invitations WHERE LOWER(invitee_email) = ? AND tenant_id = ? ORDER BY sent_at DESC LIMIT 1",
                 (email.lower(), tenant_id)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_invitation_status(self, invitation_id: int, status: str, **kwargs):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             timestamp_col = {
                 "visited": "visited_at",
                 "onboarded": "onboarded_at",
@@ -1483,13 +1943,9 @@ class PollyDB:
                         f"UPDATE family_invitations SET {key} = ? WHERE id = ?",
                         (val, invitation_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def mark_session_onboarded(self, session_id: str, step: int = None):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if step:
                 conn.execute(
                     "UPDATE web_sessions SET last_onboarding_step = ? WHERE id = ?",
@@ -1499,24 +1955,17 @@ class PollyDB:
                     "UPDATE web_sessions SET onboarding_complete = 1 WHERE id = ?",
                     (session_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
+        self.sessions.discard(session_id)
 
     def save_onboarding_feedback(self, invitation_id: int, rating: int, note: str = None):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE family_invitations SET feedback_rating = ?, feedback_note = ? WHERE id = ?",
                 (rating, note, invitation_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_invitation_funnel_stats(self) -> Dict:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             row = conn.execute("""
                 SELECT
                     COUNT(*) as total_sent,
@@ -1531,70 +1980,54 @@ class PollyDB:
                 "total_onboarded": row[2] or 0,
                 "total_converted": row[3] or 0,
             }
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Account management ──
 
     def create_account(self, email: str, password_hash: str, name: str,
                        tenant_id: int, role: str = "caretaker") -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO accounts (email, password_hash, name, tenant_id, role, terms_accepted_at)
                 VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
             """, (email, password_hash, name, tenant_id, role))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_account_by_email(self, email: str) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM accounts WHERE email = ?", (email,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_account_by_id(self, account_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM accounts WHERE id = ?", (account_id,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
+
+    def update_account_password(self, account_id: int, password_hash: str):
+        with self.connection() as conn:
+            conn.execute("UPDATE accounts SET password_hash = ? WHERE id = ?",
+                         (password_hash, account_id))
+            conn.commit()
+        self.sessions.discard_where(account_id=account_id)
 
     def update_account_login(self, account_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE accounts SET last_login = CURRENT_TIMESTAMP WHERE id = ?",
                 (account_id,)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def has_accounts(self) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             count = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
             return count > 0
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Web session management ──
 
@@ -1602,85 +2035,96 @@ class PollyDB:
                            duration_hours: int = 72) -> str:
         session_id = secrets.token_urlsafe(32)
         expires_at = (datetime.utcnow() + timedelta(hours=duration_hours)).isoformat()
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("""
                 INSERT INTO web_sessions (id, account_id, tenant_id, expires_at)
                 VALUES (?, ?, ?, ?)
             """, (session_id, account_id, tenant_id, expires_at))
             conn.commit()
             return session_id
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_web_session(self, session_id: str) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
-            conn.row_factory = sqlite3.Row
-            result = conn.execute("""
-                SELECT ws.*, a.name as account_name, a.email as account_email,
-                       a.role as account_role, a.is_admin as account_is_admin,
-                       ws.role as session_role, ws.family_name
-                FROM web_sessions ws
-                LEFT JOIN accounts a ON ws.account_id = a.id
-                WHERE ws.id = ? AND ws.expires_at > datetime('now')
-            """, (session_id,)).fetchone()
-            return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
+        session = self.sessions.get(session_id)
+        if session is None:
+            with self.connection() as conn:
+                conn.row_factory = sqlite3.Row
+                result = conn.execute("""
+                    SELECT ws.*, a.name as account_name, a.email as account_email,
+                           a.role as account_role, a.is_admin as account_is_admin,
+                           ws.role as session_role, ws.family_name
+                    FROM web_sessions ws
+                    LEFT JOIN accounts a ON ws.account_id = a.id
+                    WHERE ws.id = ? AND ws.expires_at > datetime('now')
+                """, (session_id,)).fetchone()
+            if not result:
+                return None
+            session = dict(result)
+            self.sessions.put(session_id, session)
+        pending = self.heartbeats and self.heartbeats.session_last_active(session_id)
+        if pending and pending > (session.get("last_active") or ""):
+            session["last_active"] = pending
+        return session
 
     def touch_web_session(self, session_id: str):
-        conn = self._get_connection()
-        try:
+        if self.heartbeats:
+            self.heartbeats.session_touched(session_id)
+            return
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE web_sessions SET last_active = CURRENT_TIMESTAMP WHERE id = ?",
                 (session_id,)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_web_session(self, session_id: str):
-        conn = self._get_connection()
-        try:
+        self.sessions.discard(session_id)
+        if self.heartbeats:
+            self.heartbeats.forget_session(session_id)
+        with self.connection() as conn:
             conn.execute("DELETE FROM web_sessions WHERE id = ?", (session_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
-    def cleanup_expired_sessions(self):
-        conn = self._get_connection()
-        try:
-            conn.execute("DELETE FROM web_sessions WHERE expires_at <= datetime('now')")
+    def cleanup_expired_sessions(self, limit: int = None) -> int:
+        """Delete expired sessions (at most `limit` of them when given, for
+        the batched maintenance loop). Returns the number deleted."""
+        with self.connection() as conn:
+            if limit:
+                cur = conn.execute("""
+                    DELETE FROM web_sessions WHERE id IN (
+                        SELECT id FROM web_sessions WHERE expires_at <= datetime('now') LIMIT ?)
+                """, (limit,))
+            else:
+                cur = conn.execute("DELETE FROM web_sessions WHERE expires_at <= datetime('now')")
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
+        self.sessions.clear()
+        return cur.rowcount
+
+    def invalidate_web_sessions(self, session_id: str = None, account_id: int = None,
+                                tenant_id: int = None):
+        """Drop cached sessions after changing web_sessions or accounts rows
+        outside the methods below (which do it themselves)."""
+        if session_id:
+            self.sessions.discard(session_id)
+        if account_id is not None:
+            self.sessions.discard_where(account_id=account_id)
+        if tenant_id is not None:
+            self.sessions.discard_where(tenant_id=tenant_id)
 
     # ── Family access code ──
 
     def generate_family_code(self, tenant_id: int) -> str:
         import random
         code = f"{random.randint(0, 999999):06d}"
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE tenants SET family_code = ?, family_code_created_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (code, tenant_id)
             )
             conn.commit()
             return code
-        finally:
-            if not self._conn:
-                conn.close()
 
     def revoke_family_code(self, tenant_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE tenants SET family_code = NULL, family_code_created_at = NULL WHERE id = ?",
                 (tenant_id,)
@@ -1691,14 +2135,11 @@ class PollyDB:
                 (tenant_id,)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
+        self.sessions.discard_where(tenant_id=tenant_id, session_role="family")
 
     def validate_family_code(self, code: str) -> Optional[Dict]:
         """Validate a family access code. Checks tenant-level family_code only."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM tenants WHERE family_code = ?", (code,)
@@ -1706,33 +2147,25 @@ class PollyDB:
             if result:
                 return {"tenant": dict(result), "type": "general"}
             return None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def create_family_session(self, tenant_id: int, family_name: str,
                               duration_hours: int = 72) -> str:
         session_id = secrets.token_urlsafe(32)
         expires_at = (datetime.utcnow() + timedelta(hours=duration_hours)).isoformat()
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("""
                 INSERT INTO web_sessions (id, account_id, tenant_id, expires_at, family_name, role)
                 VALUES (?, NULL, ?, ?, ?, 'family')
             """, (session_id, tenant_id, expires_at, family_name))
             conn.commit()
             return session_id
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Device management (per-tenant) ──
 
     def register_device(self, device_id: str, tenant_id: int, name: str = None,
                         api_key: str = None) -> Dict:
         api_key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             existing = conn.execute(
                 "SELECT * FROM devices WHERE device_id = ?", (device_id,)
@@ -1753,67 +2186,70 @@ class PollyDB:
                 "SELECT * FROM devices WHERE device_id = ?", (device_id,)
             ).fetchone()
             return dict(result)
-        finally:
-            if not self._conn:
-                conn.close()
+
+    def write_heartbeats(self, devices: Dict[str, str], sessions: Dict[str, str]):
+        """Bulk-apply coalesced last_seen / last_active timestamps (never
+        moving one backwards)."""
+        with self.connection() as conn:
+            conn.executemany(
+                "UPDATE devices SET last_seen = ?1 WHERE device_id = ?2 "
+                "AND (last_seen IS NULL OR last_seen < ?1)",
+                [(ts, device_id) for device_id, ts in devices.items()])
+            conn.executemany(
+                "UPDATE web_sessions SET last_active = ?1 WHERE id = ?2 "
+                "AND (last_active IS NULL OR last_active < ?1)",
+                [(ts, session_id) for session_id, ts in sessions.items()])
+            conn.commit()
+
+    def _merge_last_seen(self, devices: List[Dict]) -> List[Dict]:
+        """Overlay last_seen heartbeats that haven't been flushed yet."""
+        pending = self.heartbeats.pending_devices() if self.heartbeats else {}
+        for device in devices:
+            ts = pending.get(device.get("device_id"))
+            if ts and ts > (device.get("last_seen") or ""):
+                device["last_seen"] = ts
+        return devices
 
     def get_device(self, device_id: str) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM devices WHERE device_id = ?", (device_id,)
             ).fetchone()
-            return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
+            return self._merge_last_seen([dict(result)])[0] if result else None
 
     def get_all_devices(self) -> List[Dict]:
         """All devices regardless of tenant (for admin view)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             results = conn.execute(
                 """SELECT d.*, t.name AS tenant_name
                    FROM devices d LEFT JOIN tenants t ON d.tenant_id = t.id
                    ORDER BY d.registered_at DESC"""
             ).fetchall()
-            return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
+            return self._merge_last_seen([dict(r) for r in results])
 
     def get_device_by_api_key_hash(self, api_key_hash: str) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM devices WHERE api_key_hash = ?", (api_key_hash,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_devices_by_tenant(self, tenant_id: int) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             results = conn.execute(
                 "SELECT * FROM devices WHERE tenant_id = ? ORDER BY registered_at DESC",
                 (tenant_id,)
             ).fetchall()
-            return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
+            return self._merge_last_seen([dict(r) for r in results])
 
     def get_device_settings(self, device_id: str, tenant_id: int) -> Dict:
         """Get merged settings: device-level overrides > tenant profile defaults.
         NULL device columns inherit from user_profiles."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             device = conn.execute(
                 "SELECT * FROM devices WHERE device_id = ?", (device_id,)
@@ -1847,9 +2283,6 @@ class PollyDB:
                 "voice_volume": prof.get("voice_volume", 100),
                 "kid_mode": dev.get("dev_kid_mode") if dev.get("dev_kid_mode") is not None else prof.get("kid_mode", 0),
             }
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_device_settings(self, device_id: str, **kwargs) -> None:
         """Update per-device settings columns. Only updates provided keys.
@@ -1873,29 +2306,23 @@ class PollyDB:
             return
         set_clause = ", ".join(f"{k} = ?" for k in updates)
         values = list(updates.values()) + [device_id]
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(f"UPDATE devices SET {set_clause} WHERE device_id = ?", values)
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_device_last_seen(self, device_id: str):
-        conn = self._get_connection()
-        try:
+        if self.heartbeats:
+            self.heartbeats.device_seen(device_id)
+            return
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE devices SET last_seen = CURRENT_TIMESTAMP WHERE device_id = ?",
                 (device_id,)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_device(self, device_id: str, tenant_id: int = None, is_admin: bool = False) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if is_admin:
                 cursor = conn.execute(
                     "DELETE FROM devices WHERE device_id = ?", (device_id,)
@@ -1907,15 +2334,11 @@ class PollyDB:
                 )
             conn.commit()
             return cursor.rowcount > 0
-        finally:
-            if not self._conn:
-                conn.close()
 
     def generate_claim_code(self, device_id: str, tenant_id: int = None) -> str:
         """Generate a unique 6-digit claim code for a device."""
         import random
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             for _ in range(100):
                 code = f"{random.randint(0, 999999):06d}"
                 t_clash = conn.execute(
@@ -1935,14 +2358,10 @@ class PollyDB:
                     conn.commit()
                     return code
             raise RuntimeError("Could not generate unique claim code after 100 attempts")
-        finally:
-            if not self._conn:
-                conn.close()
 
     def claim_device(self, claim_code: str, new_tenant_id: int, device_name: str = None) -> Optional[Dict]:
         """Claim a device by its 6-digit code. Transfers to new tenant. Optionally rename."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             device = conn.execute(
                 "SELECT * FROM devices WHERE claim_code = ? AND claimed_at IS NULL",
@@ -1967,15 +2386,11 @@ class PollyDB:
                 "SELECT * FROM devices WHERE device_id = ?", (device["device_id"],)
             ).fetchone()
             return dict(result)
-        finally:
-            if not self._conn:
-                conn.close()
 
     def provision_device_by_claim_code(self, claim_code: str) -> Optional[Dict]:
         """Device calls this with claim code to get its device_id + fresh api_key."""
         from core.auth import generate_api_key
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             device = conn.execute(
                 "SELECT * FROM devices WHERE claim_code = ?",
@@ -1995,9 +2410,6 @@ class PollyDB:
                 "device_id": device["device_id"],
                 "api_key": raw_key,
             }
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Items (memory storage) ──
 
@@ -2007,8 +2419,7 @@ class PollyDB:
         item_norm = self._normalize(item)
         location_norm = self._normalize(location)
 
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 existing = conn.execute(
                     "SELECT id FROM items WHERE item_normalized = ? AND tenant_id = ?",
@@ -2035,14 +2446,10 @@ class PollyDB:
                 """, (item, item_norm, location, location_norm, context, raw_input, prep, tenant_id))
                 conn.commit()
                 return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def find_item(self, item: str, tenant_id: int = None) -> List[Dict]:
         item_norm = self._normalize(item)
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
@@ -2053,35 +2460,49 @@ class PollyDB:
             ).fetchall()
 
             if not results:
-                results = conn.execute(
-                    f"SELECT id, item, location, context, prep, created_at, updated_at FROM items WHERE item_normalized LIKE ?{t_clause}",
-                    (f"%{item_norm}%",) + t_params
-                ).fetchall()
+                match = _fts_match(item_norm, "item")
+                if self._fts and match:
+                    results = conn.execute(
+                        f"SELECT i.id, i.item, i.location, i.context, i.prep, i.created_at, i.updated_at "
+                        f"FROM items_fts JOIN items i ON i.id = items_fts.rowid "
+                        f"WHERE items_fts MATCH ?{t_clause.replace('tenant_id', 'i.tenant_id')} "
+                        f"ORDER BY bm25(items_fts) LIMIT 20",
+                        (match,) + t_params
+                    ).fetchall()
+                elif not self._fts:
+                    results = conn.execute(
+                        f"SELECT id, item, location, context, prep, created_at, updated_at FROM items WHERE item_normalized LIKE ?{t_clause}",
+                        (f"%{item_norm}%",) + t_params
+                    ).fetchall()
 
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def find_by_location(self, location: str, tenant_id: int = None) -> List[Dict]:
         location_norm = self._normalize(location)
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
-            results = conn.execute(
-                f"SELECT id, item, location, context, created_at, updated_at FROM items WHERE location_normalized LIKE ?{t_clause}",
-                (f"%{location_norm}%",) + t_params
-            ).fetchall()
+            match = _fts_match(location_norm, "location")
+            if self._fts:
+                if not match:
+                    return []
+                results = conn.execute(
+                    f"SELECT i.id, i.item, i.location, i.context, i.created_at, i.updated_at "
+                    f"FROM items_fts JOIN items i ON i.id = items_fts.rowid "
+                    f"WHERE items_fts MATCH ?{t_clause.replace('tenant_id', 'i.tenant_id')} "
+                    f"ORDER BY bm25(items_fts)",
+                    (match,) + t_params
+                ).fetchall()
+            else:
+                results = conn.execute(
+                    f"SELECT id, item, location, context, created_at, updated_at FROM items WHERE location_normalized LIKE ?{t_clause}",
+                    (f"%{location_norm}%",) + t_params
+                ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def list_all(self, tenant_id: int = None) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 results = conn.execute(
@@ -2093,14 +2514,10 @@ class PollyDB:
                     "SELECT id, item, location, context, created_at, updated_at FROM items ORDER BY updated_at DESC"
                 ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_item(self, item_id: int, item: str = None, location: str = None,
                     prep: str = None, tenant_id: int = None) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             updates = []
             params = []
             if item is not None:
@@ -2125,14 +2542,10 @@ class PollyDB:
             cursor = conn.execute(query, params)
             conn.commit()
             return cursor.rowcount > 0
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_item(self, item: str, tenant_id: int = None) -> bool:
         item_norm = self._normalize(item)
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 cursor = conn.execute(
                     "DELETE FROM items WHERE item_normalized = ? AND tenant_id = ?",
@@ -2144,17 +2557,13 @@ class PollyDB:
                 )
             conn.commit()
             return cursor.rowcount > 0
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_items_by_ids(self, ids: list, tenant_id: int = None) -> int:
         """Bulk-delete stored items by id (tenant-scoped). Returns rows deleted."""
         ids = [int(i) for i in ids if str(i).isdigit()]
         if not ids:
             return 0
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             placeholders = ",".join("?" * len(ids))
             params = list(ids)
             q = f"DELETE FROM items WHERE id IN ({placeholders})"
@@ -2164,41 +2573,42 @@ class PollyDB:
             cursor = conn.execute(q, params)
             conn.commit()
             return cursor.rowcount
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_by_id(self, item_id: int) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
             conn.commit()
             return cursor.rowcount > 0
-        finally:
-            if not self._conn:
-                conn.close()
 
     def search(self, query: str, tenant_id: int = None) -> List[Dict]:
         query_norm = self._normalize(query)
         if not query_norm:
             return []
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
-            results = conn.execute(
-                f"SELECT id, item, location, context, created_at, updated_at FROM items WHERE (item LIKE ? OR location LIKE ? OR context LIKE ?){t_clause} LIMIT 20",
-                (f"%{query_norm}%",) * 3 + t_params
-            ).fetchall()
+            match = _fts_match(query_norm)
+            if self._fts:
+                if not match:
+                    return []
+                # Item-name hits outrank location and context hits
+                results = conn.execute(
+                    f"SELECT i.id, i.item, i.location, i.context, i.created_at, i.updated_at "
+                    f"FROM items_fts JOIN items i ON i.id = items_fts.rowid "
+                    f"WHERE items_fts MATCH ?{t_clause.replace('tenant_id', 'i.tenant_id')} "
+                    f"ORDER BY bm25(items_fts, 10.0, 5.0, 1.0) LIMIT 20",
+                    (match,) + t_params
+                ).fetchall()
+            else:
+                results = conn.execute(
+                    f"SELECT id, item, location, context, created_at, updated_at FROM items WHERE (item LIKE ? OR location LIKE ? OR context LIKE ?){t_clause} LIMIT 20",
+                    (f"%{query_norm}%",) * 3 + t_params
+                ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_stats(self, tenant_id: int = None) -> Dict:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             t_clause = " WHERE tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
 
@@ -2214,17 +2624,13 @@ class PollyDB:
                 "unique_locations": locations,
                 "recent": [{"item": r[0], "location": r[1]} for r in recent]
             }
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Medications ──
 
     def add_medication(self, user_id: int, name: str, dosage: str, times: str,
                        active_days: str = None, tenant_id: int = None,
                        device_id: str = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO medications (user_id, name, dosage, times, active_days, tenant_id, device_id)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -2232,13 +2638,9 @@ class PollyDB:
                   active_days or '["mon","tue","wed","thu","fri","sat","sun"]', tenant_id, device_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_medications(self, user_id: int = None, tenant_id: int = None) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             query = "SELECT * FROM medications WHERE active = 1"
             params = []
@@ -2250,13 +2652,9 @@ class PollyDB:
                 params.append(tenant_id)
             results = conn.execute(query, params).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_medication_by_id(self, medication_id: int, tenant_id: int = None) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             query = "SELECT * FROM medications WHERE id = ?"
             params = [medication_id]
@@ -2265,15 +2663,11 @@ class PollyDB:
                 params.append(tenant_id)
             row = conn.execute(query, params).fetchone()
             return dict(row) if row else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_medication(self, medication_id: int, name: str, dosage: str,
                           times: str, active_days: str = None,
                           tenant_id: int = None):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             query = "UPDATE medications SET name = ?, dosage = ?, times = ?"
             params = [name, dosage, times]
             if active_days is not None:
@@ -2286,13 +2680,9 @@ class PollyDB:
                 params.append(tenant_id)
             conn.execute(query, params)
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_medication(self, medication_id: int, tenant_id: int = None):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             query = "DELETE FROM medications WHERE id = ?"
             params = [medication_id]
             if tenant_id:
@@ -2300,23 +2690,77 @@ class PollyDB:
                 params.append(tenant_id)
             conn.execute(query, params)
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def log_medication(self, medication_id: int, status: str,
-                       scheduled_time: str = None, reminder_count: int = 0) -> int:
-        conn = self._get_connection()
-        try:
+                       scheduled_time: str = None, reminder_count: int = 0,
+                       day: str = None) -> int:
+        """Log a reminder/taken/missed event and bump the daily rollup in the
+        same transaction. `day` is the local YYYY-MM-DD (default: today)."""
+        with self.connection() as conn:
             cursor = conn.execute("""
-                INSERT INTO medication_logs (medication_id, status, scheduled_time, reminder_count)
-                VALUES (?, ?, ?, ?)
-            """, (medication_id, status, scheduled_time, reminder_count))
+                INSERT INTO medication_logs (medication_id, status, scheduled_time,
+                                             reminder_count, tenant_id)
+                VALUES (?, ?, ?, ?, (SELECT tenant_id FROM medications WHERE id = ?))
+            """, (medication_id, status, scheduled_time, reminder_count, medication_id))
+            if status in ROLLUP_STATUSES:
+                self._bump_medication_daily(conn, [(medication_id, day or _local_day(), status, 1)])
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
+
+    @staticmethod
+    def _bump_medication_daily(conn, rows):
+        """Add (medication_id, day, status, count) increments to medication_daily."""
+        conn.executemany(f"""
+            INSERT INTO medication_daily (medication_id, day, tenant_id, reminded, taken, missed)
+            SELECT ?1, ?2, (SELECT tenant_id FROM medications WHERE id = ?1),
+                   CASE ?3 WHEN 'reminded' THEN ?4 ELSE 0 END,
+                   CASE ?3 WHEN 'taken' THEN ?4 ELSE 0 END,
+                   CASE ?3 WHEN 'missed' THEN ?4 ELSE 0 END
+            ON CONFLICT(medication_id, day) DO UPDATE SET
+                reminded = reminded + excluded.reminded,
+                taken = taken + excluded.taken,
+                missed = missed + excluded.missed
+        """, rows)
+
+    def get_medication_rollups(self, tenant_id: int, start_day: str,
+                               end_day: str = None, medication_id: int = None) -> List[Dict]:
+        """Daily compliance rows (medication_id, day, reminded, taken, missed)
+        for a tenant between two local days, inclusive."""
+        with self.connection() as conn:
+            conn.row_factory = sqlite3.Row
+            query = """SELECT medication_id, day, reminded, taken, missed
+                       FROM medication_daily WHERE tenant_id = ? AND day >= ?"""
+            params = [tenant_id, start_day]
+            if end_day:
+                query += " AND day <= ?"
+                params.append(end_day)
+            if medication_id:
+                query += " AND medication_id = ?"
+                params.append(medication_id)
+            query += " ORDER BY day, medication_id"
+            return [dict(r) for r in conn.execute(query, params).fetchall()]
+
+    def rebuild_medication_rollups(self, batch_size: int = 5000) -> int:
+        """Recompute medication_daily from the raw medication_logs (one-off
+        backfill, or repair). Log timestamps are UTC; days are local.
+        Returns the number of rollup rows written."""
+        with self.connection() as conn:
+            conn.execute("DELETE FROM medication_daily")
+            totals: Dict[tuple, int] = {}
+            cursor = conn.execute(
+                f"SELECT medication_id, status, created_at FROM medication_logs "
+                f"WHERE status IN ({','.join('?' * len(ROLLUP_STATUSES))}) ORDER BY id",
+                ROLLUP_STATUSES)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                for medication_id, status, created_at in batch:
+                    key = (medication_id, _local_day(_parse_utc(created_at)), status)
+                    totals[key] = totals.get(key, 0) + 1
+            self._bump_medication_daily(conn, [k + (n,) for k, n in totals.items()])
+            conn.commit()
+            return conn.execute("SELECT COUNT(*) FROM medication_daily").fetchone()[0]
 
     # ── Stories ──
 
@@ -2325,8 +2769,7 @@ class PollyDB:
                    duration_seconds: float = None, user_id: int = None,
                    tenant_id: int = None, question_text: str = None,
                    photo_id: int = None, recorded_by_member_id: int = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO stories (user_id, transcript, audio_s3_key, speaker_name,
                                     source, duration_seconds, tenant_id, question_text,
@@ -2337,15 +2780,20 @@ class PollyDB:
                   recorded_by_member_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_stories(self, user_id: int = None, limit: int = 50,
                     tenant_id: int = None, verified_only: bool = True,
                     exclude_private: bool = False) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        return self.get_stories_page(user_id=user_id, limit=limit, tenant_id=tenant_id,
+                                     verified_only=verified_only,
+                                     exclude_private=exclude_private)[0]
+
+    def get_stories_page(self, cursor: str = None, limit: int = 20,
+                         user_id: int = None, tenant_id: int = None,
+                         verified_only: bool = True,
+                         exclude_private: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """Stories newest first, one keyset page. Returns (stories, next_cursor)."""
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             query = "SELECT * FROM stories WHERE 1=1"
             params = []
@@ -2359,10 +2807,7 @@ class PollyDB:
             if tenant_id:
                 query += " AND tenant_id = ?"
                 params.append(tenant_id)
-            query += " ORDER BY created_at DESC LIMIT ?"
-            params.append(limit)
-            results = conn.execute(query, params).fetchall()
-            rows = [dict(r) for r in results]
+            rows, next_cursor = keyset_page(conn, query, params, cursor, limit)
             # Convert UTC timestamps to local timezone for display
             try:
                 from zoneinfo import ZoneInfo
@@ -2379,10 +2824,7 @@ class PollyDB:
                             pass
             except ImportError:
                 pass
-            return rows
-        finally:
-            if not self._conn:
-                conn.close()
+            return rows, next_cursor
 
     # ── Question sessions ──
 
@@ -2390,8 +2832,7 @@ class PollyDB:
                               answer_text: str = None, audio_s3_key: str = None,
                               week: int = None, theme: str = None,
                               user_id: int = None, tenant_id: int = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO question_sessions (user_id, question_id, question_text,
                     answer_text, audio_s3_key, week, theme, answered, tenant_id)
@@ -2400,27 +2841,19 @@ class PollyDB:
                   week, theme, 1 if answer_text else 0, tenant_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Bible verses ──
 
     def get_verse_by_day(self, day_of_year: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM bible_verses WHERE day_of_year = ?", (day_of_year,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_verse_by_topic(self, topic: str) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             # Search by topic first, then fall back to reference (e.g., "Psalm", "Proverbs")
             result = conn.execute(
@@ -2433,9 +2866,6 @@ class PollyDB:
                     (f"%{topic}%",)
                 ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Family members ──
 
@@ -2443,8 +2873,7 @@ class PollyDB:
                           primary_user_id: int = None,
                           tenant_id: int = None) -> int:
         name_norm = self._normalize(name)
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
 
@@ -2471,14 +2900,10 @@ class PollyDB:
             """, (name, name_norm, relationship, primary_user_id, tenant_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def find_family_member(self, name: str, tenant_id: int = None) -> Optional[Dict]:
         name_norm = self._normalize(name)
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
@@ -2493,13 +2918,9 @@ class PollyDB:
                     (f"%{name_norm}%",) + t_params
                 ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_family_members(self, tenant_id: int = None) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 results = conn.execute(
@@ -2511,9 +2932,6 @@ class PollyDB:
                     "SELECT * FROM family_members ORDER BY last_seen DESC"
                 ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_family_member(self, member_id: int, name: str = None,
                              relationship: str = None, relation_to_owner: str = None,
@@ -2524,8 +2942,7 @@ class PollyDB:
                              deceased_year: int = None,
                              is_minor: int = None,
                              email: str = None) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             updates = []
             params = []
             if name is not None:
@@ -2575,52 +2992,59 @@ class PollyDB:
             conn.execute(f"UPDATE family_members SET {', '.join(updates)} WHERE id = ?", params)
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_family_member_by_id(self, member_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute("SELECT * FROM family_members WHERE id = ?", (member_id,)).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_family_member(self, member_id: int) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Clear parent references pointing to this member
             conn.execute("UPDATE family_members SET parent_member_id = NULL WHERE parent_member_id = ?", (member_id,))
             conn.execute("DELETE FROM family_members WHERE id = ?", (member_id,))
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_family_member_visit(self, member_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("""
                 UPDATE family_members SET visit_count = visit_count + 1,
                 last_seen = CURRENT_TIMESTAMP WHERE id = ?
             """, (member_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def search_stories_by_speaker_or_topic(self, query: str, limit: int = 20,
                                            tenant_id: int = None) -> List[Dict]:
         query_norm = self._normalize(query)
-        conn = self._get_connection()
-        try:
+        match = _fts_match(query_norm)
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             t_clause = " AND s.tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
+            if self._fts:
+                if not match:
+                    return []
+                # Best bm25 hit per story across its transcript, speaker, the
+                # memories extracted from it, and its tags
+                tag_clause = " AND tenant_id = ?" if tenant_id else ""
+                results = conn.execute(f"""
+                    SELECT s.* FROM (
+                        SELECT rowid AS story_id, bm25(stories_fts, 1.0, 1.0, 5.0) AS score
+                        FROM stories_fts WHERE stories_fts MATCH ?
+                        UNION ALL
+                        SELECT m.story_id, bm25(memories_fts)
+                        FROM memories_fts JOIN memories m ON m.id = memories_fts.rowid
+                        WHERE memories_fts MATCH ? AND m.story_id IS NOT NULL
+                        UNION ALL
+                        SELECT story_id, 0.0 FROM story_tags
+                        WHERE tag_value LIKE ?{tag_clause}
+                    ) hits JOIN stories s ON s.id = hits.story_id
+                    WHERE s.verified = 1{t_clause}
+                    GROUP BY s.id ORDER BY MIN(hits.score), s.created_at DESC LIMIT ?
+                """, (match, match, f"%{query_norm}%") + t_params + t_params + (limit,)).fetchall()
+                return [dict(r) for r in results]
             results = conn.execute(f"""
                 SELECT s.* FROM stories s
                 LEFT JOIN story_tags st ON s.id = st.story_id
@@ -2629,23 +3053,16 @@ class PollyDB:
                 GROUP BY s.id ORDER BY s.created_at DESC LIMIT ?
             """, (f"%{query_norm}%", f"%{query_norm}%", f"%{query_norm}%") + t_params + (limit,)).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def add_story_tag(self, story_id: int, tag_type: str, tag_value: str,
                       tenant_id: int = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO story_tags (story_id, tag_type, tag_value, tenant_id)
                 VALUES (?, ?, ?, ?)
             """, (story_id, tag_type, tag_value, tenant_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Narrative log ──
 
@@ -2653,21 +3070,16 @@ class PollyDB:
 
     def add_prayer_request(self, name: str, request: str = None,
                            tenant_id: int = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO prayer_requests (tenant_id, name, request)
                 VALUES (?, ?, ?)
             """, (tenant_id, name, request))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_prayer_requests(self, tenant_id: int, active_only: bool = True) -> list:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if active_only:
                 rows = conn.execute(
@@ -2680,18 +3092,11 @@ class PollyDB:
                     (tenant_id,)
                 ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_prayer_request(self, request_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("DELETE FROM prayer_requests WHERE id = ?", (request_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Prayer recordings ──
 
@@ -2700,8 +3105,7 @@ class PollyDB:
                                audio_filename: str, transcript: str = None,
                                schedule_time: str = None,
                                schedule_days: str = "0,1,2,3,4,5,6") -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO prayer_recordings
                     (tenant_id, speaker_name, category, title, audio_filename,
@@ -2711,14 +3115,10 @@ class PollyDB:
                   transcript, schedule_time, schedule_days))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_prayer_recordings(self, tenant_id: int, category: str = None,
                                active_only: bool = True) -> list:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if category:
                 rows = conn.execute(
@@ -2735,26 +3135,18 @@ class PollyDB:
                     (tenant_id,)
                 ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_prayer_recording_by_id(self, recording_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             row = conn.execute(
                 "SELECT * FROM prayer_recordings WHERE id = ?", (recording_id,)
             ).fetchone()
             return dict(row) if row else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_scheduled_prayers(self, tenant_id: int, day_of_week: int) -> list:
         """Get prayer recordings scheduled for a specific day."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             rows = conn.execute(
                 "SELECT * FROM prayer_recordings WHERE tenant_id = ? AND active = 1 "
@@ -2762,38 +3154,26 @@ class PollyDB:
                 (tenant_id, f"%{day_of_week}%")
             ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_prayer_recording_played(self, recording_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE prayer_recordings SET play_count = play_count + 1, "
                 "last_played = CURRENT_TIMESTAMP WHERE id = ?",
                 (recording_id,)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_prayer_recording(self, recording_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("DELETE FROM prayer_recordings WHERE id = ?", (recording_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_prayer_recording_schedule(self, recording_id: int,
                                           schedule_time: str = None,
                                           schedule_days: str = None,
                                           active: int = None):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             updates = []
             params = []
             if schedule_time is not None:
@@ -2812,28 +3192,20 @@ class PollyDB:
                     params
                 )
                 conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Pronunciation guide ──
 
     def get_pronunciations(self, tenant_id: int) -> list:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             rows = conn.execute(
                 "SELECT * FROM pronunciations WHERE tenant_id = ? ORDER BY word",
                 (tenant_id,)
             ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def add_pronunciation(self, tenant_id: int, word: str, phonetic: str) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Upsert: if same word exists for this tenant, update it
             existing = conn.execute(
                 "SELECT id FROM pronunciations WHERE tenant_id = ? AND LOWER(word) = LOWER(?)",
@@ -2852,24 +3224,16 @@ class PollyDB:
             )
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_pronunciation(self, pronunciation_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("DELETE FROM pronunciations WHERE id = ?", (pronunciation_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Nostalgia snippets ──
 
     def get_nostalgia_snippets(self, tenant_id: int, category: str = None) -> list:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if category:
                 rows = conn.execute(
@@ -2882,14 +3246,10 @@ class PollyDB:
                     (tenant_id,)
                 ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_next_nostalgia_snippet(self, tenant_id: int) -> dict:
         """Get the next snippet to play (oldest last_used first, unused first)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             row = conn.execute("""
                 SELECT * FROM nostalgia_snippets WHERE tenant_id = ?
@@ -2897,14 +3257,10 @@ class PollyDB:
                 LIMIT 1
             """, (tenant_id,)).fetchone()
             return dict(row) if row else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def save_nostalgia_snippets(self, tenant_id: int, snippets: list, append: bool = False):
         """Save snippets. If append=True, adds to existing. Otherwise replaces all."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if not append:
                 conn.execute("DELETE FROM nostalgia_snippets WHERE tenant_id = ?", (tenant_id,))
             # Get max variation per category for appending
@@ -2926,26 +3282,18 @@ class PollyDB:
                     VALUES (?, ?, ?, ?, ?)
                 """, (tenant_id, cat, var, s["text"], s["text"]))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_nostalgia_snippet(self, snippet_id: int, text: str):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Save original_text on first edit if not set
             row = conn.execute("SELECT original_text, text FROM nostalgia_snippets WHERE id = ?", (snippet_id,)).fetchone()
             if row and not row[0]:
                 conn.execute("UPDATE nostalgia_snippets SET original_text = ? WHERE id = ?", (row[1], snippet_id))
             conn.execute("UPDATE nostalgia_snippets SET text = ? WHERE id = ?", (text, snippet_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_nostalgia_snippet(self, snippet_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Log the deletion so GPT can avoid similar topics
             row = conn.execute("SELECT tenant_id, category, text FROM nostalgia_snippets WHERE id = ?", (snippet_id,)).fetchone()
             if row:
@@ -2955,81 +3303,57 @@ class PollyDB:
                 )
             conn.execute("DELETE FROM nostalgia_snippets WHERE id = ?", (snippet_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_nostalgia_deleted(self, tenant_id: int) -> list:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             rows = conn.execute(
                 "SELECT * FROM nostalgia_deleted WHERE tenant_id = ? ORDER BY deleted_at DESC",
                 (tenant_id,)
             ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def mark_nostalgia_used(self, snippet_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("UPDATE nostalgia_snippets SET last_used = CURRENT_TIMESTAMP WHERE id = ?", (snippet_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def log_narrative_stories(self, story_ids: list, tenant_id: int = None,
                               query: str = None):
         """Log which stories were used in a narrative reading."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             for sid in story_ids:
                 conn.execute("""
                     INSERT INTO narrative_log (tenant_id, story_id, query)
                     VALUES (?, ?, ?)
                 """, (tenant_id, sid, query))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_recently_narrated_story_ids(self, tenant_id: int, days: int = 7) -> set:
         """Get story IDs that were used in narratives within the last N days."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             rows = conn.execute("""
                 SELECT DISTINCT story_id FROM narrative_log
                 WHERE tenant_id = ? AND created_at > datetime('now', ?)
             """, (tenant_id, f"-{days} days")).fetchall()
             return {r[0] for r in rows}
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_story_last_narrated(self, tenant_id: int) -> dict:
         """Return {story_id: last_narrated_timestamp} for all stories ever narrated."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             rows = conn.execute("""
                 SELECT story_id, MAX(created_at) as last_used
                 FROM narrative_log WHERE tenant_id = ?
                 GROUP BY story_id
             """, (tenant_id,)).fetchall()
             return {r[0]: r[1] for r in rows}
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Story narratives (cached) ──
 
     def save_narrative(self, tenant_id: int, narrative: str, attribution: str = None,
                        story_ids: list = None, query: str = None) -> int:
         """Save a GPT-generated narrative for potential replay."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             ids_str = ",".join(str(s) for s in story_ids) if story_ids else None
             cursor = conn.execute("""
                 INSERT INTO story_narratives (tenant_id, narrative, attribution, story_ids, query)
@@ -3037,14 +3361,10 @@ class PollyDB:
             """, (tenant_id, narrative, attribution, ids_str, query))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_narratives(self, tenant_id: int, status: str = None) -> list:
         """Get saved narratives, optionally filtered by status."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if status:
                 rows = conn.execute(
@@ -3057,14 +3377,10 @@ class PollyDB:
                     (tenant_id,)
                 ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_narrative(self, narrative_id: int, tenant_id: int = None) -> dict:
         """Get a single narrative by ID."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 row = conn.execute(
@@ -3076,14 +3392,10 @@ class PollyDB:
                     "SELECT * FROM story_narratives WHERE id = ?", (narrative_id,)
                 ).fetchone()
             return dict(row) if row else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_kept_narrative_for_stories(self, tenant_id: int, story_ids: list) -> dict:
         """Find a kept narrative that uses the same story IDs."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             ids_str = ",".join(str(s) for s in sorted(story_ids))
             row = conn.execute(
@@ -3091,9 +3403,6 @@ class PollyDB:
                 (tenant_id, ids_str)
             ).fetchone()
             return dict(row) if row else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_narrative(self, narrative_id: int, narrative: str = None,
                          status: str = None, query: str = None):
@@ -3109,23 +3418,15 @@ class PollyDB:
         if not sets:
             return
         params.append(narrative_id)
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(f"UPDATE story_narratives SET {', '.join(sets)} WHERE id = ?", params)
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_narrative(self, narrative_id: int):
         """Delete a narrative."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("DELETE FROM story_narratives WHERE id = ?", (narrative_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def auto_tag_story(self, story_id: int, transcript: str, tenant_id: int = None):
         """Extract and save people, places, year tags from transcript.
@@ -3133,8 +3434,7 @@ class PollyDB:
         if not transcript:
             return
         import re
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Check existing tags to avoid duplicates
             existing = {(r[0], r[1]) for r in conn.execute(
                 "SELECT tag_type, tag_value FROM story_tags WHERE story_id = ?",
@@ -3261,9 +3561,6 @@ class PollyDB:
                 """, ("none", story_id))
 
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def _get_speaker_birth_year(self, conn, speaker_name: str,
                                 tenant_id: int) -> Optional[int]:
@@ -3407,8 +3704,7 @@ class PollyDB:
                     people: list = None, locations: list = None,
                     emotions: list = None, fingerprint: str = None,
                     tenant_id: int = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO memories (story_id, speaker, bucket, life_phase,
                     text_summary, text, people, locations, emotions, fingerprint, tenant_id)
@@ -3420,16 +3716,23 @@ class PollyDB:
                   fingerprint, tenant_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_memories(self, speaker: str = None, bucket: str = None,
                      life_phase: str = None, verification_status: str = None,
                      limit: int = 200, tenant_id: int = None,
                      in_book_only: bool = False) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        return self.get_memories_page(
+            speaker=speaker, bucket=bucket, life_phase=life_phase,
+            verification_status=verification_status, limit=limit,
+            tenant_id=tenant_id, in_book_only=in_book_only)[0]
+
+    def get_memories_page(self, cursor: str = None, limit: int = 50,
+                          speaker: str = None, bucket: str = None,
+                          life_phase: str = None, verification_status: str = None,
+                          tenant_id: int = None,
+                          in_book_only: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """Memories newest first, one keyset page. Returns (memories, next_cursor)."""
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             query = "SELECT * FROM memories WHERE 1=1"
             params = []
@@ -3452,27 +3755,18 @@ class PollyDB:
             if tenant_id:
                 query += " AND tenant_id = ?"
                 params.append(tenant_id)
-            query += " ORDER BY created_at DESC LIMIT ?"
-            params.append(limit)
-            results = conn.execute(query, params).fetchall()
-            rows = []
-            for r in results:
-                d = dict(r)
+            rows, next_cursor = keyset_page(conn, query, params, cursor, limit)
+            for d in rows:
                 # Parse JSON fields
                 for field in ("people", "locations", "emotions"):
                     try:
                         d[field] = json.loads(d[field]) if d[field] else []
                     except (json.JSONDecodeError, TypeError):
                         d[field] = []
-                rows.append(d)
-            return rows
-        finally:
-            if not self._conn:
-                conn.close()
+            return rows, next_cursor
 
     def get_memory_by_id(self, memory_id: int, tenant_id: int = None) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 result = conn.execute(
@@ -3492,16 +3786,12 @@ class PollyDB:
                 except (json.JSONDecodeError, TypeError):
                     d[field] = []
             return d
-        finally:
-            if not self._conn:
-                conn.close()
 
     def verify_memory(self, memory_id: int, verifier_name: str,
                       verifier_relationship: str = None,
                       status: str = "verified", notes: str = None,
                       tenant_id: int = None) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 conn.execute("""
                     UPDATE memories SET verification_status = ?, verified_by = ?,
@@ -3519,9 +3809,6 @@ class PollyDB:
             """, (memory_id, verifier_name, verifier_relationship, status, notes))
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Chapter drafts ──
 
@@ -3529,8 +3816,7 @@ class PollyDB:
                            bucket: str, life_phase: str,
                            memory_ids: str, content: str,
                            tenant_id: int = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO chapter_drafts
                     (chapter_number, title, bucket, life_phase, memory_ids, content, tenant_id)
@@ -3538,28 +3824,20 @@ class PollyDB:
             """, (chapter_number, title, bucket, life_phase, memory_ids, content, tenant_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_chapter_summary(self, draft_id: int, summary: str):
         """Save a 2-sentence summary for chapter continuity."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE chapter_drafts SET summary = ? WHERE id = ?",
                 (summary, draft_id)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def flag_chapters_for_refresh(self, bucket: str, life_phase: str,
                                    tenant_id: int = None):
         """Mark matching chapter drafts as needing refresh (new memory added)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 conn.execute("""
                     UPDATE chapter_drafts SET needs_refresh = 1
@@ -3571,26 +3849,18 @@ class PollyDB:
                     WHERE bucket = ? AND life_phase = ?
                 """, (bucket, life_phase))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def clear_chapter_refresh(self, draft_id: int):
         """Clear needs_refresh flag after regenerating a chapter."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE chapter_drafts SET needs_refresh = 0 WHERE id = ?",
                 (draft_id,)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_chapter_drafts(self, tenant_id: int = None) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 results = conn.execute(
@@ -3602,16 +3872,12 @@ class PollyDB:
                     "SELECT * FROM chapter_drafts ORDER BY chapter_number"
                 ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── User profiles ──
 
     def get_or_create_user(self, name: str = "Default User",
                            tenant_id: int = None) -> Dict:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 user = conn.execute(
@@ -3631,14 +3897,10 @@ class PollyDB:
                 "SELECT * FROM user_profiles WHERE id = ?", (cursor.lastrowid,)
             ).fetchone()
             return dict(user)
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_user_setup(self, user_id: int, name: str, owner_email: str,
                           caretaker_name: str, caretaker_email: str) -> None:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute("""
                 UPDATE user_profiles SET name = ?, owner_email = ?,
                 caretaker_name = ?, caretaker_email = ?,
@@ -3647,14 +3909,10 @@ class PollyDB:
             """, (name, owner_email or None, caretaker_name or None,
                   caretaker_email or None, user_id))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_owner_name(self, tenant_id: int = None) -> str:
         """Get the owner's name from user_profiles, or fallback."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 user = conn.execute(
@@ -3664,15 +3922,11 @@ class PollyDB:
             else:
                 user = conn.execute("SELECT name FROM user_profiles LIMIT 1").fetchone()
             return user["name"] if user else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Story verification ──
 
     def get_story_by_id(self, story_id: int, tenant_id: int = None) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 result = conn.execute(
@@ -3682,15 +3936,11 @@ class PollyDB:
             else:
                 result = conn.execute("SELECT * FROM stories WHERE id = ?", (story_id,)).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def verify_story(self, story_id: int, verified_by: str,
                      corrected_transcript: str = None,
                      tenant_id: int = None) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 if corrected_transcript:
                     conn.execute("""
@@ -3717,9 +3967,6 @@ class PollyDB:
                     """, (verified_by, story_id))
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Photos ──
 
@@ -3728,8 +3975,7 @@ class PollyDB:
                    tags: str = "[]", story_id: int = None,
                    uploaded_by: str = None, user_id: int = None,
                    tenant_id: int = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO photos (user_id, filename, original_name, caption,
                     date_taken, tags, story_id, uploaded_by, tenant_id)
@@ -3738,32 +3984,25 @@ class PollyDB:
                   tags, story_id, uploaded_by, tenant_id))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_photos(self, limit: int = 100, tenant_id: int = None, include_wall_only: bool = False) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        return self.get_photos_page(limit=limit, tenant_id=tenant_id,
+                                    include_wall_only=include_wall_only)[0]
+
+    def get_photos_page(self, cursor: str = None, limit: int = 48, tenant_id: int = None,
+                        include_wall_only: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """Photos newest first, one keyset page. Returns (photos, next_cursor)."""
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             wall_filter = "" if include_wall_only else " AND (wall_only IS NULL OR wall_only = 0)"
             if tenant_id:
-                results = conn.execute(
-                    f"SELECT * FROM photos WHERE tenant_id = ?{wall_filter} ORDER BY created_at DESC LIMIT ?",
-                    (tenant_id, limit)
-                ).fetchall()
-            else:
-                results = conn.execute(
-                    f"SELECT * FROM photos WHERE 1=1{wall_filter} ORDER BY created_at DESC LIMIT ?", (limit,)
-                ).fetchall()
-            return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
+                return keyset_page(conn, f"SELECT * FROM photos WHERE tenant_id = ?{wall_filter}",
+                                   [tenant_id], cursor, limit)
+            return keyset_page(conn, f"SELECT * FROM photos WHERE 1=1{wall_filter}",
+                               [], cursor, limit)
 
     def get_photo_by_id(self, photo_id: int, tenant_id: int = None) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if tenant_id:
                 result = conn.execute(
@@ -3773,15 +4012,11 @@ class PollyDB:
             else:
                 result = conn.execute("SELECT * FROM photos WHERE id = ?", (photo_id,)).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def update_photo(self, photo_id: int, caption: str = None,
                      date_taken: str = None, tags: str = None,
                      story_id: int = None, tenant_id: int = None) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 conn.execute("""
                     UPDATE photos SET caption = ?, date_taken = ?, tags = ?,
@@ -3794,14 +4029,10 @@ class PollyDB:
                 """, (caption, date_taken, tags, story_id, photo_id))
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_photos_by_tag(self, tag: str, tenant_id: int = None) -> List[Dict]:
         """Find photos whose JSON tags array contains the given tag (case-insensitive)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             tag_lower = tag.lower()
             if tenant_id:
@@ -3815,14 +4046,10 @@ class PollyDB:
                     (f'%"{tag_lower}"%',)
                 ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def link_photo_story(self, photo_id: int, story_id: int,
                          tenant_id: int = None) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 conn.execute(
                     "UPDATE photos SET story_id = ? WHERE id = ? AND tenant_id = ?",
@@ -3831,13 +4058,9 @@ class PollyDB:
                 conn.execute("UPDATE photos SET story_id = ? WHERE id = ?", (story_id, photo_id))
             conn.commit()
             return True
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_photo(self, photo_id: int, tenant_id: int = None) -> bool:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 cursor = conn.execute(
                     "DELETE FROM photos WHERE id = ? AND tenant_id = ?",
@@ -3846,9 +4069,6 @@ class PollyDB:
                 cursor = conn.execute("DELETE FROM photos WHERE id = ?", (photo_id,))
             conn.commit()
             return cursor.rowcount > 0
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Family Message Board ──
 
@@ -3856,8 +4076,7 @@ class PollyDB:
                      tenant_id: int = None, expire_hours: int = 24,
                      device_id: str = None, audio_filename: str = None) -> int:
         """Save a message. device_id=None means all devices. audio_filename for voice messages."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 """INSERT INTO family_messages (tenant_id, from_name, to_name, message, expires_at, device_id, audio_filename)
                    VALUES (?, ?, ?, ?, datetime('now', ?), ?, ?)""",
@@ -3865,17 +4084,13 @@ class PollyDB:
             )
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_messages_for(self, name: str = None, tenant_id: int = None,
                          device_id: str = None) -> list:
         """Get unread/active messages, optionally filtered by recipient and device.
         device_id: if provided, returns messages for that device + all-device messages (NULL).
         If not provided, returns all messages (for web portal display)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
@@ -3900,14 +4115,10 @@ class PollyDB:
                     t_params + d_params
                 ).fetchall()
             return [dict(r) for r in results]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_person_status(self, name: str, tenant_id: int = None) -> dict:
         """Get the most recent message FROM a person (their status)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
@@ -3920,14 +4131,10 @@ class PollyDB:
                 (name.lower(),) + t_params
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def clear_person_messages(self, from_name: str, tenant_id: int = None):
         """Clear all messages from a person (they're back home)."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
             conn.execute(
@@ -3935,14 +4142,10 @@ class PollyDB:
                 (from_name.lower(),) + t_params
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_message(self, message_id: int, tenant_id: int = None):
         """Delete a single message by ID."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             t_clause = " AND tenant_id = ?" if tenant_id else ""
             t_params = (tenant_id,) if tenant_id else ()
             conn.execute(
@@ -3950,54 +4153,38 @@ class PollyDB:
                 (message_id,) + t_params
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def clear_all_messages(self, tenant_id: int = None):
         """Delete all messages for a tenant."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             if tenant_id:
                 conn.execute("DELETE FROM family_messages WHERE tenant_id = ?", (tenant_id,))
             else:
                 conn.execute("DELETE FROM family_messages")
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Firmware OTA management ──
 
     def update_device_firmware_info(self, device_id: str, fw_version: str, fw_variant: str):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 "UPDATE devices SET fw_version = ?, fw_variant = ? WHERE device_id = ?",
                 (fw_version, fw_variant, device_id)
             )
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def save_firmware_version(self, variant: str, version: str, filename: str,
                               file_size: int, file_hash: str, release_notes: str = None) -> int:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO firmware_versions (variant, version, filename, file_size, file_hash, release_notes)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (variant, version, filename, file_size, file_hash, release_notes))
             conn.commit()
             return cursor.lastrowid
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_firmware_versions(self, variant: str = None) -> List[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             if variant:
                 rows = conn.execute(
@@ -4009,38 +4196,26 @@ class PollyDB:
                     "SELECT * FROM firmware_versions ORDER BY uploaded_at DESC"
                 ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_active_firmware(self, variant: str) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM firmware_versions WHERE variant = ? AND is_active = 1",
                 (variant,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_firmware_by_id(self, firmware_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             result = conn.execute(
                 "SELECT * FROM firmware_versions WHERE id = ?", (firmware_id,)
             ).fetchone()
             return dict(result) if result else None
-        finally:
-            if not self._conn:
-                conn.close()
 
     def set_active_firmware(self, firmware_id: int):
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             # Get variant of the target firmware
             row = conn.execute("SELECT variant FROM firmware_versions WHERE id = ?", (firmware_id,)).fetchone()
             if not row:
@@ -4050,14 +4225,10 @@ class PollyDB:
             conn.execute("UPDATE firmware_versions SET is_active = 0 WHERE variant = ?", (variant,))
             conn.execute("UPDATE firmware_versions SET is_active = 1 WHERE id = ?", (firmware_id,))
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
 
     def delete_firmware_version(self, firmware_id: int) -> Optional[str]:
         """Delete a firmware version. Returns filename if deleted, None if active."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             row = conn.execute(
                 "SELECT filename, is_active FROM firmware_versions WHERE id = ?", (firmware_id,)
             ).fetchone()
@@ -4068,9 +4239,6 @@ class PollyDB:
             conn.execute("DELETE FROM firmware_versions WHERE id = ?", (firmware_id,))
             conn.commit()
             return row[0]
-        finally:
-            if not self._conn:
-                conn.close()
 
     # ── Admin dashboard (cross-tenant) ──
 
@@ -4078,103 +4246,277 @@ class PollyDB:
                          event_type: str, intent: str = None,
                          success: int = 1, detail: str = None):
         """Insert a device event row for admin telemetry."""
-        conn = self._get_connection()
-        try:
-            conn.execute(
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self.log_device_events([(device_id, tenant_id, event_type, intent, success,
+                                 detail, created_at)])
+
+    def log_device_events(self, rows: list):
+        """Insert a batch of (device_id, tenant_id, event_type, intent, success,
+        detail, created_at) rows in one transaction (TelemetryWriter), bumping
+        the admin rollups in the same transaction."""
+        with self.connection() as conn:
+            conn.executemany(
                 """INSERT INTO device_events
-                   (device_id, tenant_id, event_type, intent, success, detail)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (device_id, tenant_id, event_type, intent, success, detail),
+                   (device_id, tenant_id, event_type, intent, success, detail, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows,
             )
+            self._bump_admin_rollups(conn, [(r[0], r[2], r[3], r[6]) for r in rows])
             conn.commit()
-        finally:
-            if not self._conn:
-                conn.close()
+
+    @staticmethod
+    def _bump_admin_rollups(conn, events):
+        """Fold (device_id, event_type, intent, created_at) events into
+        device_event_hourly / intent_daily / device_activity. created_at is
+        UTC 'YYYY-MM-DD HH:MM:SS'."""
+        hourly: Dict[tuple, int] = {}
+        intents: Dict[tuple, int] = {}
+        last_command: Dict[str, str] = {}
+        for device_id, event_type, intent, created_at in events:
+            key = (created_at[:13], device_id, event_type)
+            hourly[key] = hourly.get(key, 0) + 1
+            if event_type == "command":
+                if intent:
+                    key = (created_at[:10], intent)
+                    intents[key] = intents.get(key, 0) + 1
+                if created_at > last_command.get(device_id, ""):
+                    last_command[device_id] = created_at
+        conn.executemany("""
+            INSERT INTO device_event_hourly (hour, device_id, event_type, count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(hour, device_id, event_type) DO UPDATE SET count = count + excluded.count
+        """, [k + (n,) for k, n in hourly.items()])
+        conn.executemany("""
+            INSERT INTO intent_daily (day, intent, count) VALUES (?, ?, ?)
+            ON CONFLICT(day, intent) DO UPDATE SET count = count + excluded.count
+        """, [k + (n,) for k, n in intents.items()])
+        conn.executemany("""
+            INSERT INTO device_activity (device_id, last_command_at) VALUES (?, ?)
+            ON CONFLICT(device_id) DO UPDATE SET last_command_at =
+                MAX(COALESCE(last_command_at, ''), excluded.last_command_at)
+        """, list(last_command.items()))
+
+    def rebuild_admin_rollups(self, batch_size: int = 5000) -> int:
+        """Recompute the admin dashboard rollups from device_events and
+        stories (schema v5 backfill, or repair). Returns the number of
+        device_events rows folded in."""
+        with self.connection() as conn:
+            for table in ("device_event_hourly", "intent_daily", "device_activity",
+                          "story_counts"):
+                conn.execute(f"DELETE FROM {table}")
+            cursor = conn.execute(
+                "SELECT device_id, event_type, intent, created_at FROM device_events "
+                "WHERE created_at IS NOT NULL ORDER BY id")
+            folded = 0
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                self._bump_admin_rollups(conn, batch)
+                folded += len(batch)
+            conn.execute("""
+                INSERT INTO story_counts (tenant_key, total)
+                SELECT COALESCE(tenant_id, 0), COUNT(*) FROM stories GROUP BY 1
+            """)
+            conn.commit()
+            return folded
+
+    # ── Retention / archival (batched, see core/maintenance.py) ──
+
+    def archive_device_events(self, before: str, limit: int = 500,
+                              archive_path: str = None) -> int:
+        """Move up to `limit` device_events rows created before `before` (UTC
+        'YYYY-MM-DD HH:MM:SS') into monthly device_events_YYYY_MM tables, in
+        the database file at archive_path (attached for the call) or in this
+        one when None. Re-running after a crash is safe. Returns rows moved."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, device_id, tenant_id, event_type, intent, success, detail, created_at "
+                "FROM device_events WHERE created_at < ? ORDER BY id LIMIT ?",
+                (before, limit)).fetchall()
+            if not rows:
+                return 0
+            schema = "main"
+            if archive_path:
+                conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+                schema = "archive"
+            try:
+                by_month: Dict[str, list] = {}
+                for row in rows:
+                    month = str(row[7])[:7]
+                    if not re.fullmatch(r"\d{4}-\d{2}", month):
+                        month = "0000-00"
+                    by_month.setdefault(month.replace("-", "_"), []).append(row)
+                for month, batch in by_month.items():
+                    table = f"{schema}.device_events_{month}"
+                    conn.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {table} (
+                            id INTEGER PRIMARY KEY,
+                            device_id TEXT NOT NULL,
+                            tenant_id INTEGER,
+                            event_type TEXT NOT NULL,
+                            intent TEXT,
+                            success INTEGER,
+                            detail TEXT,
+                            created_at TIMESTAMP
+                        )
+                    """)
+                    conn.executemany(f"INSERT OR IGNORE INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                     batch)
+                conn.executemany("DELETE FROM device_events WHERE id = ?",
+                                 [(row[0],) for row in rows])
+                conn.commit()
+            finally:
+                if archive_path:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    conn.execute("DETACH DATABASE archive")
+            return len(rows)
+
+    def purge_expired_messages(self, older_than_days: int, limit: int = 500) -> int:
+        """Delete up to `limit` family messages that expired more than N days
+        ago, keeping any still shown on a shared wall. Returns rows deleted."""
+        with self.connection() as conn:
+            cur = conn.execute("""
+                DELETE FROM family_messages WHERE id IN (
+                    SELECT id FROM family_messages
+                    WHERE expires_at < datetime('now', ?)
+                    AND id NOT IN (SELECT content_id FROM shared_wall_items
+                                   WHERE content_type = 'message' AND content_id IS NOT NULL)
+                    LIMIT ?)
+            """, (f"-{int(older_than_days)} days", limit))
+            conn.commit()
+            return cur.rowcount
+
+    def compact_narrative_log(self, older_than_days: int, limit: int = 500) -> int:
+        """Delete up to `limit` narrative_log rows older than N days that are
+        not their story's latest reading, so get_story_last_narrated() is
+        unchanged. Returns rows deleted."""
+        with self.connection() as conn:
+            cur = conn.execute("""
+                DELETE FROM narrative_log WHERE id IN (
+                    SELECT n.id FROM narrative_log n
+                    WHERE n.created_at < datetime('now', ?)
+                    AND EXISTS (SELECT 1 FROM narrative_log m
+                                WHERE m.story_id = n.story_id AND m.tenant_id IS n.tenant_id
+                                AND (m.created_at, m.id) > (n.created_at, n.id))
+                    LIMIT ?)
+            """, (f"-{int(older_than_days)} days", limit))
+            conn.commit()
+            return cur.rowcount
+
+    def prune_admin_rollups(self, older_than_days: int, limit: int = 500) -> int:
+        """Delete up to `limit` hourly and daily admin rollup rows older than
+        N days. Returns rows deleted."""
+        age = f"-{int(older_than_days)} days"
+        with self.connection() as conn:
+            hourly = conn.execute("""
+                DELETE FROM device_event_hourly WHERE (hour, device_id, event_type) IN (
+                    SELECT hour, device_id, event_type FROM device_event_hourly
+                    WHERE hour < strftime('%Y-%m-%d %H', 'now', ?) LIMIT ?)
+            """, (age, limit)).rowcount
+            daily = conn.execute("""
+                DELETE FROM intent_daily WHERE (day, intent) IN (
+                    SELECT day, intent FROM intent_daily WHERE day < date('now', ?) LIMIT ?)
+            """, (age, limit)).rowcount
+            conn.commit()
+            return hourly + daily
+
+    def optimize(self, vacuum_pages: int = 2000) -> Dict:
+        """PRAGMA optimize, then return up to `vacuum_pages` free pages to the
+        OS when the file uses incremental auto_vacuum."""
+        with self.connection() as conn:
+            conn.execute("PRAGMA optimize")
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if before and conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                # execute() steps it once (one page); executescript runs it out
+                conn.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return {"vacuumed_pages": before - after, "free_pages": after}
 
     def get_admin_dashboard_stats(self) -> Dict:
         """Cross-tenant stats for the admin dashboard."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             total_devices = conn.execute("SELECT COUNT(*) FROM devices").fetchone()[0]
-            # Online = last_seen within 5 minutes
-            online_devices = conn.execute(
-                "SELECT COUNT(*) FROM devices WHERE last_seen > datetime('now', '-5 minutes')"
-            ).fetchone()[0]
+            # Online = last_seen within 5 minutes (including unflushed heartbeats)
+            cutoff = conn.execute("SELECT datetime('now', '-5 minutes')").fetchone()[0]
+            last_seen = self._merge_last_seen([
+                {"device_id": r[0], "last_seen": r[1]}
+                for r in conn.execute("SELECT device_id, last_seen FROM devices").fetchall()])
+            online_devices = sum(1 for d in last_seen if (d["last_seen"] or "") > cutoff)
             total_tenants = conn.execute("SELECT COUNT(*) FROM tenants").fetchone()[0]
-            total_stories = conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+            total_stories = conn.execute(
+                "SELECT COALESCE(SUM(total), 0) FROM story_counts").fetchone()[0]
             total_stories_today = conn.execute(
                 "SELECT COUNT(*) FROM stories WHERE created_at > datetime('now', '-1 day')"
             ).fetchone()[0]
-            total_commands_today = conn.execute(
-                "SELECT COUNT(*) FROM device_events WHERE event_type = 'command' AND created_at > datetime('now', '-1 day')"
-            ).fetchone()[0]
-            total_errors_today = conn.execute(
-                "SELECT COUNT(*) FROM device_events WHERE event_type = 'error' AND created_at > datetime('now', '-1 day')"
-            ).fetchone()[0]
+            today = dict(conn.execute(
+                "SELECT event_type, SUM(count) FROM device_event_hourly "
+                "WHERE hour >= ? AND event_type IN ('command', 'error') GROUP BY event_type",
+                (self._rollup_day_start(conn),)).fetchall())
             return {
                 "total_devices": total_devices,
                 "online_devices": online_devices,
                 "total_tenants": total_tenants,
                 "total_stories": total_stories,
                 "total_stories_today": total_stories_today,
-                "total_commands_today": total_commands_today,
-                "total_errors_today": total_errors_today,
+                "total_commands_today": today.get("command", 0),
+                "total_errors_today": today.get("error", 0),
             }
-        finally:
-            if not self._conn:
-                conn.close()
+
+    @staticmethod
+    def _rollup_day_start(conn) -> str:
+        """First device_event_hourly bucket of the "today" (last 24 h)
+        window; counting whole hours makes it 24-25 h wide."""
+        return conn.execute("SELECT strftime('%Y-%m-%d %H', 'now', '-1 day')").fetchone()[0]
 
     def get_admin_device_list(self) -> List[Dict]:
         """All devices with tenant name, firmware info, and event counts."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             rows = conn.execute("""
                 SELECT d.device_id, d.name, d.last_seen, d.fw_version, d.fw_variant,
                        d.tenant_id, COALESCE(t.name, 'Unclaimed') AS tenant_name,
-                       (SELECT COUNT(*) FROM device_events e
-                        WHERE e.device_id = d.device_id AND e.event_type = 'command'
-                        AND e.created_at > datetime('now', '-1 day')) AS commands_today,
-                       (SELECT COUNT(*) FROM device_events e
-                        WHERE e.device_id = d.device_id AND e.event_type = 'error'
-                        AND e.created_at > datetime('now', '-1 day')) AS errors_today,
-                       (SELECT COUNT(*) FROM stories s
-                        WHERE d.tenant_id IS NOT NULL AND s.tenant_id = d.tenant_id) AS stories_total,
-                       (SELECT e.created_at FROM device_events e
-                        WHERE e.device_id = d.device_id AND e.event_type = 'command'
-                        ORDER BY e.created_at DESC LIMIT 1) AS last_command
+                       COALESCE(h.commands, 0) AS commands_today,
+                       COALESCE(h.errors, 0) AS errors_today,
+                       CASE WHEN d.tenant_id IS NULL THEN 0
+                            ELSE COALESCE(sc.total, 0) END AS stories_total,
+                       a.last_command_at AS last_command
                 FROM devices d
                 LEFT JOIN tenants t ON d.tenant_id = t.id
+                LEFT JOIN (
+                    SELECT device_id,
+                           SUM(CASE WHEN event_type = 'command' THEN count ELSE 0 END) AS commands,
+                           SUM(CASE WHEN event_type = 'error' THEN count ELSE 0 END) AS errors
+                    FROM device_event_hourly WHERE hour >= ? GROUP BY device_id
+                ) h ON h.device_id = d.device_id
+                LEFT JOIN story_counts sc ON sc.tenant_key = d.tenant_id
+                LEFT JOIN device_activity a ON a.device_id = d.device_id
                 ORDER BY d.last_seen DESC
-            """).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
+            """, (self._rollup_day_start(conn),)).fetchall()
+            devices = self._merge_last_seen([dict(r) for r in rows])
+            if self.heartbeats:
+                devices.sort(key=lambda d: d["last_seen"] or "", reverse=True)
+            return devices
 
     def get_admin_intent_stats(self, days: int = 7) -> List[Dict]:
         """Intent usage counts for the last N days, ordered by count DESC."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
+            # Whole UTC days, so the window is days..days+1 days wide
             rows = conn.execute(
-                """SELECT intent, COUNT(*) AS cnt
-                   FROM device_events
-                   WHERE event_type = 'command' AND intent IS NOT NULL
-                     AND created_at > datetime('now', ? || ' days')
+                """SELECT intent, SUM(count) AS cnt
+                   FROM intent_daily
+                   WHERE day >= date('now', ? || ' days')
                    GROUP BY intent
                    ORDER BY cnt DESC""",
                 (f"-{days}",),
             ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
 
     def get_admin_error_log(self, limit: int = 50) -> List[Dict]:
         """Recent error events with device_id and detail."""
-        conn = self._get_connection()
-        try:
+        with self.connection() as conn:
             conn.row_factory = sqlite3.Row
             rows = conn.execute(
                 """SELECT device_id, tenant_id, detail, created_at
@@ -4185,6 +4527,34 @@ class PollyDB:
                 (limit,),
             ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            if not self._conn:
-                conn.close()
+
+    # ── Runtime state snapshots ──
+
+    def save_runtime_state(self, snapshots: Dict[str, object]):
+        """Upsert JSON snapshots (name -> payload) in one transaction."""
+        with self.connection() as conn:
+            conn.executemany(
+                """INSERT INTO runtime_state (name, payload, saved_at)
+                   VALUES (?, ?, CURRENT_TIMESTAMP)
+                   ON CONFLICT(name) DO UPDATE SET
+                     payload = excluded.payload, saved_at = excluded.saved_at""",
+                [(name, json.dumps(payload, separators=(",", ":")))
+                 for name, payload in snapshots.items()],
+            )
+            conn.commit()
+
+    def get_runtime_state(self, max_age_seconds: int = None) -> Dict[str, object]:
+        """Load saved snapshots, skipping any older than max_age_seconds."""
+        with self.connection() as conn:
+            sql = "SELECT name, payload FROM runtime_state"
+            params = ()
+            if max_age_seconds is not None:
+                sql += " WHERE saved_at > datetime('now', ? || ' seconds')"
+                params = (f"-{int(max_age_seconds)}",)
+            result = {}
+            for name, payload in conn.execute(sql, params).fetchall():
+                try:
+                    result[name] = json.loads(payload)
+                except ValueError:
+                    continue
+            return result
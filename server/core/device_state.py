@@ -0,0 +1,280 @@
+"""
+Bounded per-device state for Polly Connect.
+
+Long-lived in-memory maps keyed by device_id (or speaker) use
+DeviceStateStore instead of a plain dict so device churn, test devices and
+REST client ids can't grow memory forever. Every entry remembers when it
+was last touched; entries idle longer than the store's TTL are dropped, and
+the least recently used ones go first once a store is full. Devices with an
+open WebSocket are never evicted — disconnecting counts as activity, so a
+device's state survives brief reconnects for a full TTL.
+
+Stores are shared between the event loop and blocking handlers running on
+asyncio.to_thread workers, so every access to the underlying dict takes
+the store's lock. Eviction callbacks run after the lock is released.
+"""
+
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600   # idle devices are forgotten after a day
+DEFAULT_MAX_ENTRIES = 1000        # per store; far above any real household fleet
+SWEEP_INTERVAL_SECONDS = 60       # writes trigger a TTL sweep at most this often
+
+# device_id -> number of open WebSocket connections
+_connected: Counter = Counter()
+
+# Weak references to every live store, for sweep_all() and memory_report()
+_stores: List[weakref.ref] = []
+
+
+def mark_connected(device_id: str):
+    """Pin a device's state while its WebSocket is open."""
+    _connected[device_id] += 1
+
+
+def mark_disconnected(device_id: str):
+    """Unpin a device and restart its idle clock in every store."""
+    if _connected[device_id] > 1:
+        _connected[device_id] -= 1
+        return
+    _connected.pop(device_id, None)
+    for store in _live_stores():
+        if store.pin_connected:
+            store.touch(device_id)
+
+
+def is_connected(device_id) -> bool:
+    return _connected.get(device_id, 0) > 0
+
+
+def _live_stores() -> List["DeviceStateStore"]:
+    live = []
+    for ref in list(_stores):
+        store = ref()
+        if store is None:
+            _stores.remove(ref)
+        else:
+            live.append(store)
+    return live
+
+
+class _Entry:
+    __slots__ = ("value", "last_active")
+
+    def __init__(self, value, last_active: float):
+        self.value = value
+        self.last_active = last_active
+
+
+class DeviceStateStore(MutableMapping):
+    """Dict-like map with last-activity tracking and TTL/LRU eviction.
+
+    Reads and writes count as activity; membership tests (`in`) and
+    iteration don't. `on_evict(key, value)` runs for every evicted entry,
+    e.g. to cancel a per-device task. Thread-safe.
+    """
+
+    def __init__(self, name: str, ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 on_evict: Optional[Callable[[Any, Any], None]] = None,
+                 pin_connected: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.pin_connected = pin_connected
+        self.evictions = 0
+        self._clock = clock
+        self._data: "OrderedDict[Any, _Entry]" = OrderedDict()  # least recently active first
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+        _stores.append(weakref.ref(self))
+
+    # ── Mapping protocol ────────────────────────────────────────────
+
+    def __getitem__(self, key):
+        with self._lock:
+            entry = self._data[key]
+            entry.last_active = self._clock()
+            self._data.move_to_end(key)
+            return entry.value
+
+    def __setitem__(self, key, value):
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._data[key] = _Entry(value, now)
+            else:
+                entry.value = value
+                entry.last_active = now
+                self._data.move_to_end(key)
+            due = (len(self._data) > self.max_entries
+                   or now - self._last_sweep >= SWEEP_INTERVAL_SECONDS)
+        if due:
+            self.evict(now)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __iter__(self) -> Iterator:
+        with self._lock:
+            return iter(list(self._data))  # snapshot: callers may delete while iterating
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            entry.last_active = self._clock()
+            self._data.move_to_end(key)
+            return entry.value
+
+    def pop(self, key, *default):
+        with self._lock:
+            if key in self._data:
+                return self._data.pop(key).value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def items(self):
+        with self._lock:
+            return [(key, entry.value) for key, entry in self._data.items()]
+
+    def values(self):
+        with self._lock:
+            return [entry.value for entry in self._data.values()]
+
+    def __repr__(self) -> str:
+        return f"DeviceStateStore({self.name!r}, {len(self._data)} entries)"
+
+    # ── Activity and eviction ───────────────────────────────────────
+
+    def touch(self, key):
+        """Record activity for a key without reading or changing its value."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                entry.last_active = self._clock()
+                self._data.move_to_end(key)
+
+    def idle_seconds(self, key) -> Optional[float]:
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else self._clock() - entry.last_active
+
+    def _pinned(self, key) -> bool:
+        return self.pin_connected and is_connected(key)
+
+    def evict(self, now: float = None) -> int:
+        """Drop expired entries, then LRU entries over capacity. Returns count."""
+        now = self._clock() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            victims = []
+
+            if self.ttl_seconds is not None:
+                cutoff = now - self.ttl_seconds
+                for key, entry in self._data.items():
+                    if entry.last_active > cutoff:
+                        break  # ordered by activity — everything after is newer
+                    if not self._pinned(key):
+                        victims.append(key)
+
+            overflow = len(self._data) - len(victims) - self.max_entries
+            if overflow > 0:
+                doomed = set(victims)
+                for key in self._data:
+                    if overflow <= 0:
+                        break
+                    if key not in doomed and not self._pinned(key):
+                        victims.append(key)
+                        overflow -= 1
+
+            evicted = [(key, self._data.pop(key).value) for key in victims]
+            self.evictions += len(evicted)
+
+        for key, value in evicted:
+            if self.on_evict:
+                try:
+                    self.on_evict(key, value)
+                except Exception as e:
+                    logger.error(f"{self.name}: eviction callback failed for {key}: {e}")
+        if victims:
+            logger.debug(f"{self.name}: evicted {len(victims)} idle entries")
+        return len(victims)
+
+    # ── Reporting ───────────────────────────────────────────────────
+
+    def memory_usage(self) -> Dict:
+        now = self._clock()
+        with self._lock:
+            entries = list(self._data.items())
+        approx = sys.getsizeof(self._data)
+        pinned = 0
+        for key, entry in entries:
+            approx += sys.getsizeof(entry) + _approx_size(key) + _approx_size(entry.value)
+            if self._pinned(key):
+                pinned += 1
+        oldest = entries[0][1] if entries else None
+        return {
+            "entries": len(entries),
+            "pinned": pinned,
+            "approx_bytes": approx,
+            "evictions": self.evictions,
+            "oldest_idle_s": round(now - oldest.last_active, 1) if oldest else 0.0,
+        }
+
+
+def _approx_size(obj, depth: int = 2) -> int:
+    """Shallow-ish sizeof: follows containers and instance attrs `depth` levels."""
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k, depth - 1) + _approx_size(v, depth - 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_approx_size(v, depth - 1) for v in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += _approx_size(vars(obj), depth - 1)
+    return size
+
+
+def sweep_all() -> int:
+    """Run eviction on every live store. Returns total entries evicted."""
+    return sum(store.evict() for store in _live_stores())
+
+
+def memory_report() -> Dict[str, Dict]:
+    """Per-store-name usage, summed across instances, largest first."""
+    report: Dict[str, Dict] = {}
+    for store in _live_stores():
+        usage = store.memory_usage()
+        agg = report.setdefault(store.name, {
+            "instances": 0, "entries": 0, "pinned": 0,
+            "approx_bytes": 0, "evictions": 0, "oldest_idle_s": 0.0,
+        })
+        agg["instances"] += 1
+        for field in ("entries", "pinned", "approx_bytes", "evictions"):
+            agg[field] += usage[field]
+        agg["oldest_idle_s"] = max(agg["oldest_idle_s"], usage["oldest_idle_s"])
+    return dict(sorted(report.items(), key=lambda kv: kv[1]["approx_bytes"], reverse=True))
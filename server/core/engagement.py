@@ -13,6 +13,8 @@ import logging
 import random
 from typing import Dict, List, Optional, Set
 
+from core.device_state import DeviceStateStore
+
 logger = logging.getLogger(__name__)
 
 # Perspective rotation — after basic collection, revisit from these angles
@@ -66,7 +68,9 @@ class EngagementTracker:
     def __init__(self, db, narrative_arc=None):
         self.db = db
         self.arc = narrative_arc
-        self._asked_questions: Dict[str, Set[str]] = {}  # speaker -> set of question IDs
+        # speaker -> set of question IDs; speakers aren't devices, so never pinned
+        self._asked_questions: Dict[str, Set[str]] = DeviceStateStore(
+            "engagement.asked_questions", ttl_seconds=7 * 24 * 3600, pin_connected=False)
 
     def select_question(self, data_loader, speaker: str = None,
                         tenant_id: int = None) -> Optional[Dict]:
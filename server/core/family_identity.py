@@ -108,16 +108,12 @@ class FamilyIdentityService:
         """Update the relationship for an existing family member."""
         member = self.db.find_family_member(name, tenant_id=tenant_id)
         if member:
-            conn = self.db._get_connection()
-            try:
+            with self.db.connection() as conn:
                 conn.execute(
                     "UPDATE family_members SET relationship = ? WHERE id = ?",
                     (relationship, member["id"])
                 )
                 conn.commit()
-            finally:
-                if not self.db._conn:
-                    conn.close()
             member["relationship"] = relationship
             logger.info(f"Updated relationship for {name}: {relationship}")
             return member
@@ -0,0 +1,116 @@
+"""
+Coalesced device heartbeats and web session touches.
+
+Devices ping every ~30 s and every portal request touches its session; each
+used to be its own UPDATE + commit. HeartbeatTracker keeps only the latest
+timestamp per device / session in memory and writes them all in one
+transaction every HEARTBEAT_FLUSH_SECONDS.
+
+Attached as `db.heartbeats`, PollyDB.update_device_last_seen() and
+touch_web_session() record here instead of writing, and device/session reads
+overlay the pending timestamps so "online" status never looks stale.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_FLUSH_SECONDS = 45
+
+
+def _utc_now() -> str:
+    # Same text format as SQLite CURRENT_TIMESTAMP, so values compare as strings
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class HeartbeatTracker:
+    def __init__(self, adb, interval: float = HEARTBEAT_FLUSH_SECONDS):
+        self.adb = adb
+        self.db = adb.db
+        self.interval = interval
+        self._lock = threading.Lock()  # recorded from executor threads too
+        self._devices: Dict[str, str] = {}
+        self._sessions: Dict[str, str] = {}
+        self._task = None
+        self.recorded = 0
+        self.written = 0
+
+    def attach(self):
+        """Route PollyDB heartbeat writes through this tracker."""
+        self.db.heartbeats = self
+        return self
+
+    def device_seen(self, device_id: str, when: str = None):
+        with self._lock:
+            self._devices[device_id] = when or _utc_now()
+            self.recorded += 1
+
+    def session_touched(self, session_id: str, when: str = None):
+        with self._lock:
+            self._sessions[session_id] = when or _utc_now()
+            self.recorded += 1
+
+    def forget_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def device_last_seen(self, device_id: str) -> Optional[str]:
+        with self._lock:
+            return self._devices.get(device_id)
+
+    def session_last_active(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def pending_devices(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._devices)
+
+    def flush(self) -> int:
+        """Write every pending timestamp in one transaction (blocking)."""
+        with self._lock:
+            devices, self._devices = self._devices, {}
+            sessions, self._sessions = self._sessions, {}
+        if not devices and not sessions:
+            return 0
+        try:
+            self.db.write_heartbeats(devices, sessions)
+        except Exception as e:
+            logger.error(f"Heartbeat flush failed: {e}")
+            with self._lock:
+                # Keep whichever is newer: a retry must not roll a timestamp back
+                for pending, failed in ((self._devices, devices), (self._sessions, sessions)):
+                    for key, ts in failed.items():
+                        if ts > pending.get(key, ""):
+                            pending[key] = ts
+            return 0
+        self.written += len(devices) + len(sessions)
+        return len(devices) + len(sessions)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the loop and write what is still pending."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.adb.write(self.flush)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.adb.write(self.flush)
+            except Exception as e:
+                logger.error(f"Heartbeat flush error: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._devices) + len(self._sessions)
+        return {"pending": pending, "recorded": self.recorded, "written": self.written}
@@ -3,7 +3,102 @@ Intent Parser for Polly Connect
 """
 
 import re
-from typing import Dict, Optional
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Hashable, Optional, Sequence, Set, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _at_boundary(text: str, pos: int) -> bool:
+    """Same test as regex \\b: word-ness differs on either side of pos."""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over many phrase groups.
+
+    Each group is a key plus a list of phrases. find() walks the text once
+    and returns the keys of every group with at least one phrase in it.
+    Groups added with short_word_boundary=True follow IntentParser._matches:
+    phrases of 3 characters or fewer only count on word boundaries
+    ("um" must not fire inside "drum"), longer ones are plain substrings.
+    """
+
+    def __init__(self, groups: Sequence[Tuple[Hashable, Sequence[str], bool]]):
+        goto = [{}]
+        raw_out = [[]]
+        for key, phrases, short_word_boundary in groups:
+            for phrase in phrases:
+                if not phrase:
+                    continue
+                node = 0
+                for ch in phrase:
+                    nxt = goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[node][ch] = nxt
+                        goto.append({})
+                        raw_out.append([])
+                    node = nxt
+                boundary = short_word_boundary and len(phrase) <= 3
+                raw_out[node].append((key, len(phrase), boundary))
+
+        # Breadth-first fail links; each node inherits the outputs of its
+        # fail target so find() never has to walk the fail chain for hits.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                raw_out[child] = raw_out[child] + raw_out[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._always = []   # per node: keys that hit unconditionally
+        self._bounded = []  # per node: (key, length) needing a \b check
+        for outputs in raw_out:
+            always = frozenset(k for k, _, b in outputs if not b)
+            bounded = tuple({(k, n) for k, n, b in outputs
+                             if b and k not in always})
+            self._always.append(always or None)
+            self._bounded.append(bounded or None)
+
+    def find(self, text: str) -> Set[Hashable]:
+        hits = set()
+        goto, fail = self._goto, self._fail
+        always, bounded = self._always, self._bounded
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if always[node] is not None:
+                hits.update(always[node])
+            if bounded[node] is not None:
+                end = i + 1
+                for key, length in bounded[node]:
+                    if (key not in hits and _at_boundary(text, end)
+                            and _at_boundary(text, end - length)):
+                        hits.add(key)
+        return hits
+
+
+@lru_cache(maxsize=8)
+def _compile_matcher(groups: Tuple[Tuple[Hashable, Tuple[str, ...], bool], ...]) -> PhraseMatcher:
+    # Every IntentParser carries the same phrase lists, so they share one automaton
+    return PhraseMatcher(groups)
 
 
 class IntentParser:
@@ -293,6 +388,72 @@ class IntentParser:
             "who is", "who's",
         ]
 
+        # Prayer themes — first matching entry wins, so order matters
+        self._prayer_themes = [
+            # Time-based
+            ("rest", ["bedtime", "goodnight", "nighttime", "evening", "sleep"]),
+            ("strength", ["morning", "start the day", "new day"]),
+            # Emotional categories
+            ("anxiety", ["worried", "worry", "anxious", "anxiety", "scared", "fear", "nervous"]),
+            ("grief", ["miss him", "miss her", "miss them", "passed away", "lost", "grief", "heaven"]),
+            ("loneliness", ["alone", "lonely", "loneliness", "isolated", "by myself"]),
+            ("strength", ["hard day", "tough", "struggling", "difficult", "having a hard"]),
+            ("healing", ["heal", "healing", "sick", "health", "surgery", "doctor", "pain"]),
+            ("forgiveness", ["forgive", "forgiveness", "let go", "bitter", "angry"]),
+            ("peace", ["peace", "calm", "quiet", "still", "rest", "comfort", "grace", "mercy"]),
+            ("hope", ["hope", "hopeful", "hopeless", "feeling down", "feeling low", "down"]),
+            ("strength", ["strength", "strong", "courage", "brave", "resilience", "resilient", "perseverance", "endurance"]),
+            ("faith", ["faith", "believe", "trust", "doubt", "wisdom", "guidance", "guide"]),
+            ("gratitude", ["thank", "grateful", "blessing", "thankful", "blessed", "bless", "praise", "glory", "glorious"]),
+            ("purpose", ["purpose", "meaning", "legacy", "why am i"]),
+            ("joy", ["happy", "happiness", "joy", "celebrate", "celebration", "wonderful"]),
+            # Family
+            ("family", ["kid", "kids", "children", "grandkid", "grandchildren", "grandson", "granddaughter", "family"]),
+        ]
+        # Words that turn a medication phrase into an item query ("where are my medicine balls")
+        self._item_query_words = ["where", "find", "lost", "can't find", "looking for"]
+
+        self._phrase_matcher = _compile_matcher(self._phrase_groups())
+
+    def _phrase_groups(self) -> Tuple[Tuple[Hashable, Tuple[str, ...], bool], ...]:
+        """Every phrase list parse() checks, keyed for the shared matcher."""
+        trigger_lists = {
+            "story_progress": self._story_progress_phrases,
+            "family_question": self._family_question_phrases,
+            "hear_stories": self._hear_stories_phrases,
+            "tell_story": self._tell_story_phrases,
+            "tell_kid_joke": self._tell_kid_joke_phrases,
+            "tell_naughty_joke": self._tell_naughty_joke_phrases,
+            "tell_joke": self._tell_joke_phrases,
+            "ask_question": self._ask_question_phrases,
+            "repeat": self._repeat_phrases,
+            "slower": self._slower_phrases,
+            "check_messages": self._check_messages_phrases,
+            "clear_messages": self._clear_messages_phrases,
+            "bible_verse": self._bible_phrases,
+            "prayer": self._prayer_phrases,
+            "nostalgia": self._nostalgia_phrases,
+            "medication": self._medication_phrases,
+            "weather": self._weather_phrases,
+            "tell_time": self._time_phrases,
+            "tell_date": self._date_phrases,
+            "thank_you": self._thank_you_phrases,
+            "thinking": self._thinking_phrases,
+            "skip": self._skip_phrases,
+            "goodbye": self._goodbye_phrases,
+            "stop": self._stop_phrases,
+            "greeting": self._greeting_phrases,
+        }
+        groups = [(key, tuple(phrases), True) for key, phrases in trigger_lists.items()]
+        # Theme and item-query words are plain substring checks, even short ones
+        groups += [(("prayer_theme", i), tuple(words), False)
+                   for i, (_, words) in enumerate(self._prayer_themes)]
+        groups.append(("item_query", tuple(self._item_query_words), False))
+        return tuple(groups)
+
+    def _phrase_hits(self, text_lower: str) -> Set[Hashable]:
+        return self._phrase_matcher.find(text_lower)
+
     def parse(self, text: str) -> Dict:
         text = text.strip()
         if not text:
@@ -314,15 +475,18 @@ class IntentParser:
         text_lower = re.sub(r'\bim ', "i'm ", text_lower)
         text_lower = re.sub(r'\bive ', "i've ", text_lower)
 
+        # One automaton pass finds every phrase group present in the text
+        hits = self._phrase_hits(text_lower)
+
         # ── Family storytelling intents (check first, order matters) ──
 
-        if self._matches(text_lower, self._story_progress_phrases):
+        if "story_progress" in hits:
             return {"intent": "story_progress", "confidence": 0.95}
 
-        if self._matches(text_lower, self._family_question_phrases):
+        if "family_question" in hits:
             return {"intent": "family_question", "confidence": 0.95}
 
-        if self._matches(text_lower, self._hear_stories_phrases):
+        if "hear_stories" in hits:
             # Extract who they want to hear about
             query = None
             # Longer "about" phrases first so they capture the full topic
@@ -346,7 +510,7 @@ class IntentParser:
                     break
             return {"intent": "hear_stories", "query": query, "confidence": 0.9}
 
-        if self._matches(text_lower, self._tell_story_phrases):
+        if "tell_story" in hits:
             return {"intent": "tell_story", "confidence": 0.95}
 
         intro = self._parse_introduction(text)
@@ -355,30 +519,30 @@ class IntentParser:
                     "relationship": intro[1], "confidence": 0.9}
 
         # Check non-memory intents (they're simpler/faster)
-        if self._matches(text_lower, self._tell_kid_joke_phrases):
+        if "tell_kid_joke" in hits:
             return {"intent": "tell_kid_joke", "confidence": 0.95}
 
-        if self._matches(text_lower, self._tell_naughty_joke_phrases):
+        if "tell_naughty_joke" in hits:
             return {"intent": "tell_naughty_joke", "confidence": 0.95}
 
-        if self._matches(text_lower, self._tell_joke_phrases):
+        if "tell_joke" in hits:
             return {"intent": "tell_joke", "confidence": 0.95}
 
-        if self._matches(text_lower, self._ask_question_phrases):
+        if "ask_question" in hits:
             return {"intent": "ask_question", "confidence": 0.95}
 
-        if self._matches(text_lower, self._repeat_phrases):
+        if "repeat" in hits:
             return {"intent": "repeat", "confidence": 0.95}
 
-        if self._matches(text_lower, self._slower_phrases):
+        if "slower" in hits:
             return {"intent": "slower", "confidence": 0.95}
 
         # ── Message board intents (before item queries) ──
 
-        if self._matches(text_lower, self._check_messages_phrases):
+        if "check_messages" in hits:
             return {"intent": "check_messages", "confidence": 0.95}
 
-        if self._matches(text_lower, self._clear_messages_phrases):
+        if "clear_messages" in hits:
             return {"intent": "clear_messages", "confidence": 0.95}
 
         # "[person] is home/back" — clear their status
@@ -417,7 +581,7 @@ class IntentParser:
 
         # ── Content intents (before memory/item to avoid false matches) ──
 
-        if self._matches(text_lower, self._bible_phrases):
+        if "bible_verse" in hits:
             topic = None
             topic_match = re.search(r"verse about (.+)", text_lower)
             if topic_match:
@@ -433,45 +597,14 @@ class IntentParser:
         if blessing_result:
             return blessing_result
 
-        if self._matches(text_lower, self._prayer_phrases):
+        if "prayer" in hits:
             theme = None
             pray_for = None  # specific person to pray for
 
-            # Time-based
-            if any(w in text_lower for w in ["bedtime", "goodnight", "nighttime", "evening", "sleep"]):
-                theme = "rest"
-            elif any(w in text_lower for w in ["morning", "start the day", "new day"]):
-                theme = "strength"
-            # Emotional categories
-            elif any(w in text_lower for w in ["worried", "worry", "anxious", "anxiety", "scared", "fear", "nervous"]):
-                theme = "anxiety"
-            elif any(w in text_lower for w in ["miss him", "miss her", "miss them", "passed away", "lost", "grief", "heaven"]):
-                theme = "grief"
-            elif any(w in text_lower for w in ["alone", "lonely", "loneliness", "isolated", "by myself"]):
-                theme = "loneliness"
-            elif any(w in text_lower for w in ["hard day", "tough", "struggling", "difficult", "having a hard"]):
-                theme = "strength"
-            elif any(w in text_lower for w in ["heal", "healing", "sick", "health", "surgery", "doctor", "pain"]):
-                theme = "healing"
-            elif any(w in text_lower for w in ["forgive", "forgiveness", "let go", "bitter", "angry"]):
-                theme = "forgiveness"
-            elif any(w in text_lower for w in ["peace", "calm", "quiet", "still", "rest", "comfort", "grace", "mercy"]):
-                theme = "peace"
-            elif any(w in text_lower for w in ["hope", "hopeful", "hopeless", "feeling down", "feeling low", "down"]):
-                theme = "hope"
-            elif any(w in text_lower for w in ["strength", "strong", "courage", "brave", "resilience", "resilient", "perseverance", "endurance"]):
-                theme = "strength"
-            elif any(w in text_lower for w in ["faith", "believe", "trust", "doubt", "wisdom", "guidance", "guide"]):
-                theme = "faith"
-            elif any(w in text_lower for w in ["thank", "grateful", "blessing", "thankful", "blessed", "bless", "praise", "glory", "glorious"]):
-                theme = "gratitude"
-            elif any(w in text_lower for w in ["purpose", "meaning", "legacy", "why am i"]):
-                theme = "purpose"
-            elif any(w in text_lower for w in ["happy", "happiness", "joy", "celebrate", "celebration", "wonderful"]):
-                theme = "joy"
-            # Family
-            elif any(w in text_lower for w in ["kid", "kids", "children", "grandkid", "grandchildren", "grandson", "granddaughter", "family"]):
-                theme = "family"
+            for i, (theme_name, _) in enumerate(self._prayer_themes):
+                if ("prayer_theme", i) in hits:
+                    theme = theme_name
+                    break
 
             # Check for "pray for [person/topic]" pattern
             pray_for_match = re.search(r'pray(?:er)?\s+(?:for|over)\s+(?:my\s+)?(.+?)(?:\s+please)?$', text_lower)
@@ -496,24 +629,24 @@ class IntentParser:
 
             return {"intent": "prayer", "theme": theme, "pray_for": pray_for, "confidence": 0.9}
 
-        if self._matches(text_lower, self._nostalgia_phrases):
+        if "nostalgia" in hits:
             return {"intent": "nostalgia", "confidence": 0.9}
 
         # Only match medication if it's not an item query ("where are my medicine balls")
-        if self._matches(text_lower, self._medication_phrases):
-            if not any(q in text_lower for q in ["where", "find", "lost", "can't find", "looking for"]):
+        if "medication" in hits:
+            if "item_query" not in hits:
                 return {"intent": "medication", "confidence": 0.9, "raw": text}
 
-        if self._matches(text_lower, self._weather_phrases):
+        if "weather" in hits:
             return {"intent": "weather", "confidence": 0.9}
 
-        if self._matches(text_lower, self._time_phrases):
+        if "tell_time" in hits:
             return {"intent": "tell_time", "confidence": 0.95}
 
-        if self._matches(text_lower, self._date_phrases):
+        if "tell_date" in hits:
             return {"intent": "tell_date", "confidence": 0.95}
 
-        if self._matches(text_lower, self._thank_you_phrases):
+        if "thank_you" in hits:
             return {"intent": "thank_you", "confidence": 0.9}
 
         # "Who is [name]?" — extract the name
@@ -562,25 +695,29 @@ class IntentParser:
                 "confidence": 0.85
             }
 
-        if self._matches(text_lower, self._thinking_phrases):
+        if "thinking" in hits:
             return {"intent": "thinking", "confidence": 0.95}
 
-        if self._matches(text_lower, self._skip_phrases):
+        if "skip" in hits:
             return {"intent": "skip", "confidence": 0.95}
 
-        if self._matches(text_lower, self._goodbye_phrases):
+        if "goodbye" in hits:
             return {"intent": "goodbye", "confidence": 0.95}
 
-        if self._matches(text_lower, self._stop_phrases):
+        if "stop" in hits:
             return {"intent": "stop", "confidence": 0.95}
 
-        if self._matches(text_lower, self._greeting_phrases):
+        if "greeting" in hits:
             return {"intent": "greeting", "confidence": 0.9}
 
         return {"intent": "unknown", "confidence": 0.0}
 
     def _matches(self, text: str, phrases: list) -> bool:
-        """Check if text contains any of the trigger phrases (word-boundary safe)."""
+        """Check if text contains any of the trigger phrases (word-boundary safe).
+
+        Reference scan for a single list; parse() uses the compiled
+        PhraseMatcher, which applies the same rule to every list at once.
+        """
         for phrase in phrases:
             if len(phrase) <= 3:
                 # Short words like "um", "hmm" need word boundaries to avoid matching inside words
@@ -0,0 +1,133 @@
+"""
+Background database maintenance for Polly Connect.
+
+device_events grew forever, expired web sessions were only deleted at
+startup and expired family messages and narrative_log rows never were.
+DbMaintenance runs every MAINTENANCE_INTERVAL_S (first pass shortly after
+startup):
+
+  1. rolls device_events older than EVENTS_LIVE_MONTHS calendar months
+     into monthly tables in the archive DB (<db>-archive.db by default)
+  2. deletes expired web sessions, family messages that expired more than
+     MESSAGE_RETENTION_DAYS ago and superseded narrative_log rows older
+     than NARRATIVE_LOG_RETENTION_DAYS
+  3. prunes admin rollups older than ROLLUP_RETENTION_DAYS
+  4. runs PRAGMA optimize and an incremental vacuum step
+
+Every step works in batches of BATCH_ROWS, each its own job on the async DB
+writer thread, so device and portal writes queue behind one small batch at
+most rather than behind the whole sweep.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_ROWS = 500
+BATCH_PAUSE_SECONDS = 0.05
+FIRST_RUN_DELAY_SECONDS = 60
+ROLLUP_RETENTION_DAYS = 400
+
+
+def archive_cutoff(live_months: int, now: datetime = None) -> str:
+    """Start of the oldest calendar month kept live (UTC), as a
+    device_events created_at string."""
+    now = now or datetime.now(timezone.utc)
+    month_index = now.year * 12 + now.month - 1 - max(live_months - 1, 0)
+    return f"{month_index // 12:04d}-{month_index % 12 + 1:02d}-01 00:00:00"
+
+
+def default_archive_path(db_path: str):
+    """<db>-archive.db next to the database; None for :memory: (archive
+    tables then live in the database itself)."""
+    if db_path == ":memory:":
+        return None
+    root, ext = os.path.splitext(db_path)
+    return f"{root}-archive{ext or '.db'}"
+
+
+class DbMaintenance:
+    def __init__(self, adb, interval: float = 3600, live_months: int = 2,
+                 archive_path: str = None, message_days: int = 30,
+                 narrative_days: int = 90, batch_rows: int = BATCH_ROWS,
+                 pause: float = BATCH_PAUSE_SECONDS,
+                 first_run_delay: float = FIRST_RUN_DELAY_SECONDS):
+        self.adb = adb
+        self.db = adb.db
+        self.interval = interval
+        self.live_months = live_months
+        self.archive_path = archive_path or default_archive_path(self.db.db_path)
+        self.message_days = message_days
+        self.narrative_days = narrative_days
+        self.batch_rows = batch_rows
+        self.pause = pause
+        self.first_run_delay = first_run_delay
+        self._task = None
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration_ms = 0.0
+        self.last_result = {}
+
+    async def _drain(self, fn, *args, **kwargs) -> int:
+        """Call a one-batch DB method until it comes back short."""
+        total = 0
+        while True:
+            n = await self.adb.write(fn, *args, limit=self.batch_rows, **kwargs)
+            total += n
+            if n < self.batch_rows:
+                return total
+            await asyncio.sleep(self.pause)
+
+    async def run_once(self) -> dict:
+        """One full maintenance pass. Returns {step: rows affected}."""
+        started = time.monotonic()
+        db = self.db
+        result = {
+            "archived_events": await self._drain(
+                db.archive_device_events, archive_cutoff(self.live_months),
+                archive_path=self.archive_path),
+            "expired_sessions": await self._drain(db.cleanup_expired_sessions),
+            "expired_messages": await self._drain(db.purge_expired_messages, self.message_days),
+            "narrative_log": await self._drain(db.compact_narrative_log, self.narrative_days),
+            "rollup_rows": await self._drain(db.prune_admin_rollups, ROLLUP_RETENTION_DAYS),
+        }
+        result.update(await self.adb.write(db.optimize))
+        self.runs += 1
+        self.last_run = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self.last_duration_ms = (time.monotonic() - started) * 1000
+        self.last_result = result
+        logger.info(f"DB maintenance in {self.last_duration_ms:.0f}ms: {result}")
+        return result
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        await asyncio.sleep(self.first_run_delay)
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"DB maintenance error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_duration_ms": round(self.last_duration_ms, 1),
+            "last_result": self.last_result,
+        }
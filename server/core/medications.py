@@ -5,20 +5,21 @@ pushes squawk + TTS voice reminders through WebSocket connections.
 """
 
 import asyncio
-import base64
-import glob
-import io
 import json
 import logging
 import os
 import random
-import struct
-import wave
-from datetime import datetime, time
-from typing import Optional
+from datetime import datetime, time, timedelta
+from time import monotonic as _monotonic
+from typing import Dict, List, Optional, Set, Tuple
 from zoneinfo import ZoneInfo
 
 from config import settings
+from core import audio_dsp
+from core.device_state import DeviceStateStore
+from core.metrics import LatencyHistogram
+from core.sound_bank import SoundBank
+from core.squawk import RenderedClip
 
 logger = logging.getLogger(__name__)
 
@@ -47,109 +48,248 @@ def _get_local_now():
     return datetime.now(tz)
 
 
-def _load_squawk_16k_mono() -> Optional[bytes]:
-    """Pick a random squawk WAV, convert to 16kHz mono PCM bytes."""
-    pattern = os.path.join(SOUNDS_DIR, "squawk*.wav")
-    files = glob.glob(pattern)
-    if not files:
-        logger.warning(f"No squawk WAV files found in {SOUNDS_DIR}")
+def _load_squawk_16k_mono(bank: SoundBank = None) -> Optional[bytes]:
+    """Pick a random squawk from the sound bank as 16kHz mono PCM bytes."""
+    bank = bank or _default_bank()
+    names = bank.names("squawk")
+    if not names:
+        logger.warning(f"No squawk WAV files found in {bank.sounds_dir}")
         return None
-
-    chosen = random.choice(files)
-    try:
-        with wave.open(chosen, "rb") as wf:
-            n_channels = wf.getnchannels()
-            sampwidth = wf.getsampwidth()
-            framerate = wf.getframerate()
-            n_frames = wf.getnframes()
-            raw = wf.readframes(n_frames)
-
-        # Convert to 16-bit samples
-        if sampwidth == 1:
-            # 8-bit unsigned → 16-bit signed
-            samples = [((b - 128) << 8) for b in raw]
-        elif sampwidth == 2:
-            samples = list(struct.unpack(f"<{len(raw)//2}h", raw))
-        elif sampwidth == 3:
-            # 24-bit → 16-bit (take top 2 bytes)
-            samples = []
-            for i in range(0, len(raw), 3):
-                val = int.from_bytes(raw[i:i+3], "little", signed=True)
-                samples.append(val >> 8)
+    pcm = bank.pcm(random.choice(names))
+    return audio_dsp.normalize_pcm(pcm).tobytes() if pcm is not None else None
+
+
+# Reminder names starting with one of these are tasks ("call Mom"), not meds
+_ACTION_STARTERS = ("tell ", "call ", "go ", "take ", "check ", "do ", "make ",
+                    "send ", "pick ", "get ", "put ", "clean ", "walk ", "feed ",
+                    "water ", "start ", "stop ", "remind ", "ask ", "say ")
+
+
+def reminder_text(med: dict, med_time: str) -> str:
+    """Announcement for a single reminder — smart phrasing based on its type."""
+    name = med["name"]
+    dosage = med.get("dosage", "")
+    time_display = format_time_12hr(med_time)
+    if name.lower().strip().startswith(_ACTION_STARTERS):
+        return f"It's {time_display}. Reminder: {name}."
+    if dosage:
+        return f"It's {time_display}, time to take {dosage} of {name}."
+    return f"It's {time_display}, time for your {name}."
+
+
+def batch_reminder_text(med_list: list) -> str:
+    """One announcement for several reminders due at the same time."""
+    time_display = format_time_12hr(med_list[0][1])
+    med_parts = []
+    task_parts = []
+    for med, _ in med_list:
+        name = med["name"]
+        dosage = med.get("dosage", "")
+        if name.lower().strip().startswith(_ACTION_STARTERS):
+            task_parts.append(name)
+        elif dosage:
+            med_parts.append(f"{dosage} of {name}")
         else:
-            logger.error(f"Unsupported sample width: {sampwidth}")
-            return None
+            med_parts.append(f"your {name}")
+
+    parts = []
+    if med_parts:
+        if len(med_parts) == 1:
+            items = med_parts[0]
+        elif len(med_parts) == 2:
+            items = f"{med_parts[0]} and {med_parts[1]}"
+        else:
+            items = ", ".join(med_parts[:-1]) + f", and {med_parts[-1]}"
+        parts.append(f"time for {items}")
+    parts.extend(task_parts)
+    return f"It's {time_display}, " + ". ".join(parts) + "."
 
-        # Stereo → mono (average channels)
-        if n_channels == 2:
-            mono = []
-            for i in range(0, len(samples), 2):
-                if i + 1 < len(samples):
-                    mono.append((samples[i] + samples[i + 1]) // 2)
-                else:
-                    mono.append(samples[i])
-            samples = mono
-        elif n_channels > 2:
-            # Take first channel
-            mono = []
-            for i in range(0, len(samples), n_channels):
-                mono.append(samples[i])
-            samples = mono
-
-        # Resample to 16kHz if needed (simple linear interpolation)
-        if framerate != 16000:
-            ratio = framerate / 16000
-            new_len = int(len(samples) / ratio)
-            resampled = []
-            for i in range(new_len):
-                src_idx = i * ratio
-                idx = int(src_idx)
-                frac = src_idx - idx
-                if idx + 1 < len(samples):
-                    val = int(samples[idx] * (1 - frac) + samples[idx + 1] * frac)
-                else:
-                    val = samples[idx] if idx < len(samples) else 0
-                # Clamp to int16 range
-                val = max(-32768, min(32767, val))
-                resampled.append(val)
-            samples = resampled
-
-        # Pack as 16-bit PCM
-        pcm = struct.pack(f"<{len(samples)}h", *samples)
-        return pcm
-
-    except Exception as e:
-        logger.error(f"Error loading squawk WAV {chosen}: {e}")
-        return None
 
+_bank = None
+
+
+def _default_bank() -> SoundBank:
+    """Module-level bank for callers that weren't handed the shared one."""
+    global _bank
+    if _bank is None:
+        _bank = SoundBank(SOUNDS_DIR)
+    return _bank
+
+
+# Full index rebuild interval — catches rows changed outside the hooked paths
+# (tenant deletion, manual SQL, another process)
+INDEX_RESYNC_SECONDS = 600
+
+ALL_DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def _decode_list(value) -> list:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return list(value or [])
 
-def _make_wav(pcm_data: bytes) -> bytes:
-    """Wrap raw 16kHz mono PCM in a WAV header."""
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(16000)
-        wf.writeframes(pcm_data)
-    return buf.getvalue()
 
+class MedicationIndex:
+    """Minute-of-week index: (weekday, "HH:MM") -> medication ids.
 
-def _extract_pcm(wav_bytes: bytes) -> bytes:
-    """Extract raw PCM from a WAV file."""
-    buf = io.BytesIO(wav_bytes)
-    with wave.open(buf, "rb") as wf:
-        return wf.readframes(wf.getnframes())
+    Rows are decoded once when indexed, so the per-minute tick is a dict
+    lookup over only the medications due this minute.
+    """
+
+    def __init__(self):
+        self._slots: Dict[Tuple[str, str], Set[int]] = {}
+        self._meds: Dict[int, dict] = {}
+        self._med_slots: Dict[int, List[Tuple[str, str]]] = {}
+
+    def __len__(self):
+        return len(self._meds)
+
+    def rebuild(self, meds: List[dict]):
+        """Replace the whole index with these (active) medication rows."""
+        self._slots.clear()
+        self._meds.clear()
+        self._med_slots.clear()
+        for med in meds:
+            self.upsert(med)
+
+    def upsert(self, med: dict):
+        """Index (or re-index) one medication row; inactive rows are removed."""
+        med_id = med["id"]
+        self.remove(med_id)
+        if not med.get("active", 1):
+            return
+        times = _decode_list(med.get("times"))
+        days = _decode_list(med.get("active_days")) or ALL_DAYS
+        slots = [(day, t) for day in days for t in times]
+        if not slots:
+            return
+        self._meds[med_id] = dict(med, times=times, active_days=days)
+        self._med_slots[med_id] = slots
+        for slot in slots:
+            self._slots.setdefault(slot, set()).add(med_id)
+
+    def remove(self, med_id: int):
+        for slot in self._med_slots.pop(med_id, ()):
+            ids = self._slots.get(slot)
+            if ids is not None:
+                ids.discard(med_id)
+                if not ids:
+                    del self._slots[slot]
+        self._meds.pop(med_id, None)
+
+    def due(self, day: str, hhmm: str) -> List[dict]:
+        """Medications scheduled at this weekday and minute, in id order."""
+        return [self._meds[i] for i in sorted(self._slots.get((day, hhmm), ()))]
+
+
+# Reminder audio is pre-rendered for slots due within this many minutes,
+# starting at a random point of the window so 08:00 across every tenant
+# doesn't synthesize in the same second
+PRERENDER_LOOKAHEAD_MINUTES = 5
+PRERENDER_MARGIN_SECONDS = 60  # finish rendering at least this long before due
+PRERENDER_CONCURRENCY = 2
+REMINDER_AUDIO_TTL_SECONDS = 600  # kept this long past the due minute
+
+# Per-device cap on writing one reminder to the socket. The wait for the
+# device's send lock (behind a TTS response) isn't counted; that sender's
+# own writes are bounded.
+REMINDER_SEND_TIMEOUT_SECONDS = 45
+# A timed-out reminder is sent again after a pause, this many times at most
+REMINDER_RETRY_DELAY_SECONDS = 30
+REMINDER_MAX_ATTEMPTS = 3
+
+
+class ReminderAudioCache:
+    """Short-lived cache of rendered reminder WAVs, keyed by announcement text."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[Optional[bytes], float]] = {}  # text -> (wav, expires)
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, text: str) -> bool:
+        entry = self._entries.get(text)
+        return entry is not None and entry[1] > _monotonic()
+
+    def put(self, text: str, wav: Optional[bytes], ttl: float):
+        self._evict()
+        if len(self._entries) >= self.max_entries:
+            del self._entries[min(self._entries, key=lambda k: self._entries[k][1])]
+        self._entries[text] = (wav, _monotonic() + ttl)
+
+    def get(self, text: str) -> Tuple[bool, Optional[bytes]]:
+        """(found, wav). A miss is counted so stats show render punctuality."""
+        if text in self:
+            self.hits += 1
+            return True, self._entries[text][0]
+        self.misses += 1
+        return False, None
+
+    def _evict(self):
+        now = _monotonic()
+        for text in [t for t, (_, exp) in self._entries.items() if exp <= now]:
+            del self._entries[text]
+
+    def stats(self) -> dict:
+        self._evict()
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
 
 
 class MedicationScheduler:
-    def __init__(self, db, tts=None):
+    def __init__(self, db, tts=None, sound_bank: SoundBank = None):
         self.db = db
         self.tts = tts
+        self.sound_bank = sound_bank
         self._running = False
         self._websockets = {}  # device_id -> {"ws": websocket, "tenant_id": int}
         self._task = None
-        self._last_reminded = {}  # med_id:time_str -> "YYYY-MM-DD HH:MM"
+        # med_id:time_str:date -> True; bounded in case the daily prune never runs
+        self._last_reminded = DeviceStateStore(
+            "medications.last_reminded", ttl_seconds=2 * 24 * 3600,
+            max_entries=10000, pin_connected=False)
         self._cmd_processor = None  # set after init for repeat support
+        self.index = MedicationIndex()
+        self._index_built_at = 0.0
+        self.audio_cache = ReminderAudioCache()
+        self.squawk = None  # SquawkManager, set after init for shared send locks
+        self._send_locks: Dict[str, asyncio.Lock] = {}  # only used without a squawk manager
+        self._delivery = DeviceStateStore("medications.delivery", ttl_seconds=7 * 24 * 3600)
+        self._prerender_tasks: Dict[str, asyncio.Task] = {}  # text -> pending render
+        self._retry_tasks: Set[asyncio.Task] = set()  # re-queued timed-out deliveries
+        self._render_sem = asyncio.Semaphore(PRERENDER_CONCURRENCY)
+
+    def rebuild_index(self):
+        """Load every active medication into the minute-of-week index."""
+        self.index.rebuild(self.db.get_medications())
+        self._index_built_at = _monotonic()
+        logger.info(f"Medication index built: {len(self.index)} medication(s)")
+
+    def refresh_medication(self, medication_id: int):
+        """Re-index one medication after an add/edit/delete (re-reads the row)."""
+        try:
+            med = self.db.get_medication_by_id(medication_id)
+        except Exception as e:
+            logger.error(f"Medication index refresh failed for {medication_id}: {e}")
+            return
+        if med:
+            self.index.upsert(med)
+        else:
+            self.index.remove(medication_id)
+
+    def snapshot_dedup(self) -> list:
+        """Reminder dedup keys already fired today, for restart snapshots."""
+        return list(self._last_reminded)
+
+    def restore_dedup(self, keys: list):
+        """Reload dedup keys so a restart doesn't repeat this minute's reminders."""
+        today_key = _get_local_now().strftime("%Y-%m-%d")
+        for key in keys:
+            if key.endswith(today_key):
+                self._last_reminded[key] = True
 
     def register_websocket(self, device_id: str, websocket, tenant_id: int = 1):
         """Track active WebSocket connections for push reminders."""
@@ -157,6 +297,7 @@ class MedicationScheduler:
         logger.info(f"Medication scheduler: registered device {device_id} (tenant={tenant_id})")
 
     def unregister_websocket(self, device_id: str):
+        self._send_locks.pop(device_id, None)
         removed = self._websockets.pop(device_id, None)
         if removed:
             logger.info(f"Medication scheduler: unregistered device {device_id}")
@@ -166,6 +307,7 @@ class MedicationScheduler:
         if self._running:
             return
         self._running = True
+        self.rebuild_index()
         self._task = asyncio.create_task(self._check_loop())
         logger.info(f"Medication scheduler started (timezone: {settings.TIMEZONE})")
 
@@ -173,6 +315,12 @@ class MedicationScheduler:
         self._running = False
         if self._task:
             self._task.cancel()
+        for task in self._prerender_tasks.values():
+            task.cancel()
+        self._prerender_tasks.clear()
+        for task in self._retry_tasks:
+            task.cancel()
+        self._retry_tasks.clear()
 
     async def _check_loop(self):
         """Check medication schedules every 60 seconds."""
@@ -207,184 +355,124 @@ class MedicationScheduler:
         current_day = now.strftime("%a").lower()
         today_key = now.strftime("%Y-%m-%d")
 
+        if _monotonic() - self._index_built_at >= INDEX_RESYNC_SECONDS:
+            await asyncio.to_thread(self.rebuild_index)
+
         # Collect all due meds grouped by (tenant, device)
         due_by_key = {}  # (tenant_id, device_id) -> [(med, med_time), ...]
-        meds = self.db.get_medications()
-        for med in meds:
-            times = json.loads(med["times"]) if isinstance(med["times"], str) else med["times"]
-            active_days = json.loads(med["active_days"]) if isinstance(med["active_days"], str) else med["active_days"]
-
-            if current_day not in active_days:
-                continue
-
-            tenant_id = med.get("tenant_id")
-            device_id = med.get("device_id")  # None = all devices
-
-            for med_time in times:
-                if med_time == current_time:
-                    dedup_key = f"{med['id']}:{med_time}:{today_key}"
-                    if dedup_key in self._last_reminded:
-                        continue
-                    self._last_reminded[dedup_key] = True
-                    group_key = (tenant_id, device_id)
-                    due_by_key.setdefault(group_key, []).append((med, med_time))
-
-        # Send one combined reminder per (tenant, device) group
+        for group_key, med_list in self._due_groups(current_day, current_time).items():
+            for med, med_time in med_list:
+                dedup_key = f"{med['id']}:{med_time}:{today_key}"
+                if dedup_key in self._last_reminded:
+                    continue
+                self._last_reminded[dedup_key] = True
+                due_by_key.setdefault(group_key, []).append((med, med_time))
+
+        # Send one combined reminder per (tenant, device) group, all groups at once
+        sends = []
         for (tenant_id, target_device), med_list in due_by_key.items():
             # Skip if target device is in quiet hours
             if target_device and self._is_device_in_quiet_hours(target_device, tenant_id):
                 logger.info(f"Skipping reminder for {target_device} — quiet hours")
                 continue
             if len(med_list) == 1:
-                await self._send_reminder(med_list[0][0], med_list[0][1], tenant_id)
+                sends.append(self._send_reminder(med_list[0][0], med_list[0][1], tenant_id))
             else:
-                await self._send_batch_reminder(med_list, tenant_id, target_device=target_device)
+                sends.append(self._send_batch_reminder(med_list, tenant_id, target_device=target_device))
+        for result in await asyncio.gather(*sends, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Reminder send error: {result}")
 
         # Clean old dedup keys (keep only today's)
         old_keys = [k for k in self._last_reminded if not k.endswith(today_key)]
         for k in old_keys:
             del self._last_reminded[k]
 
+        self._schedule_prerenders(now)
+
+    def _due_groups(self, day: str, hhmm: str) -> dict:
+        """Medications due at a minute, grouped by (tenant, device) — device None = all."""
+        groups = {}
+        for med in self.index.due(day, hhmm):
+            groups.setdefault((med.get("tenant_id"), med.get("device_id")), []).append((med, hhmm))
+        return groups
+
+    # ── Ahead-of-time rendering ──
+
+    def _schedule_prerenders(self, now: datetime):
+        """Queue audio renders for reminders due in the look-ahead window."""
+        minute = now.replace(second=0, microsecond=0)
+        for ahead in range(1, PRERENDER_LOOKAHEAD_MINUTES + 1):
+            due_at = minute + timedelta(minutes=ahead)
+            groups = self._due_groups(due_at.strftime("%a").lower(), due_at.strftime("%H:%M"))
+            for med_list in groups.values():
+                text = (reminder_text(*med_list[0]) if len(med_list) == 1
+                        else batch_reminder_text(med_list))
+                if text in self.audio_cache or text in self._prerender_tasks:
+                    continue
+                lead = (due_at - now).total_seconds()
+                delay = random.uniform(0, max(0.0, lead - PRERENDER_MARGIN_SECONDS))
+                ttl = lead + REMINDER_AUDIO_TTL_SECONDS
+                self._prerender_tasks[text] = asyncio.create_task(self._prerender(text, delay, ttl))
+
+    async def _prerender(self, text: str, delay: float, ttl: float):
+        try:
+            await asyncio.sleep(delay)
+            async with self._render_sem:
+                wav = await self._build_reminder_audio(text)
+            self.audio_cache.put(text, wav, ttl - delay)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Reminder pre-render failed: {e}")
+        finally:
+            self._prerender_tasks.pop(text, None)
+
+    async def _reminder_audio(self, text: str) -> Optional[bytes]:
+        """Rendered audio for an announcement: cached, in-flight, or built now."""
+        pending = self._prerender_tasks.get(text)
+        if pending:
+            await asyncio.shield(pending)
+        found, wav = self.audio_cache.get(text)
+        if found:
+            return wav
+        logger.info("Reminder audio not pre-rendered — synthesizing at due time")
+        return await self._build_reminder_audio(text)
+
     async def _send_batch_reminder(self, med_list: list, tenant_id: int = None,
                                     target_device: str = None):
         """Combine multiple reminders at the same time into one announcement."""
-        med_time = med_list[0][1]
-        time_display = format_time_12hr(med_time)
-
-        # Build combined list — smart phrasing per item
-        action_starters = ("tell ", "call ", "go ", "take ", "check ", "do ", "make ",
-                           "send ", "pick ", "get ", "put ", "clean ", "walk ", "feed ",
-                           "water ", "start ", "stop ", "remind ", "ask ", "say ")
-        med_parts = []
-        task_parts = []
-        for med, _ in med_list:
-            name = med["name"]
-            dosage = med.get("dosage", "")
-            name_lower = name.lower().strip()
-            if any(name_lower.startswith(v) for v in action_starters):
-                task_parts.append(name)
-            elif dosage:
-                med_parts.append(f"{dosage} of {name}")
-            else:
-                med_parts.append(f"your {name}")
-
-        parts = []
-        if med_parts:
-            if len(med_parts) == 1:
-                items = med_parts[0]
-            elif len(med_parts) == 2:
-                items = f"{med_parts[0]} and {med_parts[1]}"
-            else:
-                items = ", ".join(med_parts[:-1]) + f", and {med_parts[-1]}"
-            parts.append(f"time for {items}")
-        for t in task_parts:
-            parts.append(t)
-
-        msg = f"It's {time_display}, " + ". ".join(parts) + "."
+        msg = batch_reminder_text(med_list)
         logger.info(f"Batch medication reminder ({len(med_list)} items): {msg}")
 
-        combined_wav = await self._build_reminder_audio(msg)
-
-        sent_count = 0
-        for device_id, info in list(self._websockets.items()):
-            if tenant_id is not None and info["tenant_id"] != tenant_id:
-                continue
-            # If reminder is assigned to a specific device, only send to that one
-            if target_device and device_id != target_device:
-                continue
-            ws = info["ws"]
-            try:
-                await ws.send_json({
-                    "event": "medication_reminder",
-                    "text": msg,
-                    "medication_id": med_list[0][0]["id"],
-                    "medication_name": "multiple",
-                })
-                if combined_wav:
-                    chunk_size = 8000
-                    for i in range(0, len(combined_wav), chunk_size):
-                        chunk = combined_wav[i:i + chunk_size]
-                        chunk_b64 = base64.b64encode(chunk).decode()
-                        await ws.send_json({
-                            "event": "audio_chunk",
-                            "audio": chunk_b64,
-                            "final": (i + chunk_size >= len(combined_wav)),
-                        })
-                        await asyncio.sleep(0.05)
-                sent_count += 1
-                if self._cmd_processor:
-                    self._cmd_processor._last_response[device_id] = msg
-            except Exception as e:
-                logger.warning(f"Failed to send batch reminder to {device_id}: {e}")
-                self.unregister_websocket(device_id)
+        combined_wav = await self._reminder_audio(msg)
+        sent_count = await self._fan_out({
+            "event": "medication_reminder",
+            "text": msg,
+            "medication_id": med_list[0][0]["id"],
+            "medication_name": "multiple",
+        }, combined_wav, tenant_id, target_device)
 
         if sent_count > 0:
             logger.info(f"Batch reminder sent to {sent_count} device(s)")
 
+        # Log each medication, same as a single reminder
+        for med, med_time in med_list:
+            self.db.log_medication(med["id"], "reminded", scheduled_time=med_time, reminder_count=1)
+
     async def _send_reminder(self, med: dict, med_time: str, tenant_id: int = None):
         """Push squawk + TTS medication reminder to connected devices for this tenant."""
-        name = med["name"]
-        dosage = med.get("dosage", "")
-        time_display = format_time_12hr(med_time)
-
-        # Build announcement text — smart phrasing based on reminder type
-        name_lower = name.lower().strip()
-        # If name starts with a verb or looks like a task, use "time to [name]"
-        action_starters = ("tell ", "call ", "go ", "take ", "check ", "do ", "make ",
-                           "send ", "pick ", "get ", "put ", "clean ", "walk ", "feed ",
-                           "water ", "start ", "stop ", "remind ", "ask ", "say ")
-        if any(name_lower.startswith(v) for v in action_starters):
-            msg = f"It's {time_display}. Reminder: {name}."
-        elif dosage:
-            msg = f"It's {time_display}, time to take {dosage} of {name}."
-        else:
-            msg = f"It's {time_display}, time for your {name}."
-
+        msg = reminder_text(med, med_time)
         logger.info(f"Medication reminder: {msg}")
 
         # Generate combined squawk + TTS audio
-        combined_wav = await self._build_reminder_audio(msg)
-
-        target_device = med.get("device_id")  # None = all devices
-        sent_count = 0
-        for device_id, info in list(self._websockets.items()):
-            # Only send to devices belonging to this medication's tenant
-            if tenant_id is not None and info["tenant_id"] != tenant_id:
-                continue
-            # If reminder is assigned to a specific device, only send to that one
-            if target_device and device_id != target_device:
-                continue
-
-            ws = info["ws"]
-            try:
-                # Send text event
-                await ws.send_json({
-                    "event": "medication_reminder",
-                    "text": msg,
-                    "medication_id": med["id"],
-                    "medication_name": name,
-                })
-
-                # Send audio chunks
-                if combined_wav:
-                    chunk_size = 8000
-                    for i in range(0, len(combined_wav), chunk_size):
-                        chunk = combined_wav[i:i + chunk_size]
-                        chunk_b64 = base64.b64encode(chunk).decode()
-                        await ws.send_json({
-                            "event": "audio_chunk",
-                            "audio": chunk_b64,
-                            "final": (i + chunk_size >= len(combined_wav)),
-                        })
-                        await asyncio.sleep(0.05)
-
-                sent_count += 1
-                # Update last_response so "repeat" works for reminders
-                if self._cmd_processor:
-                    self._cmd_processor._last_response[device_id] = msg
-            except Exception as e:
-                logger.warning(f"Failed to send reminder to {device_id}: {e}")
-                self.unregister_websocket(device_id)
+        combined_wav = await self._reminder_audio(msg)
+        sent_count = await self._fan_out({
+            "event": "medication_reminder",
+            "text": msg,
+            "medication_id": med["id"],
+            "medication_name": med["name"],
+        }, combined_wav, tenant_id, med.get("device_id"))
 
         if sent_count > 0:
             logger.info(f"Reminder sent to {sent_count} device(s)")
@@ -394,12 +482,121 @@ class MedicationScheduler:
         # Log the reminder
         self.db.log_medication(med["id"], "reminded", scheduled_time=med_time, reminder_count=1)
 
+    # ── Delivery ──
+
+    def _device_lock(self, device_id: str) -> asyncio.Lock:
+        """The device's shared send lock (same one TTS and squawks take)."""
+        lock = self.squawk.get_send_lock(device_id) if self.squawk else None
+        if lock is None:
+            lock = self._send_locks.setdefault(device_id, asyncio.Lock())
+        return lock
+
+    async def _fan_out(self, event: dict, wav: Optional[bytes], tenant_id: int = None,
+                       target_device: str = None) -> int:
+        """Deliver one reminder to every matching device concurrently.
+        Returns how many devices received it."""
+        targets = [
+            (device_id, info["ws"]) for device_id, info in list(self._websockets.items())
+            # Only this tenant's devices; a device-assigned reminder goes to that one only
+            if (tenant_id is None or info["tenant_id"] == tenant_id)
+            and (not target_device or device_id == target_device)
+        ]
+        if not targets:
+            return 0
+        clip = RenderedClip(wav, squawk=False) if wav else None
+        started = _monotonic()
+        results = await asyncio.gather(*(
+            self._deliver(device_id, ws, event, clip, started) for device_id, ws in targets
+        ))
+        return sum(results)
+
+    async def _deliver(self, device_id: str, ws, event: dict, clip, started: float,
+                       attempt: int = 1) -> bool:
+        """Send one reminder to one device under its send lock. Only the
+        socket writes are timed out; a timed-out reminder is re-queued."""
+        stats = self._delivery_stats(device_id)
+
+        async def write():
+            await ws.send_json(event)
+            if clip:
+                for frame in clip.frames:
+                    await ws.send_text(frame)
+                    await asyncio.sleep(clip.chunk_delay)
+
+        if self.squawk:
+            self.squawk.stop_playback(device_id)  # reminders cut ambient squawks short
+        try:
+            async with self._device_lock(device_id):
+                queued_ms = (_monotonic() - started) * 1000
+                await asyncio.wait_for(write(), timeout=REMINDER_SEND_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Slow or stuck socket: don't unregister — the device may just be busy
+            stats["timeouts"] += 1
+            logger.warning(f"Reminder to {device_id} timed out after {REMINDER_SEND_TIMEOUT_SECONDS}s "
+                           f"(attempt {attempt} of {REMINDER_MAX_ATTEMPTS})")
+            if attempt < REMINDER_MAX_ATTEMPTS:
+                self._requeue(device_id, event, clip, attempt + 1)
+            return False
+        except Exception as e:
+            stats["failures"] += 1
+            logger.warning(f"Failed to send reminder to {device_id}: {e}")
+            self.unregister_websocket(device_id)
+            return False
+
+        total_ms = (_monotonic() - started) * 1000
+        stats["queue"].observe(queued_ms)
+        stats["latency"].observe(total_ms)
+        stats["delivered"] += 1
+        logger.info(f"Reminder delivered to {device_id} in {total_ms:.0f}ms "
+                    f"(waited {queued_ms:.0f}ms for the device)")
+        # Update last_response so "repeat" works for reminders
+        if self._cmd_processor:
+            self._cmd_processor._last_response[device_id] = event["text"]
+        return True
+
+    def _requeue(self, device_id: str, event: dict, clip, attempt: int):
+        """Deliver a timed-out reminder again after REMINDER_RETRY_DELAY_SECONDS,
+        to the device's current socket if it's still connected."""
+        async def retry():
+            await asyncio.sleep(REMINDER_RETRY_DELAY_SECONDS)
+            info = self._websockets.get(device_id)
+            if info is None:
+                logger.info(f"Reminder retry for {device_id} dropped: device disconnected")
+                return
+            await self._deliver(device_id, info["ws"], event, clip, _monotonic(), attempt)
+
+        task = asyncio.create_task(retry())
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    def _delivery_stats(self, device_id: str) -> dict:
+        stats = self._delivery.get(device_id)
+        if stats is None:
+            stats = {"delivered": 0, "timeouts": 0, "failures": 0,
+                     "queue": LatencyHistogram(), "latency": LatencyHistogram()}
+            self._delivery[device_id] = stats
+        return stats
+
+    def delivery_report(self) -> dict:
+        """Per-device reminder delivery latency: wait for the device's send
+        lock (queue) and time until the last chunk was sent (latency)."""
+        return {
+            device_id: {
+                "delivered": stats["delivered"],
+                "timeouts": stats["timeouts"],
+                "failures": stats["failures"],
+                "queue": stats["queue"].snapshot(),
+                "latency": stats["latency"].snapshot(),
+            }
+            for device_id, stats in sorted(self._delivery.items())
+        }
+
     async def _build_reminder_audio(self, text: str) -> Optional[bytes]:
         """Build combined squawk + TTS WAV audio."""
         pcm_parts = []
 
         # 1. Load a random squawk
-        squawk_pcm = _load_squawk_16k_mono()
+        squawk_pcm = _load_squawk_16k_mono(self.sound_bank)
         if squawk_pcm:
             pcm_parts.append(squawk_pcm)
             # Add 0.3s silence gap between squawk and voice
@@ -411,8 +608,10 @@ class MedicationScheduler:
             try:
                 tts_wav = await asyncio.to_thread(self.tts.synthesize, text)
                 if tts_wav:
-                    tts_pcm = _extract_pcm(tts_wav)
-                    pcm_parts.append(tts_pcm)
+                    # Engines differ in rate/channels/level — match the squawk's
+                    # format and loudness
+                    pcm = audio_dsp.normalize_pcm(audio_dsp.to_16k_mono(tts_wav))
+                    pcm_parts.append(pcm.tobytes())
             except Exception as e:
                 logger.error(f"TTS synthesis for reminder failed: {e}")
 
@@ -421,7 +620,7 @@ class MedicationScheduler:
 
         # Combine all PCM and wrap in WAV
         combined_pcm = b"".join(pcm_parts)
-        return _make_wav(combined_pcm)
+        return audio_dsp.wrap_wav(combined_pcm)
 
     def parse_medication_command(self, text: str) -> Optional[dict]:
         """Parse medication-related voice commands."""
@@ -320,17 +320,13 @@ def already_captured(db, source: str, source_ref, tenant_id: int) -> bool:
     """True if this exact source item already produced a memory."""
     if source_ref is None:
         return False
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         row = conn.execute(
             "SELECT 1 FROM memories WHERE source = ? AND source_ref = ? "
             "AND tenant_id = ? LIMIT 1",
             (source, source_ref, tenant_id)
         ).fetchone()
         return row is not None
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def capture(db, tenant_id: int, text: str, source: str, source_ref=None,
@@ -353,8 +349,7 @@ def capture(db, tenant_id: int, text: str, source: str, source_ref=None,
     if not force and already_captured(db, source, source_ref, tenant_id):
         return 0
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         birth_year = _birth_year(conn, tenant_id)
         if analysis is None:
             analysis = score_and_classify(text, birth_year=birth_year)
@@ -401,6 +396,3 @@ def capture(db, tenant_id: int, text: str, source: str, source_ref=None,
                     memory_id, source, analysis.get("story_value") or 0,
                     analysis["bucket"])
         return memory_id
-    finally:
-        if not db._conn:
-            conn.close()
@@ -55,16 +55,12 @@ class QuestionEngine:
         # Check which ones were already answered
         answered_ids = set()
         if user_id:
-            conn = self.db._get_connection()
-            try:
+            with self.db.connection() as conn:
                 rows = conn.execute(
                     "SELECT question_id FROM question_sessions WHERE user_id = ? AND week = ? AND answered = 1",
                     (user_id, week)
                 ).fetchall()
                 answered_ids = {r[0] for r in rows}
-            finally:
-                if not self.db._conn:
-                    conn.close()
 
         # Find first unanswered
         for q in questions:
@@ -94,16 +90,12 @@ class QuestionEngine:
 
         answered = 0
         if user_id:
-            conn = self.db._get_connection()
-            try:
+            with self.db.connection() as conn:
                 row = conn.execute(
                     "SELECT COUNT(*) FROM question_sessions WHERE user_id = ? AND week = ? AND answered = 1",
                     (user_id, week)
                 ).fetchone()
                 answered = row[0] if row else 0
-            finally:
-                if not self.db._conn:
-                    conn.close()
 
         return {
             "week": week,
@@ -0,0 +1,134 @@
+"""
+Shared sound bank for Polly Connect.
+
+Every consumer of static/sounds (AckCache, SquawkManager, medication
+reminders) reads clips from one SoundBank, so each WAV is decoded and
+converted to 16kHz mono 16-bit PCM once per process. Converted PCM is
+written to an on-disk cache keyed by the source file's mtime and size and
+memory-mapped on later starts, so a restart does no DSP at all unless a
+sound file changed.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+from core import audio_dsp
+
+logger = logging.getLogger(__name__)
+
+# Bump when decoding/resampling changes so cached PCM from the old converter
+# is not served
+DECODER_VERSION = 2
+
+
+def decode_wav_to_16k_mono(wav_bytes: bytes) -> np.ndarray:
+    """Decode any 8/16/24/32-bit WAV to 16kHz mono int16 samples."""
+    return audio_dsp.to_16k_mono(wav_bytes)
+
+
+def pcm_to_wav(pcm: np.ndarray, volume: float = 1.0) -> bytes:
+    """Wrap 16kHz mono int16 samples in a WAV, with optional volume scaling."""
+    return audio_dsp.wrap_wav(audio_dsp.scale_pcm(pcm, volume))
+
+
+class SoundBank:
+    """Lazily converted, disk-cached, memory-mapped 16kHz mono sound clips."""
+
+    def __init__(self, sounds_dir: str, cache_dir: Optional[str] = None):
+        self.sounds_dir = sounds_dir
+        self.cache_dir = cache_dir if cache_dir is not None else settings.SOUND_CACHE_DIR
+        self._pcm: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.conversions = 0  # clips decoded from source this process (cache misses)
+
+    def names(self, prefix: str = "") -> List[str]:
+        """Sorted WAV file names in the sounds directory, optionally by prefix."""
+        if not os.path.isdir(self.sounds_dir):
+            return []
+        return sorted(f for f in os.listdir(self.sounds_dir)
+                      if f.endswith('.wav') and f.startswith(prefix))
+
+    def pcm(self, name: str) -> Optional[np.ndarray]:
+        """16kHz mono int16 samples for a clip (read-only), or None if unusable."""
+        clip = self._pcm.get(name)
+        if clip is not None:
+            return clip
+        with self._lock:
+            clip = self._pcm.get(name)
+            if clip is None:
+                clip = self._load(name)
+                if clip is not None:
+                    self._pcm[name] = clip
+        return clip
+
+    def wav(self, name: str, volume: float = 1.0) -> Optional[bytes]:
+        """A clip as 16kHz mono WAV bytes at the given volume."""
+        clip = self.pcm(name)
+        return None if clip is None else pcm_to_wav(clip, volume)
+
+    def preload(self, prefixes=("squawk", "chatter", "ambient")) -> int:
+        """Convert (or map from cache) every clip with these prefixes."""
+        count = 0
+        for prefix in prefixes:
+            for name in self.names(prefix):
+                if self.pcm(name) is not None:
+                    count += 1
+        logger.info(f"Sound bank ready: {count} clips ({self.conversions} converted, "
+                    f"{count - self.conversions} from cache)")
+        return count
+
+    # ── Loading ──────────────────────────────────────────────────────
+
+    def _cache_path(self, name: str, st: os.stat_result) -> str:
+        base = os.path.splitext(name)[0]
+        return os.path.join(self.cache_dir, f"{base}.{st.st_mtime_ns}.{st.st_size}.v{DECODER_VERSION}.pcm")
+
+    def _load(self, name: str) -> Optional[np.ndarray]:
+        path = os.path.join(self.sounds_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            logger.warning(f"Sound not found: {path}")
+            return None
+
+        cache_path = self._cache_path(name, st) if self.cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                if os.path.getsize(cache_path) == 0:
+                    return np.zeros(0, dtype=np.int16)
+                return np.memmap(cache_path, dtype='<i2', mode='r')
+            except Exception as e:
+                logger.warning(f"Sound cache unreadable for {name}: {e}")
+
+        try:
+            with open(path, 'rb') as f:
+                clip = decode_wav_to_16k_mono(f.read())
+        except Exception as e:
+            logger.error(f"Failed to load sound {name}: {e}")
+            return None
+        self.conversions += 1
+
+        if cache_path:
+            self._write_cache(name, cache_path, clip)
+        clip.setflags(write=False)
+        return clip
+
+    def _write_cache(self, name: str, cache_path: str, clip: np.ndarray):
+        """Persist converted PCM atomically and drop stale versions of the clip."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            stale_prefix = os.path.splitext(name)[0] + "."
+            for existing in os.listdir(self.cache_dir):
+                if existing.startswith(stale_prefix) and existing.endswith(".pcm"):
+                    os.remove(os.path.join(self.cache_dir, existing))
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(clip.astype('<i2').tobytes())
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write sound cache for {name}: {e}")
@@ -2,7 +2,9 @@
 Parrot squawk / ambient sound system for Polly Connect.
 
 Clock-based scheduling: squawks and chatter fire on wall-clock intervals,
-surviving WebSocket reconnects without resetting timers.
+surviving WebSocket reconnects without resetting timers. One timer heap
+serves every connected device — the scheduler sleeps until the earliest
+deadline and is woken when a device registers or its schedule changes.
 
 Short squawks: play at regular intervals (default every 10 min) with jitter.
 Long chatter: play at longer intervals (default every 45 min) with jitter.
@@ -11,16 +13,20 @@ Post-response squawks: 50% chance after TTS, with delay to avoid mic feedback.
 
 import asyncio
 import base64
-import io
+import heapq
+import itertools
+import json
 import logging
 import os
 import random
 import time
-import wave
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import numpy as np
+from core import audio_dsp
+from core.device_state import DeviceStateStore
+from core.sound_bank import SoundBank, pcm_to_wav
 
 logger = logging.getLogger(__name__)
 
@@ -40,136 +46,183 @@ JITTER_SECONDS = 120  # ±2 minutes
 # Delay before first squawk after reconnect (seconds)
 RECONNECT_GRACE = 60
 
+# Clip cache: per-device volumes are rounded to 5% steps so each clip has at
+# most 21 rendered variants; the LRU is bounded by total bytes held.
+VOLUME_BUCKET = 0.05
+CLIP_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
-def _convert_to_16k_mono(wav_bytes: bytes, volume: float = SQUAWK_VOLUME) -> bytes:
-    """Convert any WAV to 16kHz mono 16-bit WAV with volume adjustment."""
-    with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
-        channels = w.getnchannels()
-        sampwidth = w.getsampwidth()
-        framerate = w.getframerate()
-        raw = w.readframes(w.getnframes())
-
-    # Convert to numpy
-    if sampwidth == 2:
-        samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
-    elif sampwidth == 1:
-        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) * 256
-    elif sampwidth == 4:
-        samples = (np.frombuffer(raw, dtype=np.int32).astype(np.float32) / 65536)
-    else:
-        logger.warning(f"Unsupported sample width: {sampwidth}")
-        return wav_bytes
-
-    # Stereo to mono
-    if channels == 2:
-        samples = (samples[0::2] + samples[1::2]) / 2
-
-    # Resample if not 16kHz
-    if framerate != 16000:
-        num_out = int(len(samples) * 16000 / framerate)
-        indices = np.linspace(0, len(samples) - 1, num_out)
-        samples = np.interp(indices, np.arange(len(samples)), samples)
-
-    # Apply volume reduction
-    samples = samples * volume
-
-    # Back to int16
-    samples = np.clip(samples, -32768, 32767).astype(np.int16)
-
-    # Wrap in WAV
-    out = io.BytesIO()
-    with wave.open(out, 'wb') as w:
-        w.setnchannels(1)
-        w.setsampwidth(2)
-        w.setframerate(16000)
-        w.writeframes(samples.tobytes())
-    return out.getvalue()
-
-
-def _convert_to_16k_mono_from_pcm(wav_bytes: bytes, volume: float) -> bytes:
-    """Apply volume to an already-converted 16kHz mono WAV."""
-    with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
-        raw = w.readframes(w.getnframes())
-    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
-    samples = samples * volume
-    samples = np.clip(samples, -32768, 32767).astype(np.int16)
-    out = io.BytesIO()
-    with wave.open(out, 'wb') as w:
-        w.setnchannels(1)
-        w.setsampwidth(2)
-        w.setframerate(16000)
-        w.writeframes(samples.tobytes())
-    return out.getvalue()
+# Timer kinds in the global scheduler heap
+TIMER_KINDS = ("squawk", "chatter", "prayer", "nag")
+
+# How long to wait before retrying a timer that fired while the device was busy
+BUSY_RETRY_SECONDS = 15
+
+# Message nag: at most every 15 min; re-check for new messages every minute
+MESSAGE_NAG_SECONDS = 900
+MESSAGE_CHECK_SECONDS = 60
+
+
+def _chunk_plan(total_len: int) -> Tuple[int, float]:
+    """Adaptive chunking: pace sends based on audio length to avoid
+    overwhelming the ESP32's TCP/WebSocket buffer. Returns (size, delay)."""
+    if total_len > 128000:  # >4s — voice messages, long clips
+        return 4000, 0.08
+    if total_len > 64000:  # >2s — medium clips
+        return 6000, 0.06
+    return 8000, 0.05  # short squawk clips
+
+
+class RenderedClip:
+    """A clip ready for the wire: its audio_chunk events already base64- and
+    JSON-encoded, so sending costs no DSP or encoding work."""
+
+    __slots__ = ("frames", "chunk_delay", "nbytes")
+
+    def __init__(self, wav_data: bytes, squawk: bool = True):
+        total_len = len(wav_data)
+        chunk_size, self.chunk_delay = _chunk_plan(total_len)
+        # Same encoding Starlette's send_json uses, so send_text is equivalent
+        self.frames: List[str] = [
+            json.dumps({
+                "event": "audio_chunk",
+                "audio": base64.b64encode(wav_data[i:i + chunk_size]).decode(),
+                "final": (i + chunk_size >= total_len),
+                **({"squawk": True} if squawk else {}),
+            }, separators=(",", ":"), ensure_ascii=False)
+            for i in range(0, total_len, chunk_size)
+        ]
+        self.nbytes = sum(len(f) for f in self.frames)
+
+
+class ClipCache:
+    """LRU of RenderedClip keyed by (pool, clip index, volume bucket)."""
+
+    def __init__(self, max_bytes: int = CLIP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._clips: "OrderedDict[tuple, RenderedClip]" = OrderedDict()
+
+    def get(self, key: tuple, render: Callable[[], bytes]) -> RenderedClip:
+        clip = self._clips.get(key)
+        if clip is not None:
+            self.hits += 1
+            self._clips.move_to_end(key)
+            return clip
+        self.misses += 1
+        clip = RenderedClip(render())
+        self._clips[key] = clip
+        self.nbytes += clip.nbytes
+        while self.nbytes > self.max_bytes and len(self._clips) > 1:
+            _, old = self._clips.popitem(last=False)
+            self.nbytes -= old.nbytes
+        return clip
+
+    def clear(self):
+        self._clips.clear()
+        self.nbytes = 0
+
+    def stats(self) -> Dict:
+        return {"clips": len(self._clips), "bytes": self.nbytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+def _volume_bucket(volume: float) -> int:
+    return int(round(volume / VOLUME_BUCKET))
+
+
+def _next_minute() -> float:
+    """Epoch one second past the next wall-clock minute boundary."""
+    return (time.time() // 60 + 1) * 60 + 1
+
+
+def _cancel_task(device_id: str, task: asyncio.Task):
+    """Eviction hook: stop a forgotten device's background task."""
+    if task and not task.done():
+        task.cancel()
+        logger.info(f"Cancelled idle task for evicted device {device_id}")
 
 
 class SquawkManager:
-    def __init__(self, sounds_dir: str, db=None):
+    def __init__(self, sounds_dir: str, db=None, bank: SoundBank = None):
         self._db = db
+        self._bank = bank or SoundBank(sounds_dir)
         self.squawks: List[bytes] = []       # short squawk WAVs (16kHz mono, default volume)
         self.chatter: List[bytes] = []       # long chatter WAVs (16kHz mono, default volume)
         self.ambient: List[bytes] = []       # ambient bird clips (for button mode only)
         self._raw_squawks: List[bytes] = []  # raw WAVs at full volume (for per-device volume)
         self._raw_chatter: List[bytes] = []  # raw WAVs at full volume (for per-device volume)
         self._raw_ambient: List[bytes] = []  # raw ambient WAVs at full volume
-        self._active_devices: Dict[str, asyncio.WebSocketServerProtocol] = {}
-        self._playing: Dict[str, bool] = {}  # True if currently sending squawk/chatter
-        self._busy: Dict[str, bool] = {}     # True if device is recording/processing/playing TTS
-        self._send_locks: Dict[str, asyncio.Lock] = {}  # prevent concurrent WS writes
-        self._snoozed_until: Dict[str, Optional[float]] = {}  # epoch time when snooze ends
-        self._quiet_override: Dict[str, bool] = {}  # True = ignore quiet hours until they end
-        self._quiet_hours: Dict[str, tuple] = {}  # per-device (start_hour, end_hour)
-        self._message_callbacks: Dict[str, Any] = {}  # device_id -> async fn() -> bool (has messages)
-        self._tts_callbacks: Dict[str, Any] = {}  # device_id -> async fn(text) -> None
-        self._last_message_nag: Dict[str, float] = {}  # device_id -> last nag time
-        self._message_nag_enabled: Dict[str, bool] = {}  # per-device message nag toggle
-        self.last_squawk_end: Dict[str, float] = {}  # monotonic time when last squawk/chatter finished
-        self._volume: Dict[str, float] = {}  # per-device volume (0.0-1.0)
-        self._ambient_tasks: Dict[str, asyncio.Task] = {}  # device_id -> ambient mode task
-        self._ambient_active: Dict[str, bool] = {}  # device_id -> True if ambient playing
+        self._clip_cache = ClipCache()  # rendered (pool, index, volume bucket) clips
+        # Per-device state lives in bounded stores: a device that stays
+        # disconnected past the TTL is forgotten (and its tasks cancelled).
+        store = self._device_store
+        self._active_devices: Dict[str, asyncio.WebSocketServerProtocol] = store("active_devices")
+        self._playing: Dict[str, bool] = store("playing")  # True if currently sending squawk/chatter
+        self._busy: Dict[str, bool] = store("busy")     # True if device is recording/processing/playing TTS
+        self._send_locks: Dict[str, asyncio.Lock] = store("send_locks")  # prevent concurrent WS writes
+        self._snoozed_until: Dict[str, Optional[float]] = store("snoozed_until")  # epoch time when snooze ends
+        self._quiet_override: Dict[str, bool] = store("quiet_override")  # True = ignore quiet hours until they end
+        self._quiet_hours: Dict[str, tuple] = store("quiet_hours")  # per-device (start_hour, end_hour)
+        self._message_callbacks: Dict[str, Any] = store("message_callbacks")  # device_id -> async fn() -> bool (has messages)
+        self._tts_callbacks: Dict[str, Any] = store("tts_callbacks")  # device_id -> async fn(text) -> None
+        self._last_message_nag: Dict[str, float] = store("last_message_nag")  # device_id -> last nag time
+        self._message_nag_enabled: Dict[str, bool] = store("message_nag_enabled")  # per-device message nag toggle
+        self.last_squawk_end: Dict[str, float] = store("last_squawk_end")  # monotonic time when last squawk/chatter finished
+        self._volume: Dict[str, float] = store("volume")  # per-device volume (0.0-1.0)
+        self._ambient_tasks: Dict[str, asyncio.Task] = store("ambient_tasks", on_evict=_cancel_task)  # device_id -> ambient mode task
+        self._ambient_active: Dict[str, bool] = store("ambient_active")  # device_id -> True if ambient playing
 
         # Clock-based scheduling: wall-clock epoch timestamps
-        self._next_squawk_time: Dict[str, float] = {}  # next squawk epoch
-        self._next_chatter_time: Dict[str, float] = {}  # next chatter epoch
-        self._squawk_interval: Dict[str, int] = {}   # per-device squawk interval (minutes)
-        self._chatter_interval: Dict[str, int] = {}  # per-device chatter interval (minutes)
-
-        # Nostalgia callbacks: device_id -> async callable
-        self._nostalgia_callbacks: Dict[str, callable] = {}
-
-        # Single scheduler task per device (polling loop)
-        self._scheduler_tasks: Dict[str, asyncio.Task] = {}
+        self._next_squawk_time: Dict[str, float] = store("next_squawk_time")  # next squawk epoch
+        self._next_chatter_time: Dict[str, float] = store("next_chatter_time")  # next chatter epoch
+        self._squawk_interval: Dict[str, int] = store("squawk_interval")   # per-device squawk interval (minutes)
+        self._chatter_interval: Dict[str, int] = store("chatter_interval")  # per-device chatter interval (minutes)
+
+        # Nostalgia / prayer callbacks: device_id -> async callable
+        self._nostalgia_callbacks: Dict[str, callable] = store("nostalgia_callbacks")
+        self._prayer_callbacks: Dict[str, callable] = store("prayer_callbacks")
+
+        # Global timer heap of (fire_at, seq, device_id, kind). _deadlines holds
+        # the live deadline per (device_id, kind); heap entries that no longer
+        # match it were superseded and are skipped when popped.
+        self._timer_heap: List[tuple] = []
+        self._deadlines: Dict[tuple, float] = {}
+        self._timer_seq = itertools.count()
+        self._timer_wakeup = asyncio.Event()
+        self._timer_task: Optional[asyncio.Task] = None
+        self._fire_tasks: set = set()
 
         self._load_sounds(sounds_dir)
 
+    @staticmethod
+    def _device_store(name: str, on_evict=None) -> DeviceStateStore:
+        return DeviceStateStore(f"squawk.{name}", on_evict=on_evict)
+
     def _load_sounds(self, sounds_dir: str):
-        """Load and convert all squawk/chatter WAV files."""
+        """Load all squawk/chatter/ambient clips from the shared sound bank."""
         if not os.path.isdir(sounds_dir):
             logger.warning(f"Sounds directory not found: {sounds_dir}")
             return
 
-        for fname in sorted(os.listdir(sounds_dir)):
-            if not fname.endswith('.wav'):
+        pools = {
+            'ambient': (self.ambient, self._raw_ambient),
+            'chatter': (self.chatter, self._raw_chatter),
+            'squawk': (self.squawks, self._raw_squawks),
+        }
+        for fname in self._bank.names():
+            kind = next((k for k in pools if fname.startswith(k)), None)
+            if not kind:
                 continue
-            path = os.path.join(sounds_dir, fname)
-            try:
-                with open(path, 'rb') as f:
-                    raw_bytes = f.read()
-                converted = _convert_to_16k_mono(raw_bytes)
-                raw_full = _convert_to_16k_mono(raw_bytes, volume=1.0)
-                if fname.startswith('ambient'):
-                    self.ambient.append(converted)
-                    self._raw_ambient.append(raw_full)
-                    logger.info(f"Loaded ambient sound: {fname}")
-                elif fname.startswith('chatter'):
-                    self.chatter.append(converted)
-                    self._raw_chatter.append(raw_full)
-                    logger.info(f"Loaded chatter sound: {fname}")
-                elif fname.startswith('squawk'):
-                    self.squawks.append(converted)
-                    self._raw_squawks.append(raw_full)
-                    logger.info(f"Loaded squawk sound: {fname}")
-            except Exception as e:
-                logger.error(f"Failed to load sound {fname}: {e}")
+            pcm = self._bank.pcm(fname)  # decoded once, shared with other consumers
+            if pcm is None:
+                continue
+            pcm = audio_dsp.normalize_pcm(pcm)  # even out levels across source files
+            default_list, raw_list = pools[kind]
+            default_list.append(pcm_to_wav(pcm, SQUAWK_VOLUME))
+            raw_list.append(pcm_to_wav(pcm))
+            logger.info(f"Loaded {kind} sound: {fname}")
 
         logger.info(f"SquawkManager ready: {len(self.squawks)} squawks, {len(self.chatter)} chatter, {len(self.ambient)} ambient")
 
@@ -178,11 +231,13 @@ class SquawkManager:
         interval_min = self._squawk_interval.get(device_id, DEFAULT_SQUAWK_MINUTES)
         if interval_min == 0:
             self._next_squawk_time[device_id] = float('inf')  # never fires
+            self._arm(device_id, "squawk", None)
             return
         interval = interval_min * 60
         jitter = random.uniform(-JITTER_SECONDS, JITTER_SECONDS)
         delay = max(min_delay, interval + jitter)
         self._next_squawk_time[device_id] = time.time() + delay
+        self._arm(device_id, "squawk", self._next_squawk_time[device_id])
         logger.debug(f"Next squawk for {device_id} in {delay:.0f}s")
 
     def _schedule_next_chatter(self, device_id: str, min_delay: float = 0):
@@ -190,11 +245,13 @@ class SquawkManager:
         interval_min = self._chatter_interval.get(device_id, DEFAULT_CHATTER_MINUTES)
         if interval_min == 0:
             self._next_chatter_time[device_id] = float('inf')  # never fires
+            self._arm(device_id, "chatter", None)
             return
         interval = interval_min * 60
         jitter = random.uniform(-JITTER_SECONDS, JITTER_SECONDS)
         delay = max(min_delay, interval + jitter)
         self._next_chatter_time[device_id] = time.time() + delay
+        self._arm(device_id, "chatter", self._next_chatter_time[device_id])
         logger.debug(f"Next chatter for {device_id} in {delay:.0f}s")
 
     def register_device(self, device_id: str, websocket,
@@ -223,11 +280,8 @@ class SquawkManager:
         if device_id not in self._next_chatter_time or self._next_chatter_time[device_id] < now:
             self._schedule_next_chatter(device_id, min_delay=RECONNECT_GRACE * 3)
 
-        # Start scheduler loop if not already running
-        existing_task = self._scheduler_tasks.get(device_id)
-        if not existing_task or existing_task.done():
-            task = asyncio.ensure_future(self._scheduler_loop(device_id))
-            self._scheduler_tasks[device_id] = task
+        # Arm this device's timers in the global scheduler
+        self._arm_device(device_id)
 
         logger.info(
             f"Squawk registered {device_id}: "
@@ -246,13 +300,12 @@ class SquawkManager:
 
     def register_prayer_callback(self, device_id: str, callback):
         """Register an async callback for scheduled prayer playback."""
-        if not hasattr(self, '_prayer_callbacks'):
-            self._prayer_callbacks = {}
         self._prayer_callbacks[device_id] = callback
+        self._arm(device_id, "prayer", _next_minute())
 
     def unregister_prayer_callback(self, device_id: str):
-        if hasattr(self, '_prayer_callbacks'):
-            self._prayer_callbacks.pop(device_id, None)
+        self._prayer_callbacks.pop(device_id, None)
+        self._arm(device_id, "prayer", None)
 
     def register_message_callback(self, device_id: str, has_messages_cb, tts_cb):
         """Register callbacks for message nagging.
@@ -261,6 +314,7 @@ class SquawkManager:
         """
         self._message_callbacks[device_id] = has_messages_cb
         self._tts_callbacks[device_id] = tts_cb
+        self._arm(device_id, "nag", self._next_nag_time(device_id))
 
     def unregister_device(self, device_id: str):
         """Mark device as disconnected. Does NOT cancel schedules."""
@@ -269,8 +323,10 @@ class SquawkManager:
         self._nostalgia_callbacks.pop(device_id, None)
         self._message_callbacks.pop(device_id, None)
         self._tts_callbacks.pop(device_id, None)
-        # Keep send lock, schedules, intervals, quiet hours — they survive reconnects
-        # The scheduler loop will idle while device is not in _active_devices
+        # Keep send lock, schedules, intervals, quiet hours — they survive reconnects.
+        # Timers are re-armed from the kept schedules on the next register_device.
+        for kind in TIMER_KINDS:
+            self._deadlines.pop((device_id, kind), None)
 
     def snooze(self, device_id: str, minutes: int):
         """Snooze all squawks/chatter for N minutes."""
@@ -282,6 +338,7 @@ class SquawkManager:
         """Cancel snooze and resume squawks immediately (overrides quiet hours too)."""
         self._snoozed_until.pop(device_id, None)
         self._quiet_override[device_id] = True
+        self._arm_device(device_id)  # overdue squawks/chatter fire right away
         logger.info(f"Squawks unsnoozed (quiet hours overridden) → {device_id}")
 
     def is_snoozed(self, device_id: str) -> bool:
@@ -359,6 +416,33 @@ class SquawkManager:
         self._schedule_next_squawk(device_id, min_delay=30)
         self._schedule_next_chatter(device_id, min_delay=60)
 
+    # Maps persisted across restarts: wall-clock epochs and settings, no live objects
+    _SNAPSHOT_MAPS = (
+        "_next_squawk_time", "_next_chatter_time", "_squawk_interval",
+        "_chatter_interval", "_snoozed_until", "_quiet_override",
+        "_last_message_nag",
+    )
+
+    def snapshot_schedules(self) -> Dict[str, Dict]:
+        """Schedules, snoozes and overrides, JSON-safe (inf becomes None)."""
+        snap = {}
+        for attr in self._SNAPSHOT_MAPS:
+            snap[attr.lstrip("_")] = {
+                device_id: (None if value == float('inf') else value)
+                for device_id, value in getattr(self, attr).items()
+                if value is not None
+            }
+        return snap
+
+    def restore_schedules(self, snapshot: Dict[str, Dict]):
+        """Load a snapshot_schedules() payload before devices reconnect.
+        register_device() keeps any schedule still in the future."""
+        for attr in self._SNAPSHOT_MAPS:
+            target = getattr(self, attr)
+            for device_id, value in snapshot.get(attr.lstrip("_"), {}).items():
+                if device_id not in target:
+                    target[device_id] = float('inf') if value is None else value
+
     def get_send_lock(self, device_id: str) -> Optional[asyncio.Lock]:
         """Get the websocket send lock for a device (used by _send_tts too)."""
         return self._send_locks.get(device_id)
@@ -384,96 +468,176 @@ class SquawkManager:
         # Only push forward, never pull back
         if next_time > self._next_squawk_time.get(device_id, 0):
             self._next_squawk_time[device_id] = next_time
+            self._arm(device_id, "squawk", next_time)
 
-    # ── Scheduler loop ──────────────────────────────────────────────
+    # ── Global timer scheduler ──────────────────────────────────────
 
-    async def _scheduler_loop(self, device_id: str):
-        """Single polling loop per device. Checks wall-clock schedules every 15s."""
-        logger.info(f"Scheduler loop started → {device_id}")
+    def _arm(self, device_id: str, kind: str, fire_at: Optional[float]):
+        """Set (or clear, with None/inf) one timer for a connected device."""
+        key = (device_id, kind)
+        if fire_at is None or fire_at == float('inf') or device_id not in self._active_devices:
+            self._deadlines.pop(key, None)
+            return
+        self._deadlines[key] = fire_at
+        heapq.heappush(self._timer_heap, (fire_at, next(self._timer_seq), device_id, kind))
+        if self._timer_heap[0][0] == fire_at:
+            self._timer_wakeup.set()  # new earliest deadline
+        self._ensure_timer_task()
+
+    def _arm_device(self, device_id: str):
+        """Arm every timer a connected device has from its kept schedules."""
+        self._arm(device_id, "squawk", self._next_squawk_time.get(device_id))
+        self._arm(device_id, "chatter", self._next_chatter_time.get(device_id))
+        if device_id in self._prayer_callbacks:
+            self._arm(device_id, "prayer", _next_minute())
+        if device_id in self._message_callbacks:
+            self._arm(device_id, "nag", self._next_nag_time(device_id))
+
+    def _next_nag_time(self, device_id: str) -> Optional[float]:
+        if not self._message_nag_enabled.get(device_id, True):
+            return None
+        last_nag = self._last_message_nag.get(device_id, 0)
+        return max(time.time(), last_nag + MESSAGE_NAG_SECONDS)
+
+    def _snooze_retry_at(self, device_id: str) -> float:
+        """When a snoozed device could next be awake: snooze end, or the next
+        top of the hour (quiet hours are whole hours)."""
+        now = time.time()
+        until = self._snoozed_until.get(device_id)
+        if until and until > now:
+            return until
+        return (now // 3600 + 1) * 3600 + 1
+
+    def _ensure_timer_task(self):
+        if self._timer_task and not self._timer_task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop yet; started by the next _arm() on the loop
+        self._timer_task = asyncio.ensure_future(self._timer_loop())
+
+    def stop(self):
+        """Cancel the scheduler (server shutdown)."""
+        if self._timer_task:
+            self._timer_task.cancel()
+            self._timer_task = None
+
+    async def _timer_loop(self):
+        """Single scheduler for all devices: sleep until the earliest live deadline."""
+        logger.info("Squawk scheduler started")
         try:
             while True:
-                await asyncio.sleep(15)  # Check every 15 seconds
-
-                # If device not connected, just idle
-                ws = self._active_devices.get(device_id)
-                if not ws:
+                self._timer_wakeup.clear()
+                delay = None
+                while self._timer_heap:
+                    fire_at, _, device_id, kind = self._timer_heap[0]
+                    if self._deadlines.get((device_id, kind)) != fire_at:
+                        heapq.heappop(self._timer_heap)  # superseded or disarmed
+                        continue
+                    delay = fire_at - time.time()
+                    break
+
+                if delay is None or delay > 0:
+                    try:
+                        await asyncio.wait_for(self._timer_wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
                     continue
 
-                # Skip during quiet hours or snooze
-                if self.is_snoozed(device_id):
-                    continue
+                heapq.heappop(self._timer_heap)
+                del self._deadlines[(device_id, kind)]
+                # Fire concurrently so one device's long clip can't delay the others
+                task = asyncio.ensure_future(self._fire(device_id, kind))
+                self._fire_tasks.add(task)
+                task.add_done_callback(self._fire_tasks.discard)
+        except asyncio.CancelledError:
+            logger.info("Squawk scheduler cancelled")
 
-                # Skip if device is busy (recording, processing, or playing TTS)
-                if self.is_busy(device_id):
-                    continue
+    async def _fire(self, device_id: str, kind: str):
+        """Run one due timer, then re-arm it."""
+        try:
+            if device_id not in self._active_devices:
+                return
+
+            # Busy (recording, processing, or playing TTS): try again shortly
+            if self.is_busy(device_id):
+                self._arm(device_id, kind, time.time() + BUSY_RETRY_SECONDS)
+                return
+
+            # Quiet hours or snooze: wait until they could be over
+            if self.is_snoozed(device_id):
+                self._arm(device_id, kind, self._snooze_retry_at(device_id))
+                return
 
-                now = time.time()
+            if kind == "squawk":
+                if self.squawks:
+                    await self.send_squawk(device_id)
+                self._schedule_next_squawk(device_id)
 
-                # Check scheduled prayer recordings first
-                prayer_cb = getattr(self, '_prayer_callbacks', {}).get(device_id)
+            elif kind == "chatter":
+                # 20% chance to play a nostalgia snippet instead
+                nostalgia_cb = self._nostalgia_callbacks.get(device_id)
+                if nostalgia_cb and random.random() < 0.20:
+                    try:
+                        await nostalgia_cb()
+                    except Exception as e:
+                        logger.error(f"Nostalgia callback error: {e}")
+                        await self.send_chatter(device_id)
+                elif self.chatter:
+                    await self.send_chatter(device_id)
+                self._schedule_next_chatter(device_id)
+
+            elif kind == "prayer":
+                # Scheduled prayer recordings have minute resolution
+                prayer_cb = self._prayer_callbacks.get(device_id)
                 if prayer_cb:
                     try:
-                        played = await prayer_cb()
-                        if played:
-                            continue  # Prayer played — skip squawk/chatter this cycle
+                        await prayer_cb()
                     except Exception as e:
                         logger.error(f"Prayer callback error: {e}")
+                    self._arm(device_id, "prayer", _next_minute())
 
-                # Check for pending messages — nag every 15 min (if enabled for this device)
+            elif kind == "nag":
+                # Pending messages — nag every 15 min (if enabled for this device)
                 msg_cb = self._message_callbacks.get(device_id)
                 tts_cb = self._tts_callbacks.get(device_id)
-                if msg_cb and tts_cb and self._message_nag_enabled.get(device_id, True):
-                    last_nag = self._last_message_nag.get(device_id, 0)
-                    if now - last_nag >= 900:  # 15 minutes
-                        try:
-                            has_msgs = await msg_cb()
-                            if has_msgs:
-                                self._last_message_nag[device_id] = now
-                                # Squawk first, then say "Message!"
-                                if self.squawks:
-                                    await self.send_squawk(device_id)
-                                    await asyncio.sleep(1.0)
-                                await tts_cb("Message! Message!")
-                                logger.info(f"Message nag → {device_id}")
-                                continue  # Skip regular squawk/chatter this cycle
-                        except Exception as e:
-                            logger.error(f"Message nag error: {e}")
-
-                # Check squawk schedule
-                next_sq = self._next_squawk_time.get(device_id, 0)
-                if now >= next_sq and self.squawks:
-                    await self.send_squawk(device_id)
-                    self._schedule_next_squawk(device_id)
-
-                # Check chatter schedule (20% chance to play nostalgia snippet instead)
-                next_ch = self._next_chatter_time.get(device_id, 0)
-                if now >= next_ch and self.chatter:
-                    nostalgia_cb = self._nostalgia_callbacks.get(device_id)
-                    if nostalgia_cb and random.random() < 0.20:
-                        try:
-                            await nostalgia_cb()
-                        except Exception as e:
-                            logger.error(f"Nostalgia callback error: {e}")
-                            await self.send_chatter(device_id)
-                    else:
-                        await self.send_chatter(device_id)
-                    self._schedule_next_chatter(device_id)
+                if not (msg_cb and tts_cb) or not self._message_nag_enabled.get(device_id, True):
+                    return
+                next_check = time.time() + MESSAGE_CHECK_SECONDS
+                try:
+                    if await msg_cb():
+                        self._last_message_nag[device_id] = time.time()
+                        next_check = self._last_message_nag[device_id] + MESSAGE_NAG_SECONDS
+                        # Squawk first, then say "Message!"
+                        if self.squawks:
+                            await self.send_squawk(device_id)
+                            await asyncio.sleep(1.0)
+                        await tts_cb("Message! Message!")
+                        logger.info(f"Message nag → {device_id}")
+                except Exception as e:
+                    logger.error(f"Message nag error: {e}")
+                self._arm(device_id, "nag", next_check)
 
-        except asyncio.CancelledError:
-            logger.info(f"Scheduler loop cancelled → {device_id}")
         except Exception as e:
-            logger.error(f"Scheduler loop error for {device_id}: {e}")
+            logger.error(f"Scheduler error for {device_id} ({kind}): {e}")
 
     # ── Sound sending ───────────────────────────────────────────────
 
-    def _pick_sound(self, device_id: str, raw_list: List[bytes], default_list: List[bytes]) -> bytes:
-        """Pick a random sound with per-device volume applied."""
-        vol = self._volume.get(device_id, SQUAWK_VOLUME)
+    def _pick_sound(self, device_id: str, pool: str, raw_list: List[bytes],
+                    default_list: List[bytes]) -> RenderedClip:
+        """Pick a random sound with per-device volume applied (rendered once per
+        clip and volume bucket, then served from the clip cache)."""
+        bucket = _volume_bucket(self._volume.get(device_id, SQUAWK_VOLUME))
         idx = random.randrange(len(raw_list))
-        # If volume matches default, use pre-converted version
-        if abs(vol - SQUAWK_VOLUME) < 0.01:
-            return default_list[idx]
-        return _convert_to_16k_mono_from_pcm(raw_list[idx], vol)
+
+        def render() -> bytes:
+            # If volume matches default, use pre-converted version
+            if bucket == _volume_bucket(SQUAWK_VOLUME):
+                return default_list[idx]
+            return audio_dsp.scale_wav(raw_list[idx], bucket * VOLUME_BUCKET)
+
+        return self._clip_cache.get((pool, idx, bucket), render)
 
     async def send_squawk(self, device_id: str):
         """Send a random short squawk to a device."""
@@ -482,9 +646,9 @@ class SquawkManager:
         ws = self._active_devices.get(device_id)
         if not ws:
             return
-        squawk = self._pick_sound(device_id, self._raw_squawks, self.squawks)
+        squawk = self._pick_sound(device_id, "squawk", self._raw_squawks, self.squawks)
         logger.info(f"Squawk! → {device_id} (vol {self._volume.get(device_id, SQUAWK_VOLUME):.0%})")
-        await self._send_wav(ws, device_id, squawk)
+        await self._send_clip(ws, device_id, squawk)
 
     async def send_chatter(self, device_id: str):
         """Send a random long chatter clip (interruptible)."""
@@ -493,9 +657,9 @@ class SquawkManager:
         ws = self._active_devices.get(device_id)
         if not ws:
             return
-        chatter = self._pick_sound(device_id, self._raw_chatter, self.chatter)
+        chatter = self._pick_sound(device_id, "chatter", self._raw_chatter, self.chatter)
         logger.info(f"Chatter starting → {device_id} (vol {self._volume.get(device_id, SQUAWK_VOLUME):.0%})")
-        await self._send_wav(ws, device_id, chatter, interruptible=True)
+        await self._send_clip(ws, device_id, chatter, interruptible=True)
 
     async def maybe_post_response_squawk(self, device_id: str, tts_duration: float = 0.0):
         """50% chance of a short squawk after a TTS response."""
@@ -535,11 +699,12 @@ class SquawkManager:
                     if not ws:
                         break
                     # Pick a random ambient clip (fall back to chatter if no ambient)
+                    pool = "ambient" if self._raw_ambient else "chatter"
                     raw_pool = self._raw_ambient if self._raw_ambient else self._raw_chatter
                     default_pool = self.ambient if self.ambient else self.chatter
                     if raw_pool:
-                        clip = self._pick_sound(device_id, raw_pool, default_pool)
-                        await self._send_wav(ws, device_id, clip, interruptible=False)
+                        clip = self._pick_sound(device_id, pool, raw_pool, default_pool)
+                        await self._send_clip(ws, device_id, clip, interruptible=False)
                         clip_count += 1
                     # Short pause between clips (2-5 seconds)
                     pause = random.uniform(2.0, 5.0)
@@ -577,12 +742,16 @@ class SquawkManager:
         ws = self._active_devices.get(device_id)
         if not ws:
             return
-        squawk = self._pick_sound(device_id, self._raw_squawks, self.squawks)
+        squawk = self._pick_sound(device_id, "squawk", self._raw_squawks, self.squawks)
         logger.info(f"Wake squawk → {device_id}")
-        await self._send_wav(ws, device_id, squawk)
+        await self._send_clip(ws, device_id, squawk)
 
     async def _send_wav(self, ws, device_id: str, wav_data: bytes, interruptible: bool = False):
-        """Send WAV data as chunked base64 audio_chunk events."""
+        """Send one-off WAV data (voice messages, prayers) as audio_chunk events."""
+        await self._send_clip(ws, device_id, RenderedClip(wav_data), interruptible)
+
+    async def _send_clip(self, ws, device_id: str, clip: RenderedClip, interruptible: bool = False):
+        """Send a pre-encoded clip as chunked audio_chunk events."""
         lock = self._send_locks.get(device_id)
         if not lock:
             return
@@ -593,32 +762,12 @@ class SquawkManager:
                 # Notify ESP32 that ambient sound is starting
                 await ws.send_json({"event": "squawk_start"})
 
-                # Adaptive chunking: pace sends based on audio length
-                # to avoid overwhelming ESP32's TCP/WebSocket buffer
-                total_len = len(wav_data)
-                if total_len > 128000:  # >4s — voice messages, long clips
-                    chunk_size = 4000
-                    chunk_delay = 0.08
-                elif total_len > 64000:  # >2s — medium clips
-                    chunk_size = 6000
-                    chunk_delay = 0.06
-                else:  # short squawk clips
-                    chunk_size = 8000
-                    chunk_delay = 0.05
-
-                for i in range(0, total_len, chunk_size):
+                for frame in clip.frames:
                     if not self._playing.get(device_id, False):
                         logger.info(f"Squawk/chatter interrupted → {device_id}")
                         break
-                    chunk = wav_data[i:i + chunk_size]
-                    chunk_b64 = base64.b64encode(chunk).decode()
-                    await ws.send_json({
-                        "event": "audio_chunk",
-                        "audio": chunk_b64,
-                        "final": (i + chunk_size >= total_len),
-                        "squawk": True,
-                    })
-                    await asyncio.sleep(chunk_delay)
+                    await ws.send_text(frame)
+                    await asyncio.sleep(clip.chunk_delay)
 
                 await ws.send_json({"event": "squawk_end"})
             except Exception as e:
@@ -0,0 +1,93 @@
+"""
+Runtime state snapshots for Polly Connect.
+
+Conversation modes, "repeat" responses, squawk schedules/snoozes and
+medication reminder dedup keys live in memory. StateSnapshotter writes them
+to the runtime_state table every minute and on shutdown, and lifespan
+restores them on startup — so a deploy doesn't drop a story mid-answer,
+reset every squawk timer at once, or repeat a reminder that already fired.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INTERVAL_SECONDS = 60
+MAX_SNAPSHOT_AGE_SECONDS = 24 * 3600  # older snapshots are ignored on restore
+
+
+class StateSnapshotter:
+    def __init__(self, db, cmd=None, squawk=None, med_scheduler=None,
+                 interval: float = SNAPSHOT_INTERVAL_SECONDS):
+        self.db = db
+        self.cmd = cmd
+        self.squawk = squawk
+        self.med_scheduler = med_scheduler
+        self.interval = interval
+        self._task = None
+
+    def collect(self) -> dict:
+        """Build every snapshot payload (call on the event loop thread)."""
+        snapshots = {}
+        if self.cmd:
+            snapshots["conversations"] = self.cmd.snapshot_state()
+        if self.squawk:
+            snapshots["squawk"] = self.squawk.snapshot_schedules()
+        if self.med_scheduler:
+            snapshots["medication_dedup"] = self.med_scheduler.snapshot_dedup()
+        return snapshots
+
+    def save(self):
+        """Snapshot everything now (synchronous — used on shutdown)."""
+        snapshots = self.collect()
+        if snapshots:
+            self.db.save_runtime_state(snapshots)
+
+    def restore(self, max_age_seconds: int = MAX_SNAPSHOT_AGE_SECONDS) -> list:
+        """Load saved snapshots into the live components. Returns names restored."""
+        try:
+            saved = self.db.get_runtime_state(max_age_seconds=max_age_seconds)
+        except Exception as e:
+            logger.error(f"Could not load state snapshots: {e}")
+            return []
+
+        restored = []
+        loaders = [
+            ("conversations", self.cmd and self.cmd.restore_state),
+            ("squawk", self.squawk and self.squawk.restore_schedules),
+            ("medication_dedup", self.med_scheduler and self.med_scheduler.restore_dedup),
+        ]
+        for name, load in loaders:
+            if not load or name not in saved:
+                continue
+            try:
+                load(saved[name])
+                restored.append(name)
+            except Exception as e:
+                logger.error(f"Could not restore {name} snapshot: {e}")
+        return restored
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self):
+        """Cancel the periodic loop and write a final snapshot."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"Final state snapshot failed: {e}")
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                snapshots = self.collect()
+                if snapshots:
+                    await asyncio.to_thread(self.db.save_runtime_state, snapshots)
+            except Exception as e:
+                logger.error(f"State snapshot error: {e}")
@@ -154,8 +154,7 @@ def get_subscription(db, tenant_id: int) -> Dict:
     if tenant_id == ADMIN_TENANT_ID:
         return {"tier": "legacy", "status": "active", "trial_days_left": None}
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         import sqlite3
         conn.row_factory = sqlite3.Row
         tenant = conn.execute(
@@ -179,16 +178,12 @@ def get_subscription(db, tenant_id: int) -> Dict:
             "stripe_customer_id": tenant.get("stripe_customer_id"),
             "stripe_subscription_id": tenant.get("stripe_subscription_id"),
         }
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def start_trial(db, tenant_id: int, days: int = 30):
     """Start a free trial for a tenant."""
     trial_end = (datetime.utcnow() + timedelta(days=days)).isoformat()
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("""
             UPDATE tenants SET subscription_tier = 'trial',
                 subscription_status = 'active', trial_ends_at = ?
@@ -196,9 +191,6 @@ def start_trial(db, tenant_id: int, days: int = 30):
         """, (trial_end, tenant_id))
         conn.commit()
         logger.info(f"Started {days}-day trial for tenant {tenant_id}")
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def create_checkout_session(db, tenant_id: int, tier: str,
@@ -243,15 +235,11 @@ def _book_purchased(db, tenant_id: int) -> bool:
     if tenant_id == ADMIN_TENANT_ID:
         return True
     try:
-        conn = db._get_connection()
-        try:
+        with db.connection() as conn:
             row = conn.execute(
                 "SELECT book_purchased FROM tenants WHERE id = ?", (tenant_id,)
             ).fetchone()
             return bool(row and row[0])
-        finally:
-            if not db._conn:
-                conn.close()
     except Exception:
         return False
 
@@ -303,8 +291,7 @@ def create_billing_portal_session(db, tenant_id: int,
     if not stripe:
         return None
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         customer_id = conn.execute(
             "SELECT stripe_customer_id FROM tenants WHERE id = ?",
             (tenant_id,)
@@ -312,9 +299,6 @@ def create_billing_portal_session(db, tenant_id: int,
         if not customer_id or not customer_id[0]:
             return None
         customer_id = customer_id[0]
-    finally:
-        if not db._conn:
-            conn.close()
 
     try:
         session = stripe.billing_portal.Session.create(
@@ -373,60 +357,40 @@ def handle_webhook_event(db, event) -> bool:
 # ── Internal helpers ──
 
 def _count_stories(db, tenant_id: int) -> int:
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         return conn.execute(
             "SELECT COUNT(*) FROM stories WHERE tenant_id = ?", (tenant_id,)
         ).fetchone()[0]
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _count_photos(db, tenant_id: int) -> int:
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         return conn.execute(
             "SELECT COUNT(*) FROM photos WHERE tenant_id = ?", (tenant_id,)
         ).fetchone()[0]
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _count_items(db, tenant_id: int) -> int:
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         return conn.execute(
             "SELECT COUNT(*) FROM items WHERE tenant_id = ?", (tenant_id,)
         ).fetchone()[0]
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _count_photo_stories(db, tenant_id: int) -> int:
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         return conn.execute(
             "SELECT COUNT(*) FROM stories WHERE tenant_id = ? AND photo_id IS NOT NULL",
             (tenant_id,)
         ).fetchone()[0]
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _count_reminders(db, tenant_id: int) -> int:
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         return conn.execute(
             "SELECT COUNT(*) FROM medications WHERE user_id IN (SELECT id FROM user_profiles WHERE tenant_id = ?)",
             (tenant_id,)
         ).fetchone()[0]
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 # Product/Price IDs cached after first creation
@@ -490,8 +454,7 @@ def _get_or_create_price(stripe, tier: str, interval: str) -> Optional[str]:
 
 def _get_or_create_customer(stripe, db, tenant_id: int) -> str:
     """Get existing Stripe customer or create one for this tenant."""
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         row = conn.execute(
             "SELECT stripe_customer_id FROM tenants WHERE id = ?",
             (tenant_id,)
@@ -519,24 +482,17 @@ def _get_or_create_customer(stripe, db, tenant_id: int) -> str:
         )
         conn.commit()
         return customer.id
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _activate_subscription(db, tenant_id: int, tier: str, subscription_id: str):
     """Activate a subscription after successful checkout."""
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("""
             UPDATE tenants SET subscription_tier = ?, subscription_status = 'active',
                 stripe_subscription_id = ?, trial_ends_at = NULL
             WHERE id = ?
         """, (tier, subscription_id, tenant_id))
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _sync_subscription_status(db, subscription_data):
@@ -544,8 +500,7 @@ def _sync_subscription_status(db, subscription_data):
     customer_id = subscription_data.get("customer")
     status = subscription_data.get("status")  # active, past_due, canceled, etc.
 
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         if status == "active":
             conn.execute(
                 "UPDATE tenants SET subscription_status = 'active' WHERE stripe_customer_id = ?",
@@ -562,16 +517,12 @@ def _sync_subscription_status(db, subscription_data):
                 (customer_id,)
             )
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _handle_subscription_canceled(db, subscription_data):
     """Handle subscription cancellation."""
     customer_id = subscription_data.get("customer")
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute("""
             UPDATE tenants SET subscription_status = 'canceled',
                 stripe_subscription_id = NULL
@@ -579,32 +530,21 @@ def _handle_subscription_canceled(db, subscription_data):
         """, (customer_id,))
         conn.commit()
         logger.info(f"Subscription canceled for customer {customer_id}")
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _mark_past_due(db, customer_id: str):
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE tenants SET subscription_status = 'past_due' WHERE stripe_customer_id = ?",
             (customer_id,)
         )
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
 
 
 def _mark_active(db, customer_id: str):
-    conn = db._get_connection()
-    try:
+    with db.connection() as conn:
         conn.execute(
             "UPDATE tenants SET subscription_status = 'active' WHERE stripe_customer_id = ?",
             (customer_id,)
         )
         conn.commit()
-    finally:
-        if not db._conn:
-            conn.close()
@@ -0,0 +1,110 @@
+"""
+Batched device telemetry for Polly Connect.
+
+Every connect, disconnect, command and error used to be its own INSERT +
+commit on the audio loop. TelemetryWriter buffers the rows in memory and a
+background task writes them in one executemany transaction every
+FLUSH_INTERVAL_SECONDS, or as soon as FLUSH_BATCH_ROWS are waiting, through
+the async DB writer. The admin dashboard therefore lags by at most about a
+second.
+
+The buffer is bounded: if the database falls behind, the oldest unwritten
+events are dropped and counted rather than growing memory without limit.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 0.5
+FLUSH_BATCH_ROWS = 200
+MAX_BUFFERED_EVENTS = 10000
+
+
+class TelemetryWriter:
+    def __init__(self, adb, interval: float = FLUSH_INTERVAL_SECONDS,
+                 batch_rows: int = FLUSH_BATCH_ROWS,
+                 max_buffered: int = MAX_BUFFERED_EVENTS):
+        self.adb = adb
+        self.interval = interval
+        self.batch_rows = batch_rows
+        self._buffer = deque(maxlen=max_buffered)
+        self._wake = None
+        self._task = None
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_flush_ms = 0.0
+
+    def record(self, device_id: str, tenant_id: int, event_type: str,
+               intent: str = None, success: int = 1, detail: str = None):
+        """Queue one device_events row (call on the event loop thread).
+        Never blocks and never raises."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1  # the append below evicts the oldest event
+        # Stamp now: the row may be written a moment later
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self._buffer.append((device_id, tenant_id, event_type, intent, success,
+                             detail, created_at))
+        if self._wake and len(self._buffer) >= self.batch_rows:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far in one transaction."""
+        if not self._buffer:
+            return 0
+        rows = list(self._buffer)
+        self._buffer.clear()
+        started = time.monotonic()
+        try:
+            # Shielded: cancelling the loop on shutdown mustn't lose a batch
+            await asyncio.shield(self.adb.write(self.adb.db.log_device_events, rows))
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Telemetry flush of {len(rows)} events failed: {e}")
+            # Put them back in front of anything recorded meanwhile, as room allows
+            room = self._buffer.maxlen - len(self._buffer)
+            keep = rows[-room:] if room else []
+            self.dropped += len(rows) - len(keep)
+            self._buffer.extendleft(reversed(keep))
+            return 0
+        self.flushes += 1
+        self.written += len(rows)
+        self.last_flush_ms = (time.monotonic() - started) * 1000
+        return len(rows)
+
+    async def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the loop and write whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+        }
@@ -2,14 +2,12 @@
 pyttsx3 Text-to-Speech module — local TTS backend.
 """
 
-import io
 import logging
 import os
-import struct
 import tempfile
-import wave
 from typing import Optional
 
+from core import audio_dsp
 from core.tts_base import TTSBackend
 
 logger = logging.getLogger(__name__)
@@ -69,38 +67,13 @@ class Pyttsx3TTS(TTSBackend):
             engine.runAndWait()
             engine.stop()
 
-            # Read original WAV
-            with wave.open(temp_path, 'rb') as wav_in:
-                params = wav_in.getparams()
-                frames = wav_in.readframes(params.nframes)
-
+            with open(temp_path, 'rb') as f:
+                wav_bytes = f.read()
             os.unlink(temp_path)
 
-            # Convert to samples
-            sample_width = params.sampwidth
-            if sample_width == 2:
-                samples = list(struct.unpack(f'<{len(frames)//2}h', frames))
-            else:
-                return None
-
-            # If stereo, take left channel
-            if params.nchannels == 2:
-                samples = samples[::2]
-
-            # Downsample to 16kHz
-            if params.framerate > 16000:
-                ratio = max(1, params.framerate // 16000)
-                samples = samples[::ratio]
-
-            # Create 16kHz mono WAV
-            output = io.BytesIO()
-            with wave.open(output, 'wb') as wav_out:
-                wav_out.setnchannels(1)
-                wav_out.setsampwidth(2)
-                wav_out.setframerate(22050)
-                wav_out.writeframes(struct.pack(f'<{len(samples)}h', *samples))
-
-            return output.getvalue()
+            # Engine output is typically 22.05kHz (sometimes stereo): downmix and
+            # polyphase-resample to the 16kHz mono format the ESP32 plays
+            return audio_dsp.to_16k_mono_wav(wav_bytes)
 
         except Exception as e:
             logger.error(f"TTS error: {e}")
@@ -10,6 +10,8 @@ from typing import Optional, Dict
 from fastapi import Request
 from fastapi.responses import RedirectResponse
 
+from core.async_db import get_async_db
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,13 +49,13 @@ async def get_web_session(request: Request) -> Optional[Dict]:
     if not session_id:
         return None
 
-    db = request.app.state.db
-    session = db.get_web_session(session_id)
+    adb = get_async_db(request.app)
+    session = await adb.get_web_session(session_id)
     if not session:
         return None
 
-    # Touch session to keep it active
-    db.touch_web_session(session_id)
+    # Touch session to keep it active (queued; the response doesn't wait)
+    adb.defer("touch_web_session", session_id)
 
     # Family sessions have account_id=NULL, role stored on the session row
     if session["account_id"] is None:
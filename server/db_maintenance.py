@@ -0,0 +1,104 @@
+"""
+Run DB maintenance by hand: archive old device_events, purge expired rows,
+PRAGMA optimize and an incremental vacuum step (what core/maintenance.py
+does hourly inside the server).
+
+Databases created before incremental auto_vacuum was the default need one
+full VACUUM to switch; that rewrites the file, so stop the server first.
+
+Run from /opt/polly-connect/server with:
+    sudo python3 db_maintenance.py                 # show sizes / settings
+    sudo python3 db_maintenance.py --run
+    sudo python3 db_maintenance.py --enable-incremental-vacuum   # server stopped
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import settings
+from core.async_db import AsyncPollyDB
+from core.database import PollyDB
+from core.maintenance import DbMaintenance, default_archive_path
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+def show_status(path: str, archive_path: str):
+    conn = sqlite3.connect(path)
+    try:
+        pragma = lambda name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        events = conn.execute("SELECT COUNT(*), MIN(created_at) FROM device_events").fetchone()
+        print(f"  auto_vacuum: {AUTO_VACUUM_MODES.get(pragma('auto_vacuum'))}")
+        print(f"  pages: {pragma('page_count')} ({pragma('freelist_count')} free)")
+        print(f"  device_events: {events[0]} rows, oldest {events[1]}")
+    finally:
+        conn.close()
+    print(f"  archive: {archive_path}"
+          f"{'' if os.path.exists(archive_path) else ' (not created yet)'}")
+
+
+def enable_incremental_vacuum(path: str):
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")  # the mode only takes effect on a rebuild
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+async def run_pass(db, archive_path: str) -> dict:
+    adb = AsyncPollyDB(db)
+    try:
+        return await DbMaintenance(
+            adb,
+            live_months=settings.EVENTS_LIVE_MONTHS,
+            archive_path=archive_path,
+            message_days=settings.MESSAGE_RETENTION_DAYS,
+            narrative_days=settings.NARRATIVE_LOG_RETENTION_DAYS,
+            pause=0,
+        ).run_once()
+    finally:
+        adb.close()
+
+
+def main(argv=None):
+    default_db = os.path.normpath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "polly.db"))
+    ap = argparse.ArgumentParser(description="Polly DB retention and maintenance")
+    ap.add_argument("--db", default=default_db, help="database file")
+    ap.add_argument("--archive", default=settings.EVENTS_ARCHIVE_PATH,
+                    help="archive database file (default <db>-archive.db)")
+    ap.add_argument("--run", action="store_true", help="run one maintenance pass")
+    ap.add_argument("--enable-incremental-vacuum", action="store_true",
+                    help="switch the file to incremental auto_vacuum (full VACUUM)")
+    args = ap.parse_args(argv)
+    archive_path = args.archive or default_archive_path(args.db)
+
+    print(f"DB: {args.db}")
+    if args.enable_incremental_vacuum:
+        started = time.monotonic()
+        ok = enable_incremental_vacuum(args.db)
+        print(f"VACUUM in {time.monotonic() - started:.1f}s; "
+              f"incremental auto_vacuum {'enabled' if ok else 'NOT enabled'}.")
+        if not ok:
+            return 1
+    if args.run:
+        db = PollyDB(db_path=args.db)
+        try:
+            result = asyncio.run(run_pass(db, archive_path))
+        finally:
+            db.close()
+        for step, count in result.items():
+            print(f"  {step}: {count}")
+    show_status(args.db, archive_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
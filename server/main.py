@@ -16,7 +16,12 @@ from api.devices import router as devices_router
 from api.homeassistant import router as ha_router
 from api.web import router as web_router
 from api.firmware import router as firmware_router
+from core.async_db import AsyncPollyDB, get_async_db
 from core.database import PollyDB
+from core.telemetry import TelemetryWriter
+from core.backup import DbBackup, default_backup_dir
+from core.heartbeat import HeartbeatTracker
+from core.maintenance import DbMaintenance
 from core.wakeword import WakeWordDetector
 from core.vad_wakeword import VADWakeWordDetector
 from core.data_loader import DataLoader
@@ -37,6 +42,9 @@ from core.vision import VisionService
 from core.auth import APIKeyMiddleware
 from core.squawk import SquawkManager
 from core.ack_cache import AckCache
+from core.sound_bank import SoundBank
+from core import device_state
+from core.state_snapshot import StateSnapshotter
 from config import settings
 
 logging.basicConfig(level=logging.INFO)
@@ -66,10 +74,45 @@ def create_tts_backend():
         return Pyttsx3TTS()
 
 
+async def device_state_sweeper(interval: float = 300):
+    """Evict idle per-device state even when no new devices are writing."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            evicted = device_state.sweep_all()
+            if evicted:
+                logger.info(f"Evicted {evicted} idle per-device state entries")
+        except Exception as e:
+            logger.error(f"Device state sweep error: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Polly Connect server...")
     app.state.db = PollyDB(settings.DATABASE_PATH)
+    app.state.async_db = AsyncPollyDB(app.state.db)
+    app.state.telemetry = TelemetryWriter(app.state.async_db)
+    # last_seen / session touches are kept in memory and flushed in bulk
+    app.state.heartbeats = HeartbeatTracker(app.state.async_db).attach()
+    # Retention, archival and PRAGMA optimize in small batches
+    app.state.maintenance = DbMaintenance(
+        app.state.async_db,
+        interval=settings.MAINTENANCE_INTERVAL_S,
+        live_months=settings.EVENTS_LIVE_MONTHS,
+        archive_path=settings.EVENTS_ARCHIVE_PATH or None,
+        message_days=settings.MESSAGE_RETENTION_DAYS,
+        narrative_days=settings.NARRATIVE_LOG_RETENTION_DAYS,
+    )
+    # Online snapshots via the SQLite backup API, off the DB writer thread
+    app.state.backups = None
+    if settings.BACKUP_INTERVAL_S > 0 and settings.DATABASE_PATH != ":memory:":
+        app.state.backups = DbBackup(
+            settings.DATABASE_PATH,
+            settings.BACKUP_DIR or default_backup_dir(settings.DATABASE_PATH),
+            interval=settings.BACKUP_INTERVAL_S,
+            keep_daily=settings.BACKUP_KEEP_DAILY,
+            keep_weekly=settings.BACKUP_KEEP_WEEKLY,
+        )
 
     logger.info(f"STT backend: {settings.STT_BACKEND}")
     app.state.transcriber = create_stt_backend()
@@ -77,10 +120,14 @@ async def lifespan(app: FastAPI):
     logger.info(f"TTS backend: {settings.TTS_BACKEND}")
     app.state.tts = create_tts_backend()
 
+    # Shared sound bank: static/sounds decoded once (disk-cached across restarts)
+    sounds_dir = os.path.join(os.path.dirname(__file__), "static", "sounds")
+    app.state.sound_bank = SoundBank(sounds_dir)
+    app.state.sound_bank.preload()
+
     # Pre-cache acknowledgment squawk chirps for instant playback
     app.state.ack_cache = AckCache()
-    sounds_dir = os.path.join(os.path.dirname(__file__), "static", "sounds")
-    app.state.ack_cache.warm_up(sounds_dir)
+    app.state.ack_cache.warm_up(sounds_dir, bank=app.state.sound_bank)
 
     logger.info(f"Loading wake word model: {settings.WAKE_WORD_MODEL_PATH}")
     detector = WakeWordDetector(
@@ -113,7 +160,8 @@ async def lifespan(app: FastAPI):
     app.state.bible = BibleVerseService(app.state.db, settings.DATA_DIR)
     app.state.prayer = PrayerService(settings.DATA_DIR)  # db/followup_gen set below
     app.state.weather = AlmanacWeather(settings.DATA_DIR)
-    app.state.med_scheduler = MedicationScheduler(app.state.db, tts=app.state.tts)
+    app.state.med_scheduler = MedicationScheduler(
+        app.state.db, tts=app.state.tts, sound_bank=app.state.sound_bank)
 
     # Family identity and narrative services
     app.state.family_identity = FamilyIdentityService(app.state.db)
@@ -158,21 +206,47 @@ async def lifespan(app: FastAPI):
     app.state.med_scheduler._cmd_processor = app.state.cmd
 
     # Squawk / ambient parrot sounds
-    sounds_dir = os.path.join(os.path.dirname(__file__), "static", "sounds")
-    app.state.squawk = SquawkManager(sounds_dir, db=app.state.db)
+    app.state.squawk = SquawkManager(sounds_dir, db=app.state.db, bank=app.state.sound_bank)
+    # Reminders go through the same per-device send locks as squawks and TTS
+    app.state.med_scheduler.squawk = app.state.squawk
+
+    # Restore conversation/squawk/medication state from the last run
+    app.state.snapshotter = StateSnapshotter(
+        app.state.db, cmd=app.state.cmd, squawk=app.state.squawk,
+        med_scheduler=app.state.med_scheduler,
+    )
+    restored = app.state.snapshotter.restore()
+    if restored:
+        logger.info(f"Restored runtime state: {', '.join(restored)}")
 
     # Start medication reminder background task
     await app.state.med_scheduler.start()
 
-    # Clean up expired web sessions
-    app.state.db.cleanup_expired_sessions()
-    logger.info("Expired web sessions cleaned up")
+    # Bounded per-device state: sweep idle entries every few minutes
+    sweeper = asyncio.create_task(device_state_sweeper())
+    await app.state.snapshotter.start()
+    await app.state.telemetry.start()
+    await app.state.heartbeats.start()
+    # Expired sessions are now deleted by the maintenance loop
+    await app.state.maintenance.start()
+    if app.state.backups:
+        await app.state.backups.start()
 
     logger.info("Server ready")
     yield
 
     # Cleanup
+    sweeper.cancel()
+    app.state.squawk.stop()
+    await app.state.snapshotter.stop()  # final snapshot for the next start
     await app.state.med_scheduler.stop()
+    if app.state.backups:
+        await app.state.backups.stop()
+    await app.state.maintenance.stop()
+    await app.state.telemetry.stop()  # flush buffered device events
+    await app.state.heartbeats.stop()
+    app.state.async_db.close()  # drain queued writes first
+    app.state.db.close()
     logger.info("Shutting down...")
 
 
@@ -197,8 +271,7 @@ class PrivateStaticMiddleware(BaseHTTPMiddleware):
             # Check for valid session cookie
             session_id = request.cookies.get("polly_session")
             if session_id:
-                db = request.app.state.db
-                session = db.get_web_session(session_id)
+                session = await get_async_db(request.app).get_web_session(session_id)
                 if session:
                     return await call_next(request)
             # Also allow device API key access (for firmware/device playback)
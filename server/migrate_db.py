@@ -0,0 +1,52 @@
+"""
+Show or apply pending schema migrations (PRAGMA user_version).
+
+PollyDB applies them on startup anyway; this lets a deploy see what is
+pending and run it before the server restarts.
+
+Run from /opt/polly-connect/server with:
+    sudo python3 migrate_db.py            # show version + pending steps
+    sudo python3 migrate_db.py --apply
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import MIGRATIONS, SCHEMA_VERSION, PollyDB
+
+
+def main(argv=None):
+    default_db = os.path.normpath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "polly.db"))
+    ap = argparse.ArgumentParser(description="Polly DB schema migrations")
+    ap.add_argument("--db", default=default_db, help="database file")
+    ap.add_argument("--apply", action="store_true", help="apply pending migrations")
+    args = ap.parse_args(argv)
+
+    print(f"DB: {args.db}")
+    db = PollyDB(db_path=args.db, migrate=False)
+    try:
+        print(f"Schema v{db.schema_version()} (code is v{SCHEMA_VERSION})")
+        pending = db.pending_migrations()
+        for version, description in pending:
+            print(f"  pending v{version}: {description}")
+        if not pending:
+            print("Up to date.")
+            return 0
+        if not args.apply:
+            print("Run with --apply to migrate.")
+            return 0
+        started = time.monotonic()
+        applied = db.apply_migrations()
+        print(f"Applied {len(applied)} of {len(MIGRATIONS)} migration(s) in "
+              f"{time.monotonic() - started:.1f}s; now v{db.schema_version()}.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Audio DSP Benchmark
+===================
+Throughput and quality of server/core/audio_dsp against the converters it
+replaced: the pure-Python struct loop in Pyttsx3TTS (left channel only,
+integer-step decimation) and the linear-interpolation resampler the sound
+bank used.
+
+Quality is measured on synthetic tones: output length must match 16kHz
+playback (the old pyttsx3 path skipped decimation below 32kHz and played
+22.05kHz audio fast and high-pitched), a 1kHz tone must come through at
+full level (passband), and a 10kHz tone — above the 8kHz Nyquist limit of
+the 16kHz output — must be filtered out rather than folding back as an
+audible 6kHz alias.
+
+Run:
+    python -m tests.audio_dsp_benchmark
+    python -m tests.audio_dsp_benchmark --seconds 30 --rounds 5
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import io
+import struct
+import time
+import wave
+from typing import Callable, Dict
+
+import numpy as np
+
+from server.core import audio_dsp
+
+# (label, source rate, channels)
+CASES = [
+    ("tts 22.05k mono", 22050, 1),
+    ("sound 44.1k stereo", 44100, 2),
+    ("sound 48k mono", 48000, 1),
+]
+
+
+# ── Legacy converters (as they were before audio_dsp) ────────────────
+
+def legacy_pyttsx3(wav_bytes: bytes) -> np.ndarray:
+    """Pyttsx3TTS.synthesize: struct unpack, left channel, integer decimation."""
+    frames = audio_dsp.wav_frames(wav_bytes)
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
+        channels, rate = w.getnchannels(), w.getframerate()
+    samples = list(struct.unpack(f'<{len(frames)//2}h', frames))
+    if channels == 2:
+        samples = samples[::2]
+    if rate > 16000:
+        samples = samples[::max(1, rate // 16000)]
+    packed = struct.pack(f'<{len(samples)}h', *samples)
+    return np.frombuffer(packed, dtype=np.int16)
+
+
+def legacy_interp(wav_bytes: bytes) -> np.ndarray:
+    """SoundBank's first decoder: channel mean + np.interp linear resampling."""
+    samples, rate = audio_dsp.unwrap_wav(wav_bytes)
+    samples = samples.mean(axis=1)
+    num_out = int(len(samples) * 16000 / rate)
+    positions = np.linspace(0, len(samples) - 1, num_out)
+    samples = np.interp(positions, np.arange(len(samples)), samples)
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+CONVERTERS: Dict[str, Callable[[bytes], np.ndarray]] = {
+    "legacy_pyttsx3": legacy_pyttsx3,
+    "legacy_interp": legacy_interp,
+    "audio_dsp": audio_dsp.to_16k_mono,
+}
+
+
+# ── Signals and measurements ─────────────────────────────────────────
+
+def tone_wav(freq: float, rate: int, channels: int, seconds: float,
+             amplitude: float = 12000.0) -> bytes:
+    t = np.arange(int(rate * seconds)) / rate
+    mono = amplitude * np.sin(2 * np.pi * freq * t)
+    return audio_dsp.wrap_wav(audio_dsp.saturate(np.repeat(mono[:, None], channels, axis=1)),
+                              rate=rate, channels=channels)
+
+
+def _level_db(pcm: np.ndarray, freq: float, rate: int = 16000, amplitude: float = 12000.0) -> float:
+    """Level of a single frequency relative to the input amplitude (dB)."""
+    x = pcm[len(pcm) // 10: -len(pcm) // 10 or None].astype(np.float64)
+    if not len(x):
+        return float('-inf')
+    spectrum = np.abs(np.fft.rfft(x * np.hanning(len(x)))) * 2 / (np.hanning(len(x)).sum())
+    bin_hz = rate / len(x)
+    lo, hi = int((freq - 50) / bin_hz), int((freq + 50) / bin_hz) + 1
+    peak = spectrum[max(lo, 0):max(hi, 1)].max()
+    return 20 * np.log10(max(peak, 1e-9) / amplitude)
+
+
+def _time(fn: Callable, arg, rounds: int) -> float:
+    fn(arg)  # warm caches (filter banks, imports)
+    best = float('inf')
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run_benchmark(seconds: float = 10.0, rounds: int = 3) -> Dict:
+    """Time every converter on every case and measure passband/alias levels."""
+    report = {"seconds": seconds, "cases": {}}
+    for label, rate, channels in CASES:
+        speech = tone_wav(440, rate, channels, seconds)
+        passband = tone_wav(1000, rate, channels, 2.0)
+        alias = tone_wav(10000, rate, channels, 2.0)
+        folded = 16000 - 10000  # where a 10kHz tone lands without filtering
+        case = {}
+        for name, convert in CONVERTERS.items():
+            elapsed = _time(convert, speech, rounds)
+            case[name] = {
+                # Output samples vs what 16kHz playback needs; != 1.0 means
+                # the clip plays at the wrong speed and pitch
+                "length_ratio": round(len(convert(speech)) / (seconds * 16000), 3),
+                "x_realtime": round(seconds / elapsed, 1),
+                "ms": round(elapsed * 1000, 2),
+                "passband_db": round(_level_db(convert(passband), 1000), 2),
+                "alias_db": round(_level_db(convert(alias), folded), 1),
+            }
+        report["cases"][label] = case
+
+    # Volume scaling on 16kHz output (AckCache / squawk / TTS volume paths)
+    wav16 = tone_wav(440, 16000, 1, seconds)
+
+    def legacy_scale(wav):
+        samples = np.frombuffer(audio_dsp.wav_frames(wav), dtype=np.int16).astype(np.float32)
+        return audio_dsp.wrap_wav(np.clip(samples * 0.6, -32768, 32767).astype(np.int16))
+
+    report["scale"] = {
+        "legacy_ms": round(_time(legacy_scale, wav16, rounds) * 1000, 2),
+        "audio_dsp_ms": round(_time(lambda w: audio_dsp.scale_wav(w, 0.6), wav16, rounds) * 1000, 2),
+    }
+    return report
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"{report['seconds']:.0f}s of audio per conversion", ""]
+    header = f"{'case':<20} {'converter':<16} {'x realtime':>11} {'ms':>9} {'length':>7} {'1kHz dB':>8} {'alias dB':>9}"
+    lines += [header, "-" * len(header)]
+    for label, case in report["cases"].items():
+        for name, r in case.items():
+            lines.append(f"{label:<20} {name:<16} {r['x_realtime']:>11.0f} {r['ms']:>9.2f} {r['length_ratio']:>7.3f} "
+                         f"{r['passband_db']:>8.2f} {r['alias_db']:>9.1f}")
+    s = report["scale"]
+    lines += ["", f"volume scale: legacy {s['legacy_ms']} ms, audio_dsp {s['audio_dsp_ms']} ms"]
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark audio_dsp against legacy converters")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+    print(format_report(run_benchmark(seconds=args.seconds, rounds=args.rounds)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""Shared test setup: a fixed CSRF secret, so importing api.web never
+writes server/.csrf_secret."""
+
+import os
+
+os.environ.setdefault("POLLY_CSRF_SECRET", "test-csrf-secret")
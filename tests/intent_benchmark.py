@@ -0,0 +1,321 @@
+"""
+Intent Parser Benchmark
+=======================
+Throughput and accuracy runner for IntentParser.parse.
+
+Accuracy is scored on tests/intent_golden.json, a hand-written set of
+utterances and the intent each must get, plus STT noise variants of each
+(wake-word mishears like "hey holly", dropped apostrophes, fillers,
+trailing punctuation). Because the set does not come from the parser, a
+phrase that is dropped or moved to another intent shows up as a miss.
+
+Throughput is timed on a larger corpus generated deterministically from
+the parser's own phrase lists plus slot-filled templates, with the same
+variants. It only checks the parser keeps up, so it is not an accuracy
+measure.
+
+Run:
+    python -m tests.intent_benchmark                    # print report
+    python -m tests.intent_benchmark --update-baseline  # re-record baseline
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from server.core.intent_parser import IntentParser
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "intent_benchmark_baseline.json")
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "intent_golden.json")
+SEED = 2026
+
+FAMILY_NAMES = {
+    "glen", "grandma", "dad", "mom", "mia", "brooklyn",
+    "papa", "nana", "uncle bob", "bob", "sarah", "joe",
+}
+
+# Wake-word prefixes as STT actually hears them
+WAKE_PREFIXES = [
+    "polly", "hey polly", "okay polly", "hey holly", "hey poly",
+    "hey paulie", "hi holly", "hey molly",
+]
+FILLERS = ["uh", "so", "well", "okay", "oh"]
+SUFFIXES = ["please", "polly", "now", "for me"]
+PUNCTUATION = ["?", ".", "!", ","]
+
+ITEMS = [
+    "hammer", "keys", "glasses", "wallet", "tape measure", "screwdriver",
+    "flashlight", "passport", "checkbook", "remote", "drill", "scissors",
+]
+LOCATIONS = [
+    "garage", "kitchen drawer", "red toolbox", "top shelf", "hall closet",
+    "workbench", "nightstand", "basement", "blue bin", "junk drawer",
+]
+NAMES = ["Glen", "Sarah", "Mia", "Bob", "Joe", "Brooklyn"]
+ROLES = ["dad", "mom", "grandma", "grandpa", "papa", "nana"]
+
+# (intent, template) — slots: {item} {loc} {name} {role}
+TEMPLATES: List[Tuple[str, str]] = [
+    ("store", "the {item} is in the {loc}"),
+    ("store", "my {item} is on the {loc}"),
+    ("store", "i put the {item} in the {loc}"),
+    ("store", "i left my {item} on the {loc}"),
+    ("retrieve_item", "where is the {item}"),
+    ("retrieve_item", "where's my {item}"),
+    ("retrieve_item", "where did i put the {item}"),
+    ("retrieve_item", "i can't find my {item}"),
+    ("retrieve_item", "i lost my {item}"),
+    ("retrieve_item", "have you seen my {item}"),
+    ("retrieve_location", "what's in the {loc}"),
+    ("retrieve_location", "what is on the {loc}"),
+    ("delete", "forget about the {item}"),
+    ("delete", "delete my {item}"),
+    ("who_is", "who is {name}"),
+    ("leave_message", "tell {name} that dinner is ready"),
+    ("leave_message", "leave a message for {name} call me back"),
+    ("person_home", "{name} is home"),
+    ("person_home", "{role} is back"),
+    ("where_is_person", "where is {role}"),
+    ("status_update", "i'm going to the store"),
+    ("status_update", "{name} went to work"),
+    ("introduce_self", "my name is {name}"),
+    ("introduce_self", "this is {name}"),
+    ("play_blessing", "play a meal blessing"),
+    ("play_blessing", "play {name}'s bedtime blessing"),
+    ("help", "what can you do"),
+    ("help", "i need help"),
+    ("list_all", "list everything"),
+    ("list_all", "what do you remember"),
+    ("found_it", "i found it"),
+    ("found_it", "found it"),
+    ("send_polly_message", "send a message to {name}'s polly"),
+    ("unknown", "the quick brown fox"),
+    ("unknown", "purple elephants dancing"),
+]
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        item=rng.choice(ITEMS), loc=rng.choice(LOCATIONS),
+        name=rng.choice(NAMES), role=rng.choice(ROLES),
+    )
+
+
+def _variants(text: str, rng: random.Random, count: int) -> List[str]:
+    """Paraphrase/noise variants of one utterance, as STT would deliver them."""
+    makers = [
+        lambda t: f"{rng.choice(WAKE_PREFIXES)} {t}",
+        lambda t: f"{t} {rng.choice(SUFFIXES)}",
+        lambda t: f"{rng.choice(FILLERS)} {t}",
+        lambda t: t.replace("'", ""),
+        lambda t: t[:1].upper() + t[1:] + rng.choice(PUNCTUATION),
+        lambda t: f"{rng.choice(WAKE_PREFIXES)}, {t}{rng.choice(PUNCTUATION)}",
+    ]
+    picked = rng.sample(makers, min(count, len(makers)))
+    return [make(text) for make in picked]
+
+
+def build_corpus(parser: IntentParser = None, seed: int = SEED,
+                 variants_per_phrase: int = 5,
+                 fills_per_template: int = 20) -> List[Tuple[str, str]]:
+    """Return [(utterance, expected_intent)], deterministic for a given seed."""
+    parser = parser or IntentParser()
+    rng = random.Random(seed)
+    corpus = []
+
+    for key, phrases, _ in parser._phrase_groups():
+        if not isinstance(key, str) or key == "item_query":
+            continue  # theme words and guards are not intents of their own
+        for phrase in phrases:
+            phrase = phrase.strip()
+            corpus.append((phrase, key))
+            corpus.extend((v, key) for v in _variants(phrase, rng, variants_per_phrase))
+
+    for intent, template in TEMPLATES:
+        for _ in range(fills_per_template):
+            text = _fill(template, rng)
+            corpus.append((text, intent))
+            corpus.extend((v, intent) for v in _variants(text, rng, 1))
+
+    return corpus
+
+
+def load_golden(path: str = GOLDEN_PATH) -> List[Tuple[str, str]]:
+    """The hand-written [(utterance, expected_intent)] set."""
+    with open(path) as f:
+        golden = json.load(f)
+    return [(text, intent) for intent, texts in golden.items() for text in texts]
+
+
+def build_golden_corpus(seed: int = SEED, variants_per_utterance: int = 4) -> List[Tuple[str, str]]:
+    """Golden utterances plus STT noise variants of each, deterministic."""
+    rng = random.Random(seed)
+    corpus = []
+    for text, intent in load_golden():
+        corpus.append((text, intent))
+        corpus.extend((v, intent) for v in _variants(text, rng, variants_per_utterance))
+    return corpus
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    if not sorted_values:
+        return 0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_benchmark(corpus: List[Tuple[str, str]] = None, rounds: int = 3,
+                  golden: List[Tuple[str, str]] = None) -> Dict:
+    """Time `rounds` passes over the generated corpus; score accuracy and
+    confusion on the golden corpus."""
+    parser = IntentParser()
+    parser._family_names = set(FAMILY_NAMES)
+    corpus = corpus if corpus is not None else build_corpus(parser)
+    golden = golden if golden is not None else build_golden_corpus()
+
+    for text, _ in corpus[:200]:
+        parser.parse(text)  # warm regex and matcher caches
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text, _ in corpus:
+            t0 = time.perf_counter_ns()
+            parser.parse(text)
+            latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+
+    predicted = [parser.parse(text)["intent"] for text, _ in golden]
+    exact = {text for text, _ in load_golden()}
+    per_intent_total = Counter()
+    per_intent_correct = Counter()
+    confusion = defaultdict(Counter)
+    golden_misses = []
+    for (text, expected), got in zip(golden, predicted):
+        per_intent_total[expected] += 1
+        if got == expected:
+            per_intent_correct[expected] += 1
+        else:
+            confusion[expected][got] += 1
+            if text in exact:
+                golden_misses.append(f"{text!r}: expected {expected}, got {got}")
+
+    latencies.sort()
+    correct = sum(per_intent_correct.values())
+    return {
+        "utterances": len(corpus),
+        "parses_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_us": round(_percentile(latencies, 50) / 1000.0, 1),
+        "p99_us": round(_percentile(latencies, 99) / 1000.0, 1),
+        "golden_utterances": len(golden),
+        "golden_misses": golden_misses,
+        "accuracy": round(correct / len(golden), 4),
+        "per_intent_accuracy": {
+            intent: round(per_intent_correct[intent] / total, 4)
+            for intent, total in sorted(per_intent_total.items())
+        },
+        "confusion": {
+            expected: dict(got.most_common())
+            for expected, got in sorted(confusion.items())
+        },
+    }
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(report: Dict, path: str = BASELINE_PATH):
+    baseline = {
+        "utterances": report["utterances"],
+        "golden_utterances": report["golden_utterances"],
+        "parses_per_sec": report["parses_per_sec"],
+        "p99_us": report["p99_us"],
+        "accuracy": report["accuracy"],
+        "per_intent_accuracy": report["per_intent_accuracy"],
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_to_baseline(report: Dict, baseline: Dict,
+                        throughput_tolerance: float = 0.5,
+                        accuracy_tolerance: float = 0.005,
+                        check_throughput: bool = True) -> List[str]:
+    """Return human-readable regressions (empty list = no regression).
+    Throughput depends on the machine, so callers on shared runners can
+    leave it out and gate on accuracy only."""
+    problems = [f"golden miss {miss}" for miss in report["golden_misses"]]
+    floor = baseline["parses_per_sec"] * (1 - throughput_tolerance)
+    if check_throughput and report["parses_per_sec"] < floor:
+        problems.append(
+            f"throughput {report['parses_per_sec']:.0f}/s below "
+            f"{floor:.0f}/s (baseline {baseline['parses_per_sec']:.0f}/s)")
+    if report["accuracy"] < baseline["accuracy"] - accuracy_tolerance:
+        problems.append(
+            f"accuracy {report['accuracy']:.4f} below baseline {baseline['accuracy']:.4f}")
+    for intent, base_acc in baseline["per_intent_accuracy"].items():
+        acc = report["per_intent_accuracy"].get(intent)
+        if acc is not None and acc < base_acc - accuracy_tolerance:
+            top = report["confusion"].get(intent, {})
+            problems.append(
+                f"{intent}: accuracy {acc:.4f} below baseline {base_acc:.4f} "
+                f"(now confused with {top})")
+    return problems
+
+
+def format_report(report: Dict, max_confusions: int = 5) -> str:
+    lines = [
+        f"Utterances:   {report['utterances']} timed, {report['golden_utterances']} golden",
+        f"Throughput:   {report['parses_per_sec']:.0f} parses/sec",
+        f"Latency:      p50 {report['p50_us']} us, p99 {report['p99_us']} us",
+        f"Accuracy:     {report['accuracy']:.2%} (golden + STT variants)",
+        "",
+        f"{'intent':<20} {'acc':>7}  top confusions",
+    ]
+    for intent, acc in report["per_intent_accuracy"].items():
+        confused = report["confusion"].get(intent, {})
+        top = ", ".join(f"{k}={v}" for k, v in list(confused.items())[:max_confusions])
+        lines.append(f"{intent:<20} {acc:>7.2%}  {top}")
+    if report["golden_misses"]:
+        lines += ["", "Golden misses:"] + [f"  {miss}" for miss in report["golden_misses"]]
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark IntentParser.parse")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--update-baseline", action="store_true",
+                    help="record this run as the new baseline")
+    args = ap.parse_args()
+
+    report = run_benchmark(rounds=args.rounds)
+    print(format_report(report))
+
+    if args.update_baseline:
+        save_baseline(report)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    if os.path.exists(BASELINE_PATH):
+        problems = compare_to_baseline(report, load_baseline())
+        if problems:
+            print("\nREGRESSIONS:")
+            for p in problems:
+                print(f"  - {p}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Admin Dashboard Rollup Tests
+============================
+device_events are folded into hourly / per-intent / per-device rollups as
+they are written, and story totals are kept by triggers, so the admin
+dashboard never aggregates the raw history.
+Run: python -m pytest tests/test_admin_rollups.py -v
+"""
+
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.database import PollyDB
+
+
+def _ago(**delta):
+    return (datetime.now(timezone.utc) - timedelta(**delta)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    db.register_device("dev1", 1, name="Kitchen")
+    db.register_device("dev2", 1, name="Den")
+    yield db
+    db.close()
+
+
+def _seed(db):
+    now, old = _ago(minutes=1), _ago(days=3)
+    db.log_device_events([
+        ("dev1", 1, "command", "weather", 1, None, now),
+        ("dev1", 1, "command", "weather", 1, None, now),
+        ("dev1", 1, "command", "time", 1, None, _ago(minutes=5)),
+        ("dev1", 1, "error", None, 0, "tts failed", now),
+        ("dev2", 1, "command", "joke", 1, None, old),
+        ("dev2", 1, "connect", None, 1, None, now),
+    ])
+
+
+def _rollup_rows(db):
+    with db.connection() as conn:
+        return {t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall())
+                for t in ("device_event_hourly", "intent_daily", "device_activity", "story_counts")}
+
+
+class TestDashboard:
+    def test_today_counts(self, db):
+        _seed(db)
+        stats = db.get_admin_dashboard_stats()
+        assert stats["total_commands_today"] == 3
+        assert stats["total_errors_today"] == 1
+
+    def test_device_list(self, db):
+        _seed(db)
+        db.log_device_event("dev2", 1, "command", intent="joke")
+        devices = {d["device_id"]: d for d in db.get_admin_device_list()}
+        assert devices["dev1"]["commands_today"] == 3 and devices["dev1"]["errors_today"] == 1
+        assert devices["dev2"]["commands_today"] == 1
+        assert devices["dev2"]["last_command"] > _ago(minutes=1)
+
+    def test_intent_stats(self, db):
+        _seed(db)
+        week = db.get_admin_intent_stats(days=7)
+        assert week[0] == {"intent": "weather", "cnt": 2}
+        assert {r["intent"]: r["cnt"] for r in week} == {"weather": 2, "time": 1, "joke": 1}
+        assert {r["intent"] for r in db.get_admin_intent_stats(days=1)} == {"weather", "time"}
+
+    def test_reads_never_touch_device_events(self, db):
+        _seed(db)
+        statements = []
+        db._pool.close_all()  # new connections below get the trace callback
+        acquire = db._pool.acquire
+
+        def traced():
+            conn = acquire()
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        db._pool.acquire = traced
+        db.get_admin_dashboard_stats()
+        db.get_admin_device_list()
+        db.get_admin_intent_stats()
+        assert statements and not any("device_events" in sql for sql in statements)
+
+
+class TestStoryCounts:
+    def test_triggers_track_inserts_deletes_and_moves(self, db):
+        ids = [db.save_story(f"story {i}", tenant_id=1) for i in range(3)]
+        db.save_story("no tenant")
+        with db.connection() as conn:
+            conn.execute("DELETE FROM stories WHERE id = ?", (ids[0],))
+            conn.execute("UPDATE stories SET tenant_id = 2 WHERE id = ?", (ids[1],))
+            conn.commit()
+        assert db.get_admin_dashboard_stats()["total_stories"] == 3
+        devices = {d["device_id"]: d for d in db.get_admin_device_list()}
+        assert devices["dev1"]["stories_total"] == 1
+
+
+class TestRebuild:
+    def test_rebuild_matches_incremental(self, db):
+        _seed(db)
+        db.save_story("story", tenant_id=1)
+        incremental = _rollup_rows(db)
+        assert db.rebuild_admin_rollups() == 6
+        assert _rollup_rows(db) == incremental
+
+    def test_upgrade_backfills_history(self, tmp_path):
+        path = str(tmp_path / "old.db")
+        db = PollyDB(path)
+        _seed(db)
+        db.close()
+        # Pretend the history predates the rollups: v4 schema, rollups empty
+        conn = sqlite3.connect(path)
+        for table in ("device_event_hourly", "intent_daily", "device_activity"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("PRAGMA user_version = 4")
+        conn.commit()
+        conn.close()
+
+        db = PollyDB(path)
+        assert db.get_admin_dashboard_stats()["total_commands_today"] == 3
+        db.close()
@@ -0,0 +1,138 @@
+"""
+Async DB Facade Tests
+=====================
+AsyncPollyDB runs PollyDB reads on a reader pool and writes on a single
+writer thread, so awaiting the database never blocks the event loop.
+Run: python -m pytest tests/test_async_db.py -v
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import web_auth
+from core.async_db import AsyncPollyDB, get_async_db, is_read_method
+from core.database import PollyDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def adb(db):
+    adb = AsyncPollyDB(db)
+    yield adb
+    adb.close()
+
+
+def test_method_routing():
+    assert is_read_method("get_stories") and is_read_method("search")
+    assert not is_read_method("save_story")
+    assert not is_read_method("get_or_create_user")  # may insert
+
+
+class TestFacade:
+    def test_reads_and_writes_on_their_threads(self, adb, monkeypatch):
+        seen = {}
+
+        def spy(name, result):
+            def fn(*args, **kwargs):
+                seen[name] = threading.current_thread().name
+                return result
+            return fn
+
+        monkeypatch.setattr(adb.db, "get_stories", spy("read", []))
+        monkeypatch.setattr(adb.db, "save_story", spy("write", 1))
+
+        async def go():
+            await adb.get_stories(tenant_id=1)
+            await adb.save_story("hello", tenant_id=1)
+
+        asyncio.run(go())
+        assert seen["read"].startswith("db-reader")
+        assert seen["write"].startswith("db-writer")
+
+    def test_results_round_trip(self, adb):
+        async def go():
+            story_id = await adb.save_story("the county fair", tenant_id=1)
+            return story_id, await adb.get_story_by_id(story_id, tenant_id=1)
+
+        story_id, story = asyncio.run(go())
+        assert story["id"] == story_id and story["transcript"] == "the county fair"
+
+    def test_writes_apply_in_submission_order(self, adb):
+        async def go():
+            await asyncio.gather(*(adb.store_item(f"item {i}", "shelf", tenant_id=1)
+                                   for i in range(20)))
+            return await adb.list_all(tenant_id=1)
+
+        items = asyncio.run(go())
+        assert sorted(r["id"] for r in items) == list(range(1, 21))
+        assert {r["id"]: r["item"] for r in items}[20] == "item 19"
+
+    def test_slow_query_does_not_block_loop(self, adb, monkeypatch):
+        monkeypatch.setattr(adb.db, "get_stories", lambda **kw: time.sleep(0.3) or [])
+
+        async def go():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            await adb.get_stories(tenant_id=1)
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(go()) >= 10
+
+    def test_deferred_failure_is_logged_not_raised(self, adb, monkeypatch):
+        def boom(*args):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(adb.db, "touch_web_session", boom)
+        adb.defer("touch_web_session", "abc").exception(timeout=1)
+        adb.defer("update_device_last_seen", "dev1").result(timeout=1)
+        assert adb.stats() == {"pending_writes": 0, "deferred_failures": 1}
+
+    def test_memory_db_stays_on_one_thread(self):
+        adb = AsyncPollyDB(PollyDB(":memory:"))
+        assert adb._readers is adb._writer
+        adb.close()
+
+
+class TestAppIntegration:
+    def test_get_async_db_is_cached_per_db(self, db):
+        app = SimpleNamespace(state=SimpleNamespace(db=db))
+        adb = get_async_db(app)
+        assert get_async_db(app) is adb and adb.db is db
+        assert get_async_db(SimpleNamespace(state=SimpleNamespace())) is None
+        adb.close()
+
+    def test_web_session_lookup(self, db):
+        tenant_id = db.create_tenant("Smith")
+        account_id = db.create_account("a@example.com", "x", "Ann", tenant_id, role="owner")
+        session_id = db.create_web_session(account_id, tenant_id)
+        app = SimpleNamespace(state=SimpleNamespace(db=db))
+        request = SimpleNamespace(app=app, cookies={"polly_session": session_id})
+
+        session = asyncio.run(web_auth.get_web_session(request))
+        assert session["account_id"] == account_id and session["tenant_id"] == tenant_id
+        app.state.async_db.close()  # touch was queued; drained here
+
+        request.cookies["polly_session"] = "nope"
+        assert asyncio.run(web_auth.get_web_session(request)) is None
@@ -0,0 +1,139 @@
+"""
+Audio DSP Tests
+===============
+WAV (un)wrapping, downmix, polyphase resampling, gain/saturation and
+loudness normalization in core/audio_dsp, plus the converters built on it
+(pyttsx3 TTS output, TTS volume scaling) and the benchmark's quality gates.
+Run: python -m pytest tests/test_audio_dsp.py -v
+"""
+
+import io
+import os
+import sys
+import wave
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core import audio_dsp
+from core.tts import Pyttsx3TTS
+from tests.audio_dsp_benchmark import run_benchmark, tone_wav
+
+
+def _params(wav_bytes):
+    with wave.open(io.BytesIO(wav_bytes), "rb") as w:
+        return w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()
+
+
+class TestWav:
+    def test_round_trip(self):
+        pcm = np.array([0, 1, -1, 32767, -32768], dtype=np.int16)
+        samples, rate = audio_dsp.unwrap_wav(audio_dsp.wrap_wav(pcm, rate=22050))
+        assert rate == 22050
+        assert samples.shape == (5, 1)
+        assert list(samples[:, 0]) == list(pcm)
+
+    def test_wrap_raw_bytes_with_channels(self):
+        wav = audio_dsp.wrap_wav(b"\x01\x00" * 8, rate=8000, channels=2)
+        assert _params(wav) == (2, 2, 8000, 4)
+        assert audio_dsp.wav_frames(wav) == b"\x01\x00" * 8
+
+    def test_unsupported_width(self):
+        with pytest.raises(ValueError):
+            audio_dsp.decode_pcm(b"\x00" * 10, 5)
+
+
+class TestDownmixGain:
+    def test_downmix_averages_channels(self):
+        stereo = np.array([[1000, 3000], [-2000, 0]], dtype=np.float32)
+        assert list(audio_dsp.downmix(stereo)) == [2000, -1000]
+
+    def test_saturates_instead_of_wrapping(self):
+        loud = audio_dsp.apply_gain(np.array([30000, -30000, 100], dtype=np.int16), 2.0)
+        assert list(audio_dsp.saturate(loud)) == [32767, -32768, 200]
+
+    def test_normalize_hits_rms_target(self):
+        x = 1000 * np.sin(np.linspace(0, 200 * np.pi, 16000))
+        y = audio_dsp.normalize_loudness(x, target_dbfs=-20.0)
+        assert audio_dsp.rms_dbfs(y) == pytest.approx(-20.0, abs=0.05)
+
+    def test_normalize_respects_peak_ceiling(self):
+        x = np.zeros(16000)
+        x[0] = 1000  # one spike: RMS target would need huge gain
+        y = audio_dsp.normalize_loudness(x, target_dbfs=-10.0, peak_dbfs=-1.0)
+        assert np.max(np.abs(y)) == pytest.approx(32768 * 10 ** (-1 / 20), rel=1e-4)
+
+    def test_normalize_silence_is_noop(self):
+        assert not np.any(audio_dsp.normalize_loudness(np.zeros(100)))
+
+
+class TestResample:
+    @pytest.mark.parametrize("src", [8000, 11025, 22050, 24000, 44100, 48000])
+    def test_length_and_dc_gain(self, src):
+        y = audio_dsp.resample(np.full(src, 1000.0), src, 16000)
+        assert len(y) == 16000
+        assert np.allclose(y[200:-200], 1000.0, atol=0.5)
+
+    def test_odd_lengths(self):
+        for n in (1, 2, 7, 441, 1001):
+            assert len(audio_dsp.resample(np.ones(n), 44100, 16000)) == -(-n * 160 // 441)
+
+    def test_same_rate_is_identity(self):
+        x = np.arange(10, dtype=np.float32)
+        assert audio_dsp.resample(x, 16000, 16000) is x
+
+    def test_preserves_tone_frequency(self):
+        x = audio_dsp.unwrap_wav(tone_wav(1000, 44100, 1, 1.0))[0][:, 0]
+        y = audio_dsp.resample(x, 44100, 16000)
+        spectrum = np.abs(np.fft.rfft(y))
+        assert np.argmax(spectrum) * 16000 / len(y) == pytest.approx(1000, abs=2)
+
+    def test_rejects_above_nyquist(self):
+        pcm = audio_dsp.to_16k_mono(tone_wav(10000, 44100, 2, 1.0))
+        assert audio_dsp.rms_dbfs(pcm[500:-500]) < -80
+
+
+class TestConverters:
+    def test_to_16k_mono_wav_format(self):
+        wav = audio_dsp.to_16k_mono_wav(tone_wav(440, 22050, 2, 0.5), volume=0.5)
+        channels, width, rate, frames = _params(wav)
+        assert (channels, width, rate, frames) == (1, 2, 16000, 8000)
+
+    def test_scale_wav_keeps_header(self):
+        wav = audio_dsp.wrap_wav(np.full(100, 10000, dtype=np.int16))
+        scaled = audio_dsp.scale_wav(wav, 0.5)
+        assert _params(scaled) == _params(wav)
+        assert np.all(np.frombuffer(audio_dsp.wav_frames(scaled), dtype=np.int16) == 5000)
+
+    def test_pyttsx3_output_is_16k(self, tmp_path):
+        class FakeEngine:
+            def save_to_file(self, text, path):
+                with open(path, "wb") as f:
+                    f.write(tone_wav(440, 22050, 2, 1.0))
+
+            def runAndWait(self):
+                pass
+
+            def stop(self):
+                pass
+
+        tts = Pyttsx3TTS()
+        tts._available = True
+        tts._get_engine = lambda: FakeEngine()
+        channels, _, rate, frames = _params(tts.synthesize("hello"))
+        assert (channels, rate, frames) == (1, 16000, 16000)
+
+
+class TestBenchmark:
+    def test_quality_beats_legacy(self):
+        report = run_benchmark(seconds=1.0, rounds=1)
+        for label, case in report["cases"].items():
+            new = case["audio_dsp"]
+            assert new["length_ratio"] == 1.0, label
+            assert abs(new["passband_db"]) < 0.1, label
+            assert new["alias_db"] < -80, label
+            assert new["alias_db"] < case["legacy_interp"]["alias_db"] - 40, label
+        assert report["cases"]["tts 22.05k mono"]["legacy_pyttsx3"]["length_ratio"] > 1.3
@@ -0,0 +1,150 @@
+"""
+Online Backup Tests
+===================
+Snapshots are taken with the SQLite backup API in small steps from one
+pinned read transaction, gzipped, rotated, and can be verified and
+restored with backup_db.py.
+Run: python -m pytest tests/test_backup.py -v
+"""
+
+import asyncio
+import gzip
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import backup_db
+from core.backup import (DbBackup, list_backups, rotate_backups, snapshot_time,
+                         take_backup, verify_backup)
+from core.database import SCHEMA_VERSION, PollyDB
+from tests.backup_benchmark import run_benchmark
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    for i in range(50):
+        db.save_story(f"story {i}", tenant_id=1)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def backup_dir(tmp_path):
+    return str(tmp_path / "backups")
+
+
+def _story_count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestTakeBackup:
+    def test_snapshot_is_a_compressed_copy(self, db, backup_dir, tmp_path):
+        result = take_backup(db.db_path, backup_dir, pages=4, pause=0)
+        assert result["steps"] > 1
+        assert list_backups(backup_dir) == [result["path"]]
+        assert os.listdir(backup_dir) == [os.path.basename(result["path"])]
+        restored = str(tmp_path / "restored.db")
+        with gzip.open(result["path"]) as fin, open(restored, "wb") as fout:
+            fout.write(fin.read())
+        assert _story_count(restored) == 50
+
+    def test_writes_during_backup_neither_block_nor_restart(self, db, backup_dir, tmp_path):
+        writer = sqlite3.connect(db.db_path, timeout=0.5)
+        steps = []
+
+        def write_between_steps(status, remaining, total):
+            steps.append(remaining)
+            writer.execute("INSERT INTO stories (transcript, tenant_id) VALUES ('late', 1)")
+            writer.commit()
+
+        src = sqlite3.connect(db.db_path)
+        dst = sqlite3.connect(str(tmp_path / "copy.db"))
+        src.execute("BEGIN")
+        src.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        src.backup(dst, pages=4, progress=write_between_steps)
+        src.rollback()
+        for conn in (src, dst, writer):
+            conn.close()
+        # One pass over the pages, and the copy is the snapshot at BEGIN
+        assert steps == sorted(steps, reverse=True)
+        assert _story_count(str(tmp_path / "copy.db")) == 50
+        assert _story_count(db.db_path) == 50 + len(steps)
+
+
+class TestRotation:
+    def test_keeps_newest_per_day_and_week(self, db, backup_dir):
+        start = datetime(2024, 1, 1, 3, tzinfo=timezone.utc)  # a Monday
+        for day in range(30):
+            for hour in (0, 12):
+                take_backup(db.db_path, backup_dir, pause=0,
+                            now=start + timedelta(days=day, hours=hour))
+        removed = rotate_backups(backup_dir, keep_daily=3, keep_weekly=2)
+        kept = [snapshot_time(p).strftime("%m-%d %H") for p in list_backups(backup_dir)]
+        # Sundays end ISO weeks: 01-28 closes week 4, 01-30 is the newest
+        assert kept == ["01-28 15", "01-29 15", "01-30 15"]
+        assert len(removed) == 57
+
+    def test_weekly_outlives_daily(self, db, backup_dir):
+        start = datetime(2024, 1, 1, 3, tzinfo=timezone.utc)
+        for day in (0, 7, 14, 15):
+            take_backup(db.db_path, backup_dir, pause=0, now=start + timedelta(days=day))
+        rotate_backups(backup_dir, keep_daily=1, keep_weekly=3)
+        # The 15th loses both its daily slot and its ISO week to the 16th
+        assert [snapshot_time(p).day for p in list_backups(backup_dir)] == [1, 8, 16]
+
+
+class TestVerify:
+    def test_good_snapshot(self, db, backup_dir):
+        result = verify_backup(take_backup(db.db_path, backup_dir, pause=0)["path"])
+        assert result["ok"] and result["integrity"] == "ok"
+        assert result["schema_version"] == SCHEMA_VERSION
+
+    def test_truncated_snapshot(self, db, backup_dir):
+        path = take_backup(db.db_path, backup_dir, pause=0)["path"]
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+        assert not verify_backup(path)["ok"]
+
+
+class TestCli:
+    def test_backup_verify_restore(self, db, backup_dir, tmp_path, capsys):
+        assert backup_db.main(["--db", db.db_path, "--dir", backup_dir, "--backup"]) == 0
+        assert backup_db.main(["--db", db.db_path, "--dir", backup_dir, "--verify"]) == 0
+        assert "integrity ok" in capsys.readouterr().out
+
+        snapshot = list_backups(backup_dir)[-1]
+        dest = str(tmp_path / "restored.db")
+        open(dest + "-wal", "wb").close()  # stale WAL must not survive
+        assert backup_db.main(["--restore", snapshot, "--to", dest]) == 0
+        assert _story_count(dest) == 50 and not os.path.exists(dest + "-wal")
+        assert backup_db.main(["--restore", snapshot, "--to", dest]) == 1
+        assert backup_db.main(["--restore", snapshot, "--to", dest, "--force"]) == 0
+
+    def test_verify_with_no_snapshots(self, backup_dir, capsys):
+        assert backup_db.main(["--dir", backup_dir, "--verify"]) == 1
+
+
+def test_scheduled_run_rotates(db, backup_dir):
+    backups = DbBackup(db.db_path, backup_dir, keep_daily=1, keep_weekly=1, pause=0)
+    take_backup(db.db_path, backup_dir, pause=0,
+                now=datetime.now(timezone.utc) - timedelta(days=30))
+    result = asyncio.run(backups.run_once())
+    assert result["rotated"] == 1
+    assert backups.stats()["snapshots"] == 1 and backups.runs == 1
+    assert backups._seconds_until_due() > backups.interval - 60
+
+
+def test_benchmark_stepped_backup_completes_under_writes():
+    report = run_benchmark(mb=2)
+    assert report["stepped"]["writes"] > 0
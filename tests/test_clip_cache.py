@@ -0,0 +1,139 @@
+"""
+Squawk Clip Cache Tests
+=======================
+Squawk/chatter/ambient clips are rendered once per (clip, volume bucket) and
+kept pre-chunked in the audio_chunk wire format, in a byte-bounded LRU.
+TTS responses go out in the same framing.
+Run: python -m pytest tests/test_clip_cache.py -v
+"""
+
+import asyncio
+import base64
+import io
+import json
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from api import audio as audio_api
+from core import audio_dsp
+from core import squawk as squawk_mod
+from core.squawk import ClipCache, RenderedClip, SquawkManager
+
+
+def _wav(n_samples, value=1000):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(np.full(n_samples, value, dtype=np.int16).tobytes())
+    return buf.getvalue()
+
+
+class FakeWS:
+    def __init__(self):
+        self.text = []
+
+    async def send_json(self, data):
+        self.text.append(json.dumps(data))
+
+    async def send_text(self, text):
+        self.text.append(text)
+
+
+class TestRenderedClip:
+    def test_frames_reassemble_to_wav(self):
+        wav = _wav(50000)  # ~100 KB → medium chunking
+        clip = RenderedClip(wav)
+        events = [json.loads(f) for f in clip.frames]
+        assert b"".join(base64.b64decode(e["audio"]) for e in events) == wav
+        assert [e["final"] for e in events] == [False] * (len(events) - 1) + [True]
+        assert all(e["squawk"] and e["event"] == "audio_chunk" for e in events)
+        assert clip.chunk_delay == 0.06
+
+
+class TestClipCache:
+    def test_renders_once_per_key(self):
+        cache = ClipCache()
+        calls = []
+
+        def render():
+            calls.append(1)
+            return _wav(1000)
+
+        a = cache.get(("squawk", 0, 6), render)
+        b = cache.get(("squawk", 0, 6), render)
+        assert a is b and len(calls) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_lru_bounded_by_bytes(self):
+        one = RenderedClip(_wav(1000)).nbytes
+        cache = ClipCache(max_bytes=one * 2)
+        for i in range(3):
+            cache.get(("squawk", i, 6), lambda: _wav(1000))
+        assert cache.stats()["clips"] == 2
+        assert ("squawk", 0, 6) not in cache._clips
+
+
+class TestSquawkManager:
+    def _mgr(self, tmp_path):
+        mgr = SquawkManager(str(tmp_path))
+        raw = _wav(4000, value=10000)
+        mgr._raw_squawks = [raw]
+        mgr.squawks = [audio_dsp.scale_wav(raw, squawk_mod.SQUAWK_VOLUME)]
+        return mgr
+
+    def test_volume_buckets(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        mgr._volume["dev1"] = 0.52
+        mgr._volume["dev2"] = 0.49
+        mgr._volume["dev3"] = 0.80
+        clips = [mgr._pick_sound(d, "squawk", mgr._raw_squawks, mgr.squawks)
+                 for d in ("dev1", "dev2", "dev3")]
+        assert clips[0] is clips[1]  # both round to 50%
+        assert clips[2] is not clips[0]
+        assert mgr._clip_cache.stats()["misses"] == 2
+
+    def test_default_volume_uses_preconverted_clip(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        clip = mgr._pick_sound("dev1", "squawk", mgr._raw_squawks, mgr.squawks)
+        assert clip.frames == RenderedClip(mgr.squawks[0]).frames
+
+    def test_send_squawk_sends_cached_frames(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        ws = FakeWS()
+
+        async def go():
+            mgr.register_device("dev1", ws, squawk_volume=70)
+            await mgr.send_squawk("dev1")
+            await mgr.send_squawk("dev1")
+            mgr.stop()
+
+        asyncio.run(go())
+        events = [json.loads(t)["event"] for t in ws.text]
+        assert events.count("squawk_start") == 2
+        assert mgr._clip_cache.stats() == {
+            "clips": 1, "bytes": mgr._clip_cache.nbytes, "hits": 1, "misses": 1}
+
+
+class FakeTTS:
+    def __init__(self, wav):
+        self.wav = wav
+
+    def synthesize(self, text):
+        return self.wav
+
+
+def test_tts_uses_rendered_clip_framing(monkeypatch):
+    monkeypatch.setattr(squawk_mod, "_chunk_plan", lambda total_len: (5000, 0))
+    wav = _wav(6000)  # 12044 bytes -> 3 frames of at most 5000
+    ws = FakeWS()
+    ws.app = type("App", (), {"state": type("State", (), {})()})()
+    duration = asyncio.run(audio_api._send_tts(ws, FakeTTS(wav), "hello"))
+    assert duration == len(wav) / 32000.0
+    assert ws.text == RenderedClip(wav, squawk=False).frames and len(ws.text) == 3
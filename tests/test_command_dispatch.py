@@ -0,0 +1,162 @@
+"""
+Command Dispatch Tests
+======================
+CommandProcessor routes intents through a handler registry: blocking
+handlers run off the event loop, and every dispatch is timed per intent.
+Run: python -m pytest tests/test_command_dispatch.py -v
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.command_processor import CommandProcessor
+from core.database import PollyDB
+from core.intent_parser import IntentParser
+from core.metrics import LatencyHistogram
+
+
+class FakeData:
+    def get_response(self, key):
+        return None
+
+
+@pytest.fixture
+def cmd():
+    db = PollyDB(":memory:")
+    tid = db.create_tenant("Test Family")
+    proc = CommandProcessor(db=db, data=FakeData())
+    proc._get_state("dev1").tenant_id = tid
+    return proc
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestRegistry:
+    def test_every_parser_intent_has_handler(self, cmd):
+        parser = IntentParser()
+        intents = {key for key, _, _ in parser._phrase_groups() if isinstance(key, str)}
+        intents.discard("item_query")
+        intents.discard("thinking")  # only meaningful inside process_in_context
+        intents |= {
+            "store", "retrieve_item", "retrieve_location", "delete", "list_all",
+            "found_it", "who_is", "help", "introduce_self", "play_blessing",
+            "leave_message", "send_polly_message", "where_is_person",
+            "status_update", "person_home",
+        }
+        missing = sorted(i for i in intents if i not in cmd._handlers)
+        assert not missing
+
+    def test_unknown_intent_falls_back(self, cmd):
+        resp = run(cmd.process({"intent": "unknown"}, "blah", "dev1"))
+        assert resp.startswith("I didn't understand that")
+
+    def test_blocking_handler_runs_off_loop(self, cmd):
+        seen = {}
+
+        def slow(intent_result, raw_text, device_id, state):
+            seen["thread"] = threading.get_ident()
+            return "done"
+
+        cmd.register_intent("custom", slow, blocking=True)
+
+        async def go():
+            seen["loop"] = threading.get_ident()
+            return await cmd.process({"intent": "custom"}, "", "dev1")
+
+        assert run(go()) == "done"
+        assert seen["thread"] != seen["loop"]
+
+    def test_non_blocking_handler_runs_inline(self, cmd):
+        seen = {}
+
+        def quick(intent_result, raw_text, device_id, state):
+            seen["thread"] = threading.get_ident()
+            return "ok"
+
+        cmd.register_intent("custom", quick)
+
+        async def go():
+            seen["loop"] = threading.get_ident()
+            return await cmd.process({"intent": "custom"}, "", "dev1")
+
+        assert run(go()) == "ok"
+        assert seen["thread"] == seen["loop"]
+
+    def test_async_handler_awaited(self, cmd):
+        async def handler(intent_result, raw_text, device_id, state):
+            await asyncio.sleep(0)
+            return f"hi {device_id}"
+
+        cmd.register_intent("custom", handler)
+        assert run(cmd.process({"intent": "custom"}, "", "dev1")) == "hi dev1"
+
+
+class TestHandlers:
+    def test_store_then_retrieve(self, cmd):
+        resp = run(cmd.process(
+            {"intent": "store", "item": "hammer", "location": "garage", "prep": "in"},
+            "the hammer is in the garage", "dev1"))
+        assert resp == "Got it. The hammer is in the garage."
+        resp = run(cmd.process({"intent": "retrieve_item", "item": "hammer"},
+                               "where is the hammer", "dev1"))
+        assert "garage" in resp
+
+    def test_repeat_uses_last_response(self, cmd):
+        run(cmd.process({"intent": "greeting"}, "hello", "dev1"))
+        resp = run(cmd.process({"intent": "repeat"}, "say that again", "dev1"))
+        assert resp.endswith("Hello! How are you today?")
+
+    def test_hear_stories_queries_db_off_loop(self, cmd, monkeypatch):
+        seen = {}
+
+        def get_stories(**kwargs):
+            seen["thread"] = threading.get_ident()
+            return [{"id": 1, "transcript": "We fished the lake every summer."}]
+
+        monkeypatch.setattr(cmd.db, "get_stories", get_stories)
+
+        async def go():
+            seen["loop"] = threading.get_ident()
+            return await cmd.process({"intent": "hear_stories"}, "tell me a story", "dev1")
+
+        assert run(go()).endswith("We fished the lake every summer.")
+        assert seen["thread"] != seen["loop"]
+
+
+class TestLatency:
+    def test_every_dispatch_is_timed(self, cmd):
+        run(cmd.process({"intent": "greeting"}, "hello", "dev1"))
+        run(cmd.process({"intent": "greeting"}, "hello", "dev1"))
+        run(cmd.process({"intent": "tell_time"}, "what time is it", "dev1"))
+        report = cmd.intent_latency_report()
+        assert report["greeting"]["count"] == 2
+        assert report["tell_time"]["count"] == 1
+
+    def test_failed_handler_still_timed(self, cmd):
+        def broken(intent_result, raw_text, device_id, state):
+            raise RuntimeError("boom")
+
+        cmd.register_intent("custom", broken, blocking=True)
+        with pytest.raises(RuntimeError):
+            run(cmd.process({"intent": "custom"}, "", "dev1"))
+        assert cmd.intent_latency_report()["custom"]["count"] == 1
+
+    def test_histogram_percentiles(self):
+        hist = LatencyHistogram()
+        for ms in [0.5] * 90 + [40] * 9 + [3000]:
+            hist.observe(ms)
+        snap = hist.snapshot()
+        assert snap["count"] == 100
+        assert snap["p50_ms"] == 1
+        assert snap["p95_ms"] == 50
+        assert snap["p99_ms"] == 50
+        assert snap["max_ms"] == 3000
+        assert snap["buckets"] == {"<=1": 90, "<=50": 9, "<=5000": 1}
@@ -0,0 +1,95 @@
+"""
+SQLite Connection Pool Tests
+============================
+PollyDB reuses a few long-lived connections, configured once with the WAL
+and cache pragmas, and resets their state when they go back to the pool.
+Run: python -m pytest tests/test_db_pool.py -v
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.database import PollyDB
+from core.database import ConnectionPool, PooledConnection
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    yield db
+    db.close()
+
+
+class TestPool:
+    def test_connections_are_reused(self, db):
+        created = db.pool_stats()["created"]
+        for _ in range(20):
+            db.get_or_create_user(tenant_id=1)
+        stats = db.pool_stats()
+        assert stats["created"] == created
+        assert stats["reused"] >= 20 and stats["in_use"] == 0
+
+    def test_pragmas_applied(self, db):
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16000
+
+    def test_uncommitted_work_rolled_back(self, db):
+        with db.connection() as conn:
+            conn.execute("INSERT INTO tenants (name) VALUES ('dangling')")
+        with db.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM tenants WHERE name = 'dangling'").fetchone()[0] == 0
+
+    def test_row_factory_reset(self, db):
+        with db.connection() as conn:
+            conn.row_factory = sqlite3.Row
+        with db.connection() as conn:
+            assert conn.row_factory is None
+
+    def test_exception_returns_connection(self, db):
+        with pytest.raises(ZeroDivisionError):
+            with db.connection():
+                1 / 0
+        assert db.pool_stats()["in_use"] == 0
+
+    def test_idle_bounded(self, tmp_path):
+        pool = ConnectionPool(str(tmp_path / "p.db"), max_idle=2)
+        conns = [pool.acquire() for _ in range(4)]
+        for conn in conns:
+            pool.release(conn)
+        assert pool.stats() == {"idle": 2, "in_use": 0, "created": 4, "reused": 0}
+        pool.close_all()
+        assert pool.stats()["idle"] == 0
+
+
+class TestLegacyProxy:
+    def test_close_returns_to_pool(self, db):
+        conn = db._get_connection()
+        assert isinstance(conn, PooledConnection)
+        conn.row_factory = sqlite3.Row
+        assert conn.execute("SELECT 1 AS one").fetchone()["one"] == 1
+        conn.close()
+        conn.close()  # idempotent
+        assert db.pool_stats()["in_use"] == 0
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_unclosed_proxy_released_on_gc(self, db):
+        db._get_connection().execute("SELECT 1")
+        assert db.pool_stats()["in_use"] == 0
+
+
+def test_memory_db_shares_one_connection():
+    db = PollyDB(":memory:")
+    with db.connection() as conn:
+        assert conn is db._conn
+    assert db._get_connection() is db._conn
+    assert db.pool_stats() == {}
@@ -0,0 +1,187 @@
+"""
+Bounded Per-Device State Tests
+==============================
+DeviceStateStore evicts idle entries by TTL and LRU capacity, never evicts
+connected devices, is safe to share with to_thread workers, and reports
+approximate memory use.
+Run: python -m pytest tests/test_device_state.py -v
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import device_state
+from core.device_state import DeviceStateStore
+from core.squawk import SquawkManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def no_connections():
+    device_state._connected.clear()
+    yield
+    device_state._connected.clear()
+
+
+class TestEviction:
+    def test_ttl_evicts_idle_entries(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, clock=clock)
+        store["a"] = 1
+        clock.now += 30
+        store["b"] = 2
+        clock.now += 40
+        assert store.evict() == 1
+        assert "a" not in store and store["b"] == 2
+
+    def test_reads_count_as_activity(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, clock=clock)
+        store["a"] = 1
+        clock.now += 50
+        assert store.get("a") == 1
+        clock.now += 50
+        assert store.evict() == 0
+
+    def test_membership_is_not_activity(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, clock=clock)
+        store["a"] = 1
+        clock.now += 50
+        assert "a" in store
+        clock.now += 50
+        assert store.evict() == 1
+
+    def test_lru_capacity(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=None, max_entries=2, clock=clock)
+        store["a"] = 1
+        store["b"] = 2
+        store["a"]  # touch: b is now least recently used
+        store["c"] = 3
+        assert sorted(store) == ["a", "c"]
+        assert store.evictions == 1
+
+    def test_connected_devices_are_pinned(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, max_entries=1, clock=clock)
+        device_state.mark_connected("dev1")
+        store["dev1"] = "live"
+        store["dev2"] = "idle"
+        assert "dev1" in store and "dev2" not in store
+        clock.now += 600
+        assert store.evict() == 0
+
+    def test_disconnect_restarts_idle_clock(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, clock=clock)
+        device_state.mark_connected("dev1")
+        store["dev1"] = "state"
+        clock.now += 3600
+        device_state.mark_disconnected("dev1")
+        assert store.evict() == 0
+        clock.now += 61
+        assert store.evict() == 1
+
+    def test_overlapping_connections_stay_pinned(self):
+        device_state.mark_connected("dev1")
+        device_state.mark_connected("dev1")
+        device_state.mark_disconnected("dev1")
+        assert device_state.is_connected("dev1")
+        device_state.mark_disconnected("dev1")
+        assert not device_state.is_connected("dev1")
+
+    def test_unpinned_store_ignores_connections(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, pin_connected=False, clock=clock)
+        device_state.mark_connected("dev1")
+        store["dev1"] = 1
+        clock.now += 61
+        assert store.evict() == 1
+
+    def test_on_evict_called(self, clock):
+        seen = []
+        store = DeviceStateStore("t", ttl_seconds=60, on_evict=lambda k, v: seen.append((k, v)),
+                                 clock=clock)
+        store["a"] = 1
+        clock.now += 61
+        store.evict()
+        assert seen == [("a", 1)]
+
+    def test_writes_trigger_periodic_sweep(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, clock=clock)
+        store["a"] = 1
+        clock.now += device_state.SWEEP_INTERVAL_SECONDS + 61
+        store["b"] = 2
+        assert list(store) == ["b"]
+
+
+class TestThreads:
+    def test_concurrent_writes_and_iteration(self):
+        store = DeviceStateStore("t", max_entries=50)
+        errors = []
+
+        def writer(n):
+            for i in range(2000):
+                store[f"dev{n}-{i}"] = i  # over capacity: every write evicts
+
+        def reader():
+            try:
+                for _ in range(500):
+                    store.items()
+                    store.memory_usage()
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        threads += [threading.Thread(target=reader) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == [] and len(store) == 50
+
+    def test_on_evict_may_use_the_store(self, clock):
+        store = DeviceStateStore("t", ttl_seconds=60, clock=clock,
+                                 on_evict=lambda k, v: store.get("other"))
+        store["a"] = 1
+        clock.now += 61
+        assert store.evict() == 1  # callback runs outside the lock
+
+
+class TestReport:
+    def test_memory_report_aggregates_by_name(self, clock):
+        s1 = DeviceStateStore("report.test", clock=clock)
+        s2 = DeviceStateStore("report.test", clock=clock)
+        s1["a"] = "x" * 1000
+        s2["b"] = {"nested": [1, 2, 3]}
+        usage = device_state.memory_report()["report.test"]
+        assert usage["instances"] == 2
+        assert usage["entries"] == 2
+        assert usage["approx_bytes"] > 1000
+
+
+class TestSquawkEviction:
+    def test_evicted_device_task_is_cancelled(self, tmp_path):
+        async def go():
+            mgr = SquawkManager(str(tmp_path))
+            task = asyncio.ensure_future(asyncio.sleep(3600))
+            mgr._ambient_tasks["dev1"] = task
+            mgr._ambient_tasks.ttl_seconds = 0
+            mgr._ambient_tasks.evict(now=device_state.time.monotonic() + 1)
+            await asyncio.sleep(0)
+            return task
+
+        task = asyncio.run(go())
+        assert task.cancelled()
@@ -0,0 +1,127 @@
+"""
+Full-Text Search Tests
+======================
+FTS5 indexes over items, stories and memories stay in sync through
+triggers, rank with BM25, match word prefixes and respect tenants.
+Run: python -m pytest tests/test_fts_search.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.database import FTS_TABLES, PollyDB, _fts_match
+
+
+@pytest.fixture
+def db():
+    return PollyDB(":memory:")
+
+
+def _story(db, transcript, tenant_id=1, speaker="Grandma", verified=1):
+    story_id = db.save_story(transcript, speaker_name=speaker, tenant_id=tenant_id)
+    db._conn.execute("UPDATE stories SET verified = ? WHERE id = ?", (verified, story_id))
+    db._conn.commit()
+    return story_id
+
+
+class TestMatchExpression:
+    def test_prefix_terms_anded(self):
+        assert _fts_match("Blue jackets") == '"blue"* AND "jackets"*'
+
+    def test_filler_and_punctuation_dropped(self):
+        assert _fts_match("about the farm's barn!") == '"farm"* AND "barn"*'
+        assert _fts_match("the a") is None
+
+    def test_column_filter(self):
+        assert _fts_match("keys", "item") == 'item : ("keys"*)'
+
+
+class TestItems:
+    def test_find_item_falls_back_to_fts(self, db):
+        db.store_item("car keys", "kitchen hook", tenant_id=1)
+        assert [r["item"] for r in db.find_item("key", tenant_id=1)] == ["car keys"]
+
+    def test_exact_match_first(self, db):
+        db.store_item("keys", "drawer", tenant_id=1)
+        db.store_item("car keys", "hook", tenant_id=1)
+        assert [r["location"] for r in db.find_item("keys", tenant_id=1)] == ["drawer"]
+
+    def test_search_ranks_item_name_over_context(self, db):
+        db.store_item("notebook", "desk", context="next to the glasses", tenant_id=1)
+        db.store_item("reading glasses", "nightstand", tenant_id=1)
+        assert [r["item"] for r in db.search("glasses", tenant_id=1)] == [
+            "reading glasses", "notebook"]
+
+    def test_triggers_follow_update_and_delete(self, db):
+        item_id = db.store_item("umbrella", "closet", tenant_id=1)
+        db.update_item(item_id, location="garage", tenant_id=1)
+        assert db.find_by_location("closet", tenant_id=1) == []
+        assert [r["item"] for r in db.find_by_location("garage", tenant_id=1)] == ["umbrella"]
+        db.delete_item("umbrella", tenant_id=1)
+        assert db.search("umbrella", tenant_id=1) == []
+
+    def test_tenant_scoped(self, db):
+        db.store_item("passport", "safe", tenant_id=1)
+        db.store_item("passport", "desk", tenant_id=2)
+        assert [r["location"] for r in db.search("pass", tenant_id=2)] == ["desk"]
+
+
+class TestStories:
+    def test_matches_transcript_speaker_memory_and_tag(self, db):
+        by_text = _story(db, "We drove the tractor to the county fair")
+        by_speaker = _story(db, "A quiet afternoon", speaker="Uncle Ray")
+        by_memory = _story(db, "That summer")
+        db.save_memory(story_id=by_memory, text_summary="Ray fixed the old tractor", tenant_id=1)
+        by_tag = _story(db, "Sunday dinner")
+        db.add_story_tag(by_tag, "topic", "tractors", tenant_id=1)
+        _story(db, "Nothing relevant")
+
+        found = {s["id"] for s in db.search_stories_by_speaker_or_topic("tractor", tenant_id=1)}
+        assert found == {by_text, by_memory, by_tag}
+        assert [s["id"] for s in db.search_stories_by_speaker_or_topic("ray", tenant_id=1)][0] == by_speaker
+
+    def test_corrected_transcript_indexed(self, db):
+        story_id = _story(db, "we went to the lake")
+        db._conn.execute("UPDATE stories SET corrected_transcript = 'we went to Lake Geneva' "
+                         "WHERE id = ?", (story_id,))
+        assert [s["id"] for s in db.search_stories_by_speaker_or_topic("geneva", tenant_id=1)] == [story_id]
+
+    def test_unverified_and_other_tenants_excluded(self, db):
+        _story(db, "the lighthouse", verified=0)
+        _story(db, "the lighthouse", tenant_id=2)
+        assert db.search_stories_by_speaker_or_topic("lighthouse", tenant_id=1) == []
+
+    def test_best_match_first(self, db):
+        weak = _story(db, "a trip to the lake and then home")
+        strong = _story(db, "lake lake lake, the lake was everything")
+        ids = [s["id"] for s in db.search_stories_by_speaker_or_topic("lake", tenant_id=1)]
+        assert ids == [strong, weak]
+
+
+def test_existing_rows_indexed_on_upgrade(tmp_path):
+    path = str(tmp_path / "polly.db")
+    db = PollyDB(path)
+    with db.connection() as conn:
+        for fts in FTS_TABLES:
+            conn.execute(f"DROP TABLE {fts}")
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(f"DROP TRIGGER {fts}_{suffix}")
+        conn.execute("INSERT INTO items (item, item_normalized, location, location_normalized, "
+                     "tenant_id) VALUES ('hammer', 'hammer', 'shed', 'shed', 1)")
+        conn.commit()
+    db.close()
+
+    db = PollyDB(path)
+    assert [r["item"] for r in db.search("hamm", tenant_id=1)] == ["hammer"]
+    db.close()
+
+
+def test_like_fallback_without_fts(db):
+    db.store_item("thermos", "pantry", tenant_id=1)
+    db._fts = False
+    assert [r["item"] for r in db.search("ermo", tenant_id=1)] == ["thermos"]
+    assert [r["item"] for r in db.find_item("ermo", tenant_id=1)] == ["thermos"]
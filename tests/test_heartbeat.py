@@ -0,0 +1,117 @@
+"""
+Heartbeat Coalescing Tests
+==========================
+Device last_seen pings and web session touches are kept in memory, written
+in bulk, and merged into device/session reads until they are.
+Run: python -m pytest tests/test_heartbeat.py -v
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.async_db import AsyncPollyDB
+from core.database import PollyDB
+from core.heartbeat import HeartbeatTracker
+
+RECENT = "2099-01-01 00:00:00"  # always "now or later" for online checks
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    db.register_device("dev1", 1, name="Kitchen")
+    db.register_device("dev2", 1, name="Den")
+    with db.connection() as conn:
+        conn.execute("UPDATE devices SET last_seen = '2020-01-01 00:00:00'")
+        conn.commit()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def tracker(db):
+    adb = AsyncPollyDB(db)
+    yield HeartbeatTracker(adb).attach()
+    adb.close()
+
+
+def _stored_last_seen(db, device_id):
+    with db.connection() as conn:
+        return conn.execute("SELECT last_seen FROM devices WHERE device_id = ?",
+                            (device_id,)).fetchone()[0]
+
+
+class TestDevices:
+    def test_pings_are_coalesced(self, db, tracker):
+        for _ in range(50):
+            db.update_device_last_seen("dev1")
+        assert _stored_last_seen(db, "dev1") == "2020-01-01 00:00:00"
+        assert tracker.flush() == 1
+        assert _stored_last_seen(db, "dev1") > "2020-01-01 00:00:00"
+        assert tracker.stats() == {"pending": 0, "recorded": 50, "written": 1}
+
+    def test_reads_merge_pending(self, db, tracker):
+        tracker.device_seen("dev2", RECENT)
+        assert db.get_device("dev2")["last_seen"] == RECENT
+        assert {d["device_id"]: d["last_seen"] for d in db.get_devices_by_tenant(1)}["dev2"] == RECENT
+        assert db.get_admin_dashboard_stats()["online_devices"] == 1
+        assert db.get_admin_device_list()[0]["device_id"] == "dev2"
+
+    def test_flush_never_moves_backwards(self, db, tracker):
+        tracker.device_seen("dev1", "2019-06-01 00:00:00")
+        tracker.flush()
+        assert _stored_last_seen(db, "dev1") == "2020-01-01 00:00:00"
+
+    def test_failed_flush_keeps_newest(self, db, tracker, monkeypatch):
+        tracker.device_seen("dev1", "2030-01-01 00:00:00")
+
+        def fail(devices, sessions):
+            tracker.device_seen("dev1", "2030-01-01 00:00:30")  # arrives mid-flush
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(db, "write_heartbeats", fail)
+        assert tracker.flush() == 0
+        assert tracker.device_last_seen("dev1") == "2030-01-01 00:00:30"
+
+    def test_without_tracker_writes_through(self, db):
+        db.update_device_last_seen("dev1")
+        assert _stored_last_seen(db, "dev1") > "2020-01-01 00:00:00"
+
+
+class TestSessions:
+    def _session(self, db):
+        tenant_id = db.create_tenant("Smith")
+        account_id = db.create_account("a@example.com", "x", "Ann", tenant_id)
+        return db.create_web_session(account_id, tenant_id)
+
+    def test_touch_is_merged_then_flushed(self, db, tracker):
+        session_id = self._session(db)
+        db.touch_web_session(session_id)
+        pending = tracker.session_last_active(session_id)
+        assert db.get_web_session(session_id)["last_active"] == pending
+        tracker.flush()
+        with db.connection() as conn:
+            stored = conn.execute("SELECT last_active FROM web_sessions WHERE id = ?",
+                                  (session_id,)).fetchone()[0]
+        assert stored == pending
+
+    def test_logout_drops_pending_touch(self, db, tracker):
+        session_id = self._session(db)
+        db.touch_web_session(session_id)
+        db.delete_web_session(session_id)
+        assert tracker.stats()["pending"] == 0
+
+
+def test_stop_flushes(db, tracker):
+    async def go():
+        await tracker.start()
+        db.update_device_last_seen("dev1")
+        await tracker.stop()
+
+    asyncio.run(go())
+    assert _stored_last_seen(db, "dev1") > "2020-01-01 00:00:00"
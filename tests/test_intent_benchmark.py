@@ -0,0 +1,99 @@
+"""
+Intent Parser Benchmark Gate
+============================
+Scores the hand-written utterances in tests/intent_golden.json (plus STT
+variants) and fails when any golden utterance is misparsed or accuracy
+(overall or per intent) regresses against the stored baseline.
+Throughput depends on the machine, so it is only gated when
+POLLY_BENCH_THROUGHPUT=1 is set (or by running the benchmark script).
+Re-record after an intentional change with:
+    python -m tests.intent_benchmark --update-baseline
+Run: python -m pytest tests/test_intent_benchmark.py -v
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from server.core.intent_parser import IntentParser
+from tests import intent_benchmark
+from tests.intent_benchmark import (
+    build_corpus, build_golden_corpus, compare_to_baseline, load_baseline,
+    load_golden, run_benchmark,
+)
+
+
+@pytest.fixture(scope="module")
+def report():
+    return run_benchmark()
+
+
+class TestCorpus:
+    def test_corpus_is_large_and_deterministic(self):
+        corpus = build_corpus()
+        assert len(corpus) >= 3000
+        assert corpus == build_corpus()
+
+    def test_corpus_covers_every_trigger_intent(self):
+        intents = {intent for _, intent in build_corpus()}
+        for expected in ("prayer", "bible_verse", "tell_joke", "store",
+                         "retrieve_item", "greeting", "unknown"):
+            assert expected in intents
+
+    def test_golden_set_covers_every_intent(self):
+        golden_intents = {intent for _, intent in load_golden()}
+        trigger_intents = {key for key, _, _ in IntentParser()._phrase_groups()
+                           if isinstance(key, str) and key != "item_query"}
+        template_intents = {intent for intent, _ in intent_benchmark.TEMPLATES}
+        assert not (trigger_intents | template_intents) - golden_intents
+        assert build_golden_corpus() == build_golden_corpus()
+
+    def test_corpus_includes_stt_mishears(self):
+        texts = [t for t, _ in build_corpus()]
+        assert any(t.startswith("hey holly ") for t in texts)
+        assert any("'" not in t and "whats" in t for t in texts)
+
+
+class TestAgainstBaseline:
+    def test_report_shape(self, report):
+        assert report["parses_per_sec"] > 0
+        assert report["p99_us"] >= report["p50_us"]
+        assert 0.0 <= report["accuracy"] <= 1.0
+
+    def test_every_golden_utterance_parses(self, report):
+        assert not report["golden_misses"], "\n".join(report["golden_misses"])
+
+    def test_no_accuracy_regression(self, report):
+        problems = compare_to_baseline(report, load_baseline(), check_throughput=False)
+        assert not problems, "\n".join(problems)
+
+    @pytest.mark.skipif(not os.getenv("POLLY_BENCH_THROUGHPUT"),
+                        reason="machine-dependent; set POLLY_BENCH_THROUGHPUT=1")
+    def test_no_throughput_regression(self, report):
+        problems = compare_to_baseline(report, load_baseline())
+        assert not problems, "\n".join(problems)
+
+    def test_dropped_phrase_is_caught(self, monkeypatch):
+        parse = IntentParser.parse
+
+        def without_jokes(self, text):
+            if "joke" in text.lower():
+                return {"intent": "unknown", "confidence": 0.0}
+            return parse(self, text)
+
+        monkeypatch.setattr(intent_benchmark.IntentParser, "parse", without_jokes)
+        report = run_benchmark(corpus=[("hello", "greeting")], rounds=1)
+        problems = compare_to_baseline(report, load_baseline(), check_throughput=False)
+        assert any("tell me a joke" in p for p in problems)
+        assert any(p.startswith("tell_joke: accuracy") for p in problems)
+
+    def test_compare_flags_regressions(self, report):
+        baseline = load_baseline()
+        worse = dict(report, parses_per_sec=baseline["parses_per_sec"] * 0.1,
+                     accuracy=baseline["accuracy"] - 0.1)
+        problems = compare_to_baseline(worse, baseline)
+        assert any("throughput" in p for p in problems)
+        assert any(p.startswith("accuracy") for p in problems)
+        assert not any("throughput" in p for p in
+                       compare_to_baseline(worse, baseline, check_throughput=False))
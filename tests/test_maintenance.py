@@ -0,0 +1,160 @@
+"""
+DB Maintenance Tests
+====================
+Old device_events roll into monthly archive tables, expired sessions,
+messages and superseded narrative_log rows are deleted in batches, and
+PRAGMA optimize / incremental vacuum run on a schedule.
+Run: python -m pytest tests/test_maintenance.py -v
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+import db_maintenance
+from core.async_db import AsyncPollyDB
+from core.database import PollyDB
+from core.maintenance import DbMaintenance, archive_cutoff, default_archive_path
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "polly.db")
+
+
+@pytest.fixture
+def db(path):
+    db = PollyDB(path)
+    yield db
+    db.close()
+
+
+def _events(db, *stamps):
+    db.log_device_events([("dev1", 1, "command", "weather", 1, None, s) for s in stamps])
+
+
+def _run(db, **kwargs):
+    adb = AsyncPollyDB(db)
+    try:
+        return asyncio.run(DbMaintenance(adb, pause=0, **kwargs).run_once())
+    finally:
+        adb.close()
+
+
+def test_archive_cutoff():
+    now = datetime(2024, 3, 15, tzinfo=timezone.utc)
+    assert archive_cutoff(2, now) == "2024-02-01 00:00:00"
+    assert archive_cutoff(3, now) == "2024-01-01 00:00:00"
+    assert archive_cutoff(4, now) == "2023-12-01 00:00:00"
+    assert default_archive_path("/srv/polly.db") == "/srv/polly-archive.db"
+    assert default_archive_path(":memory:") is None
+
+
+class TestArchive:
+    def test_moves_rows_into_monthly_tables(self, db, tmp_path):
+        _events(db, "2023-11-05 10:00:00", "2023-12-24 08:00:00", "2023-12-25 09:00:00",
+                "2024-02-01 00:00:00")
+        archive = str(tmp_path / "archive.db")
+        assert db.archive_device_events("2024-01-01 00:00:00", limit=2, archive_path=archive) == 2
+        assert db.archive_device_events("2024-01-01 00:00:00", limit=2, archive_path=archive) == 1
+        assert db.archive_device_events("2024-01-01 00:00:00", archive_path=archive) == 0
+
+        with db.connection() as conn:
+            assert conn.execute("SELECT created_at FROM device_events").fetchall() == \
+                [("2024-02-01 00:00:00",)]
+            assert conn.execute("PRAGMA database_list").fetchall()[-1][1] != "archive"
+        conn = sqlite3.connect(archive)
+        assert conn.execute("SELECT COUNT(*) FROM device_events_2023_11").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM device_events_2023_12").fetchone()[0] == 2
+        conn.close()
+
+    def test_archived_events_keep_rollups(self, db):
+        _events(db, "2023-12-24 08:00:00")
+        db.archive_device_events("2024-01-01 00:00:00")
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM device_events_2023_12").fetchone()[0] == 1
+            assert conn.execute("SELECT SUM(count) FROM device_event_hourly").fetchone()[0] == 1
+
+
+class TestPurges:
+    def test_expired_sessions_in_batches(self, db):
+        with db.connection() as conn:
+            conn.executemany(
+                "INSERT INTO web_sessions (id, account_id, tenant_id, expires_at) "
+                "VALUES (?, 1, 1, '2000-01-01T00:00:00')", [(f"s{i}",) for i in range(5)])
+            conn.commit()
+        live = db.create_web_session(1, 1)
+        assert db.cleanup_expired_sessions(limit=3) == 3
+        assert db.cleanup_expired_sessions() == 2
+        assert db.get_web_session(live)
+
+    def test_messages_on_a_wall_are_kept(self, db):
+        old = [db.save_message("Ann", f"hi {i}", tenant_id=1) for i in range(2)]
+        fresh = db.save_message("Ann", "still here", tenant_id=1)
+        with db.connection() as conn:
+            conn.execute("UPDATE family_messages SET expires_at = datetime('now', '-60 days') "
+                         "WHERE id IN (?, ?)", old)
+            conn.execute("INSERT INTO shared_wall_items (from_tenant_id, to_tenant_id, "
+                         "content_type, content_id) VALUES (1, 2, 'message', ?)", (old[1],))
+            conn.commit()
+        assert db.purge_expired_messages(30) == 1
+        with db.connection() as conn:
+            left = {r[0] for r in conn.execute("SELECT id FROM family_messages")}
+        assert left == {old[1], fresh}
+
+    def test_narrative_log_keeps_latest_per_story(self, db):
+        db.log_narrative_stories([1, 1, 2, 3], tenant_id=1)
+        with db.connection() as conn:
+            conn.execute("UPDATE narrative_log SET created_at = datetime('now', '-200 days') "
+                         "WHERE story_id != 3")
+            conn.commit()
+        before = db.get_story_last_narrated(1)
+        assert db.compact_narrative_log(90) == 1
+        assert db.get_story_last_narrated(1) == before
+
+
+class TestScheduledPass:
+    def test_run_once(self, db, tmp_path):
+        _events(db, "2001-01-01 00:00:00", "2001-02-01 00:00:00",
+                datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+        archive = str(tmp_path / "archive.db")
+        result = _run(db, archive_path=archive, batch_rows=1)
+        assert result["archived_events"] == 2
+        assert {"expired_sessions", "expired_messages", "narrative_log",
+                "rollup_rows", "vacuumed_pages", "free_pages"} <= set(result)
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM device_events").fetchone()[0] == 1
+
+    def test_new_database_vacuums_incrementally(self, db):
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            conn.execute("CREATE TABLE filler (x BLOB)")
+            conn.executemany("INSERT INTO filler VALUES (zeroblob(4000))", [()] * 200)
+            conn.commit()
+            conn.execute("DROP TABLE filler")
+            conn.commit()
+        result = db.optimize()
+        assert result["vacuumed_pages"] > 0 and result["free_pages"] == 0
+
+
+class TestCli:
+    def test_enable_incremental_vacuum(self, path, capsys):
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE device_events (id INTEGER PRIMARY KEY, created_at TEXT)")
+        conn.close()
+        assert db_maintenance.main(["--db", path, "--enable-incremental-vacuum"]) == 0
+        out = capsys.readouterr().out
+        assert "incremental auto_vacuum enabled" in out and "auto_vacuum: incremental" in out
+
+    def test_run(self, db, path, capsys):
+        _events(db, "2001-01-01 00:00:00")
+        assert db_maintenance.main(["--db", path, "--run"]) == 0
+        out = capsys.readouterr().out
+        assert "archived_events: 1" in out
+        assert os.path.exists(default_archive_path(path))
@@ -0,0 +1,116 @@
+"""
+Medication Schedule Index Tests
+===============================
+The minute-of-week index maps (weekday, HH:MM) to medication ids, stays in
+step with add/edit/delete, and drives the per-minute reminder tick.
+Run: python -m pytest tests/test_medication_index.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import medications as med_mod
+from core.database import PollyDB
+from core.medications import MedicationIndex, MedicationScheduler
+
+
+def _med(med_id, times, days=None, **extra):
+    return dict(id=med_id, name=f"med{med_id}", times=json.dumps(times),
+                active_days=json.dumps(days) if days else None, active=1, **extra)
+
+
+class TestIndex:
+    def test_due_lookup(self):
+        index = MedicationIndex()
+        index.rebuild([_med(1, ["08:00", "20:00"]), _med(2, ["08:00"], ["mon"])])
+        assert [m["id"] for m in index.due("mon", "08:00")] == [1, 2]
+        assert [m["id"] for m in index.due("tue", "08:00")] == [1]
+        assert index.due("mon", "08:01") == []
+
+    def test_rows_are_decoded_once(self):
+        index = MedicationIndex()
+        index.upsert(_med(1, ["08:00"]))
+        med = index.due("sun", "08:00")[0]
+        assert med["times"] == ["08:00"]
+        assert len(med["active_days"]) == 7
+
+    def test_upsert_moves_slots(self):
+        index = MedicationIndex()
+        index.upsert(_med(1, ["08:00"]))
+        index.upsert(_med(1, ["09:30"], ["fri"]))
+        assert index.due("fri", "08:00") == []
+        assert [m["id"] for m in index.due("fri", "09:30")] == [1]
+        assert index._slots.keys() == {("fri", "09:30")}
+
+    def test_remove_and_inactive(self):
+        index = MedicationIndex()
+        index.upsert(_med(1, ["08:00"]))
+        index.upsert(_med(2, ["08:00"]))
+        index.remove(1)
+        index.upsert(dict(_med(2, ["08:00"]), active=0))
+        assert len(index) == 0 and not index._slots
+
+
+class TestScheduler:
+    @pytest.fixture
+    def db(self):
+        return PollyDB(":memory:")
+
+    def _add(self, db, times, days=None):
+        user = db.get_or_create_user(tenant_id=1)
+        return db.add_medication(user["id"], "aspirin", "", json.dumps(times),
+                                 active_days=json.dumps(days) if days else None, tenant_id=1)
+
+    def test_refresh_follows_db(self, db):
+        sched = MedicationScheduler(db)
+        med_id = self._add(db, ["08:00"])
+        sched.refresh_medication(med_id)
+        assert len(sched.index) == 1
+        db.update_medication(med_id, "aspirin", "", json.dumps(["09:00"]), tenant_id=1)
+        sched.refresh_medication(med_id)
+        assert [m["id"] for m in sched.index.due("mon", "09:00")] == [med_id]
+        db.delete_medication(med_id, tenant_id=1)
+        sched.refresh_medication(med_id)
+        assert len(sched.index) == 0
+
+    def test_tick_sends_only_due_once(self, db, monkeypatch):
+        due_id = self._add(db, ["08:00"], ["mon"])
+        self._add(db, ["08:00"], ["tue"])
+        self._add(db, ["09:00"])
+        sched = MedicationScheduler(db)
+        sched.rebuild_index()
+        monday_8am = datetime(2026, 10, 19, 8, 0)
+        monkeypatch.setattr(med_mod, "_get_local_now", lambda: monday_8am)
+        sent = []
+
+        async def fake_send(med, med_time, tenant_id=None):
+            sent.append((med["id"], med_time))
+
+        sched._send_reminder = fake_send
+        asyncio.run(sched._check_medications())
+        asyncio.run(sched._check_medications())
+        assert sent == [(due_id, "08:00")]
+
+    def test_tick_does_not_scan_table(self, db, monkeypatch):
+        self._add(db, ["08:00"])
+        sched = MedicationScheduler(db)
+        sched.rebuild_index()
+        monkeypatch.setattr(db, "get_medications",
+                            lambda *a, **k: pytest.fail("tick scanned the table"))
+        asyncio.run(sched._check_medications())
+
+    def test_periodic_resync(self, db, monkeypatch):
+        sched = MedicationScheduler(db)
+        sched.rebuild_index()
+        self._add(db, ["08:00"])  # written without a refresh hook
+        monkeypatch.setattr(med_mod, "_get_local_now", lambda: datetime(2026, 10, 19, 7, 0))
+        sched._index_built_at -= med_mod.INDEX_RESYNC_SECONDS
+        asyncio.run(sched._check_medications())
+        assert len(sched.index) == 1
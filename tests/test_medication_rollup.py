@@ -0,0 +1,137 @@
+"""
+Medication Compliance Rollup Tests
+==================================
+log_medication keeps the medication_daily rollup current, the backfill
+rebuilds it from raw logs, and the upcoming/calendar views read it.
+Run: python -m pytest tests/test_medication_rollup.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from api import web
+from config import settings
+from core import database
+from core.command_processor import CommandProcessor
+from core.database import PollyDB
+from core.intent_parser import IntentParser
+from core.medications import MedicationScheduler
+
+
+@pytest.fixture
+def db():
+    return PollyDB(":memory:")
+
+
+def _add(db, tenant_id=1, times=("08:00",), name="aspirin"):
+    user = db.get_or_create_user(tenant_id=tenant_id)
+    return db.add_medication(user["id"], name, "", json.dumps(list(times)), tenant_id=tenant_id)
+
+
+class TestRollup:
+    def test_log_bumps_daily_counts(self, db):
+        med = _add(db)
+        db.log_medication(med, "reminded", day="2026-10-19")
+        db.log_medication(med, "reminded", day="2026-10-19")
+        db.log_medication(med, "taken", day="2026-10-19")
+        db.log_medication(med, "missed", day="2026-10-20")
+        db.log_medication(med, "snoozed", day="2026-10-20")  # not rolled up
+        rows = db.get_medication_rollups(1, "2026-10-01")
+        assert [(r["day"], r["reminded"], r["taken"], r["missed"]) for r in rows] == [
+            ("2026-10-19", 2, 1, 0), ("2026-10-20", 0, 0, 1)]
+
+    def test_tenant_scoped(self, db):
+        mine, theirs = _add(db, 1), _add(db, 2)
+        db.log_medication(mine, "reminded", day="2026-10-19")
+        db.log_medication(theirs, "reminded", day="2026-10-19")
+        assert [r["medication_id"] for r in db.get_medication_rollups(1, "2026-10-19")] == [mine]
+        assert db.get_medication_rollups(1, "2026-10-20") == []
+
+    def test_rebuild_matches_incremental(self, db):
+        a, b = _add(db), _add(db, name="vitamin D")
+        for med, status in [(a, "reminded"), (a, "taken"), (b, "reminded"), (b, "missed"), (a, "reminded")]:
+            db.log_medication(med, status)
+        incremental = db.get_medication_rollups(1, "2000-01-01")
+        assert db.rebuild_medication_rollups(batch_size=2) == 2
+        assert db.get_medication_rollups(1, "2000-01-01") == incremental
+
+    def test_rebuild_uses_local_day(self, db, monkeypatch):
+        monkeypatch.setattr(settings, "TIMEZONE", "America/Chicago")
+        med = _add(db)
+        conn = db._get_connection()
+        # 03:00 UTC is the previous evening in Chicago
+        conn.execute("INSERT INTO medication_logs (medication_id, status, created_at) "
+                     "VALUES (?, 'reminded', '2026-10-19 03:00:00')", (med,))
+        conn.commit()
+        db.rebuild_medication_rollups()
+        assert db.get_medication_rollups(1, "2026-10-01")[0]["day"] == "2026-10-18"
+
+    def test_utc_timestamp_to_local_day(self, monkeypatch):
+        monkeypatch.setattr(settings, "TIMEZONE", "Asia/Tokyo")
+        when = datetime(2026, 10, 19, 20, 0, tzinfo=timezone.utc)
+        assert database._local_day(when) == "2026-10-20"
+
+
+class TestVoice:
+    def _ask(self, db, text):
+        cmd = CommandProcessor(db=db, data=None, med_scheduler=MedicationScheduler(db))
+        state = cmd._get_state("dev1")
+        state.tenant_id = 1
+        intent = IntentParser().parse(text)
+        assert intent["intent"] == "medication"
+        return cmd._intent_medication(intent, text, "dev1", state)
+
+    def _log_count(self, db):
+        conn = db._get_connection()
+        return conn.execute("SELECT COUNT(*) FROM medication_logs").fetchone()[0]
+
+    def test_question_logs_nothing(self, db):
+        med = _add(db)
+        db.log_medication(med, "reminded")
+        self._ask(db, "have I taken my medication today")
+        assert self._log_count(db) == 1
+        assert all(r["taken"] == 0 for r in db.get_medication_rollups(1, "2000-01-01"))
+
+
+class TestViews:
+    def _request(self, db):
+        return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(db=db)))
+
+    @pytest.fixture(autouse=True)
+    def session(self, monkeypatch):
+        async def fake_session(request):
+            return {"tenant_id": 1}
+
+        monkeypatch.setattr(web, "get_web_session", fake_session)
+        monkeypatch.setattr(web, "_get_local_now", lambda: datetime(2026, 10, 19, 12, 0))
+
+    def test_upcoming_reports_reminders_not_compliance(self, db):
+        # Nothing records taken/missed yet, so past doses stay "overdue"
+        med = _add(db, times=("08:00", "10:00", "20:00"))
+        db.log_medication(med, "reminded", day="2026-10-19")
+        db.log_medication(med, "taken", day="2026-10-19")
+        db.log_medication(med, "missed", day="2026-10-15")
+
+        resp = asyncio.run(web.medications_upcoming(self._request(db)))
+        body = json.loads(resp.body)
+        badges = {m["time_24"]: m["badge"] for m in body["medications"]}
+        assert badges == {"08:00": "overdue", "10:00": "overdue", "20:00": "scheduled"}
+        assert body["reminders_7d"] == 1
+        assert "compliance_7d" not in body
+
+    def test_calendar_includes_reminder_count(self, db):
+        med = _add(db)
+        for status in ("reminded", "reminded", "taken"):
+            db.log_medication(med, status, day="2026-10-10")
+        resp = asyncio.run(web.medications_calendar(self._request(db)))
+        text = resp.body.decode()
+        assert "Last 30 days: 2 reminders sent" in text
+        assert "taken" not in text
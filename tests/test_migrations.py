@@ -0,0 +1,113 @@
+"""
+Schema Migration Tests
+======================
+PollyDB records applied schema steps in PRAGMA user_version: a current
+database skips the migration chain, an old one is brought forward step by
+step, and migrate_db.py reports and applies what is pending.
+Run: python -m pytest tests/test_migrations.py -v
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import migrate_db
+from core.database import MIGRATIONS, SCHEMA_VERSION, PollyDB
+from tests.db_startup_benchmark import run_benchmark
+
+
+def _user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _set_user_version(path, version):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {version}")
+    conn.close()
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "polly.db")
+
+
+def test_versions_are_sequential():
+    assert [m[0] for m in MIGRATIONS] == list(range(1, len(MIGRATIONS) + 1))
+    assert all(hasattr(PollyDB, m[2]) for m in MIGRATIONS)
+
+
+class TestStartup:
+    def test_new_database_is_current(self, path):
+        db = PollyDB(path)
+        assert db.schema_version() == SCHEMA_VERSION
+        assert db.pending_migrations() == []
+        assert db._fts
+        db.close()
+
+    def test_current_database_skips_chain(self, path, monkeypatch):
+        PollyDB(path).close()
+        for _, _, method in MIGRATIONS:
+            monkeypatch.setattr(PollyDB, method, lambda self: pytest.fail("re-ran a migration"))
+        db = PollyDB(path)
+        assert db._fts  # still detected without running the FTS step
+        db.close()
+
+    def test_old_database_runs_only_newer_steps(self, path, monkeypatch):
+        PollyDB(path).close()
+        _set_user_version(path, 1)
+        monkeypatch.setattr(PollyDB, "_migrate_base_schema",
+                            lambda self: pytest.fail("re-ran v1"))
+        db = PollyDB(path)
+        assert db.schema_version() == SCHEMA_VERSION
+        db.close()
+
+    def test_unversioned_database_is_upgraded(self, path):
+        # A pre-versioning database: user_version 0, old columns missing
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE accounts (id INTEGER PRIMARY KEY, email TEXT, "
+                     "password_hash TEXT, name TEXT, tenant_id INTEGER, role TEXT)")
+        conn.execute("INSERT INTO accounts (email, name) VALUES ('a@example.com', 'Ann')")
+        conn.commit()
+        conn.close()
+
+        db = PollyDB(path)
+        account = db.get_account_by_id(1)
+        assert account["is_admin"] == 1 and "terms_accepted_at" in account
+        assert _user_version(path) == SCHEMA_VERSION
+        db.close()
+
+    def test_migrate_false_leaves_schema_alone(self, path):
+        db = PollyDB(path, migrate=False)
+        assert db.schema_version() == 0
+        assert [v for v, _ in db.pending_migrations()] == [m[0] for m in MIGRATIONS]
+        assert not db._fts
+        db.close()
+
+
+class TestCli:
+    def test_status_does_not_apply(self, path, capsys):
+        assert migrate_db.main(["--db", path]) == 0
+        out = capsys.readouterr().out
+        assert "Schema v0" in out and f"pending v{SCHEMA_VERSION}" in out
+        assert _user_version(path) == 0
+
+    def test_apply(self, path, capsys):
+        assert migrate_db.main(["--db", path, "--apply"]) == 0
+        assert _user_version(path) == SCHEMA_VERSION
+        capsys.readouterr()
+        migrate_db.main(["--db", path])
+        assert "Up to date." in capsys.readouterr().out
+
+
+def test_benchmark_current_is_fastest():
+    report = run_benchmark(rounds=3)
+    assert report["current_ms"] < report["legacy_ms"] < report["fresh_ms"]
@@ -0,0 +1,128 @@
+"""
+Keyset Pagination Tests
+=======================
+Stories, photos, memories, the shared wall and chatter posts page on
+(created_at, id) newest first with an opaque cursor: no row is skipped or
+repeated, even when many rows share a timestamp.
+Run: python -m pytest tests/test_pagination.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from api import web
+from core.database import PollyDB, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    yield db
+    db.close()
+
+
+def _stamp(db, table, created_at):
+    with db.connection() as conn:
+        conn.execute(f"UPDATE {table} SET created_at = ?", (created_at,))
+        conn.commit()
+
+
+def _walk(fetch, limit):
+    """Follow next_cursor to the end; returns the ids in order."""
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = fetch(cursor=cursor, limit=limit)
+        ids += [r["id"] for r in rows]
+        pages += 1
+        if not cursor:
+            return ids, pages
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("2024-05-01 10:00:00", 42)) == ("2024-05-01 10:00:00", 42)
+    assert decode_cursor(None) is None
+    assert decode_cursor("not a cursor!") is None
+
+
+class TestDbPages:
+    def test_stories_with_shared_timestamps(self, db):
+        for i in range(23):
+            db.save_story(f"story {i}", tenant_id=1)
+        db.save_story("other family", tenant_id=2)
+        _stamp(db, "stories", "2024-01-01 00:00:00")  # all in the same second
+
+        ids, pages = _walk(lambda **kw: db.get_stories_page(
+            tenant_id=1, verified_only=False, **kw), limit=5)
+        assert ids == list(range(23, 0, -1)) and pages == 5
+
+    def test_newest_first_across_timestamps(self, db):
+        for i in range(6):
+            story_id = db.save_story(f"story {i}", tenant_id=1)
+            with db.connection() as conn:
+                # Older ids get newer dates: order follows created_at, not id
+                conn.execute("UPDATE stories SET created_at = ? WHERE id = ?",
+                             (f"2024-01-0{9 - i} 00:00:00", story_id))
+                conn.commit()
+        ids, _ = _walk(lambda **kw: db.get_stories_page(
+            tenant_id=1, verified_only=False, **kw), limit=4)
+        assert ids == [1, 2, 3, 4, 5, 6]
+
+    def test_photos_and_memories(self, db):
+        for i in range(7):
+            db.save_photo(f"p{i}.jpg", tenant_id=1)
+            db.save_memory(story_id=None, speaker="Ann", text=f"memory {i}", tenant_id=1)
+        assert _walk(lambda **kw: db.get_photos_page(tenant_id=1, **kw), limit=3)[0] == \
+            list(range(7, 0, -1))
+        assert _walk(lambda **kw: db.get_memories_page(tenant_id=1, **kw), limit=3)[0] == \
+            list(range(7, 0, -1))
+
+    def test_last_page_has_no_cursor(self, db):
+        db.save_photo("only.jpg", tenant_id=1)
+        photos, cursor = db.get_photos_page(tenant_id=1, limit=1)
+        assert len(photos) == 1 and cursor is None
+
+    def test_legacy_getters_unchanged(self, db):
+        for i in range(4):
+            db.save_photo(f"p{i}.jpg", tenant_id=1)
+        assert [p["id"] for p in db.get_photos(limit=2, tenant_id=1)] == [4, 3]
+
+
+class TestRoutes:
+    @pytest.fixture(autouse=True)
+    def session(self, monkeypatch):
+        async def fake_session(request):
+            return {"tenant_id": 1, "role": "owner"}
+
+        monkeypatch.setattr(web, "get_web_session", fake_session)
+
+    def _get(self, db, handler, *args, **query):
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(db=db)),
+                                  query_params=query)
+        return asyncio.run(handler(request, *args))
+
+    def test_photos_list_cursor_header(self, db):
+        for i in range(5):
+            db.save_photo(f"p{i}.jpg", tenant_id=1)
+        resp = self._get(db, web.photos_list_api, limit="3")
+        assert [p["id"] for p in json.loads(resp.body)] == [5, 4, 3]
+        resp = self._get(db, web.photos_list_api, limit="3",
+                         cursor=resp.headers["x-next-cursor"])
+        assert [p["id"] for p in json.loads(resp.body)] == [2, 1]
+        assert "x-next-cursor" not in resp.headers
+
+    def test_stories_feed(self, db):
+        for i in range(3):
+            db.save_story(f"story {i}", tenant_id=1)
+        body = json.loads(self._get(db, web.stories_feed_api, limit="2").body)
+        assert [s["id"] for s in body["items"]] == [3, 2] and body["next_cursor"]
+
+    def test_chatter_feed_requires_membership(self, db):
+        resp = self._get(db, web.chatter_group_feed_api, 7)
+        assert resp.status_code == 403
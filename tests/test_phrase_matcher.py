@@ -0,0 +1,121 @@
+"""
+Phrase Matcher Equivalence
+==========================
+The compiled Aho-Corasick matcher must report exactly the phrase groups the
+old per-list scan (IntentParser._matches + substring theme checks) found,
+and parse() must return identical results either way.
+Run: python -m pytest tests/test_phrase_matcher.py -v
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+
+import pytest
+from server.core.intent_parser import IntentParser, PhraseMatcher
+
+
+FAMILY_NAMES = {
+    "glen", "grandma", "dad", "mom", "mia", "brooklyn",
+    "papa", "nana", "uncle bob", "bob", "sarah", "joe",
+}
+
+FILLER = [
+    "polly", "hey holly", "the", "drum", "umbrella", "hummingbird", "bypass",
+    "sickle", "downtown", "kidney", "pill", "where is", "my", "please",
+    "um,", "hmm...", "huh?", "bye!", "i'm", "whats", "im", "dont", "_um_",
+    "um2", "café", "naïve", "", "  ",
+]
+
+
+class ScanningParser(IntentParser):
+    """The pre-automaton behaviour: scan every list on its own."""
+
+    def _phrase_hits(self, text_lower):
+        hits = set()
+        for key, phrases, short_word_boundary in self._phrase_groups():
+            if short_word_boundary:
+                if self._matches(text_lower, list(phrases)):
+                    hits.add(key)
+            elif any(p in text_lower for p in phrases):
+                hits.add(key)
+        return hits
+
+
+def _all_phrases(parser):
+    return [p for _, phrases, _ in parser._phrase_groups() for p in phrases]
+
+
+def _corpus(parser, size=3000, seed=1234):
+    rng = random.Random(seed)
+    phrases = _all_phrases(parser)
+    texts = list(phrases)
+    texts += [f"polly {p} please" for p in phrases]
+    texts += [p.replace(" ", "") for p in phrases]
+    for _ in range(size):
+        parts = rng.sample(phrases, rng.randint(1, 3)) + rng.sample(FILLER, rng.randint(0, 3))
+        rng.shuffle(parts)
+        text = " ".join(parts)
+        if rng.random() < 0.3:
+            # Chop mid-word to exercise boundaries and partial phrases
+            cut = rng.randint(0, len(text))
+            text = text[cut:] if rng.random() < 0.5 else text[:cut]
+        texts.append(text)
+    return texts
+
+
+@pytest.fixture
+def parsers():
+    fast, slow = IntentParser(), ScanningParser()
+    fast._family_names = set(FAMILY_NAMES)
+    slow._family_names = set(FAMILY_NAMES)
+    return fast, slow
+
+
+class TestPhraseMatcher:
+    def test_short_phrase_needs_word_boundary(self):
+        m = PhraseMatcher([("thinking", ("um", "hmm"), True)])
+        assert m.find("um let me see") == {"thinking"}
+        assert m.find("hmm.") == {"thinking"}
+        assert m.find("play the drum") == set()
+        assert m.find("umbrella") == set()
+        assert m.find("um_") == set()
+
+    def test_long_phrase_is_substring(self):
+        m = PhraseMatcher([("skip", ("pass",), True)])
+        assert m.find("bypass") == {"skip"}
+
+    def test_unbounded_group_ignores_length(self):
+        m = PhraseMatcher([("theme", ("kid",), False)])
+        assert m.find("kidney") == {"theme"}
+
+    def test_overlapping_phrases_all_reported(self):
+        m = PhraseMatcher([
+            ("a", ("tell me a joke",), True),
+            ("b", ("a joke",), True),
+            ("c", ("joke please",), True),
+        ])
+        assert m.find("tell me a joke please") == {"a", "b", "c"}
+
+    def test_bounded_hit_after_failed_boundary(self):
+        # First "um" is inside a word, the second one stands alone
+        m = PhraseMatcher([("thinking", ("um",), True)])
+        assert m.find("drum um") == {"thinking"}
+
+    def test_parsers_share_compiled_automaton(self):
+        assert IntentParser()._phrase_matcher is IntentParser()._phrase_matcher
+
+
+class TestEquivalence:
+    def test_hits_match_scan(self, parsers):
+        fast, slow = parsers
+        for text in _corpus(fast):
+            lowered = text.lower()
+            assert fast._phrase_hits(lowered) == slow._phrase_hits(lowered), text
+
+    def test_parse_matches_scan(self, parsers):
+        fast, slow = parsers
+        for text in _corpus(fast):
+            assert fast.parse(text) == slow.parse(text), text
@@ -0,0 +1,111 @@
+"""
+Query Plan Regression Tests
+===========================
+Runs the tenant-scoped hot queries against a seeded database, captures the
+SQL they actually execute and fails if EXPLAIN QUERY PLAN shows a full
+table SCAN for any of them. Text search goes through the FTS5 indexes.
+Run: python -m pytest tests/test_query_plans.py -v
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import memory_capture
+from core.database import FEED_INDEXES, PollyDB, TENANT_INDEXES, encode_cursor
+
+TENANTS = (1, 2, 3)
+
+
+@pytest.fixture(scope="module")
+def db():
+    db = PollyDB(":memory:")
+    for tid in TENANTS:
+        user = db.get_or_create_user(tenant_id=tid)
+        for i in range(30):
+            db.store_item(f"thing {i}", f"drawer {i % 5}", tenant_id=tid)
+            story_id = db.save_story(f"story {i} about the farm", speaker_name="Grandma",
+                                     tenant_id=tid)
+            db.add_story_tag(story_id, "topic", f"topic{i % 4}", tenant_id=tid)
+            db.save_memory(story_id=story_id, speaker="Grandma", text=f"memory {i}",
+                           tenant_id=tid)
+            db.save_photo(f"p{tid}_{i}.jpg", tenant_id=tid)
+        for i in range(5):
+            db.add_family_member(f"cousin {i}", "cousin", tenant_id=tid)
+            db.add_medication(user["id"], f"med {i}", "", json.dumps(["08:00"]), tenant_id=tid)
+    return db
+
+
+def _capture(db, fn):
+    """SELECT statements executed by fn, with parameters bound."""
+    statements = []
+
+    def trace(sql):
+        if sql.lstrip().upper().startswith("SELECT"):
+            statements.append(sql)
+
+    db._conn.set_trace_callback(trace)
+    try:
+        fn()
+    finally:
+        db._conn.set_trace_callback(None)
+    assert statements, "nothing was executed"
+    return statements
+
+
+def _scans(db, sql):
+    plan = [row[3] for row in db._conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()]
+    # Walking a materialized subquery, or an FTS5 MATCH (reported as a
+    # virtual-table "scan" of its index), is not a table scan
+    subqueries = {f"SCAN {d.split()[1]}" for d in plan if d.startswith("MATERIALIZE ")}
+    return [d for d in plan if d.startswith("SCAN") and d not in subqueries
+            and "VIRTUAL TABLE INDEX" not in d]
+
+
+HOT_QUERIES = {
+    "find_item": lambda db: db.find_item("thing 3", tenant_id=2),
+    "find_item_fuzzy": lambda db: db.find_item("hing", tenant_id=2),
+    "search": lambda db: db.search("drawer", tenant_id=2),
+    "find_by_location": lambda db: db.find_by_location("drawer 3", tenant_id=2),
+    "search_stories": lambda db: db.search_stories_by_speaker_or_topic("farm", tenant_id=2),
+    "list_all": lambda db: db.list_all(tenant_id=2),
+    "get_stories": lambda db: db.get_stories(tenant_id=2),
+    "get_stories_public": lambda db: db.get_stories(tenant_id=2, exclude_private=True),
+    "get_memories": lambda db: db.get_memories(tenant_id=2),
+    "get_memories_in_book": lambda db: db.get_memories(tenant_id=2, in_book_only=True),
+    "get_photos": lambda db: db.get_photos(tenant_id=2),
+    "stories_page_2": lambda db: db.get_stories_page(
+        cursor=encode_cursor("2099-01-01 00:00:00", 50), tenant_id=2, verified_only=False),
+    "memories_page_2": lambda db: db.get_memories_page(
+        cursor=encode_cursor("2099-01-01 00:00:00", 50), tenant_id=2),
+    "photos_page_2": lambda db: db.get_photos_page(
+        cursor=encode_cursor("2099-01-01 00:00:00", 50), tenant_id=2),
+    "wall_page": lambda db: db.get_wall_page(1, 2, cursor=encode_cursor("2099-01-01 00:00:00", 50)),
+    "get_medications": lambda db: db.get_medications(tenant_id=2),
+    "get_family_members": lambda db: db.get_family_members(tenant_id=2),
+    "get_devices_by_tenant": lambda db: db.get_devices_by_tenant(2),
+    "already_captured": lambda db: memory_capture.already_captured(db, "story", 5, 2),
+    "story_tags_by_value": lambda db: db._conn.execute(
+        "SELECT story_id FROM story_tags WHERE tenant_id = 2 AND tag_type = 'topic' "
+        "AND tag_value = 'topic1'").fetchall(),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(db, name):
+    for sql in _capture(db, lambda: HOT_QUERIES[name](db)):
+        assert _scans(db, sql) == [], f"{name}: {sql}"
+
+
+def test_indexes_created(db):
+    names = {row[0] for row in db._conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()}
+    assert {name for name, _, _ in TENANT_INDEXES + FEED_INDEXES} <= names
+
+
+def test_detects_scan(db):
+    assert _scans(db, "SELECT * FROM items WHERE context = 'x'")
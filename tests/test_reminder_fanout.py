@@ -0,0 +1,213 @@
+"""
+Reminder Fan-out Tests
+======================
+Medication reminders are delivered to every device concurrently, each under
+the device's shared send lock with timed-out writes re-queued, and with
+per-device latency stats.
+Run: python -m pytest tests/test_reminder_fanout.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import medications as med_mod
+from core.database import PollyDB
+from core.medications import MedicationScheduler
+from core.squawk import SquawkManager
+
+WAV = b"RIFF" + b"\x00" * 20000  # three 8000-byte chunks
+
+
+class FakeWS:
+    def __init__(self, delay=0.0, hang=False, fail=False, hang_sends=None):
+        self.delay = delay
+        self.hang = hang
+        self.fail = fail
+        self.hang_sends = hang_sends  # hang this many sends, then recover
+        self.sent = []
+
+    async def _send(self, data):
+        if self.fail:
+            raise ConnectionError("socket closed")
+        if self.hang_sends:
+            self.hang_sends -= 1
+            await asyncio.Event().wait()
+        if self.hang:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def send_json(self, data):
+        await self._send(data)
+
+    async def send_text(self, text):
+        await self._send(json.loads(text))
+
+
+@pytest.fixture
+def sched(monkeypatch):
+    sched = MedicationScheduler(PollyDB(":memory:"))
+
+    async def fake_audio(text):
+        return WAV
+
+    sched._reminder_audio = fake_audio
+    return sched
+
+
+def _send(sched, tenant_id=1, device_id=None):
+    med = {"id": 7, "name": "aspirin", "dosage": "", "device_id": device_id}
+    return sched._send_reminder(med, "08:00", tenant_id)
+
+
+class TestFanOut:
+    def test_devices_receive_concurrently(self, sched):
+        socks = {f"dev{i}": FakeWS(delay=0.05) for i in range(5)}
+        for device_id, ws in socks.items():
+            sched.register_websocket(device_id, ws, tenant_id=1)
+
+        started = time.monotonic()
+        asyncio.run(_send(sched))
+        elapsed = time.monotonic() - started
+
+        # 4 messages x 50ms each per device; serial delivery would take ~1s+
+        assert elapsed < 0.6
+        for ws in socks.values():
+            assert [m["event"] for m in ws.sent] == ["medication_reminder"] + ["audio_chunk"] * 3
+            assert ws.sent[-1]["final"] and "squawk" not in ws.sent[-1]
+
+    def test_tenant_and_device_targeting(self, sched):
+        mine, other_device, other_tenant = FakeWS(), FakeWS(), FakeWS()
+        sched.register_websocket("dev1", mine, tenant_id=1)
+        sched.register_websocket("dev2", other_device, tenant_id=1)
+        sched.register_websocket("dev3", other_tenant, tenant_id=2)
+        asyncio.run(_send(sched, device_id="dev1"))
+        assert mine.sent and not other_device.sent and not other_tenant.sent
+
+    def test_stuck_socket_times_out_without_delaying_others(self, sched, monkeypatch):
+        monkeypatch.setattr(med_mod, "REMINDER_SEND_TIMEOUT_SECONDS", 0.2)
+        ok, stuck = FakeWS(), FakeWS(hang=True)
+        sched.register_websocket("ok", ok, tenant_id=1)
+        sched.register_websocket("stuck", stuck, tenant_id=1)
+
+        started = time.monotonic()
+        asyncio.run(_send(sched))
+        assert time.monotonic() - started < 0.5
+        assert ok.sent
+        report = sched.delivery_report()
+        assert report["stuck"]["timeouts"] == 1 and report["ok"]["delivered"] == 1
+        assert "stuck" in sched._websockets  # busy isn't dead
+
+    def test_timed_out_reminder_is_requeued(self, sched, monkeypatch):
+        monkeypatch.setattr(med_mod, "REMINDER_SEND_TIMEOUT_SECONDS", 0.3)
+        monkeypatch.setattr(med_mod, "REMINDER_RETRY_DELAY_SECONDS", 0)
+        ws = FakeWS(hang_sends=1)
+        sched.register_websocket("dev1", ws, tenant_id=1)
+
+        async def go():
+            await _send(sched)
+            assert ws.sent == [] and len(sched._retry_tasks) == 1
+            await asyncio.gather(*sched._retry_tasks)
+
+        asyncio.run(go())
+        assert [m["event"] for m in ws.sent] == ["medication_reminder"] + ["audio_chunk"] * 3
+        report = sched.delivery_report()["dev1"]
+        assert report["timeouts"] == 1 and report["delivered"] == 1
+
+    def test_retries_stop_after_max_attempts(self, sched, monkeypatch):
+        monkeypatch.setattr(med_mod, "REMINDER_SEND_TIMEOUT_SECONDS", 0.05)
+        monkeypatch.setattr(med_mod, "REMINDER_RETRY_DELAY_SECONDS", 0)
+        sched.register_websocket("stuck", FakeWS(hang=True), tenant_id=1)
+
+        async def go():
+            await _send(sched)
+            while sched._retry_tasks:
+                await asyncio.gather(*list(sched._retry_tasks))
+
+        asyncio.run(go())
+        assert sched.delivery_report()["stuck"]["timeouts"] == med_mod.REMINDER_MAX_ATTEMPTS
+
+    def test_failed_socket_is_unregistered(self, sched):
+        sched.register_websocket("dead", FakeWS(fail=True), tenant_id=1)
+        asyncio.run(_send(sched))
+        assert "dead" not in sched._websockets
+        assert sched.delivery_report()["dead"]["failures"] == 1
+
+
+class TestLogging:
+    def test_batch_logs_each_medication(self, sched):
+        db = sched.db
+        user = db.get_or_create_user(tenant_id=1)
+        ids = [db.add_medication(user["id"], name, "", '["08:00"]', tenant_id=1)
+               for name in ("aspirin", "vitamin D")]
+        meds = [({"id": med_id, "name": name, "dosage": ""}, "08:00")
+                for med_id, name in zip(ids, ("aspirin", "vitamin D"))]
+        asyncio.run(sched._send_batch_reminder(meds, tenant_id=1))
+        rollups = db.get_medication_rollups(1, "2000-01-01")
+        assert sorted(r["medication_id"] for r in rollups) == ids
+        assert all(r["reminded"] == 1 for r in rollups)
+
+
+class TestSendLock:
+    def test_waits_for_squawk_lock_and_reports_queue_time(self, sched, tmp_path):
+        async def go():
+            squawk = SquawkManager(str(tmp_path))
+            ws = FakeWS()
+            squawk.register_device("dev1", ws)
+            sched.squawk = squawk
+            sched.register_websocket("dev1", ws, tenant_id=1)
+
+            lock = squawk.get_send_lock("dev1")
+            await lock.acquire()  # a TTS response is mid-send
+            send = asyncio.ensure_future(_send(sched))
+            await asyncio.sleep(0.1)
+            assert ws.sent == []  # nothing interleaved with the TTS
+            lock.release()
+            await send
+            squawk.stop()
+            return ws
+
+        ws = asyncio.run(go())
+        assert ws.sent[0]["event"] == "medication_reminder"
+        stats = sched.delivery_report()["dev1"]
+        assert stats["queue"]["max_ms"] >= 100
+        assert stats["latency"]["count"] == 1
+
+    def test_lock_wait_does_not_count_toward_timeout(self, sched, tmp_path, monkeypatch):
+        monkeypatch.setattr(med_mod, "REMINDER_SEND_TIMEOUT_SECONDS", 0.3)
+
+        async def go():
+            squawk = SquawkManager(str(tmp_path))
+            ws = FakeWS()
+            squawk.register_device("dev1", ws)
+            sched.squawk = squawk
+            sched.register_websocket("dev1", ws, tenant_id=1)
+
+            lock = squawk.get_send_lock("dev1")
+            await lock.acquire()
+            send = asyncio.ensure_future(_send(sched))
+            await asyncio.sleep(0.5)  # longer than the write timeout
+            lock.release()
+            await send
+            squawk.stop()
+            return ws
+
+        ws = asyncio.run(go())
+        assert ws.sent[0]["event"] == "medication_reminder"
+        assert sched.delivery_report()["dev1"]["timeouts"] == 0
+
+    def test_repeat_uses_reminder_text(self, sched):
+        class Cmd:
+            _last_response = {}
+
+        sched._cmd_processor = Cmd()
+        sched.register_websocket("dev1", FakeWS(), tenant_id=1)
+        asyncio.run(_send(sched))
+        assert Cmd._last_response["dev1"] == "It's 8 AM, time for your aspirin."
@@ -0,0 +1,143 @@
+"""
+Reminder Audio Pre-render Tests
+===============================
+Reminders due within the look-ahead window are rendered ahead of time into
+a short-lived cache; at the due minute the audio is only sent.
+Run: python -m pytest tests/test_reminder_prerender.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import medications as med_mod
+from core.database import PollyDB
+from core.medications import (
+    MedicationScheduler, ReminderAudioCache, batch_reminder_text, reminder_text,
+)
+
+
+_real_sleep = asyncio.sleep
+
+
+async def _no_sleep(delay, *args):
+    await _real_sleep(0)
+
+
+class FakeWS:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+@pytest.fixture
+def sched(monkeypatch):
+    db = PollyDB(":memory:")
+    user = db.get_or_create_user(tenant_id=1)
+    db.add_medication(user["id"], "aspirin", "", json.dumps(["08:00"]), tenant_id=1)
+    sched = MedicationScheduler(db)
+    sched.rebuild_index()
+    sched.builds = []
+
+    async def fake_build(text):
+        sched.builds.append(text)
+        await asyncio.sleep(0.01)
+        return b"RIFF" + text.encode()
+
+    sched._build_reminder_audio = fake_build
+    monkeypatch.setattr(med_mod.random, "uniform", lambda a, b: 0.0)
+    return sched
+
+
+def _at(hour, minute, second=0):
+    return datetime(2026, 10, 19, hour, minute, second)  # a Monday
+
+
+class TestText:
+    def test_single(self):
+        assert reminder_text({"name": "aspirin", "dosage": "81mg"}, "08:00") == \
+            "It's 8 AM, time to take 81mg of aspirin."
+        assert reminder_text({"name": "call Mom"}, "14:30") == "It's 2:30 PM. Reminder: call Mom."
+
+    def test_batch(self):
+        meds = [({"name": "aspirin"}, "08:00"), ({"name": "vitamin D", "dosage": "1 pill"}, "08:00"),
+                ({"name": "walk the dog"}, "08:00")]
+        assert batch_reminder_text(meds) == \
+            "It's 8 AM, time for your aspirin and 1 pill of vitamin D. walk the dog."
+
+
+class TestPrerender:
+    def test_renders_ahead_and_sends_from_cache(self, sched, monkeypatch):
+        async def go():
+            sched._schedule_prerenders(_at(7, 57, 30))
+            assert len(sched._prerender_tasks) == 1
+            await asyncio.gather(*sched._prerender_tasks.values())
+
+            ws = FakeWS()
+            sched.register_websocket("dev1", ws, tenant_id=1)
+            monkeypatch.setattr(med_mod, "_get_local_now", lambda: _at(8, 0, 5))
+            monkeypatch.setattr(med_mod.asyncio, "sleep", _no_sleep)
+            await sched._check_medications()
+            return ws
+
+        ws = asyncio.run(go())
+        assert sched.builds == ["It's 8 AM, time for your aspirin."]
+        assert sched.audio_cache.hits == 1 and sched.audio_cache.misses == 0
+        assert ws.sent[0]["event"] == "medication_reminder"
+        assert any(m["event"] == "audio_chunk" for m in ws.sent)
+
+    def test_outside_window_not_rendered(self, sched):
+        async def go():
+            sched._schedule_prerenders(_at(7, 50))
+            return len(sched._prerender_tasks)
+
+        assert asyncio.run(go()) == 0
+
+    def test_not_rendered_twice(self, sched):
+        async def go():
+            sched._schedule_prerenders(_at(7, 56))
+            sched._schedule_prerenders(_at(7, 56, 30))  # still in flight
+            await asyncio.gather(*sched._prerender_tasks.values())
+            sched._schedule_prerenders(_at(7, 57))  # cached
+            return len(sched._prerender_tasks)
+
+        assert asyncio.run(go()) == 0
+        assert len(sched.builds) == 1
+
+    def test_in_flight_render_is_awaited(self, sched):
+        async def go():
+            sched._schedule_prerenders(_at(7, 59, 50))
+            return await sched._reminder_audio("It's 8 AM, time for your aspirin.")
+
+        assert asyncio.run(go()).startswith(b"RIFF")
+        assert len(sched.builds) == 1
+
+    def test_miss_synthesizes_inline(self, sched):
+        wav = asyncio.run(sched._reminder_audio("It's 9 AM, time for your tea."))
+        assert wav and sched.audio_cache.misses == 1
+
+
+class TestCache:
+    def test_expiry_and_capacity(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(med_mod, "_monotonic", lambda: clock[0])
+        cache = ReminderAudioCache(max_entries=2)
+        cache.put("a", b"1", ttl=10)
+        cache.put("b", b"2", ttl=20)
+        cache.put("c", b"3", ttl=30)  # evicts "a", the soonest to expire
+        assert "a" not in cache and "c" in cache
+        clock[0] += 25
+        assert cache.get("b") == (False, None)
+        assert cache.get("c") == (True, b"3")
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
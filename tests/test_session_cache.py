@@ -0,0 +1,118 @@
+"""
+Web Session Cache Tests
+=======================
+get_web_session() rows are cached in memory (TTL + LRU) and dropped on
+logout, password change, family code revoke and cleanup.
+Run: python -m pytest tests/test_session_cache.py -v
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.database import PollyDB, SessionCache
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def account(db):
+    tenant_id = db.create_tenant("Smith")
+    account_id = db.create_account("a@example.com", "x", "Ann", tenant_id)
+    return tenant_id, account_id
+
+
+def _count_session_queries(db):
+    seen = []
+    if db._pool:
+        # Trace every pooled connection handed out from here on
+        acquire = db._pool.acquire
+
+        def traced():
+            conn = acquire()
+            conn.set_trace_callback(lambda sql: "FROM web_sessions ws" in sql and seen.append(sql))
+            return conn
+        db._pool.acquire = traced
+    return seen
+
+
+class TestCache:
+    def test_repeat_lookups_hit_cache(self, db, account):
+        session_id = db.create_web_session(account[1], account[0])
+        queries = _count_session_queries(db)
+        for _ in range(5):
+            assert db.get_web_session(session_id)["account_name"] == "Ann"
+        assert len(queries) == 1
+        assert db.sessions.stats()["hits"] == 4
+
+    def test_callers_get_copies(self, db, account):
+        session_id = db.create_web_session(account[1], account[0])
+        db.get_web_session(session_id)["tenant_id"] = 999
+        assert db.get_web_session(session_id)["tenant_id"] == account[0]
+
+    def test_unknown_session_not_cached(self, db):
+        assert db.get_web_session("nope") is None
+        assert db.sessions.stats()["entries"] == 0
+
+    def test_ttl_and_lru(self):
+        cache = SessionCache(ttl=0, max_entries=2)
+        future = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+        cache.put("a", {"expires_at": future})
+        assert cache.get("a") is None  # ttl elapsed
+
+        cache = SessionCache(max_entries=2)
+        for sid in ("a", "b"):
+            cache.put(sid, {"expires_at": future})
+        cache.get("a")
+        cache.put("c", {"expires_at": future})
+        assert cache.get("b") is None and cache.get("a") and cache.get("c")
+
+    def test_expired_session_not_served(self):
+        cache = SessionCache()
+        cache.put("a", {"expires_at": (datetime.utcnow() - timedelta(seconds=1)).isoformat()})
+        assert cache.get("a") is None
+
+
+class TestInvalidation:
+    def test_logout(self, db, account):
+        session_id = db.create_web_session(account[1], account[0])
+        db.get_web_session(session_id)
+        db.delete_web_session(session_id)
+        assert db.get_web_session(session_id) is None
+
+    def test_password_change_drops_all_account_sessions(self, db, account):
+        sessions = [db.create_web_session(account[1], account[0]) for _ in range(2)]
+        for sid in sessions:
+            db.get_web_session(sid)
+        db.update_account_password(account[1], "new-hash")
+        assert db.sessions.stats()["entries"] == 0
+        assert db.get_account_by_id(account[1])["password_hash"] == "new-hash"
+
+    def test_revoke_family_code(self, db, account):
+        family_id = db.create_family_session(account[0], "Cousin Bo")
+        owner_id = db.create_web_session(account[1], account[0])
+        db.get_web_session(family_id)
+        db.get_web_session(owner_id)
+        db.revoke_family_code(account[0])
+        assert db.get_web_session(family_id) is None
+        assert db.get_web_session(owner_id) is not None
+
+    def test_cleanup_clears(self, db, account):
+        db.get_web_session(db.create_web_session(account[1], account[0]))
+        db.cleanup_expired_sessions()
+        assert db.sessions.stats()["entries"] == 0
+
+    def test_onboarding_progress_is_visible(self, db, account):
+        session_id = db.create_family_session(account[0], "Cousin Bo")
+        db.get_web_session(session_id)
+        db.mark_session_onboarded(session_id)
+        assert db.get_web_session(session_id)["onboarding_complete"] == 1
@@ -0,0 +1,140 @@
+"""
+Sound Bank Tests
+================
+static/sounds clips are decoded once to 16kHz mono, cached on disk keyed by
+source mtime/size, memory-mapped on reload, and shared by AckCache,
+SquawkManager and medication reminders.
+Run: python -m pytest tests/test_sound_bank.py -v
+"""
+
+import asyncio
+import io
+import os
+import sys
+import wave
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import audio_dsp, medications
+from core.ack_cache import AckCache
+from core.sound_bank import SoundBank, decode_wav_to_16k_mono
+from core.squawk import SquawkManager
+
+
+def _wav_bytes(samples, rate=16000, channels=1, sampwidth=2):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sampwidth)
+        w.setframerate(rate)
+        w.writeframes(samples)
+    return buf.getvalue()
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.fixture
+def sounds(tmp_path):
+    d = tmp_path / "sounds"
+    d.mkdir()
+    stereo = np.tile(np.array([[1000, 3000]], dtype=np.int16), (44100, 1))  # 1s at 44.1kHz
+    _write(d / "squawk1.wav", _wav_bytes(stereo.tobytes(), rate=44100, channels=2))
+    _write(d / "squawk6.wav", _wav_bytes(np.full(8000, 500, dtype=np.int16).tobytes()))
+    _write(d / "chatter1.wav", _wav_bytes(np.full(16000, -700, dtype=np.int16).tobytes()))
+    _write(d / "readme.txt", b"not audio")
+    return str(d)
+
+
+class TestDecode:
+    def test_stereo_44k_to_16k_mono(self):
+        stereo = np.tile(np.array([[1000, 3000]], dtype=np.int16), (44100, 1))
+        pcm = decode_wav_to_16k_mono(_wav_bytes(stereo.tobytes(), rate=44100, channels=2))
+        assert pcm.dtype == np.int16
+        assert len(pcm) == 16000
+        # Channels averaged; the resampler's edge transients aside, DC is exact
+        assert np.all(np.abs(pcm[100:-100].astype(int) - 2000) <= 1)
+
+    def test_24_bit(self):
+        vals = np.array([0x123456, -0x123456, 0x7FFFFF], dtype=np.int32)
+        raw = b"".join(int(v).to_bytes(3, "little", signed=True) for v in vals)
+        pcm = decode_wav_to_16k_mono(_wav_bytes(raw, sampwidth=3))
+        assert list(pcm) == [0x1234, -0x1235, 0x7FFF]
+
+    def test_8_bit(self):
+        pcm = decode_wav_to_16k_mono(_wav_bytes(bytes([128, 255, 0]), sampwidth=1))
+        assert list(pcm) == [0, 127 * 256, -32768]
+
+
+class TestDiskCache:
+    def test_second_bank_maps_from_cache(self, sounds, tmp_path):
+        cache = str(tmp_path / "cache")
+        first = SoundBank(sounds, cache_dir=cache)
+        assert first.preload() == 3
+        assert first.conversions == 3
+
+        second = SoundBank(sounds, cache_dir=cache)
+        assert second.preload() == 3
+        assert second.conversions == 0
+        assert isinstance(second.pcm("squawk1.wav"), np.memmap)
+        assert np.array_equal(second.pcm("squawk1.wav"), first.pcm("squawk1.wav"))
+
+    def test_changed_source_invalidates_cache(self, sounds, tmp_path):
+        cache = str(tmp_path / "cache")
+        SoundBank(sounds, cache_dir=cache).preload()
+        path = os.path.join(sounds, "squawk6.wav")
+        _write(path, _wav_bytes(np.full(4000, 9, dtype=np.int16).tobytes()))
+        os.utime(path, ns=(1, 1))
+
+        bank = SoundBank(sounds, cache_dir=cache)
+        assert list(bank.pcm("squawk6.wav")[:2]) == [9, 9]
+        assert bank.conversions == 1
+        assert len([f for f in os.listdir(cache) if f.startswith("squawk6.")]) == 1
+
+    def test_no_cache_dir(self, sounds):
+        bank = SoundBank(sounds, cache_dir="")
+        assert bank.pcm("chatter1.wav") is not None
+        assert bank.pcm("missing.wav") is None
+
+
+class TestConsumers:
+    def test_all_consumers_share_one_decode(self, sounds, tmp_path):
+        bank = SoundBank(sounds, cache_dir=str(tmp_path / "cache"))
+        ack = AckCache()
+        ack.warm_up(sounds, bank=bank)
+        mgr = SquawkManager(sounds, bank=bank)
+        pcm = medications._load_squawk_16k_mono(bank)
+
+        assert ack.ready and len(ack._clips) == 2
+        assert len(mgr.squawks) == 2 and len(mgr.chatter) == 1
+        assert pcm is not None and len(pcm) % 2 == 0
+        assert bank.conversions == 3
+
+    def test_squawk_default_volume(self, sounds):
+        mgr = SquawkManager(sounds, bank=SoundBank(sounds, cache_dir=""))
+        with wave.open(io.BytesIO(mgr.chatter[0])) as w:
+            samples = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        # -700 normalized to the loudness target, then 30%
+        level = np.rint(-32768 * 10 ** (audio_dsp.LOUDNESS_TARGET_DBFS / 20))
+        assert np.all(samples == np.rint(level * 0.3))
+
+    def test_reminder_squawk_and_tts_share_loudness(self, sounds):
+        class QuietTTS:
+            def synthesize(self, text):
+                return _wav_bytes(np.full(16000, 50, dtype=np.int16).tobytes(), rate=22050)
+
+        bank = SoundBank(sounds, cache_dir="")
+        sched = medications.MedicationScheduler(None, tts=QuietTTS(), sound_bank=bank)
+        wav = asyncio.run(sched._build_reminder_audio("time for your pills"))
+        with wave.open(io.BytesIO(wav)) as w:
+            samples = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        tts = samples[-10000:]  # tail of the voice part, clear of resampler edges
+        squawk = samples[:4000]
+        for part in (tts, squawk):
+            assert audio_dsp.rms_dbfs(part) == pytest.approx(audio_dsp.LOUDNESS_TARGET_DBFS, abs=0.5)
+
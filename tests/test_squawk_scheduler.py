@@ -0,0 +1,186 @@
+"""
+Squawk Scheduler Tests
+======================
+One global timer heap drives squawks, chatter, prayer slots and message
+nags for every connected device; timers are re-armed on register,
+unregister, snooze and busy.
+Run: python -m pytest tests/test_squawk_scheduler.py -v
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+import wave
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core import squawk as squawk_mod
+from core.squawk import SquawkManager
+
+
+class FakeWS:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data["event"])
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text)["event"])
+
+
+def _tiny_wav():
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * 160)
+    return buf.getvalue()
+
+
+def _register(mgr, device_id):
+    ws = FakeWS()
+    # quiet hours 0-0 = never quiet, so tests don't depend on the clock
+    mgr.register_device(device_id, ws, quiet_hours_start=0, quiet_hours_end=0)
+    return ws
+
+
+@pytest.fixture
+def mgr(tmp_path):
+    m = SquawkManager(str(tmp_path))
+    m.squawks = [_tiny_wav()]
+    m._raw_squawks = [_tiny_wav()]
+    return m
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestArming:
+    def test_one_scheduler_for_all_devices(self, mgr):
+        async def go():
+            for i in range(5):
+                _register(mgr, f"dev{i}")
+            assert mgr._timer_task is not None
+            assert {k for k in mgr._deadlines} == {
+                (f"dev{i}", kind) for i in range(5) for kind in ("squawk", "chatter")}
+            mgr.stop()
+        run(go())
+
+    def test_unregister_disarms_but_keeps_schedule(self, mgr):
+        async def go():
+            _register(mgr, "dev1")
+            next_sq = mgr._next_squawk_time["dev1"]
+            mgr.unregister_device("dev1")
+            assert not mgr._deadlines
+            _register(mgr, "dev1")
+            assert mgr._deadlines[("dev1", "squawk")] == next_sq
+            mgr.stop()
+        run(go())
+
+    def test_disabled_interval_not_armed(self, mgr):
+        async def go():
+            _register(mgr, "dev1")
+            mgr.update_intervals("dev1", squawk_interval=0)
+            assert ("dev1", "squawk") not in mgr._deadlines
+            assert ("dev1", "chatter") in mgr._deadlines
+            mgr.stop()
+        run(go())
+
+    def test_callbacks_arm_prayer_and_nag(self, mgr):
+        async def noop(*args):
+            return False
+
+        async def go():
+            _register(mgr, "dev1")
+            mgr.register_prayer_callback("dev1", noop)
+            mgr.register_message_callback("dev1", noop, noop)
+            assert ("dev1", "prayer") in mgr._deadlines
+            assert ("dev1", "nag") in mgr._deadlines
+            mgr.stop()
+        run(go())
+
+    def test_arm_without_loop_is_safe(self, mgr):
+        mgr._active_devices["dev1"] = FakeWS()
+        mgr._arm("dev1", "squawk", time.time() + 60)
+        assert mgr._timer_task is None
+        assert ("dev1", "squawk") in mgr._deadlines
+
+
+class TestFiring:
+    def test_due_squawk_fires_and_reschedules(self, mgr):
+        async def go():
+            ws = _register(mgr, "dev1")
+            mgr._arm("dev1", "squawk", time.time())
+            await asyncio.sleep(0.3)
+            mgr.stop()
+            return ws
+
+        ws = run(go())
+        assert ws.sent.count("squawk_start") == 1
+        assert mgr._next_squawk_time["dev1"] > time.time() + 60
+
+    def test_earlier_deadline_wakes_sleeping_scheduler(self, mgr):
+        async def go():
+            ws = _register(mgr, "dev1")  # first timers are minutes away
+            await asyncio.sleep(0.05)
+            mgr._arm("dev1", "squawk", time.time() + 0.05)
+            await asyncio.sleep(0.4)
+            mgr.stop()
+            return ws
+
+        assert "squawk_start" in run(go()).sent
+
+    def test_snoozed_device_rearmed_at_snooze_end(self, mgr):
+        async def go():
+            ws = _register(mgr, "dev1")
+            mgr.snooze("dev1", 10)
+            mgr._arm("dev1", "squawk", time.time())
+            await asyncio.sleep(0.1)
+            mgr.stop()
+            return ws
+
+        ws = run(go())
+        assert ws.sent == []
+        assert mgr._deadlines[("dev1", "squawk")] == mgr._snoozed_until["dev1"]
+
+    def test_busy_device_retried_later(self, mgr):
+        async def go():
+            ws = _register(mgr, "dev1")
+            mgr.set_busy("dev1", True)
+            mgr._arm("dev1", "squawk", time.time())
+            await asyncio.sleep(0.1)
+            mgr.stop()
+            return ws
+
+        ws = run(go())
+        assert ws.sent == []
+        retry = mgr._deadlines[("dev1", "squawk")]
+        assert time.time() < retry <= time.time() + squawk_mod.BUSY_RETRY_SECONDS
+
+    def test_message_nag(self, mgr):
+        said = []
+
+        async def has_messages():
+            return True
+
+        async def tts(text):
+            said.append(text)
+
+        async def go():
+            _register(mgr, "dev1")
+            mgr.register_message_callback("dev1", has_messages, tts)
+            await asyncio.sleep(1.5)
+            mgr.stop()
+
+        run(go())
+        assert said == ["Message! Message!"]
+        nag_at = mgr._deadlines[("dev1", "nag")]
+        assert nag_at == pytest.approx(time.time() + squawk_mod.MESSAGE_NAG_SECONDS, abs=5)
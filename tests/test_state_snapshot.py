@@ -0,0 +1,113 @@
+"""
+Runtime State Snapshot Tests
+============================
+Conversation state, squawk schedules and medication dedup keys survive a
+save -> new process -> restore round trip through the runtime_state table.
+Run: python -m pytest tests/test_state_snapshot.py -v
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.command_processor import CommandProcessor
+from core.conversation_state import ConversationMode, ConversationState
+from core.database import PollyDB
+from core.medications import MedicationScheduler, _get_local_now
+from core.squawk import SquawkManager
+from core.state_snapshot import StateSnapshotter
+
+
+class FakeData:
+    def get_response(self, key):
+        return None
+
+
+def _components(db, tmp_path):
+    return dict(
+        cmd=CommandProcessor(db=db, data=FakeData()),
+        squawk=SquawkManager(str(tmp_path)),
+        med_scheduler=MedicationScheduler(db),
+    )
+
+
+@pytest.fixture
+def db():
+    return PollyDB(":memory:")
+
+
+class TestConversationState:
+    def test_round_trip(self):
+        state = ConversationState()
+        state.mode = ConversationMode.FOLLOWUP_WAIT
+        state.speaker_name = "Grandma"
+        state.story_parts = ["We lived on a farm"]
+        state.tenant_id = 7
+        state.voice_volume = 60
+        state.mode_set_at -= 30
+
+        copy = ConversationState.from_dict(state.to_dict())
+        assert copy.mode == ConversationMode.FOLLOWUP_WAIT
+        assert copy.speaker_name == "Grandma"
+        assert copy.story_parts == ["We lived on a farm"]
+        assert copy.tenant_id == 7
+        assert copy.voice_volume == 60
+        assert abs((time.monotonic() - copy.mode_set_at) - 30) < 1
+
+    def test_unknown_mode_falls_back_to_command(self):
+        copy = ConversationState.from_dict({"mode": "no_such_mode"})
+        assert copy.mode == ConversationMode.COMMAND
+
+
+class TestSnapshotter:
+    def test_save_and_restore(self, db, tmp_path):
+        old = _components(db, tmp_path)
+        state = old["cmd"]._get_state("dev1")
+        state.mode = ConversationMode.STORY_PROMPT
+        state.tenant_id = 3
+        old["cmd"]._last_response["dev1"] = "Hello! How are you today?"
+        old["squawk"]._next_squawk_time["dev1"] = time.time() + 500
+        old["squawk"]._next_chatter_time["dev1"] = float("inf")
+        old["squawk"].snooze("dev1", 30)
+        today = _get_local_now().strftime("%Y-%m-%d")
+        old["med_scheduler"]._last_reminded[f"4:08:00:{today}"] = True
+        old["med_scheduler"]._last_reminded["4:08:00:2000-01-01"] = True
+        StateSnapshotter(db, **old).save()
+
+        new = _components(db, tmp_path)
+        restored = StateSnapshotter(db, **new).restore()
+        assert sorted(restored) == ["conversations", "medication_dedup", "squawk"]
+
+        state = new["cmd"]._get_state("dev1")
+        assert state.mode == ConversationMode.STORY_PROMPT
+        assert state.tenant_id == 3
+        assert new["cmd"]._last_response["dev1"] == "Hello! How are you today?"
+        sq = new["squawk"]
+        assert sq._next_squawk_time["dev1"] == old["squawk"]._next_squawk_time["dev1"]
+        assert sq._next_chatter_time["dev1"] == float("inf")
+        assert sq.snooze_status("dev1").startswith("snoozed:")
+        assert list(new["med_scheduler"]._last_reminded) == [f"4:08:00:{today}"]
+
+    def test_live_state_wins_over_snapshot(self, db, tmp_path):
+        old = _components(db, tmp_path)
+        old["cmd"]._last_response["dev1"] = "stale"
+        StateSnapshotter(db, **old).save()
+
+        new = _components(db, tmp_path)
+        new["cmd"]._last_response["dev1"] = "fresh"
+        StateSnapshotter(db, **new).restore()
+        assert new["cmd"]._last_response["dev1"] == "fresh"
+
+    def test_old_snapshots_ignored(self, db, tmp_path):
+        StateSnapshotter(db, **_components(db, tmp_path)).save()
+        conn = db._get_connection()
+        conn.execute("UPDATE runtime_state SET saved_at = datetime('now', '-2 days')")
+        conn.commit()
+        assert StateSnapshotter(db, **_components(db, tmp_path)).restore() == []
+
+    def test_nothing_saved(self, db, tmp_path):
+        assert StateSnapshotter(db, **_components(db, tmp_path)).restore() == []
@@ -0,0 +1,111 @@
+"""
+Device Telemetry Writer Tests
+=============================
+Device events are buffered in memory and written in batches by a background
+task; the buffer is bounded and counts what it had to drop.
+Run: python -m pytest tests/test_telemetry.py -v
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.async_db import AsyncPollyDB
+from core.database import PollyDB
+from core.telemetry import TelemetryWriter
+
+
+@pytest.fixture
+def adb(tmp_path):
+    db = PollyDB(str(tmp_path / "polly.db"))
+    adb = AsyncPollyDB(db)
+    yield adb
+    adb.close()
+    db.close()
+
+
+def _events(db):
+    with db.connection() as conn:
+        return conn.execute("SELECT device_id, event_type, intent, created_at "
+                            "FROM device_events ORDER BY id").fetchall()
+
+
+class TestWriter:
+    def test_flush_writes_one_batch(self, adb):
+        writer = TelemetryWriter(adb)
+        writer.record("dev1", 1, "connect")
+        writer.record("dev1", 1, "command", intent="weather")
+        assert _events(adb.db) == []  # nothing written on record()
+
+        assert asyncio.run(writer.flush()) == 2
+        rows = _events(adb.db)
+        assert [(r[0], r[1], r[2]) for r in rows] == [
+            ("dev1", "connect", None), ("dev1", "command", "weather")]
+        assert rows[0][3]  # stamped when recorded
+        assert writer.stats()["written"] == 2 and writer.stats()["flushes"] == 1
+
+    def test_background_flush_on_interval(self, adb):
+        async def go():
+            writer = TelemetryWriter(adb, interval=0.05)
+            await writer.start()
+            writer.record("dev1", 1, "connect")
+            await asyncio.sleep(0.2)
+            written = len(_events(adb.db))
+            await writer.stop()
+            return written
+
+        assert asyncio.run(go()) == 1
+
+    def test_full_batch_flushes_early(self, adb):
+        async def go():
+            writer = TelemetryWriter(adb, interval=60, batch_rows=5)
+            await writer.start()
+            for i in range(5):
+                writer.record(f"dev{i}", 1, "command")
+            await asyncio.sleep(0.1)
+            written = len(_events(adb.db))
+            await writer.stop()
+            return written
+
+        assert asyncio.run(go()) == 5
+
+    def test_stop_flushes_remainder(self, adb):
+        async def go():
+            writer = TelemetryWriter(adb, interval=60)
+            await writer.start()
+            writer.record("dev1", 1, "disconnect")
+            await writer.stop()
+
+        asyncio.run(go())
+        assert len(_events(adb.db)) == 1
+
+    def test_bounded_buffer_drops_oldest(self, adb):
+        writer = TelemetryWriter(adb, max_buffered=3)
+        for i in range(5):
+            writer.record(f"dev{i}", 1, "command")
+        assert writer.stats()["dropped"] == 2
+        asyncio.run(writer.flush())
+        assert [r[0] for r in _events(adb.db)] == ["dev2", "dev3", "dev4"]
+
+    def test_failed_flush_requeues(self, adb, monkeypatch):
+        writer = TelemetryWriter(adb, max_buffered=3)
+        writer.record("dev1", 1, "command")
+        writer.record("dev2", 1, "command")
+
+        def fail(rows):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(adb.db, "log_device_events", fail)
+        assert asyncio.run(writer.flush()) == 0
+        writer.record("dev3", 1, "command")
+        writer.record("dev4", 1, "command")  # buffer full: oldest goes
+        stats = writer.stats()
+        assert stats["failures"] == 1 and stats["buffered"] == 3 and stats["dropped"] == 1
+
+        monkeypatch.undo()
+        asyncio.run(writer.flush())
+        assert [r[0] for r in _events(adb.db)] == ["dev2", "dev3", "dev4"]